@@ -2,18 +2,31 @@
 
 This is the main API server for the Snake game. It provides endpoints for
 controlling the game and retrieving game state.
+
+Every client plays in its own session. Routes under
+`/api/game/<session_id>/...` address a specific session, while the legacy
+`/api/game/...` routes operate on a shared default session.
 """
 
+import json
 import os
 import sys
-from flask import Flask, jsonify
+import threading
+import time
+from contextlib import contextmanager
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
 import logging
 
 # Add the src directory to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from src.api.snake_api import SnakeAPI
+from src.api.game_loop import GameLoop
+from src.api.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, HTTP_BUCKETS, METRICS
+from src.api.metrics import engine_metrics_reader, timed_library
+from src.api.sessions import SessionLimitError, SessionNotFoundError, SessionRegistry
+from src.api.sharding import ShardedRegistry
+from src.api.snake_api import GRID_HEIGHT, GRID_WIDTH, SnakeAPI
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,18 +35,211 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all origins
 
-# Initialize game instance
-game = None
+DEFAULT_SESSION = 'default'
+
+# Registry of live game sessions
+registry = None
+# Server-side tick loop for streamed sessions
+game_loop = None
+# Guards creating the registry and loop on concurrent first requests
+init_lock = threading.RLock()
+
+# Seconds between keepalive comments on an idle event stream
+STREAM_KEEPALIVE = 15
+
+# Content type of packed binary state (see SnakeAPI.get_state_bytes)
+BINARY_MIMETYPE = 'application/octet-stream'
+
+# Metrics served at /metrics when SNAKE_METRICS=1. Games created while they
+# are on time every C call through ctypes instead of the native extension.
+METRICS.enabled = os.environ.get('SNAKE_METRICS', '0') == '1'
+REQUESTS_TOTAL = METRICS.counter(
+    'snake_http_requests_total', 'HTTP requests by route, method and status')
+REQUEST_SECONDS = METRICS.histogram(
+    'snake_http_request_duration_seconds', 'HTTP request duration by route and method', HTTP_BUCKETS)
+ACTIVE_SESSIONS = METRICS.gauge('snake_active_sessions', 'Live game sessions')
+METRICS.add_reader(lambda: {ACTIVE_SESSIONS: len(registry)} if registry is not None else {})
+
+class GameInitError(Exception):
+    """Raised when the session registry or a session's game cannot be set up."""
+
+@contextmanager
+def game_setup():
+    """Turn failures to set up the registry or a game into `GameInitError`.
+
+    Missing sessions and a full registry keep their own 404 and 503 responses.
+    """
+    try:
+        yield
+    except (SessionNotFoundError, SessionLimitError):
+        raise
+    except Exception as e:
+        raise GameInitError(str(e)) from e
+
+def init_registry():
+    """Initialize the session registry if it doesn't exist."""
+    global registry
+    if registry is None:
+        with init_lock:
+            if registry is None:
+                lib_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'build', 'libsnake.so')
+                if not os.path.exists(lib_path):
+                    raise RuntimeError(f"Library not found at {lib_path}")
+                width = int(os.environ.get('SNAKE_GRID_WIDTH', GRID_WIDTH))
+                height = int(os.environ.get('SNAKE_GRID_HEIGHT', GRID_HEIGHT))
+                max_sessions = int(os.environ.get('SNAKE_MAX_SESSIONS', 10000))
+                idle_ttl = float(os.environ.get('SNAKE_SESSION_TTL', 600))
+                shards = int(os.environ.get('SNAKE_SHARDS', 0))
+                # Directory for per-session input logs (see src/api/replay.py)
+                input_log_dir = os.environ.get('SNAKE_INPUT_LOG_DIR') or None
+                if shards > 0:
+                    # Host games in worker processes; this process only routes calls
+                    logger.info(f"Hosting sessions in {shards} shard processes")
+                    registry = ShardedRegistry(
+                        shards,
+                        lib_path,
+                        width=width,
+                        height=height,
+                        max_sessions=max_sessions,
+                        idle_ttl=idle_ttl,
+                        input_log_dir=input_log_dir,
+                    )
+                else:
+                    if METRICS.enabled:
+                        # Moves and games over are counted by the C library
+                        METRICS.add_reader(engine_metrics_reader(lib_path))
+
+                    def create_game():
+                        # Games time their C calls while metrics are on
+                        library = timed_library(lib_path) if METRICS.enabled else None
+                        return SnakeAPI(lib_path, width=width, height=height, library=library)
+
+                    registry = SessionRegistry(
+                        lib_path,
+                        factory=create_game,
+                        max_sessions=max_sessions,
+                        idle_ttl=idle_ttl,
+                        input_log_dir=input_log_dir,
+                    )
+    return registry
+
+def init_loop():
+    """Start the server-side game loop if it isn't running."""
+    global game_loop
+    if game_loop is None:
+        with init_lock:
+            if game_loop is None:
+                game_loop = GameLoop(init_registry(), render=lambda game: json.dumps(state_payload(game)))
+                game_loop.start()
+    return game_loop
+
+def init_game(session_id=DEFAULT_SESSION):
+    """Look up the game for a session; the default session is created on demand."""
+    with game_setup():
+        if session_id == DEFAULT_SESSION:
+            return init_registry().get_or_create(session_id)
+        return init_registry().get(session_id)
+
+def state_payload(game):
+    """Build the JSON state payload for a game."""
+    state = game.get_state()
+    return {
+        'snake': state['snake'],
+        'food': state['food'],
+        'score': state['score'],
+        'game_over': state['game_over'],
+        'won': state['won'],
+        'direction': state['direction'],
+        'width': state['width'],
+        'height': state['height'],
+        'tick': state['tick']
+    }
+
+def delta_payload(game, since):
+    """Build the JSON payload with the changes since a tick the client has seen."""
+    delta = game.get_delta(since)
+    payload = {
+        'tick': delta['tick'],
+        'keyframe': delta['keyframe'],
+        'length': delta['length'],
+        'food': delta['food'],
+        'score': delta['score'],
+        'game_over': delta['game_over'],
+        'won': delta['won'],
+        'direction': delta['direction'],
+        'width': delta['width'],
+        'height': delta['height']
+    }
+    if delta['keyframe']:
+        payload['snake'] = delta['snake']
+    else:
+        payload['head'] = delta['head']
+    return payload
+
+def since_arg():
+    """Read the client's last-seen tick from the `since` query parameter."""
+    since = request.args.get('since')
+    if since is None:
+        return None
+    if not since.isdigit():
+        raise ValueError('since must be a non-negative integer')
+    return int(since)
+
+def wants_binary():
+    """Whether the client asked for packed binary state via the Accept header."""
+    best = request.accept_mimetypes.best_match(['application/json', BINARY_MIMETYPE])
+    return best == BINARY_MIMETYPE
+
+def state_response(game):
+    """Build the state response the client asked for.
+
+    Sends only the changes if the client passed `?since=<tick>`, and packed
+    binary instead of JSON for `Accept: application/octet-stream`.
+    """
+    since = since_arg()
+    if wants_binary():
+        return Response(game.get_state_bytes(since), mimetype=BINARY_MIMETYPE)
+    return jsonify(state_payload(game) if since is None else delta_payload(game, since))
+
+def record_request(route, method, status, start):
+    """Count a finished request and record how long it took since `start`."""
+    METRICS.observe(REQUEST_SECONDS, time.perf_counter() - start, (('route', route), ('method', method)))
+    METRICS.inc(REQUESTS_TOTAL, (('route', route), ('method', method), ('status', str(status))))
+
+def metrics_text():
+    """Render the metrics of this process and of any shard processes."""
+    snapshots = registry.metrics_snapshots() if isinstance(registry, ShardedRegistry) else ()
+    return METRICS.render(snapshots)
+
+@app.before_request
+def start_request_timer():
+    if METRICS.enabled:
+        g.request_start = time.perf_counter()
 
-def init_game():
-    """Initialize the game instance if it doesn't exist."""
-    global game
-    if game is None:
-        lib_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'build', 'libsnake.so')
-        if not os.path.exists(lib_path):
-            raise RuntimeError(f"Library not found at {lib_path}")
-        game = SnakeAPI(lib_path)
-    return game
+@app.after_request
+def finish_request_timer(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        # Endpoint names are shared by a route's legacy and session paths
+        record_request(request.endpoint or 'unmatched', request.method, response.status_code, start)
+    return response
+
+@app.errorhandler(SessionNotFoundError)
+def session_not_found(e):
+    """Return 404 for unknown or expired sessions."""
+    return jsonify({'error': f"Session not found: {e.args[0]}"}), 404
+
+@app.errorhandler(SessionLimitError)
+def session_limit(e):
+    """Return 503 when the server cannot host more sessions."""
+    logger.error(f"Session limit reached: {str(e)}")
+    return jsonify({'error': str(e)}), 503
+
+@app.errorhandler(GameInitError)
+def game_init_failed(e):
+    """Return 400 when the registry or a game cannot be set up."""
+    logger.error(f"Error initializing game: {str(e)}")
+    return jsonify({'error': str(e)}), 400
 
 @app.route('/')
 def root():
@@ -43,45 +249,94 @@ def root():
         "status": "active",
         "version": "1.0.0",
         "endpoints": {
-            "GET /api/game/state": "Get current game state",
+            "POST /api/game/session": "Create a new game session",
+            "DELETE /api/game/<session_id>": "Destroy a game session",
+            "GET /api/game/state": "Get current game state (?since=<tick> for only the changes)",
             "POST /api/game/move": "Move snake one step",
+            "POST /api/game/step": "Optionally change direction, move and return the new state",
             "POST /api/game/direction/<direction>": "Change snake direction (up/right/down/left)",
-            "POST /api/game/reset": "Reset game to initial state"
+            "POST /api/game/speed": "Set the server-side tick speed",
+            "GET /api/game/stream": "Stream state frames (Server-Sent Events) as the server advances the game",
+            "POST /api/game/reset": "Reset game to initial state",
+            "GET /metrics": "Request, game and C call metrics in the Prometheus text format"
         }
     })
 
+@app.route('/metrics')
+def metrics():
+    """Serve metrics in the Prometheus text format."""
+    if not METRICS.enabled:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    return Response(metrics_text(), content_type=METRICS_CONTENT_TYPE)
+
+@app.route('/api/game/session', methods=['POST'])
+def create_session():
+    """Create a new game session."""
+    with game_setup():
+        session_id = init_registry().create()
+    return jsonify({'session_id': session_id}), 201
+
+@app.route('/api/game/<session_id>', methods=['DELETE'])
+def destroy_session(session_id):
+    """Destroy a game session and free its game."""
+    with game_setup():
+        destroyed = init_registry().destroy(session_id)
+    if not destroyed:
+        raise SessionNotFoundError(session_id)
+    return jsonify({'success': True})
+
 @app.route('/api/game/state', methods=['GET'])
-def get_state():
-    """Get the current game state."""
+@app.route('/api/game/<session_id>/state', methods=['GET'])
+def get_state(session_id=DEFAULT_SESSION):
+    """Get the current game state, or only the changes since `?since=<tick>`."""
+    game = init_game(session_id)
     try:
-        game = init_game()
-        return jsonify({
-            'snake': game.get_snake_positions(),
-            'food': game.get_food_position(),
-            'score': game.get_score(),
-            'game_over': game.is_game_over(),
-            'direction': game.get_snake_direction()
-        })
+        return state_response(game)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error getting game state: {str(e)}")
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/game/move', methods=['POST'])
-def move():
+@app.route('/api/game/<session_id>/move', methods=['POST'])
+def move(session_id=DEFAULT_SESSION):
     """Move the snake one step forward."""
+    game = init_game(session_id)
     try:
-        game = init_game()
         success = game.move()
         return jsonify({'success': success})
     except Exception as e:
         logger.error(f"Error moving snake: {str(e)}")
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/game/step', methods=['POST'])
+@app.route('/api/game/<session_id>/step', methods=['POST'])
+def step(session_id=DEFAULT_SESSION):
+    """Apply an optional queued direction, move the snake and return the new state."""
+    game = init_game(session_id)
+    body = request.get_json(silent=True) or {}
+    direction = request.args.get('direction', body.get('direction'))
+    try:
+        since_arg()  # Reject a bad tick before moving
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        game.step(direction)
+        return state_response(game)
+    except ValueError as e:
+        logger.error(f"Invalid direction: {str(e)}")
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error stepping game: {str(e)}")
+        return jsonify({'error': str(e)}), 400
+
 @app.route('/api/game/direction/<direction>', methods=['POST'])
-def change_direction(direction):
+@app.route('/api/game/<session_id>/direction/<direction>', methods=['POST'])
+def change_direction(direction, session_id=DEFAULT_SESSION):
     """Change the snake's direction."""
+    game = init_game(session_id)
     try:
-        game = init_game()
         game.change_direction(direction)
         return jsonify({'success': True})
     except ValueError as e:
@@ -91,11 +346,54 @@ def change_direction(direction):
         logger.error(f"Error changing direction: {str(e)}")
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/game/speed', methods=['POST'])
+@app.route('/api/game/<session_id>/speed', methods=['POST'])
+def set_speed(session_id=DEFAULT_SESSION):
+    """Set how fast the server-side game loop advances the game."""
+    game = init_game(session_id)
+    body = request.get_json(silent=True) or {}
+    try:
+        speed = float(request.args.get('speed', body.get('speed')))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'speed must be a number'}), 400
+    if not speed > 0:
+        return jsonify({'error': 'speed must be positive'}), 400
+    game.set_game_speed(speed)
+    return jsonify({'success': True, 'speed': game.get_game_speed()})
+
+@app.route('/api/game/stream', methods=['GET'])
+@app.route('/api/game/<session_id>/stream', methods=['GET'])
+def stream(session_id=DEFAULT_SESSION):
+    """Stream state frames as Server-Sent Events while the server advances the game."""
+    init_game(session_id)
+    with game_setup():
+        loop = init_loop()
+    subscription = loop.subscribe(session_id)
+
+    def events():
+        try:
+            while True:
+                frame = subscription.get(timeout=STREAM_KEEPALIVE)
+                if frame is not None:
+                    yield f"data: {frame}\n\n"
+                elif subscription.closed:
+                    break
+                else:
+                    yield ": keepalive\n\n"
+        finally:
+            loop.unsubscribe(subscription)
+
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/api/game/reset', methods=['POST'])
-def reset():
+@app.route('/api/game/<session_id>/reset', methods=['POST'])
+def reset(session_id=DEFAULT_SESSION):
     """Reset the game to its initial state."""
+    game = init_game(session_id)
     try:
-        game = init_game()
         game.reset()
         return jsonify({'success': True})
     except Exception as e:
@@ -104,4 +402,4 @@ def reset():
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 4000))
-    app.run(host='0.0.0.0', port=port) 
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port) 
@@ -0,0 +1,395 @@
+"""Asyncio (ASGI) entry point for the Snake Game API Server.
+
+Serves the same routes as `app.py` from one event loop, so a single process
+can hold thousands of open connections, including idle event streams, without
+a worker thread per connection. Sessions, payloads and the game loop are
+shared with `app.py`.
+
+Run it with any ASGI server, for example:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 4000
+
+Calls into the C library take microseconds and run on the event loop. Work
+that scales with the board (creating games, and reading state on boards
+larger than `INLINE_MAX_CELLS`) runs in the default executor so one large
+game cannot stall every other connection.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import re
+import sys
+import time
+from urllib.parse import parse_qs
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import (
+    BINARY_MIMETYPE,
+    DEFAULT_SESSION,
+    STREAM_KEEPALIVE,
+    delta_payload,
+    init_game,
+    init_loop,
+    init_registry,
+    logger,
+    metrics_text,
+    record_request,
+    state_payload,
+)
+from src.api.game_loop import AsyncSubscription
+from src.api.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, METRICS
+from src.api.sessions import SessionLimitError, SessionNotFoundError
+
+# Boards up to this many cells are read on the event loop
+INLINE_MAX_CELLS = 64 * 64
+
+CORS_HEADERS = [
+    (b'access-control-allow-origin', b'*'),
+]
+
+
+class Request:
+    """The parts of an HTTP request the handlers need."""
+
+    def __init__(self, scope, body=b''):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        self.headers = {
+            name.decode('latin-1').lower(): value.decode('latin-1')
+            for name, value in scope.get('headers', [])
+        }
+        self.body = body
+
+    def arg(self, name):
+        """Return a query parameter, falling back to the JSON body."""
+        if name in self.query:
+            return self.query[name][0]
+        try:
+            body = json.loads(self.body) if self.body else {}
+        except ValueError:
+            return None
+        return body.get(name) if isinstance(body, dict) else None
+
+
+class Response:
+    """A complete HTTP response."""
+
+    def __init__(self, body, status=200, content_type='application/json'):
+        self.status = status
+        self.content_type = content_type
+        self.body = body
+
+    @classmethod
+    def json(cls, payload, status=200):
+        return cls(json.dumps(payload).encode(), status)
+
+    @classmethod
+    def error(cls, message, status=400):
+        return cls.json({'error': message}, status)
+
+
+def since_arg(request):
+    """Read the client's last-seen tick from the `since` query parameter."""
+    since = request.query.get('since', [None])[0]
+    if since is None:
+        return None
+    if not since.isdigit():
+        raise ValueError('since must be a non-negative integer')
+    return int(since)
+
+
+def accept_quality(accept, mimetype):
+    """Quality the Accept header gives a mimetype (0 if not acceptable)."""
+    major = mimetype.split('/')[0]
+    best = 0.0
+    for item in accept.split(','):
+        media, _, params = item.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media.strip() in (mimetype, f'{major}/*', '*/*'):
+            best = max(best, quality)
+    return best
+
+
+def wants_binary(request):
+    """Whether the client prefers packed binary state over JSON."""
+    accept = request.headers.get('accept', '*/*')
+    return accept_quality(accept, BINARY_MIMETYPE) > accept_quality(accept, 'application/json')
+
+
+async def call_game(game, func, *args):
+    """Run a call whose cost grows with the board, off the loop if the board is large."""
+    if game.width * game.height <= INLINE_MAX_CELLS:
+        return func(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args))
+
+
+def render_state(game, since, binary):
+    """Build the state response body the client asked for."""
+    if binary:
+        return Response(game.get_state_bytes(since), content_type=BINARY_MIMETYPE)
+    payload = state_payload(game) if since is None else delta_payload(game, since)
+    return Response.json(payload)
+
+
+async def lookup(session_id):
+    """Look up a session's game; creating the default session allocates a board."""
+    if session_id == DEFAULT_SESSION and session_id not in init_registry():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, init_game, session_id)
+    return init_game(session_id)
+
+
+async def root(request):
+    return Response.json({
+        "message": "Snake Game API is running",
+        "status": "active",
+        "version": "1.0.0",
+        "server": "asgi"
+    })
+
+
+async def metrics(request):
+    if not METRICS.enabled:
+        return Response.error('Metrics are disabled', 404)
+    # Collecting from shard processes blocks on their pipes
+    text = await asyncio.get_running_loop().run_in_executor(None, metrics_text)
+    return Response(text.encode(), content_type=METRICS_CONTENT_TYPE)
+
+
+async def create_session(request):
+    loop = asyncio.get_running_loop()
+    session_id = await loop.run_in_executor(None, init_registry().create)
+    return Response.json({'session_id': session_id}, 201)
+
+
+async def destroy_session(request, session_id):
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(None, init_registry().destroy, session_id):
+        raise SessionNotFoundError(session_id)
+    return Response.json({'success': True})
+
+
+async def get_state(request, session_id=DEFAULT_SESSION):
+    game = await lookup(session_id)
+    return await call_game(game, render_state, game, since_arg(request), wants_binary(request))
+
+
+async def move(request, session_id=DEFAULT_SESSION):
+    game = await lookup(session_id)
+    return Response.json({'success': game.move()})
+
+
+async def step(request, session_id=DEFAULT_SESSION):
+    game = await lookup(session_id)
+    since = since_arg(request)
+    game.step(request.arg('direction'))
+    return await call_game(game, render_state, game, since, wants_binary(request))
+
+
+async def change_direction(request, direction, session_id=DEFAULT_SESSION):
+    game = await lookup(session_id)
+    game.change_direction(direction)
+    return Response.json({'success': True})
+
+
+async def set_speed(request, session_id=DEFAULT_SESSION):
+    game = await lookup(session_id)
+    try:
+        speed = float(request.arg('speed'))
+    except (TypeError, ValueError):
+        return Response.error('speed must be a number')
+    if not speed > 0:
+        return Response.error('speed must be positive')
+    game.set_game_speed(speed)
+    return Response.json({'success': True, 'speed': game.get_game_speed()})
+
+
+async def reset(request, session_id=DEFAULT_SESSION):
+    game = await lookup(session_id)
+    await call_game(game, game.reset)
+    return Response.json({'success': True})
+
+
+async def stream(request, send, receive, session_id=DEFAULT_SESSION):
+    """Stream state frames as Server-Sent Events without holding a thread."""
+    await lookup(session_id)
+    loop = init_loop()
+    subscription = loop.subscribe(session_id, AsyncSubscription(session_id))
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': CORS_HEADERS + [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ],
+    })
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        while True:
+            frame = asyncio.ensure_future(subscription.get(STREAM_KEEPALIVE))
+            await asyncio.wait({frame, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                frame.cancel()
+                break
+            if frame.result() is not None:
+                chunk = f"data: {frame.result()}\n\n"
+            elif subscription.closed:
+                break
+            else:
+                chunk = ": keepalive\n\n"
+            await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    except OSError:
+        # The client went away mid-write
+        pass
+    finally:
+        disconnected.cancel()
+        loop.unsubscribe(subscription)
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+SESSION = r'(?:/(?P<session_id>[^/]+))?'
+
+ROUTES = [
+    ('GET', re.compile(r'/$'), root),
+    ('GET', re.compile(r'/metrics$'), metrics),
+    ('POST', re.compile(r'/api/game/session$'), create_session),
+    ('DELETE', re.compile(r'/api/game/(?P<session_id>[^/]+)$'), destroy_session),
+    ('GET', re.compile(rf'/api/game{SESSION}/state$'), get_state),
+    ('POST', re.compile(rf'/api/game{SESSION}/move$'), move),
+    ('POST', re.compile(rf'/api/game{SESSION}/step$'), step),
+    ('POST', re.compile(rf'/api/game{SESSION}/direction/(?P<direction>[^/]+)$'), change_direction),
+    ('POST', re.compile(rf'/api/game{SESSION}/speed$'), set_speed),
+    ('POST', re.compile(rf'/api/game{SESSION}/reset$'), reset),
+]
+
+STREAM_ROUTE = re.compile(rf'/api/game{SESSION}/stream$')
+
+
+def match_route(method, path):
+    """Find the handler and path parameters for a request."""
+    allowed = False
+    for route_method, pattern, handler in ROUTES:
+        match = pattern.match(path)
+        if match:
+            if route_method == method:
+                params = {k: v for k, v in match.groupdict().items() if v is not None}
+                return handler, params, True
+            allowed = True
+    return None, None, allowed
+
+
+async def read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        body += message.get('body', b'')
+        if not message.get('more_body', False):
+            break
+    return body
+
+
+async def send_response(send, response):
+    await send({
+        'type': 'http.response.start',
+        'status': response.status,
+        'headers': CORS_HEADERS + [
+            (b'content-type', response.content_type.encode()),
+            (b'content-length', str(len(response.body)).encode()),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': response.body})
+
+
+async def handle(request, handler, params):
+    """Run a handler, mapping errors to responses the way `app.py` does."""
+    try:
+        return await handler(request, **params)
+    except SessionNotFoundError as e:
+        return Response.error(f"Session not found: {e.args[0]}", 404)
+    except SessionLimitError as e:
+        logger.error(f"Session limit reached: {str(e)}")
+        return Response.error(str(e), 503)
+    except ValueError as e:
+        return Response.error(str(e))
+    except Exception as e:  # pylint: disable=broad-except
+        logger.error(f"Error handling {request.method} {request.path}: {str(e)}")
+        return Response.error(str(e))
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI application."""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    if scope['method'] == 'OPTIONS':
+        # CORS preflight
+        await send({
+            'type': 'http.response.start',
+            'status': 204,
+            'headers': CORS_HEADERS + [
+                (b'access-control-allow-methods', b'GET, POST, DELETE, OPTIONS'),
+                (b'access-control-allow-headers', b'*'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    stream_match = STREAM_ROUTE.match(scope['path'])
+    if stream_match and scope['method'] == 'GET':
+        request = Request(scope)
+        session_id = stream_match.group('session_id') or DEFAULT_SESSION
+        try:
+            await stream(request, send, receive, session_id)
+        except SessionNotFoundError as e:
+            await send_response(send, Response.error(f"Session not found: {e.args[0]}", 404))
+        return
+
+    start = time.perf_counter()
+    handler, params, allowed = match_route(scope['method'], scope['path'])
+    if handler is None:
+        status = 405 if allowed else 404
+        await send_response(send, Response.error('Method not allowed' if allowed else 'Not found', status))
+        if METRICS.enabled:
+            record_request('unmatched', scope['method'], status, start)
+        return
+
+    request = Request(scope, await read_body(receive))
+    response = await handle(request, handler, params)
+    await send_response(send, response)
+    if METRICS.enabled:
+        # Handler names match the endpoint names used by app.py
+        record_request(handler.__name__, scope['method'], response.status, start)
@@ -0,0 +1,81 @@
+"""Measure arena ticks per second as the number of snakes grows.
+
+Every snake is a bot turning at random on about one tick in four; dead snakes
+are respawned after each tick, as a server would do for its players. The
+benchmark reports the mean time of the `step_arena` call, the mean time of a
+whole tick including respawning, and the resulting ticks and snake moves per
+second.
+
+Usage:
+    python benchmarks/bench_arena.py --snakes 100 500 2000 --size 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.api.arena import SnakeArena  # noqa: E402
+from src.api.batch import KEEP_DIRECTION  # noqa: E402
+from src.api.snake_api import default_lib_path  # noqa: E402
+
+
+def bot_turns(rng, snakes, ticks):
+    """Pre-generated directions so the measurement excludes the bots."""
+    choices = [KEEP_DIRECTION] * 3 + [0, 1, 2, 3]
+    return [bytes(rng.choice(choices) % 256 for _ in range(snakes)) for _ in range(ticks)]
+
+
+def run(lib, snakes, size, ticks, seed):
+    """Step an arena of `snakes` bots for `ticks` ticks.
+
+    Returns:
+        tuple: Mean seconds per step call, mean seconds per tick and mean
+        number of live snakes
+    """
+    arena = SnakeArena(snakes, lib, seed=seed, width=size, height=size)
+    turns = bot_turns(random.Random(seed), snakes, ticks)
+    directions = arena.directions.cast("B")
+    stepping = 0.0
+    live = 0
+    start = time.perf_counter()
+    for tick in range(ticks):
+        directions[:] = turns[tick]
+        t = time.perf_counter()
+        live += arena.step()
+        stepping += time.perf_counter() - t
+        arena.respawn_dead()
+    elapsed = time.perf_counter() - start
+    arena.cleanup()
+    return stepping / ticks, elapsed / ticks, live / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lib", default=default_lib_path(), help="Path to libsnake.so")
+    parser.add_argument("--snakes", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--size", type=int, default=200, help="Board side")
+    parser.add_argument("--ticks", type=int, default=1000, help="Ticks per arena")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.size}x{args.size} board, {args.ticks} ticks")
+    print(
+        f"{'snakes':>7} {'live':>7} {'step ms':>8} {'tick ms':>8} "
+        f"{'ticks/s':>9} {'moves/s':>11}"
+    )
+    for snakes in args.snakes:
+        step, tick, live = run(args.lib, snakes, args.size, args.ticks, args.seed)
+        print(
+            f"{snakes:>7} {live:>7.0f} {step * 1e3:>8.3f} {tick * 1e3:>8.3f} "
+            f"{1 / tick:>9.0f} {live / tick:>11.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
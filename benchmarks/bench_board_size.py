@@ -0,0 +1,143 @@
+"""Benchmark per-move cost of the C engine as the board grows.
+
+Every game follows a Hamiltonian cycle of the board so it never dies, which
+keeps the measured moves comparable across board sizes. Each size reports:
+
+- create: time to allocate and initialize one game
+- move (SnakeAPI): per-move time through `SnakeAPI.step`, with the snake
+  grown to a long body first
+- move (GameBatch): per-move time when stepping many games per C call
+
+Usage:
+    python benchmarks/bench_board_size.py --sizes 20 100 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api.batch import GameBatch  # noqa: E402
+from src.api.snake_api import SnakeAPI  # noqa: E402
+
+DIRECTIONS = {(0, -1): 0, (1, 0): 1, (0, 1): 2, (-1, 0): 3}
+DIRECTION_NAMES = ("up", "right", "down", "left")
+
+
+def hamiltonian_cycle(width, height):
+    """Return a cycle visiting every cell of a board with an even height."""
+    cycle = [(x, 0) for x in range(width)]
+    for y in range(1, height):
+        columns = range(width - 1, 0, -1) if y % 2 else range(1, width)
+        cycle.extend((x, y) for x in columns)
+    cycle.extend((0, y) for y in range(height - 1, 0, -1))
+    return cycle
+
+
+def cycle_path(width, height):
+    """Cells of the cycle starting at the spawn cell, with a first move right.
+
+    The returned path ends with its first cell again so consecutive pairs give
+    every move of one full lap.
+    """
+    cycle = hamiltonian_cycle(width, height)
+    start = cycle.index((width // 2, height // 2))
+    # Walk the cycle backwards if going forwards would start with a U-turn
+    if cycle[(start + 1) % len(cycle)][0] < cycle[start][0]:
+        cycle.reverse()
+        start = len(cycle) - 1 - start
+    path = cycle[start:] + cycle[:start]
+    path.append(path[0])
+    return path
+
+
+def cycle_directions(path):
+    """Direction values for each move along a path."""
+    return [DIRECTIONS[(b[0] - a[0], b[1] - a[1])] for a, b in zip(path, path[1:])]
+
+
+def bench_create(lib_path, size, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        SnakeAPI(lib_path, seed=0, width=size, height=size).cleanup()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_single(lib_path, size, moves, length):
+    api = SnakeAPI(lib_path, seed=0, width=size, height=size)
+    path = cycle_path(size, size)
+    directions = [DIRECTION_NAMES[d] for d in cycle_directions(path)]
+    steps = len(directions)
+
+    # Grow the snake by feeding it on every step
+    i = 0
+    while api.get_snake_length() < length:
+        api.set_food_position(*path[(i + 1) % steps])
+        api.step(directions[i % steps])
+        i += 1
+
+    # Keep the food on the cell behind the tail so the length stays fixed;
+    # the head only reaches it after `steps - length` moves.
+    chunk = steps - length - 1
+    elapsed = 0.0
+    for offset in range(0, moves, chunk):
+        first = i + offset
+        api.set_food_position(*path[(first - length) % steps])
+        start = time.perf_counter()
+        for j in range(first, first + min(chunk, moves - offset)):
+            api.step(directions[j % steps])
+        elapsed += time.perf_counter() - start
+    assert not api.is_game_over() and api.get_snake_length() == length
+    api.cleanup()
+    return elapsed / moves
+
+
+def bench_batch(lib_path, size, moves, games):
+    batch = GameBatch(games, lib_path, seed=0, width=size, height=size)
+    directions = [[d] * games for d in cycle_directions(cycle_path(size, size))]
+    steps = len(directions)
+    # Games grow as they eat; stop before a small board could fill up
+    ticks = max(1, min(moves // games, steps - 2))
+
+    start = time.perf_counter()
+    for i in range(ticks):
+        batch.step(directions[i % steps])
+    elapsed = time.perf_counter() - start
+    assert not any(batch.game_over)
+    batch.cleanup()
+    return elapsed / (ticks * games)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lib", default=None, help="Path to libsnake.so")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[20, 50, 100, 200, 500, 1000]
+    )
+    parser.add_argument("--moves", type=int, default=20000)
+    parser.add_argument("--games", type=int, default=64)
+    parser.add_argument("--length", type=int, default=200, help="Snake length to grow to")
+    args = parser.parse_args()
+
+    print(
+        f"{'board':>11} {'create (ms)':>12} {'move SnakeAPI (us)':>19} "
+        f"{'move GameBatch (us)':>20}"
+    )
+    for size in args.sizes:
+        if size % 2:
+            parser.error("board sizes must be even")
+        create = bench_create(args.lib, size, repeat=5)
+        length = min(args.length, size * size // 2)
+        single = bench_single(args.lib, size, args.moves, length)
+        batched = bench_batch(args.lib, size, args.moves, args.games)
+        print(
+            f"{size:>5}x{size:<5} {create * 1e3:>12.3f} {single * 1e6:>19.3f} "
+            f"{batched * 1e6:>20.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Benchmark how fast games are created and destroyed.
+
+Creating a session creates a `SnakeAPI` game and deleting it destroys the
+game. For each board size this reports creates per second (each followed by
+a destroy) for:
+
+- uncached: loading the library and setting up its function signatures for
+  every game, as `SnakeAPI` did before the handle was shared
+- no pool: the shared library handle with the C game pool disabled, so every
+  game is allocated from and freed to the system
+- pooled: the shared handle and the game pool (the default)
+- C only: `create_game_sized`/`destroy_game` called directly, pooled
+
+Allocator churn is reported as games allocated from the system per create,
+read from the pool's counters: 1.0 means every create hit malloc, 0.0 means
+every game was reused. A live set of sessions is kept open throughout, so
+creates and destroys interleave like they do on a busy server.
+
+Usage:
+    python benchmarks/bench_create.py --sizes 20 100 500 --creates 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+from ctypes import CDLL
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api.snake_api import (  # noqa: E402
+    SnakeAPI,
+    _setup_function_signatures,
+    default_lib_path,
+    game_pool_stats,
+    load_library,
+    set_game_pool_limits,
+)
+
+DEFAULT_POOL_GAMES = 1024
+DEFAULT_POOL_BYTES = 64 << 20
+
+
+def churn(lib_path, run):
+    """Run `run`, returning its creates per second and allocations per create."""
+    before = game_pool_stats(lib_path)
+    start = time.perf_counter()
+    creates = run()
+    seconds = time.perf_counter() - start
+    allocated = game_pool_stats(lib_path)["allocated"] - before["allocated"]
+    return creates / seconds, allocated / creates
+
+
+def cycle_sessions(create, destroy, creates, live):
+    """Keep `live` games open, replacing the oldest one `creates` times.
+
+    Returns:
+        int: Number of games created
+    """
+    games = [create() for _ in range(live)]
+    for i in range(creates):
+        destroy(games[i % live])
+        games[i % live] = create()
+    for game in games:
+        destroy(game)
+    return creates + live
+
+
+def bench_uncached(lib_path, size, creates, live):
+    def create():
+        lib = CDLL(lib_path)
+        _setup_function_signatures(lib)
+        return lib, lib.create_game_sized(size, size)
+
+    def destroy(game):
+        lib, instance = game
+        lib.destroy_game(instance)
+
+    return churn(lib_path, lambda: cycle_sessions(create, destroy, creates, live))
+
+
+def bench_api(lib_path, size, creates, live):
+    def create():
+        return SnakeAPI(lib_path, width=size, height=size)
+
+    return churn(
+        lib_path, lambda: cycle_sessions(create, SnakeAPI.cleanup, creates, live)
+    )
+
+
+def bench_c(lib_path, size, creates, live):
+    lib = load_library(lib_path)
+    return churn(
+        lib_path,
+        lambda: cycle_sessions(
+            lambda: lib.create_game_sized(size, size), lib.destroy_game, creates, live
+        ),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lib", default=default_lib_path(), help="Path to libsnake.so")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 500])
+    parser.add_argument("--creates", type=int, default=20000, help="Creates per measurement")
+    parser.add_argument("--live", type=int, default=64, help="Sessions kept open")
+    args = parser.parse_args()
+
+    print(f"{args.creates} creates per measurement, {args.live} sessions open")
+    print(f"{'size':>6} {'variant':>10} {'creates/s':>12} {'allocs/create':>14}")
+    for size in args.sizes:
+        # Fewer creates on large boards, which are slow to initialize
+        creates = max(args.live, args.creates * 400 // max(400, size * size))
+        set_game_pool_limits(0, 0, args.lib)
+        results = {
+            "uncached": bench_uncached(args.lib, size, creates, args.live),
+            "no pool": bench_api(args.lib, size, creates, args.live),
+        }
+        set_game_pool_limits(DEFAULT_POOL_GAMES, DEFAULT_POOL_BYTES, args.lib)
+        # Fill the pool first, as a server that has been running for a while
+        cycle_sessions(
+            lambda: SnakeAPI(args.lib, width=size, height=size),
+            SnakeAPI.cleanup,
+            0,
+            args.live,
+        )
+        results["pooled"] = bench_api(args.lib, size, creates, args.live)
+        results["C only"] = bench_c(args.lib, size, creates, args.live)
+        for variant, (rate, allocs) in results.items():
+            print(f"{size:>6} {variant:>10} {rate:>12,.0f} {allocs:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
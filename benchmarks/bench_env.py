@@ -0,0 +1,105 @@
+"""Measure environment steps per second with observations built in C or Python.
+
+The baseline is how training code wrapped `SnakeAPI` before `src.api.env`:
+one game per object, with a grid observation rebuilt in NumPy from
+`get_snake_positions()` and `get_food_position()` after every move, and
+frames stacked by copying. `SnakeEnv` draws the observation of one game in
+C, and `SnakeVecEnv` steps all games with one C call and has C draw their
+observations into a buffer shared with NumPy.
+
+Usage:
+    python benchmarks/bench_env.py --envs 1 64 1024 --stack 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.api.env import SnakeEnv, SnakeVecEnv  # noqa: E402
+from src.api.snake_api import DIRECTION_NAMES, SnakeAPI, default_lib_path  # noqa: E402
+
+
+def python_observation(api, frames):
+    """Shift the stacked frames and draw the newest from the game's state."""
+    frames[:-3] = frames[3:]
+    frame = frames[-3:]
+    frame[:] = 0
+    snake = api.get_snake_positions()
+    xs, ys = zip(*snake)
+    frame[0, ys, xs] = 1
+    frame[1, snake[0][1], snake[0][0]] = 1
+    food_x, food_y = api.get_food_position()
+    frame[2, food_y, food_x] = 1
+
+
+def run_python(lib, envs, steps, size, stack):
+    apis = [SnakeAPI(lib, seed=i, width=size, height=size) for i in range(envs)]
+    frames = np.zeros((envs, stack * 3, size, size), dtype=np.uint8)
+    actions = np.random.default_rng(0).integers(0, 4, (steps, envs))
+    start = time.perf_counter()
+    for t in range(steps):
+        for i, api in enumerate(apis):
+            api.step(DIRECTION_NAMES[actions[t, i]])
+            if api.is_game_over():
+                api.reset()
+            python_observation(api, frames[i])
+    elapsed = time.perf_counter() - start
+    for api in apis:
+        api.cleanup()
+    return elapsed
+
+
+def run_single(lib, envs, steps, size, stack):
+    games = [SnakeEnv(lib, seed=i, width=size, height=size, stack=stack) for i in range(envs)]
+    actions = np.random.default_rng(0).integers(0, 4, (steps, envs)).tolist()
+    start = time.perf_counter()
+    for t in range(steps):
+        for i, env in enumerate(games):
+            if env.step(actions[t][i])[2]:
+                env.reset()
+    elapsed = time.perf_counter() - start
+    for env in games:
+        env.cleanup()
+    return elapsed
+
+
+def run_vec(lib, envs, steps, size, stack):
+    env = SnakeVecEnv(envs, lib, seed=0, width=size, height=size, stack=stack)
+    env.reset()
+    actions = np.random.default_rng(0).integers(0, 4, (steps, envs))
+    start = time.perf_counter()
+    for t in range(steps):
+        env.step(actions[t])
+    elapsed = time.perf_counter() - start
+    env.cleanup()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lib", default=default_lib_path(), help="Path to libsnake.so")
+    parser.add_argument("--envs", type=int, nargs="+", default=[1, 64, 1024])
+    parser.add_argument("--steps", type=int, default=200, help="Steps of every env")
+    parser.add_argument("--size", type=int, default=20, help="Board side")
+    parser.add_argument("--stack", type=int, default=4, help="Frames per observation")
+    args = parser.parse_args()
+
+    print(f"{args.size}x{args.size} board, {args.stack} stacked frames, {args.steps} steps")
+    print(f"{'envs':>6} {'python steps/s':>15} {'SnakeEnv':>10} {'SnakeVecEnv':>12}")
+    for envs in args.envs:
+        rates = [
+            envs * args.steps / run(args.lib, envs, args.steps, args.size, args.stack)
+            for run in (run_python, run_single, run_vec)
+        ]
+        print(f"{envs:>6} {rates[0]:>15.0f} {rates[1]:>10.0f} {rates[2]:>12.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
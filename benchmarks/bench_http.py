@@ -0,0 +1,241 @@
+"""Load-test `app.py` with the traffic the web frontend generates.
+
+Each server configuration is started locally and driven by simulated
+players. Like the frontend, a player runs a fixed-rate loop (every 100 ms by
+default) that sends ``POST move`` followed by ``GET state``, occasionally
+changes direction and resets the game once it is over. Every player plays
+its own session over its own keep-alive connection.
+
+For each endpoint the benchmark reports requests per second, latency
+percentiles and the error rate. It also reports how late players started
+their ticks, which shows when a server can no longer keep up with the
+frontend's pace. Player behaviour is seeded, so runs are reproducible.
+
+Servers:
+- flask: `app.py` on the Werkzeug development server (threaded)
+- gunicorn: `app.py` on gunicorn with one threaded worker
+- asgi: `asgi.py` on uvicorn
+
+Usage:
+    python benchmarks/bench_http.py --clients 200 --duration 20
+    python benchmarks/bench_http.py --servers gunicorn --shards 4 --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_servers import (  # noqa: E402
+    DIRECTIONS,
+    SERVERS,
+    Connection,
+    percentile,
+    start_server,
+    wait_until_ready,
+)
+
+# Chance per tick that a player changes direction
+TURN_CHANCE = 0.15
+
+
+class EndpointStats:
+    """Latencies and failures of the requests sent to one endpoint."""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = Counter()
+
+    @property
+    def requests(self):
+        return len(self.latencies) + sum(self.errors.values())
+
+    def summary(self, seconds):
+        requests = self.requests
+        latencies = self.latencies or [0.0]
+        return {
+            "requests": requests,
+            "req_per_sec": requests / seconds,
+            "p50_ms": percentile(latencies, 0.5) * 1e3,
+            "p90_ms": percentile(latencies, 0.9) * 1e3,
+            "p99_ms": percentile(latencies, 0.99) * 1e3,
+            "max_ms": max(latencies) * 1e3,
+            "errors": sum(self.errors.values()),
+            "error_rate": sum(self.errors.values()) / requests if requests else 0.0,
+            "error_kinds": dict(self.errors),
+        }
+
+
+class Recorder:
+    """Collects per-endpoint results.
+
+    Latencies are only recorded once the warm-up is over, errors always.
+    """
+
+    def __init__(self, start_at):
+        self.start_at = start_at
+        self.endpoints = {}
+        self.tick_lag = []
+
+    def recording(self):
+        return time.monotonic() >= self.start_at
+
+    async def request(self, conn, endpoint, method, path):
+        """Send a request, recording its latency or failure under `endpoint`.
+
+        Returns:
+            The response body of a successful request, otherwise None
+        """
+        record = self.recording()
+        stats = self.endpoints.setdefault(endpoint, EndpointStats())
+        start = time.perf_counter()
+        try:
+            status, body = await conn.request(method, path)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+            conn.close()
+            stats.errors[type(e).__name__] += 1
+            return None
+        if status >= 400:
+            stats.errors[str(status)] += 1
+            return None
+        if record:
+            stats.latencies.append(time.perf_counter() - start)
+        return body
+
+
+async def play(port, deadline, interval, recorder, rng):
+    """One simulated frontend: create a session and play it until the deadline."""
+    conn = Connection(port)
+    body = await recorder.request(conn, "POST session", "POST", "/api/game/session")
+    if body is None:
+        conn.close()
+        return
+    game = f"/api/game/{json.loads(body)['session_id']}"
+    # Spread the players' ticks over the interval, as real clients would be
+    next_tick = time.monotonic() + rng.uniform(0, interval)
+    try:
+        while next_tick < deadline:
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+            if recorder.recording():
+                recorder.tick_lag.append(time.monotonic() - next_tick)
+            if rng.random() < TURN_CHANCE:
+                direction = rng.choice(DIRECTIONS)
+                path = f"{game}/direction/{direction}"
+                await recorder.request(conn, "POST direction", "POST", path)
+            await recorder.request(conn, "POST move", "POST", f"{game}/move")
+            state = await recorder.request(conn, "GET state", "GET", f"{game}/state")
+            if state is not None and json.loads(state)["game_over"]:
+                await recorder.request(conn, "POST reset", "POST", f"{game}/reset")
+            # Like setInterval, a slow tick delays the next one but never
+            # queues up a burst of ticks
+            next_tick = max(next_tick + interval, time.monotonic())
+        await recorder.request(conn, "DELETE session", "DELETE", game)
+    finally:
+        conn.close()
+
+
+async def run_load(port, clients, duration, warmup, interval, seed):
+    start = time.monotonic()
+    recorder = Recorder(start + warmup)
+    deadline = start + warmup + duration
+    await asyncio.gather(
+        *(
+            play(port, deadline, interval, recorder, random.Random(seed + i))
+            for i in range(clients)
+        )
+    )
+    return recorder
+
+
+def report(name, recorder, duration):
+    """Summarize one server's run and print it as a table."""
+    endpoints = {
+        endpoint: stats.summary(duration)
+        for endpoint, stats in sorted(recorder.endpoints.items())
+        if stats.requests
+    }
+    lag = recorder.tick_lag or [0.0]
+    result = {
+        "requests": sum(e["requests"] for e in endpoints.values()),
+        "req_per_sec": sum(e["req_per_sec"] for e in endpoints.values()),
+        "errors": sum(e["errors"] for e in endpoints.values()),
+        "tick_lag_p50_ms": percentile(lag, 0.5) * 1e3,
+        "tick_lag_p99_ms": percentile(lag, 0.99) * 1e3,
+        "endpoints": endpoints,
+    }
+    print(
+        f"\n{name}: {result['req_per_sec']:.0f} req/s, {result['errors']} errors, "
+        f"tick lag p50 {result['tick_lag_p50_ms']:.1f} ms / p99 {result['tick_lag_p99_ms']:.1f} ms"
+    )
+    print(
+        f"{'endpoint':>15} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+        f"{'max ms':>8} {'errors':>7}"
+    )
+    for endpoint, e in endpoints.items():
+        print(
+            f"{endpoint:>15} {e['req_per_sec']:>8.1f} {e['p50_ms']:>8.2f} {e['p90_ms']:>8.2f} "
+            f"{e['p99_ms']:>8.2f} {e['max_ms']:>8.2f} {e['error_rate']:>7.2%}"
+        )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--servers", nargs="+", default=["flask", "gunicorn"], choices=list(SERVERS)
+    )
+    parser.add_argument("--clients", type=int, default=100, help="Concurrent players")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per server")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds first")
+    parser.add_argument(
+        "--interval", type=float, default=0.1, help="Seconds between a player's ticks"
+    )
+    parser.add_argument(
+        "--shards", type=int, default=0, help="Game processes behind each server (0 = in-process)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the players' choices")
+    parser.add_argument("--port", type=int, default=4200)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    config = {
+        key: getattr(args, key)
+        for key in ("clients", "duration", "warmup", "interval", "shards", "seed")
+    }
+    print(
+        f"{args.clients} players, a tick every {args.interval * 1e3:g} ms, "
+        f"{args.duration:g}s measured after {args.warmup:g}s warm-up, {args.shards} shards"
+    )
+    results = {}
+    for offset, name in enumerate(args.servers):
+        port = args.port + offset
+        server = start_server(name, port, args.shards)
+        if server is None:
+            print(f"\n{name}: not installed")
+            continue
+        try:
+            if not asyncio.run(wait_until_ready(port)):
+                print(f"\n{name}: failed to start")
+                continue
+            recorder = asyncio.run(
+                run_load(port, args.clients, args.duration, args.warmup, args.interval, args.seed)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        results[name] = report(name, recorder, args.duration)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "servers": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
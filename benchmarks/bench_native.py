@@ -0,0 +1,117 @@
+"""Compare per-call latency of SnakeAPI through ctypes and the native extension.
+
+The extension is built with ``make build-ext``. For each call the benchmark
+reports the mean latency in microseconds with each binding and the speedup.
+`get_state` and `get_snake_positions` are measured with a long snake, grown
+on a Hamiltonian cycle of the board, since their cost grows with its length.
+
+Usage:
+    make build-ext
+    python benchmarks/bench_native.py --calls 200000 --length 100
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_board_size import (  # noqa: E402
+    DIRECTION_NAMES,
+    cycle_directions,
+    cycle_path,
+)
+from src.api.snake_api import SnakeAPI, default_lib_path, load_native  # noqa: E402
+
+CALLS = ("move", "step", "get_state", "get_snake_positions", "get_score")
+
+
+def grown_game(lib_path, size, length, native):
+    """A game whose snake has `length` segments and follows a cycle of the board.
+
+    Returns:
+        tuple: The game, the directions of one lap of the cycle and the index
+        of the next one
+    """
+    api = SnakeAPI(lib_path, seed=0, width=size, height=size, native=native)
+    path = cycle_path(size, size)
+    directions = [DIRECTION_NAMES[d] for d in cycle_directions(path)]
+    i = 0
+    while api.get_snake_length() < length:
+        api.set_food_position(*path[(i + 1) % len(directions)])
+        api.step(directions[i % len(directions)])
+        i += 1
+    # Put the food half a lap ahead, out of reach of a measured chunk
+    api.set_food_position(*path[(i + len(directions) // 2) % len(directions)])
+    return api, directions, i
+
+
+def time_call(api, name, calls, directions, start):
+    """Mean seconds per call.
+
+    Calls are timed in chunks of a quarter lap. The game is restored after
+    each chunk so the snake never reaches the food or changes length.
+    """
+    saved = api.snapshot()
+    chunk = max(1, len(directions) // 4)
+    func = getattr(api, name)
+    elapsed = 0.0
+    done = 0
+    while done < calls:
+        count = min(chunk, calls - done)
+        turns = [directions[(start + i) % len(directions)] for i in range(count)]
+        api.restore(saved)
+        if name == "step":
+            t = time.perf_counter()
+            for direction in turns:
+                func(direction)
+            elapsed += time.perf_counter() - t
+        elif name == "move":
+            # Turn along the cycle between moves, outside the timing
+            for direction in turns:
+                api.change_direction(direction)
+                t = time.perf_counter()
+                func()
+                elapsed += time.perf_counter() - t
+        else:
+            t = time.perf_counter()
+            for _ in range(count):
+                func()
+            elapsed += time.perf_counter() - t
+        done += count
+    api.restore(saved)
+    return elapsed / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lib", default=default_lib_path(), help="Path to libsnake.so")
+    parser.add_argument("--calls", type=int, default=100000, help="Calls per measurement")
+    parser.add_argument("--size", type=int, default=20, help="Board side")
+    parser.add_argument("--length", type=int, default=100, help="Snake length")
+    args = parser.parse_args()
+
+    if load_native(args.lib) is None:
+        print("Native extension not built, run `make build-ext` first")
+        return 1
+
+    results = {}
+    for native in (False, True):
+        api, directions, start = grown_game(args.lib, args.size, args.length, native)
+        for name in CALLS:
+            results[name, native] = time_call(api, name, args.calls, directions, start)
+            assert api.get_snake_length() == args.length and not api.is_game_over()
+        api.cleanup()
+
+    print(f"{args.size}x{args.size} board, snake length {args.length}")
+    print(f"{'call':>20} {'ctypes us':>10} {'native us':>10} {'speedup':>8}")
+    for name in CALLS:
+        plain, native = results[name, False] * 1e6, results[name, True] * 1e6
+        print(f"{name:>20} {plain:>10.2f} {native:>10.2f} {plain / native:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Measure how many autopilot decisions per second each planner makes.
+
+Every game is played by the planner, one decision and one move per tick, and
+reset when it ends. Three ways of deciding are compared:
+
+- python: a breadth-first search in Python over `get_state()`, which is what
+  bots did before the planner moved into C
+- suggest: `SnakeAPI.suggest_direction()`, one call per game per tick
+- batch: `GameBatch.suggest_directions()`, one call per tick for all games
+
+For the C planners the share of decisions served from a cached distance
+field and the cells visited per decision are reported as well.
+
+Usage:
+    python benchmarks/bench_planner.py --games 64 --ticks 500 --size 20
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.api.batch import GameBatch  # noqa: E402
+from src.api.snake_api import DIRECTION_NAMES, SnakeAPI, default_lib_path  # noqa: E402
+
+# (dx, dy) of each direction value
+MOVES = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+
+def python_direction(state):
+    """First step of a shortest path to the food, searched in Python."""
+    width, height = state["width"], state["height"]
+    body = set(state["snake"])
+    dist = {state["food"]: 0}
+    queue = deque([state["food"]])
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in MOVES:
+            cell = (x + dx, y + dy)
+            if 0 <= cell[0] < width and 0 <= cell[1] < height and cell not in body:
+                if cell not in dist:
+                    dist[cell] = dist[x, y] + 1
+                    queue.append(cell)
+    head_x, head_y = state["snake"][0]
+    back = (DIRECTION_NAMES.index(state["direction"]) + 2) % 4
+    best = None
+    for value, (dx, dy) in enumerate(MOVES):
+        cell = (head_x + dx, head_y + dy)
+        if value != back and cell in dist and (best is None or dist[cell] < best[0]):
+            best = (dist[cell], DIRECTION_NAMES[value])
+    return best[1] if best else None
+
+
+def run_python(lib, games, ticks, size):
+    apis = [SnakeAPI(lib, seed=i, width=size, height=size) for i in range(games)]
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for api in apis:
+            api.step(python_direction(api.get_state()))
+            if api.is_game_over():
+                api.reset()
+    elapsed = time.perf_counter() - start
+    for api in apis:
+        api.cleanup()
+    return elapsed, None
+
+
+def run_suggest(lib, games, ticks, size):
+    apis = [SnakeAPI(lib, seed=i, width=size, height=size) for i in range(games)]
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for api in apis:
+            api.step(api.suggest_direction())
+            if api.is_game_over():
+                api.reset()
+    elapsed = time.perf_counter() - start
+    stats = [api.get_planner_stats() for api in apis]
+    for api in apis:
+        api.cleanup()
+    return elapsed, {key: sum(s[key] for s in stats) for key in stats[0]}
+
+
+def run_batch(lib, games, ticks, size):
+    batch = GameBatch(games, lib, seed=0, width=size, height=size)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        batch.suggest_directions()
+        batch.step()
+        batch.reset_finished()
+    elapsed = time.perf_counter() - start
+    stats = batch.get_planner_stats()
+    batch.cleanup()
+    return elapsed, stats
+
+
+RUNS = {"python": run_python, "suggest": run_suggest, "batch": run_batch}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lib", default=default_lib_path(), help="Path to libsnake.so")
+    parser.add_argument("--games", type=int, default=64)
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--size", type=int, default=20, help="Board side")
+    parser.add_argument("--runs", nargs="+", choices=sorted(RUNS), default=list(RUNS))
+    args = parser.parse_args()
+
+    decisions = args.games * args.ticks
+    print(f"{args.games} games x {args.ticks} ticks on a {args.size}x{args.size} board")
+    print(f"{'planner':>8} {'decisions/s':>12} {'us each':>8} {'cached':>7} {'cells each':>11}")
+    for name in args.runs:
+        elapsed, stats = RUNS[name](args.lib, args.games, args.ticks, args.size)
+        line = f"{name:>8} {decisions / elapsed:>12.0f} {elapsed / decisions * 1e6:>8.2f}"
+        if stats:
+            made = stats["searches"] + stats["reused"]
+            line += f" {stats['reused'] / made:>6.0%} {stats['cells'] / made:>11.1f}"
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""Load-test the Flask and ASGI servers side by side.
+
+Each server is started locally as a single process. Simulated clients each
+create a session and play it with `POST /api/game/<id>/step` requests over a
+keep-alive connection, either as fast as possible or paced like the web
+frontend (``--interval 0.1``). Optionally, ``--streams`` event-stream
+connections are opened first to show what holding many connections costs each
+server.
+
+Servers:
+- flask: `app.py` on the Werkzeug development server (threaded)
+- gunicorn: `app.py` on gunicorn with one threaded worker
+- asgi: `asgi.py` on uvicorn
+
+Usage:
+    python benchmarks/bench_servers.py --clients 50 --duration 10
+    python benchmarks/bench_servers.py --servers gunicorn asgi --streams 1000
+    python benchmarks/bench_servers.py --servers gunicorn --shards 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    "flask": [
+        sys.executable,
+        "-c",
+        "import sys; from app import app; app.run(port=int(sys.argv[1]), threaded=True)",
+        "{port}",
+    ],
+    "gunicorn": [
+        "gunicorn",
+        "--bind",
+        "127.0.0.1:{port}",
+        "--worker-class",
+        "gthread",
+        "--threads",
+        "100",
+        "app:app",
+    ],
+    "asgi": ["uvicorn", "asgi:app", "--port", "{port}", "--log-level", "warning"],
+}
+
+DIRECTIONS = ("up", "right", "down", "left")
+
+# Seconds before a request that got no response counts as an error
+REQUEST_TIMEOUT = 5.0
+
+
+class Connection:
+    """Minimal HTTP/1.1 client connection that reuses its socket when it can."""
+
+    def __init__(self, port):
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path):
+        try:
+            return await asyncio.wait_for(self._request(method, path), REQUEST_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.close()
+            raise
+
+    async def _request(self, method, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: 0\r\n\r\n".encode()
+        )
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed")
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if status_line.startswith(b"HTTP/1.0") or headers.get("connection") == "close":
+            self.close()
+        return int(status_line.split()[1]), body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+async def hold_stream(port, session_id, stop):
+    """Keep an event stream open and discard its frames until stopped."""
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(
+            f"GET /api/game/{session_id}/stream HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+        )
+        await writer.drain()
+        while not stop.is_set():
+            try:
+                if not await asyncio.wait_for(reader.read(65536), 1.0):
+                    break
+            except asyncio.TimeoutError:
+                # The server may not have got to this connection yet
+                pass
+        writer.close()
+    except OSError:
+        pass
+
+
+async def play(port, deadline, interval, latencies, errors):
+    """One simulated player: create a session, then step it until the deadline."""
+    conn = Connection(port)
+    try:
+        status, body = await conn.request("POST", "/api/game/session")
+        if status != 201:
+            errors.append(status)
+            return
+        session_id = json.loads(body)["session_id"]
+        while time.monotonic() < deadline:
+            path = f"/api/game/{session_id}/step"
+            if random.random() < 0.2:
+                path += f"?direction={random.choice(DIRECTIONS)}"
+            start = time.perf_counter()
+            status, body = await conn.request("POST", path)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+            elif json.loads(body)["game_over"]:
+                await conn.request("POST", f"/api/game/{session_id}/reset")
+            if interval:
+                await asyncio.sleep(interval)
+    except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+        errors.append(type(e).__name__)
+    finally:
+        conn.close()
+
+
+async def run_load(port, clients, duration, interval, streams):
+    stop = asyncio.Event()
+    holders = []
+    if streams:
+        conn = Connection(port)
+        session_ids = []
+        for _ in range(streams):
+            _, body = await conn.request("POST", "/api/game/session")
+            session_ids.append(json.loads(body)["session_id"])
+        conn.close()
+        holders = [asyncio.ensure_future(hold_stream(port, s, stop)) for s in session_ids]
+        await asyncio.sleep(1.0)
+
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    await asyncio.gather(
+        *(play(port, deadline, interval, latencies, errors) for _ in range(clients))
+    )
+    stop.set()
+    await asyncio.gather(*holders)
+    return latencies, errors
+
+
+def start_server(name, port, shards):
+    command = [part.format(port=port) for part in SERVERS[name]]
+    if shutil.which(command[0]) is None:
+        return None
+    env = dict(os.environ, SNAKE_MAX_SESSIONS="100000", SNAKE_SHARDS=str(shards))
+    return subprocess.Popen(
+        command, cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+async def wait_until_ready(port, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        conn = Connection(port)
+        try:
+            status, _ = await conn.request("GET", "/")
+            if status == 200:
+                return True
+        except OSError:
+            await asyncio.sleep(0.2)
+        finally:
+            conn.close()
+    return False
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--servers", nargs="+", default=list(SERVERS), choices=list(SERVERS))
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent players")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per server")
+    parser.add_argument(
+        "--interval", type=float, default=0.0, help="Pause between a player's steps (0 = closed loop)"
+    )
+    parser.add_argument("--streams", type=int, default=0, help="Event streams (live games) held open")
+    parser.add_argument(
+        "--shards", type=int, default=0, help="Game processes behind each server (0 = in-process)"
+    )
+    parser.add_argument("--port", type=int, default=4100)
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} players, {args.duration:g}s, interval {args.interval:g}s, "
+        f"{args.streams} open streams, {args.shards} shards"
+    )
+    print(f"{'server':>10} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for offset, name in enumerate(args.servers):
+        port = args.port + offset
+        server = start_server(name, port, args.shards)
+        if server is None:
+            print(f"{name:>10} not installed")
+            continue
+        try:
+            if not asyncio.run(wait_until_ready(port)):
+                print(f"{name:>10} failed to start")
+                continue
+            latencies, errors = asyncio.run(
+                run_load(port, args.clients, args.duration, args.interval, args.streams)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        if not latencies:
+            print(f"{name:>10} {'-':>9} {'-':>8} {'-':>8} {len(errors):>7}")
+            continue
+        print(
+            f"{name:>10} {len(latencies) / args.duration:>9.0f} "
+            f"{statistics.median(latencies) * 1e3:>8.2f} "
+            f"{percentile(latencies, 0.99) * 1e3:>8.2f} {len(errors):>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark saving and restoring games at maximum snake length.
+
+For each board size the snake is grown along a Hamiltonian cycle until it
+fills the whole board, the worst case for a saved game's body. Each size
+reports the size and time of:
+
+- snapshot: `SnakeAPI.snapshot`, the complete game
+- restore: `SnakeAPI.restore` of that snapshot into another game
+- state bytes: `SnakeAPI.get_state_bytes`, the packed keyframe sent to clients
+- state json: `json.dumps(SnakeAPI.get_state())`, for comparison
+
+Usage:
+    python benchmarks/bench_snapshot.py --sizes 20 100 500
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_board_size import DIRECTION_NAMES, cycle_directions, cycle_path  # noqa: E402
+from src.api.snake_api import SnakeAPI  # noqa: E402
+
+
+def fill_board(lib_path, size):
+    """Return a game whose snake covers the whole board."""
+    api = SnakeAPI(lib_path, seed=0, width=size, height=size)
+    path = cycle_path(size, size)
+    for cell, direction in zip(path[1:-1], cycle_directions(path)):
+        api.set_food_position(*cell)
+        api.step(DIRECTION_NAMES[direction])
+    assert api.is_game_won()
+    return api
+
+
+def timed(func, repeat):
+    """Average seconds per call and the last result."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lib", default=None, help="Path to libsnake.so")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 50, 100, 200, 500])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(
+        f"{'board':>9} {'length':>8} {'snapshot':>16} {'restore':>10} "
+        f"{'state bytes':>16} {'state json':>18}"
+    )
+    for size in args.sizes:
+        api = fill_board(args.lib, size)
+        target = SnakeAPI(args.lib, width=size, height=size)
+        repeat = max(1, args.repeat * 400 // (size * size)) if size > 20 else args.repeat * 100
+
+        snapshot_time, data = timed(api.snapshot, repeat)
+        restore_time, _ = timed(lambda: target.restore(data), repeat)
+        assert target.get_snake_positions() == api.get_snake_positions()
+        state_time, state = timed(api.get_state_bytes, repeat)
+        json_time, text = timed(lambda: json.dumps(api.get_state()), max(1, repeat // 10))
+
+        print(
+            f"{size:>4}x{size:<4} {api.get_snake_length():>8} "
+            f"{len(data):>7}B {snapshot_time * 1e6:>6.1f}us {restore_time * 1e6:>8.1f}us "
+            f"{len(state):>7}B {state_time * 1e6:>6.1f}us "
+            f"{len(text):>9}B {json_time * 1e6:>6.0f}us"
+        )
+        api.cleanup()
+        target.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Measure how stepping independent games scales with threads.
+
+Each thread owns its games and steps them for a fixed number of ticks. ctypes
+releases the GIL during every C call, so threads only contend for the GIL in
+the Python code between calls. Work done in C per call (a `GameBatch` step)
+scales across cores; per-move `SnakeAPI` calls are dominated by Python
+overhead and scale much less.
+
+Usage:
+    python benchmarks/bench_threads.py --threads 1 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.api.batch import GameBatch  # noqa: E402
+from src.api.snake_api import SnakeAPI  # noqa: E402
+
+
+def run_batches(lib, threads, games, ticks):
+    """Each thread steps its own batch of `games` games `ticks` times."""
+    batches = [GameBatch(games, lib, seed=i * games) for i in range(threads)]
+
+    def worker(batch):
+        for _ in range(ticks):
+            batch.step()
+            batch.reset_finished()
+
+    elapsed = run(worker, batches)
+    for batch in batches:
+        batch.cleanup()
+    return threads * games * ticks / elapsed
+
+
+def run_games(lib, threads, games, ticks):
+    """Each thread steps `games` SnakeAPI games one call at a time."""
+    owned = [[SnakeAPI(lib, seed=i * games + j) for j in range(games)] for i in range(threads)]
+
+    def worker(apis):
+        for _ in range(ticks):
+            for api in apis:
+                if not api.move():
+                    api.reset()
+
+    elapsed = run(worker, owned)
+    for apis in owned:
+        for api in apis:
+            api.cleanup()
+    return threads * games * ticks / elapsed
+
+
+def run(worker, per_thread):
+    threads = [threading.Thread(target=worker, args=(work,)) for work in per_thread]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--games", type=int, default=4096, help="Games per batch")
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--lib", default=os.path.join(PROJECT_ROOT, "build", "libsnake.so"))
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'threads':>8} {'batch moves/s':>15} {'speedup':>8} {'api moves/s':>13} {'speedup':>8}")
+    base = None
+    for threads in args.threads:
+        batch_rate = run_batches(args.lib, threads, args.games, args.ticks)
+        api_rate = run_games(args.lib, threads, 64, args.ticks * 4)
+        if base is None:
+            base = (batch_rate, api_rate)
+        print(
+            f"{threads:>8} {batch_rate:>15,.0f} {batch_rate / base[0]:>8.2f} "
+            f"{api_rate:>13,.0f} {api_rate / base[1]:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,11 @@ import sys
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, project_root)
 
-from src.api.snake_api import SnakeAPI
-from flask import Flask, jsonify, request
+from src.api.game_loop import GameLoop
+from src.api.sessions import SessionLimitError, SessionNotFoundError, SessionRegistry
+from flask import Flask, Response, jsonify, request
+import json
+from contextlib import contextmanager
 from flask_cors import CORS
 import logging
 
@@ -17,24 +20,119 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
-# Initialize game instance
-game = None
+DEFAULT_SESSION = 'default'
 
-def init_game():
-    global game
-    if game is None:
+# Registry of live game sessions
+registry = None
+# Server-side tick loop for streamed sessions
+game_loop = None
+
+# Seconds between keepalive comments on an idle event stream
+STREAM_KEEPALIVE = 15
+
+# Content type of packed binary state (see SnakeAPI.get_state_bytes)
+BINARY_MIMETYPE = 'application/octet-stream'
+
+class GameInitError(Exception):
+    """Raised when the session registry or a session's game cannot be set up."""
+
+@contextmanager
+def game_setup():
+    # Missing sessions and a full registry keep their own 404 and 503 responses
+    try:
+        yield
+    except (SessionNotFoundError, SessionLimitError):
+        raise
+    except Exception as e:
+        raise GameInitError(str(e)) from e
+
+def init_registry():
+    global registry
+    if registry is None:
         lib_path = os.path.join(project_root, 'build', 'libsnake.so')
         if not os.path.exists(lib_path):
             raise RuntimeError(f"Library not found at {lib_path}")
-        game = SnakeAPI(lib_path)
-    return game
+        registry = SessionRegistry(
+            lib_path,
+            max_sessions=int(os.environ.get('SNAKE_MAX_SESSIONS', 10000)),
+            idle_ttl=float(os.environ.get('SNAKE_SESSION_TTL', 600)),
+        )
+    return registry
+
+def init_loop():
+    global game_loop
+    if game_loop is None:
+        game_loop = GameLoop(init_registry(), render=lambda game: json.dumps(state_payload(game)))
+        game_loop.start()
+    return game_loop
+
+def init_game(session_id=DEFAULT_SESSION):
+    with game_setup():
+        if session_id == DEFAULT_SESSION:
+            return init_registry().get_or_create(session_id)
+        return init_registry().get(session_id)
 
-def cleanup_game():
-    global game
-    if game is not None:
-        game = None
+def cleanup_game(session_id=DEFAULT_SESSION):
+    if registry is not None and registry.destroy(session_id):
         logger.info("Game instance cleaned up")
 
+def state_payload(game):
+    state = game.get_state()
+    return {
+        'snake': state['snake'],
+        'food': state['food'],
+        'score': state['score'],
+        'game_over': state['game_over'],
+        'tick': state['tick']
+    }
+
+def delta_payload(game, since):
+    delta = game.get_delta(since)
+    payload = {
+        'tick': delta['tick'],
+        'keyframe': delta['keyframe'],
+        'length': delta['length'],
+        'food': delta['food'],
+        'score': delta['score'],
+        'game_over': delta['game_over']
+    }
+    if delta['keyframe']:
+        payload['snake'] = delta['snake']
+    else:
+        payload['head'] = delta['head']
+    return payload
+
+def since_arg():
+    since = request.args.get('since')
+    if since is None:
+        return None
+    if not since.isdigit():
+        raise ValueError('since must be a non-negative integer')
+    return int(since)
+
+def wants_binary():
+    best = request.accept_mimetypes.best_match(['application/json', BINARY_MIMETYPE])
+    return best == BINARY_MIMETYPE
+
+def state_response(game):
+    since = since_arg()
+    if wants_binary():
+        return Response(game.get_state_bytes(since), mimetype=BINARY_MIMETYPE)
+    return jsonify(state_payload(game) if since is None else delta_payload(game, since))
+
+@app.errorhandler(SessionNotFoundError)
+def session_not_found(e):
+    return jsonify({'error': f"Session not found: {e.args[0]}"}), 404
+
+@app.errorhandler(SessionLimitError)
+def session_limit(e):
+    return jsonify({'error': str(e)}), 503
+
+@app.errorhandler(GameInitError)
+def game_init_failed(e):
+    logger.error(f"Error initializing game: {str(e)}")
+    return jsonify({'error': str(e)}), 400
+
 @app.route('/')
 def root():
     return jsonify({"message": "Snake Game API is running"})
@@ -44,32 +142,64 @@ def init():
     init_game()
     return jsonify({"message": "Game initialized"})
 
+@app.route('/api/game/session', methods=['POST'])
+def create_session():
+    with game_setup():
+        session_id = init_registry().create()
+    return jsonify({'session_id': session_id}), 201
+
+@app.route('/api/game/<session_id>', methods=['DELETE'])
+def destroy_session(session_id):
+    with game_setup():
+        destroyed = init_registry().destroy(session_id)
+    if not destroyed:
+        raise SessionNotFoundError(session_id)
+    return jsonify({'success': True})
+
 @app.route('/api/game/state', methods=['GET'])
-def get_state():
+@app.route('/api/game/<session_id>/state', methods=['GET'])
+def get_state(session_id=DEFAULT_SESSION):
+    game = init_game(session_id)
     try:
-        game = init_game()
-        return jsonify({
-            'snake': game.get_snake_positions(),
-            'food': game.get_food_position(),
-            'score': game.get_score(),
-            'game_over': game.is_game_over()
-        })
+        return state_response(game)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/game/move', methods=['POST'])
-def move():
+@app.route('/api/game/<session_id>/move', methods=['POST'])
+def move(session_id=DEFAULT_SESSION):
+    game = init_game(session_id)
     try:
-        game = init_game()
         game.move()
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/game/step', methods=['POST'])
+@app.route('/api/game/<session_id>/step', methods=['POST'])
+def step(session_id=DEFAULT_SESSION):
+    game = init_game(session_id)
+    body = request.get_json(silent=True) or {}
+    direction = request.args.get('direction', body.get('direction'))
+    try:
+        since_arg()  # Reject a bad tick before moving
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        game.step(direction)
+        return state_response(game)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
 @app.route('/api/game/direction/<direction>', methods=['POST'])
-def change_direction(direction):
+@app.route('/api/game/<session_id>/direction/<direction>', methods=['POST'])
+def change_direction(direction, session_id=DEFAULT_SESSION):
+    game = init_game(session_id)
     try:
-        game = init_game()
         game.change_direction(direction)
         return jsonify({'success': True})
     except ValueError as e:
@@ -77,28 +207,70 @@ def change_direction(direction):
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/game/speed', methods=['POST'])
+@app.route('/api/game/<session_id>/speed', methods=['POST'])
+def set_speed(session_id=DEFAULT_SESSION):
+    game = init_game(session_id)
+    body = request.get_json(silent=True) or {}
+    try:
+        speed = float(request.args.get('speed', body.get('speed')))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'speed must be a number'}), 400
+    if not speed > 0:
+        return jsonify({'error': 'speed must be positive'}), 400
+    game.set_game_speed(speed)
+    return jsonify({'success': True, 'speed': game.get_game_speed()})
+
+@app.route('/api/game/stream', methods=['GET'])
+@app.route('/api/game/<session_id>/stream', methods=['GET'])
+def stream(session_id=DEFAULT_SESSION):
+    init_game(session_id)
+    with game_setup():
+        loop = init_loop()
+    subscription = loop.subscribe(session_id)
+
+    def events():
+        try:
+            while True:
+                frame = subscription.get(timeout=STREAM_KEEPALIVE)
+                if frame is not None:
+                    yield f"data: {frame}\n\n"
+                elif subscription.closed:
+                    break
+                else:
+                    yield ": keepalive\n\n"
+        finally:
+            loop.unsubscribe(subscription)
+
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/api/game/cleanup', methods=['POST'])
 def cleanup():
     cleanup_game()
     return jsonify({"message": "Game cleaned up"})
 
 @app.route('/api/game/reset', methods=['POST'])
-def reset_game():
+@app.route('/api/game/<session_id>/reset', methods=['POST'])
+def reset_game(session_id=DEFAULT_SESSION):
+    game = init_game(session_id)
     try:
-        game = init_game()
         game.reset()
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
 @app.route('/api/game/score', methods=['GET'])
-def get_score():
+@app.route('/api/game/<session_id>/score', methods=['GET'])
+def get_score(session_id=DEFAULT_SESSION):
+    game = init_game(session_id)
     try:
-        game = init_game()
         return jsonify({'score': game.get_score()})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
 if __name__ == '__main__':
     print("Starting Snake game API server on http://localhost:4000")
-    app.run(host='0.0.0.0', port=4000) 
\ No newline at end of file
+    app.run(host='0.0.0.0', port=4000) 
@@ -0,0 +1,371 @@
+"""Many snakes sharing one board.
+
+`SnakeArena` owns an arena in the C library: one board holding many snakes
+(players or bots) and several pieces of food. Every `step` moves all live
+snakes at once with a single `step_arena` call. Collisions are resolved in C
+through a grid recording which snake covers each cell, so a step costs the
+same per snake however many snakes share the board.
+
+A head that would leave the board or enter any snake's body dies, as do
+heads entering the same cell; dead snakes are removed from the board and
+can be respawned. Like `GameBatch`, directions are read from, and scores,
+live flags, head positions and lengths are written to, contiguous buffers
+exposed as `memoryview`s.
+
+Example:
+    ```python
+    from src.api.arena import SnakeArena
+    arena = SnakeArena(200, width=200, height=200, food=100)
+    arena.directions[0] = 1  # snake 0 turns right
+    alive = arena.step()
+    arena.respawn_dead()
+    arena.cleanup()
+    ```
+"""
+
+import threading
+from ctypes import CDLL, POINTER, c_bool, c_byte, c_int, c_ubyte, c_uint64, c_void_p
+from typing import List, Optional, Sequence, Tuple
+
+from src.api.batch import KEEP_DIRECTION
+from src.api.snake_api import (
+    DIRECTION_NAMES,
+    DIRECTION_VALUES,
+    check_grid_size,
+    load_library,
+)
+
+# Values of `SnakeArena.get_cell` other than a snake index (see snake.h)
+ARENA_EMPTY = -1
+ARENA_FOOD = -2
+ARENA_WALL = -3
+
+
+def _setup_arena_signatures(lib: CDLL) -> None:
+    """Set up the signatures of the arena functions, see `load_library`."""
+    lib.create_arena.argtypes = [c_int, c_int, c_int, c_int]
+    lib.create_arena.restype = c_void_p
+
+    lib.create_arena_seeded.argtypes = [c_int, c_int, c_int, c_int, c_uint64]
+    lib.create_arena_seeded.restype = c_void_p
+
+    lib.destroy_arena.argtypes = [c_void_p]
+    lib.destroy_arena.restype = None
+
+    outputs = [POINTER(c_int), POINTER(c_ubyte), POINTER(c_int), POINTER(c_int)]
+    lib.step_arena.argtypes = [c_void_p, POINTER(c_byte)] + outputs
+    lib.step_arena.restype = c_int
+
+    lib.read_arena.argtypes = [c_void_p] + outputs
+    lib.read_arena.restype = None
+
+    lib.spawn_arena_snake.argtypes = [c_void_p, c_int]
+    lib.spawn_arena_snake.restype = c_bool
+
+    lib.spawn_arena_snake_at.argtypes = [c_void_p, c_int, c_int, c_int, c_int]
+    lib.spawn_arena_snake_at.restype = c_bool
+
+    lib.set_arena_food.argtypes = [c_void_p, c_int]
+    lib.set_arena_food.restype = None
+
+    lib.get_arena_snake.argtypes = [c_void_p, c_int, POINTER(c_int), c_int]
+    lib.get_arena_snake.restype = c_int
+
+    lib.get_arena_snake_direction.argtypes = [c_void_p, c_int]
+    lib.get_arena_snake_direction.restype = c_int
+
+    lib.get_arena_food.argtypes = [c_void_p, POINTER(c_int), c_int]
+    lib.get_arena_food.restype = c_int
+
+    lib.get_arena_cell.argtypes = [c_void_p, c_int, c_int]
+    lib.get_arena_cell.restype = c_int
+
+    lib.get_arena_tick.argtypes = [c_void_p]
+    lib.get_arena_tick.restype = c_uint64
+
+
+class SnakeArena:
+    """Snakes moving together on one shared board.
+
+    Methods hold a per-arena lock, so an arena can be shared between
+    threads. Reading the buffer views while another thread steps the arena
+    may still see a partially updated step.
+
+    Attributes:
+        lib: The loaded C library instance
+        arena_instance: Pointer to the arena in C
+        count: Number of snakes
+        width: Number of columns on the board
+        height: Number of rows on the board
+        directions: Writable signed-byte view, one direction per snake
+            (0-3 as in `DIRECTION_NAMES`, -1 keeps the current direction)
+        scores: Int view of each snake's score
+        alive: Byte view of each snake's live flag
+        heads: Int view of interleaved x, y head positions (2 per snake,
+            -1 for dead snakes)
+        lengths: Int view of each snake's length (0 for dead snakes)
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        count: int,
+        lib_path: Optional[str] = None,
+        seed: Optional[int] = None,
+        width: int = 100,
+        height: int = 100,
+        food: Optional[int] = None,
+    ):
+        """Create an arena and spawn `count` snakes on random empty cells.
+
+        Args:
+            count: Number of snakes
+            lib_path: Path to the shared library. If None, uses default path.
+            seed: Optional seed for spawning and food placement. Arenas with
+                the same seed given the same directions play out identically.
+            width: Number of columns on the board
+            height: Number of rows on the board
+            food: Pieces of food kept on the board. If None, one per snake.
+
+        Raises:
+            ValueError: If the board is invalid or cannot fit the snakes
+        """
+        check_grid_size(width, height)
+        if not 1 <= count <= width * height:
+            raise ValueError(f"Cannot fit {count} snakes on a {width}x{height} board")
+        if food is None:
+            food = count
+        if food < 0:
+            raise ValueError("food must not be negative")
+        self.lib = load_library(lib_path, (_setup_arena_signatures,))
+        if seed is None:
+            self.arena_instance = self.lib.create_arena(width, height, count, food)
+        else:
+            self.arena_instance = self.lib.create_arena_seeded(
+                width, height, count, food, seed
+            )
+        if not self.arena_instance:
+            raise RuntimeError("Failed to create arena")
+        self.count = count
+        self.width = width
+        self.height = height
+
+        self._directions = (c_byte * count)(*([KEEP_DIRECTION] * count))
+        self._scores = (c_int * count)()
+        self._alive = (c_ubyte * count)()
+        self._heads = (c_int * (count * 2))()
+        self._lengths = (c_int * count)()
+        self._segments = (c_int * 2)()
+        self._food = (c_int * (max(food, 1) * 2))()
+        self._lock = threading.Lock()
+
+        self.directions = memoryview(self._directions).cast("B").cast("b")
+        self.scores = memoryview(self._scores).cast("B").cast("i")
+        self.alive = memoryview(self._alive).cast("B")
+        self.heads = memoryview(self._heads).cast("B").cast("i")
+        self.lengths = memoryview(self._lengths).cast("B").cast("i")
+
+        self._read_results()
+
+    def _check(self):
+        if not self.arena_instance:
+            raise RuntimeError("Arena not initialized")
+
+    def _check_index(self, index: int) -> None:
+        if not 0 <= index < self.count:
+            raise IndexError("snake index out of range")
+
+    def _outputs(self):
+        return self._scores, self._alive, self._heads, self._lengths
+
+    def _read_results(self) -> None:
+        self._check()
+        self.lib.read_arena(self.arena_instance, *self._outputs())
+
+    def step(self, directions: Optional[Sequence[int]] = None) -> int:
+        """Move every live snake once.
+
+        Args:
+            directions: Optional per-snake directions copied into
+                `directions` before stepping. If None, the current buffer
+                contents are used.
+
+        Returns:
+            int: Number of live snakes
+        """
+        with self._lock:
+            self._check()
+            if directions is not None:
+                self._directions[:] = directions
+            return self.lib.step_arena(
+                self.arena_instance, self._directions, *self._outputs()
+            )
+
+    def change_direction(self, index: int, direction: str) -> None:
+        """Set the direction a snake takes on the next step.
+
+        Args:
+            index: Index of the snake
+            direction: New direction ('up', 'down', 'left', 'right')
+
+        Raises:
+            ValueError: If invalid direction
+        """
+        self._check_index(index)
+        try:
+            self._directions[index] = DIRECTION_VALUES[direction]
+        except KeyError:
+            raise ValueError("Invalid direction") from None
+
+    def spawn(
+        self,
+        index: int,
+        position: Optional[Tuple[int, int]] = None,
+        direction: Optional[str] = None,
+    ) -> bool:
+        """Respawn a snake with length 1, replacing it if it is alive.
+
+        Args:
+            index: Index of the snake
+            position: Optional (x, y) cell, which must be empty. If None, a
+                random empty cell and direction are chosen.
+            direction: Direction when `position` is given, default 'right'
+
+        Returns:
+            bool: False if the snake could not be placed (it is then dead)
+        """
+        self._check_index(index)
+        with self._lock:
+            self._check()
+            if position is None:
+                spawned = self.lib.spawn_arena_snake(self.arena_instance, index)
+            else:
+                try:
+                    value = DIRECTION_VALUES[direction or "right"]
+                except KeyError:
+                    raise ValueError("Invalid direction") from None
+                spawned = self.lib.spawn_arena_snake_at(
+                    self.arena_instance, index, position[0], position[1], value
+                )
+            self._read_results()
+            return spawned
+
+    def dead(self) -> List[int]:
+        """Indices of the snakes that are not alive."""
+        return [i for i, alive in enumerate(self.alive) if not alive]
+
+    def respawn_dead(self) -> int:
+        """Respawn every dead snake on a random empty cell.
+
+        Cheaper than calling `spawn` for each index in `dead()`, as the
+        buffers are refreshed once.
+
+        Returns:
+            int: Number of snakes respawned
+        """
+        with self._lock:
+            self._check()
+            spawned = 0
+            for index in self.dead():
+                spawned += self.lib.spawn_arena_snake(self.arena_instance, index)
+            if spawned:
+                self._read_results()
+            return spawned
+
+    def set_food(self, food: int) -> None:
+        """Change the number of pieces of food kept on the board.
+
+        Extra food is placed right away; with less, existing food stays
+        until eaten.
+        """
+        if food < 0:
+            raise ValueError("food must not be negative")
+        with self._lock:
+            self._check()
+            self.lib.set_arena_food(self.arena_instance, food)
+
+    def get_snake(self, index: int) -> List[Tuple[int, int]]:
+        """Get the (x, y) segments of a snake, head first (empty when dead)."""
+        self._check_index(index)
+        with self._lock:
+            self._check()
+            return self._snake_locked(index)
+
+    def get_food(self) -> List[Tuple[int, int]]:
+        """Get the (x, y) positions of all food on the board."""
+        with self._lock:
+            self._check()
+            return self._food_locked()
+
+    def _snake_locked(self, index: int) -> List[Tuple[int, int]]:
+        arena = self.arena_instance
+        capacity = len(self._segments) // 2
+        length = self.lib.get_arena_snake(arena, index, self._segments, capacity)
+        if length > capacity:
+            self._segments = (c_int * (2 * max(length, 2 * capacity)))()
+            length = self.lib.get_arena_snake(arena, index, self._segments, length)
+        coords = iter(self._segments[: 2 * length])
+        return list(zip(coords, coords))
+
+    def _food_locked(self) -> List[Tuple[int, int]]:
+        capacity = len(self._food) // 2
+        count = self.lib.get_arena_food(self.arena_instance, self._food, capacity)
+        if count > capacity:
+            self._food = (c_int * (2 * count))()
+            count = self.lib.get_arena_food(self.arena_instance, self._food, count)
+        coords = iter(self._food[: 2 * count])
+        return list(zip(coords, coords))
+
+    def get_cell(self, x: int, y: int) -> int:
+        """Get the index of the snake covering a cell.
+
+        Returns:
+            int: The snake index, or `ARENA_EMPTY`, `ARENA_FOOD` or
+            `ARENA_WALL` (outside the board)
+        """
+        with self._lock:
+            self._check()
+            return self.lib.get_arena_cell(self.arena_instance, x, y)
+
+    def get_tick(self) -> int:
+        """Get the number of steps taken."""
+        with self._lock:
+            self._check()
+            return self.lib.get_arena_tick(self.arena_instance)
+
+    def get_state(self) -> dict:
+        """Get the whole arena.
+
+        Returns:
+            dict: ``tick``, ``width``, ``height``, ``food`` and ``snakes``, a
+            list with each snake's ``alive``, ``score``, ``direction`` and
+            ``snake`` (segments, head first)
+        """
+        with self._lock:
+            self._check()
+            arena = self.arena_instance
+            snakes = [
+                {
+                    "alive": bool(self._alive[index]),
+                    "score": self._scores[index],
+                    "direction": DIRECTION_NAMES[
+                        self.lib.get_arena_snake_direction(arena, index)
+                    ],
+                    "snake": self._snake_locked(index),
+                }
+                for index in range(self.count)
+            ]
+            return {
+                "tick": self.lib.get_arena_tick(arena),
+                "width": self.width,
+                "height": self.height,
+                "food": self._food_locked(),
+                "snakes": snakes,
+            }
+
+    def cleanup(self) -> None:
+        """Destroy the arena."""
+        with self._lock:
+            if self.arena_instance:
+                self.lib.destroy_arena(self.arena_instance)
+                self.arena_instance = None
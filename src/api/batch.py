@@ -0,0 +1,280 @@
+"""Batched stepping of many Snake games through one C call.
+
+`GameBatch` owns N independent games in the C library and advances all of
+them with a single `step_batch` call. Directions are read from, and scores,
+game-over flags, head and food positions are written to, contiguous buffers
+owned by the batch. Those buffers are exposed as `memoryview`s (and NumPy
+arrays when NumPy is installed) without copying.
+
+Example:
+    ```python
+    from src.api.batch import GameBatch
+    batch = GameBatch(1024)
+    alive = batch.step([1] * 1024)  # everyone turns right
+    print(batch.scores[0], batch.game_over[0], batch.heads[0:2].tolist())
+    batch.cleanup()
+    ```
+"""
+
+import threading
+from ctypes import CDLL, POINTER, c_byte, c_int, c_ubyte, c_uint64, c_void_p
+from typing import Dict, Optional, Sequence
+
+from src.api.snake_api import (
+    GRID_HEIGHT,
+    GRID_WIDTH,
+    SnapshotReader,
+    check_grid_size,
+    load_library,
+    planner_stats,
+)
+
+# Direction value that leaves a game's current direction unchanged
+KEEP_DIRECTION = -1
+
+
+def setup_batch_signatures(lib: CDLL) -> None:
+    """Set up the signatures of the batch functions, see `load_library`."""
+    lib.create_batch_sized.argtypes = [c_int, c_int, c_int]
+    lib.create_batch_sized.restype = c_void_p
+
+    lib.create_batch_sized_seeded.argtypes = [c_int, c_int, c_int, c_uint64]
+    lib.create_batch_sized_seeded.restype = c_void_p
+
+    lib.destroy_batch.argtypes = [c_void_p]
+    lib.destroy_batch.restype = None
+
+    lib.batch_game.argtypes = [c_void_p, c_int]
+    lib.batch_game.restype = c_void_p
+
+    outputs = [POINTER(c_int), POINTER(c_ubyte), POINTER(c_int), POINTER(c_int)]
+    lib.step_batch.argtypes = [c_void_p, POINTER(c_byte)] + outputs
+    lib.step_batch.restype = c_int
+
+    lib.reset_batch.argtypes = [c_void_p, POINTER(c_ubyte)] + outputs
+    lib.reset_batch.restype = None
+
+
+class GameBatch:
+    """A batch of independent games advanced together.
+
+    Methods hold a per-batch lock, so a batch can be shared between threads.
+    Reading the buffer views while another thread steps the batch may still
+    see a partially updated step.
+
+    Attributes:
+        lib: The loaded C library instance
+        batch_instance: Pointer to the batch in C
+        count: Number of games in the batch
+        width: Number of columns on each board
+        height: Number of rows on each board
+        directions: Writable signed-byte view, one direction per game
+            (0-3 as in `DIRECTION_NAMES`, -1 keeps the current direction)
+        scores: Int view of each game's score
+        game_over: Byte view of each game's game-over flag
+        heads: Int view of interleaved x, y head positions (2 per game)
+        food: Int view of interleaved x, y food positions (2 per game)
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        count: int,
+        lib_path: Optional[str] = None,
+        seed: Optional[int] = None,
+        width: int = GRID_WIDTH,
+        height: int = GRID_HEIGHT,
+    ):
+        """Create `count` games.
+
+        Args:
+            count: Number of games in the batch
+            lib_path: Path to the shared library. If None, uses default path.
+            seed: Optional seed. Game ``i`` is seeded with ``seed + i`` and
+                plays exactly like ``SnakeAPI(seed=seed + i)``.
+            width: Number of columns on each board
+            height: Number of rows on each board
+        """
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        check_grid_size(width, height)
+        self.lib = load_library(lib_path, (setup_batch_signatures,))
+
+        if seed is None:
+            self.batch_instance = self.lib.create_batch_sized(count, width, height)
+        else:
+            self.batch_instance = self.lib.create_batch_sized_seeded(
+                count, width, height, seed
+            )
+        if not self.batch_instance:
+            raise RuntimeError("Failed to create game batch")
+        self.count = count
+        self.width = width
+        self.height = height
+
+        self._directions = (c_byte * count)(*([KEEP_DIRECTION] * count))
+        self._scores = (c_int * count)()
+        self._game_over = (c_ubyte * count)()
+        self._heads = (c_int * (count * 2))()
+        self._food = (c_int * (count * 2))()
+        self._snapshot = SnapshotReader(self.lib, width * height)
+        self._planner = None
+        self._lock = threading.Lock()
+
+        self.directions = memoryview(self._directions).cast("B").cast("b")
+        self.scores = memoryview(self._scores).cast("B").cast("i")
+        self.game_over = memoryview(self._game_over).cast("B")
+        self.heads = memoryview(self._heads).cast("B").cast("i")
+        self.food = memoryview(self._food).cast("B").cast("i")
+
+        self._read_results()
+
+    def _check(self):
+        if not self.batch_instance:
+            raise RuntimeError("Game batch not initialized")
+
+    def _read_results(self) -> None:
+        """Fill the output buffers without stepping or resetting any game."""
+        self._check()
+        no_games = (c_ubyte * self.count)()
+        self.lib.reset_batch(
+            self.batch_instance,
+            no_games,
+            self._scores,
+            self._game_over,
+            self._heads,
+            self._food,
+        )
+
+    def step(self, directions: Optional[Sequence[int]] = None) -> int:
+        """Advance every game by one move.
+
+        Args:
+            directions: Optional per-game directions copied into `directions`
+                before stepping. If None, the current buffer contents are used.
+
+        Returns:
+            int: Number of games that are not over
+        """
+        with self._lock:
+            self._check()
+            if directions is not None:
+                self._directions[:] = directions
+            return self.lib.step_batch(
+                self.batch_instance,
+                self._directions,
+                self._scores,
+                self._game_over,
+                self._heads,
+                self._food,
+            )
+
+    def reset(self, mask: Optional[Sequence[int]] = None) -> None:
+        """Reset games to their initial state.
+
+        Args:
+            mask: Optional per-game flags; only games with a truthy flag are
+                reset. If None, every game is reset.
+        """
+        with self._lock:
+            self._check()
+            c_mask = None
+            if mask is not None:
+                c_mask = (c_ubyte * self.count)(*[1 if m else 0 for m in mask])
+            self.lib.reset_batch(
+                self.batch_instance,
+                c_mask,
+                self._scores,
+                self._game_over,
+                self._heads,
+                self._food,
+            )
+
+    def reset_finished(self) -> None:
+        """Reset every game that is over."""
+        with self._lock:
+            self._check()
+            self.lib.reset_batch(
+                self.batch_instance,
+                self._game_over,
+                self._scores,
+                self._game_over,
+                self._heads,
+                self._food,
+            )
+
+    def suggest_directions(self) -> int:
+        """Fill `directions` with a suggested move for every game.
+
+        Each suggestion is the one `SnakeAPI.suggest_direction` makes, found
+        in C for the whole batch with one call; a distance field is kept per
+        game. Games that are over or have no safe move get -1, which keeps
+        their direction. The next `step()` without arguments plays them.
+
+        Returns:
+            int: Number of games given a direction
+        """
+        with self._lock:
+            self._check()
+            if self._planner is None:
+                self._planner = self.lib.create_planner()
+                if not self._planner:
+                    raise RuntimeError("Failed to create planner")
+            return self.lib.plan_batch(
+                self._planner, self.batch_instance, self._directions
+            )
+
+    def get_planner_stats(self) -> Dict[str, int]:
+        """Get the counters of the planner behind `suggest_directions`.
+
+        Returns:
+            Dict[str, int]: Counters keyed as in `PLANNER_STAT_NAMES`
+        """
+        with self._lock:
+            return planner_stats(self.lib, self._planner)
+
+    def get_state(self, index: int) -> dict:
+        """Get the full state of one game in the batch.
+
+        Args:
+            index: Index of the game
+
+        Returns:
+            dict: Dictionary containing game state, as `SnakeAPI.get_state`
+        """
+        with self._lock:
+            self._check()
+            if not 0 <= index < self.count:
+                raise IndexError("game index out of range")
+            game = self.lib.batch_game(self.batch_instance, index)
+            return self._snapshot.state(game)
+
+    def as_numpy(self) -> dict:
+        """Return NumPy arrays sharing memory with the batch buffers.
+
+        Returns:
+            dict: Arrays for ``directions``, ``scores``, ``game_over``,
+            ``heads`` and ``food`` (the last two with shape (count, 2))
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        return {
+            "directions": np.frombuffer(self._directions, dtype=np.int8),
+            "scores": np.frombuffer(self._scores, dtype=np.intc),
+            "game_over": np.frombuffer(self._game_over, dtype=np.bool_),
+            "heads": np.frombuffer(self._heads, dtype=np.intc).reshape(self.count, 2),
+            "food": np.frombuffer(self._food, dtype=np.intc).reshape(self.count, 2),
+        }
+
+    def cleanup(self) -> None:
+        """Destroy every game in the batch."""
+        with self._lock:
+            if self.batch_instance:
+                self.lib.destroy_batch(self.batch_instance)
+                self.batch_instance = None
+            if self._planner is not None:
+                self.lib.destroy_planner(self._planner)
+                self._planner = None
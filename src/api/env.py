@@ -0,0 +1,416 @@
+"""Reinforcement-learning environments with observations written in C.
+
+`SnakeVecEnv` steps N games with one `step_batch` call, and the C core then
+draws every game's observation straight into one preallocated buffer, seen
+from Python as a NumPy array without copying. `SnakeEnv` is the same for a
+single game. Both follow the Gymnasium reset/step API, without depending on
+Gymnasium:
+
+- ``reset(seed=None) -> (observation, info)``
+- ``step(action) -> (observation, reward, terminated, truncated, info)``
+
+Actions are direction values 0-3 (up, right, down, left); 180-degree turns
+are ignored as in the game. An observation is the last ``stack`` frames,
+oldest first, each made of three planes with one byte per cell: the snake
+(head included), its head and the food, 1 where they are and 0 elsewhere.
+Frames are concatenated along the channel axis, so one game's observation
+has shape ``(stack * 3, height, width)``. After a reset every frame shows
+the initial state.
+
+Observations are views of the environment's buffer that the next `step` or
+`reset` overwrites; copy them to keep them.
+
+Requires NumPy.
+
+Example:
+    ```python
+    from src.api.env import SnakeVecEnv
+    env = SnakeVecEnv(256, seed=0, stack=4)
+    obs, info = env.reset()
+    obs, rewards, terminated, truncated, info = env.step(policy(obs))
+    env.cleanup()
+    ```
+"""
+
+import threading
+from ctypes import CDLL, POINTER, c_bool, c_byte, c_int, c_ubyte, c_void_p
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.api.batch import setup_batch_signatures
+from src.api.snake_api import GRID_HEIGHT, GRID_WIDTH, check_grid_size, load_library
+
+# Planes of each frame (see OBS_* in snake.h)
+OBSERVATION_PLANES = ("body", "head", "food")
+
+
+def _setup_observe_signatures(lib: CDLL) -> None:
+    """Set up the signatures of the observation functions, see `load_library`."""
+    lib.observe_game.argtypes = [c_void_p, POINTER(c_ubyte), c_int, c_bool]
+    lib.observe_game.restype = None
+
+    lib.observe_batch.argtypes = [c_void_p, POINTER(c_ubyte), c_int, POINTER(c_ubyte)]
+    lib.observe_batch.restype = None
+
+
+class SnakeVecEnv:
+    """A vector of games stepped together, observed without copies.
+
+    Games that end, or reach `max_steps`, are reset within `step` when
+    `autoreset` is set: the observation returned for them is already the
+    first one of the next episode, while ``info`` holds the score and
+    length of the episode that ended. Methods hold a per-environment lock.
+
+    Rewards are `REWARD_FOOD` for each piece of food eaten, `REWARD_DEATH`
+    for losing and `REWARD_STEP` for every step; override them in a
+    subclass to shape rewards.
+
+    Attributes:
+        lib: The loaded C library instance
+        batch_instance: Pointer to the games' batch in C
+        num_envs: Number of games
+        width: Number of columns on each board
+        height: Number of rows on each board
+        stack: Number of frames in each observation
+        max_steps: Steps after which an episode is truncated, or None
+        autoreset: Whether `step` resets games whose episode ended
+        observation_shape: Shape of one game's observation
+        action_count: Number of actions
+        observations: uint8 array of shape ``(num_envs,) +
+            observation_shape`` holding every game's observation
+    """
+
+    REWARD_FOOD = 1.0
+    REWARD_DEATH = -1.0
+    REWARD_STEP = 0.0
+
+    action_count = 4
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(
+        self,
+        num_envs: int,
+        lib_path: Optional[str] = None,
+        seed: Optional[int] = None,
+        width: int = GRID_WIDTH,
+        height: int = GRID_HEIGHT,
+        stack: int = 1,
+        max_steps: Optional[int] = None,
+        autoreset: bool = True,
+    ):
+        """Create `num_envs` games and observe their initial state.
+
+        Args:
+            num_envs: Number of games
+            lib_path: Path to the shared library. If None, uses default path.
+            seed: Optional seed. Game ``i`` is seeded with ``seed + i``.
+            width: Number of columns on each board
+            height: Number of rows on each board
+            stack: Number of frames in each observation
+            max_steps: Optional number of steps after which an episode is
+                truncated
+            autoreset: Whether `step` resets games whose episode ended. If
+                False nothing is reset before `reset`, and stepping a game
+                that is over reports ``terminated`` again with no reward.
+
+        Raises:
+            ValueError: If an argument is invalid
+        """
+        if num_envs < 1:
+            raise ValueError("num_envs must be at least 1")
+        if stack < 1:
+            raise ValueError("stack must be at least 1")
+        if max_steps is not None and max_steps < 1:
+            raise ValueError("max_steps must be at least 1")
+        check_grid_size(width, height)
+        self.lib = load_library(
+            lib_path, (setup_batch_signatures, _setup_observe_signatures)
+        )
+        if seed is None:
+            self.batch_instance = self.lib.create_batch_sized(num_envs, width, height)
+        else:
+            self.batch_instance = self.lib.create_batch_sized_seeded(
+                num_envs, width, height, seed
+            )
+        if not self.batch_instance:
+            raise RuntimeError("Failed to create game batch")
+        self.num_envs = num_envs
+        self.width = width
+        self.height = height
+        self.stack = stack
+        self.max_steps = max_steps
+        self.autoreset = autoreset
+        self.observation_shape = (stack * len(OBSERVATION_PLANES), height, width)
+
+        self._directions = (c_byte * num_envs)()
+        self._scores = (c_int * num_envs)()
+        self._game_over = (c_ubyte * num_envs)()
+        self._ended = (c_ubyte * num_envs)()
+        self._frames = (c_ubyte * (num_envs * int(np.prod(self.observation_shape))))()
+        self._lock = threading.Lock()
+
+        self._directions_array = np.frombuffer(self._directions, dtype=np.int8)
+        self._scores_array = np.frombuffer(self._scores, dtype=np.intc)
+        self._game_over_array = np.frombuffer(self._game_over, dtype=np.bool_)
+        self._ended_array = np.frombuffer(self._ended, dtype=np.bool_)
+        self._last_scores = np.zeros(num_envs, dtype=np.intc)
+        self._steps = np.zeros(num_envs, dtype=np.int64)
+        self.observations = np.frombuffer(self._frames, dtype=np.uint8).reshape(
+            (num_envs,) + self.observation_shape
+        )
+
+        self._read_results()
+        self._ended_array[:] = True
+        self._observe()
+
+    def _check(self):
+        if not self.batch_instance:
+            raise RuntimeError("Environment not initialized")
+
+    def _read_results(self) -> None:
+        """Fill the score and game-over buffers without changing any game."""
+        self._check()
+        self._ended_array[:] = False
+        self._reset_ended()
+
+    def _reset_ended(self) -> None:
+        """Reset the games flagged in the `_ended` buffer."""
+        self.lib.reset_batch(
+            self.batch_instance, self._ended, self._scores, self._game_over, None, None
+        )
+
+    def _observe(self) -> None:
+        """Draw every game, starting fresh frames for those flagged ended."""
+        self.lib.observe_batch(
+            self.batch_instance, self._frames, self.stack, self._ended
+        )
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, dict]:
+        """Start a new episode in every game.
+
+        Args:
+            seed: Optional seed. Game ``i`` is reseeded with ``seed + i``.
+
+        Returns:
+            tuple: The observations and an empty info dict
+        """
+        with self._lock:
+            self._check()
+            if seed is None:
+                self.lib.reset_batch(
+                    self.batch_instance, None, self._scores, self._game_over, None, None
+                )
+            else:
+                for i in range(self.num_envs):
+                    game = self.lib.batch_game(self.batch_instance, i)
+                    self.lib.reset_game_seeded(game, seed + i)
+                self._read_results()
+            self._ended_array[:] = True
+            self._last_scores[:] = self._scores_array
+            self._steps[:] = 0
+            self._observe()
+            return self.observations, {}
+
+    def step(
+        self, actions: Sequence[int]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        """Move every game once.
+
+        Args:
+            actions: One direction value per game
+
+        Returns:
+            tuple: The observations, float32 rewards, and boolean
+            ``terminated`` (the game was lost or won) and ``truncated``
+            (`max_steps` reached) arrays. The info dict has each game's
+            ``score`` and episode ``steps`` before any automatic reset.
+        """
+        with self._lock:
+            self._check()
+            over_before = self._game_over_array.copy()
+            self._directions_array[:] = actions
+            self.lib.step_batch(
+                self.batch_instance,
+                self._directions,
+                self._scores,
+                self._game_over,
+                None,
+                None,
+            )
+            live = ~over_before
+            self._steps += live
+
+            scores = self._scores_array
+            terminated = self._game_over_array.copy()
+            # Each piece of food scores 10
+            gained = scores - self._last_scores
+            rewards = (gained * (self.REWARD_FOOD / 10)).astype(np.float32)
+            if self.REWARD_STEP:
+                rewards += live * np.float32(self.REWARD_STEP)
+            lost = terminated & live
+            if lost.any():
+                for i in np.flatnonzero(lost):
+                    game = self.lib.batch_game(self.batch_instance, i)
+                    if not self.lib.is_game_won(game):
+                        rewards[i] += self.REWARD_DEATH
+            self._last_scores[:] = scores
+            if self.max_steps is None:
+                truncated = np.zeros(self.num_envs, dtype=np.bool_)
+            else:
+                truncated = (self._steps >= self.max_steps) & ~terminated
+            info = {"score": scores.copy(), "steps": self._steps.copy()}
+
+            ended = self._ended_array
+            np.logical_or(terminated, truncated, out=ended)
+            if self.autoreset and ended.any():
+                self._reset_ended()
+                self._last_scores[:] = scores
+                self._steps[ended] = 0
+            else:
+                ended[:] = False
+            self._observe()
+            return self.observations, rewards, terminated, truncated, info
+
+    def cleanup(self) -> None:
+        """Destroy the games."""
+        with self._lock:
+            if self.batch_instance:
+                self.lib.destroy_batch(self.batch_instance)
+                self.batch_instance = None
+
+
+class SnakeEnv:
+    """One game with observations written by C, reset only by `reset`.
+
+    Rewards are as in `SnakeVecEnv`. Stepping after the episode ended
+    reports ``terminated`` again with no reward. Methods hold a per-game
+    lock.
+
+    Attributes:
+        lib: The loaded C library instance
+        game_instance: Pointer to the game in C
+        stack: Number of frames in each observation
+        max_steps: Steps after which an episode is truncated, or None
+        observation_shape: Shape of an observation
+        action_count: Number of actions
+        observation: uint8 array of shape `observation_shape`
+    """
+
+    REWARD_FOOD = SnakeVecEnv.REWARD_FOOD
+    REWARD_DEATH = SnakeVecEnv.REWARD_DEATH
+    REWARD_STEP = SnakeVecEnv.REWARD_STEP
+
+    action_count = SnakeVecEnv.action_count
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        lib_path: Optional[str] = None,
+        seed: Optional[int] = None,
+        width: int = GRID_WIDTH,
+        height: int = GRID_HEIGHT,
+        stack: int = 1,
+        max_steps: Optional[int] = None,
+    ):
+        """Create the game and observe its initial state.
+
+        Args:
+            lib_path: Path to the shared library. If None, uses default path.
+            seed: Optional seed for food placement
+            width: Number of columns on the board
+            height: Number of rows on the board
+            stack: Number of frames in each observation
+            max_steps: Optional number of steps after which an episode is
+                truncated
+
+        Raises:
+            ValueError: If an argument is invalid
+        """
+        if stack < 1:
+            raise ValueError("stack must be at least 1")
+        if max_steps is not None and max_steps < 1:
+            raise ValueError("max_steps must be at least 1")
+        check_grid_size(width, height)
+        self.lib = load_library(lib_path, (_setup_observe_signatures,))
+        if seed is None:
+            self.game_instance = self.lib.create_game_sized(width, height)
+        else:
+            self.game_instance = self.lib.create_game_sized_seeded(width, height, seed)
+        if not self.game_instance:
+            raise RuntimeError("Failed to create game instance")
+        self.stack = stack
+        self.max_steps = max_steps
+        self.observation_shape = (stack * len(OBSERVATION_PLANES), height, width)
+        self._frames = (c_ubyte * int(np.prod(self.observation_shape)))()
+        self.observation = np.frombuffer(self._frames, dtype=np.uint8).reshape(
+            self.observation_shape
+        )
+        self._steps = 0
+        self._lock = threading.Lock()
+        self.lib.observe_game(self.game_instance, self._frames, stack, True)
+
+    def _check(self):
+        if not self.game_instance:
+            raise RuntimeError("Game instance not initialized")
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, dict]:
+        """Start a new episode.
+
+        Args:
+            seed: Optional new seed for food placement
+
+        Returns:
+            tuple: The observation and an empty info dict
+        """
+        with self._lock:
+            self._check()
+            if seed is None:
+                self.lib.reset_game(self.game_instance)
+            else:
+                self.lib.reset_game_seeded(self.game_instance, seed)
+            self._steps = 0
+            self.lib.observe_game(self.game_instance, self._frames, self.stack, True)
+            return self.observation, {}
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, dict]:
+        """Move once.
+
+        Args:
+            action: Direction value
+
+        Returns:
+            tuple: The observation, reward, ``terminated``, ``truncated``
+            and an info dict with the ``score`` and episode ``steps``
+
+        Raises:
+            ValueError: If the action is not a direction value
+        """
+        if not 0 <= action < self.action_count:
+            raise ValueError("Invalid action")
+        with self._lock:
+            self._check()
+            game = self.game_instance
+            reward = 0.0
+            if not self.lib.is_game_over(game):
+                self.lib.change_direction(game, action)
+                if self.lib.move_snake(game):
+                    reward += self.REWARD_FOOD
+                self._steps += 1
+                reward += self.REWARD_STEP
+                if self.lib.is_game_over(game) and not self.lib.is_game_won(game):
+                    reward += self.REWARD_DEATH
+                self.lib.observe_game(game, self._frames, self.stack, False)
+            terminated = bool(self.lib.is_game_over(game))
+            truncated = not terminated and (
+                self.max_steps is not None and self._steps >= self.max_steps
+            )
+            info = {"score": self.lib.get_score(game), "steps": self._steps}
+            return self.observation, reward, terminated, truncated, info
+
+    def cleanup(self) -> None:
+        """Destroy the game."""
+        with self._lock:
+            if self.game_instance:
+                self.lib.destroy_game(self.game_instance)
+                self.game_instance = None
@@ -0,0 +1,329 @@
+"""Server-side tick loop that pushes game frames to subscribers.
+
+Instead of clients driving every move with an HTTP request, a `GameLoop`
+advances each watched session on a background thread at the session's own
+speed and publishes a frame after every tick. Clients receive frames through
+a `Subscription` (served as Server-Sent Events by the web apps) and only send
+requests when they change direction.
+
+A session is ticked while it has at least one subscriber. Sessions are kept
+in a heap ordered by their next deadline, so each wake-up only touches the
+sessions that are due.
+
+Example:
+    ```python
+    from src.api.game_loop import GameLoop
+    from src.api.sessions import SessionRegistry
+    registry = SessionRegistry("build/libsnake.so")
+    loop = GameLoop(registry)
+    loop.start()
+    subscription = loop.subscribe(registry.create())
+    frame = subscription.get(timeout=1.0)
+    loop.unsubscribe(subscription)
+    loop.stop()
+    ```
+"""
+
+import asyncio
+import heapq
+import itertools
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Set
+
+from src.api.sessions import SessionNotFoundError, SessionRegistry
+from src.api.snake_api import SnakeAPI
+
+# Seconds between ticks for a game with speed 1.0
+BASE_TICK_INTERVAL = 0.1
+# Frames buffered per subscriber before the oldest are dropped
+DEFAULT_FRAME_BUFFER = 8
+
+
+class Subscription:
+    """A stream of frames for one session.
+
+    Frames are buffered up to `max_frames`; a subscriber that falls behind
+    loses its oldest frames rather than delaying the loop.
+
+    Attributes:
+        session_id: Id of the watched session
+        closed: True once the loop will publish no more frames, e.g. because
+            the session was destroyed or the subscriber unsubscribed
+    """
+
+    def __init__(self, session_id: str, max_frames: int = DEFAULT_FRAME_BUFFER):
+        self.session_id = session_id
+        self.closed = False
+        self._frames: "queue.Queue[Any]" = queue.Queue(maxsize=max_frames)
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Wait for the next frame.
+
+        Args:
+            timeout: Seconds to wait. Waits forever if None.
+
+        Returns:
+            The next frame, or None if the timeout expired or the
+            subscription was closed
+        """
+        try:
+            return self._frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _publish(self, frame: Any) -> None:
+        while True:
+            try:
+                self._frames.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self._frames.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _close(self) -> None:
+        self.closed = True
+        # Wake up a waiting reader
+        self._publish(None)
+
+
+class AsyncSubscription:
+    """A stream of frames for one session, read from an asyncio event loop.
+
+    Frames are handed to the event loop thread-safely, so waiting for a frame
+    does not hold a thread. Like `Subscription`, it keeps at most
+    `max_frames` frames and drops the oldest.
+
+    Attributes:
+        session_id: Id of the watched session
+        closed: True once the loop will publish no more frames
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        max_frames: int = DEFAULT_FRAME_BUFFER,
+    ):
+        """Create the subscription; must be called on (or given) the event loop.
+
+        Args:
+            session_id: Id of the watched session
+            loop: Event loop that reads frames. Defaults to the running loop.
+            max_frames: Frames buffered before the oldest are dropped
+        """
+        self.session_id = session_id
+        self.closed = False
+        self._loop = loop or asyncio.get_running_loop()
+        self._frames: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=max_frames)
+
+    async def get(self, timeout: Optional[float] = None) -> Any:
+        """Wait for the next frame.
+
+        Args:
+            timeout: Seconds to wait. Waits forever if None.
+
+        Returns:
+            The next frame, or None if the timeout expired or the
+            subscription was closed
+        """
+        try:
+            return await asyncio.wait_for(self._frames.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def _put(self, frame: Any) -> None:
+        if self._frames.full():
+            self._frames.get_nowait()
+        self._frames.put_nowait(frame)
+
+    def _publish(self, frame: Any) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._put, frame)
+        except RuntimeError:
+            # The event loop has shut down; nobody is reading any more
+            pass
+
+    def _close(self) -> None:
+        self.closed = True
+        self._publish(None)
+
+
+class GameLoop:
+    """Background loop ticking subscribed sessions at their speed.
+
+    A game with speed ``s`` is stepped every ``BASE_TICK_INTERVAL / s``
+    seconds. Games that are over are not stepped and publish no frames until
+    they are reset.
+
+    Attributes:
+        registry: Registry the ticked sessions live in
+        base_interval: Seconds between ticks for a game with speed 1.0
+    """
+
+    def __init__(
+        self,
+        registry: SessionRegistry,
+        render: Optional[Callable[[SnakeAPI], Any]] = None,
+        base_interval: float = BASE_TICK_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the loop.
+
+        Args:
+            registry: Registry the ticked sessions live in
+            render: Callable turning a game into a frame. It runs once per
+                tick and the result is shared by every subscriber of the
+                session. Defaults to `SnakeAPI.get_state`.
+            base_interval: Seconds between ticks for a game with speed 1.0
+            clock: Monotonic time source, injectable for tests
+        """
+        self.registry = registry
+        self.base_interval = base_interval
+        self._render = render or (lambda game: game.get_state())
+        self._clock = clock
+        self._subscribers: Dict[str, list] = {}
+        self._schedule: list = []
+        # Sessions with an entry in the schedule; at most one each
+        self._scheduled: Set[str] = set()
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self) -> None:
+        """Start ticking on a daemon thread."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run, name="snake-game-loop", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the loop thread and close every subscription."""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+            thread, self._thread = self._thread, None
+            subscriptions = [s for subs in self._subscribers.values() for s in subs]
+            self._subscribers.clear()
+            self._schedule.clear()
+            self._scheduled.clear()
+        if thread is not None:
+            thread.join()
+        for subscription in subscriptions:
+            subscription._close()  # pylint: disable=protected-access
+
+    def subscribe(self, session_id: str, subscription=None):
+        """Start receiving frames for a session.
+
+        The current state is published to the new subscription immediately.
+        The first subscriber of a session starts its ticking.
+
+        Args:
+            session_id: Id of the session
+            subscription: Optional subscription to publish to, e.g. an
+                `AsyncSubscription`. A new `Subscription` is created if None.
+
+        Returns:
+            The subscription
+
+        Raises:
+            SessionNotFoundError: If the session does not exist
+        """
+        if subscription is None:
+            subscription = Subscription(session_id)
+        with self._cond:
+            game = self.registry.get(session_id)
+            frame = self._render(game)
+            subscription._publish(frame)  # pylint: disable=protected-access
+            subscribers = self._subscribers.setdefault(session_id, [])
+            if session_id not in self._scheduled:
+                self._scheduled.add(session_id)
+                self._schedule_locked(session_id, self._clock() + self._interval(game))
+                self._cond.notify()
+            subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription) -> None:
+        """Stop receiving frames; the session stops ticking with its last subscriber.
+
+        Args:
+            subscription: Subscription returned by `subscribe`
+        """
+        with self._cond:
+            subscribers = self._subscribers.get(subscription.session_id, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+                if not subscribers:
+                    # The heap entry is dropped when it comes due, unless the
+                    # session is subscribed to again before then
+                    del self._subscribers[subscription.session_id]
+        subscription._close()  # pylint: disable=protected-access
+
+    def tick(self, now: Optional[float] = None) -> int:
+        """Step every session whose deadline has passed.
+
+        Called by the loop thread; tests call it directly with a fake clock.
+
+        Args:
+            now: Current time. Uses the loop clock if None.
+
+        Returns:
+            int: Number of frames published
+        """
+        with self._cond:
+            return self._tick_locked(self._clock() if now is None else now)
+
+    def _interval(self, game: SnakeAPI) -> float:
+        speed = game.get_game_speed()
+        return self.base_interval / speed if speed > 0 else self.base_interval
+
+    def _schedule_locked(self, session_id: str, deadline: float) -> None:
+        heapq.heappush(self._schedule, (deadline, next(self._order), session_id))
+
+    def _tick_locked(self, now: float) -> int:
+        published = 0
+        while self._schedule and self._schedule[0][0] <= now:
+            deadline, _, session_id = heapq.heappop(self._schedule)
+            subscribers = self._subscribers.get(session_id)
+            if not subscribers:
+                self._scheduled.discard(session_id)
+                continue
+            try:
+                game = self.registry.get(session_id)
+            except SessionNotFoundError:
+                self._scheduled.discard(session_id)
+                for subscription in self._subscribers.pop(session_id):
+                    subscription._close()  # pylint: disable=protected-access
+                continue
+            if not game.is_game_over():
+                game.step()
+                frame = self._render(game)
+                for subscription in subscribers:
+                    subscription._publish(frame)  # pylint: disable=protected-access
+                published += 1
+            # Keep a steady cadence, but don't burst to catch up after a stall
+            interval = self._interval(game)
+            deadline += interval
+            if deadline <= now:
+                deadline = now + interval
+            self._schedule_locked(session_id, deadline)
+        return published
+
+    def _run(self) -> None:
+        with self._cond:
+            while self._running:
+                now = self._clock()
+                self._tick_locked(now)
+                timeout = (
+                    self._schedule[0][0] - self._clock() if self._schedule else None
+                )
+                if timeout is None or timeout > 0:
+                    self._cond.wait(timeout)
@@ -0,0 +1,289 @@
+"""Append-only logs of the inputs that drive a game.
+
+Games are deterministic: a game created with a seed and given the same
+direction changes and resets at the same ticks always plays out the same
+way. An input log therefore only stores the board size, the seed and each
+input with the tick it was applied at; moves are implied by the ticks.
+Checkpoints with the score and state hash are written whenever the game is
+reset and when the log is closed, so a replay can prove it reached the same
+states (see `src.api.replay`).
+
+File format (integers little endian, varints LEB128):
+
+- Header: ``b"SNKL"``, version (u8), width (u32), height (u32), seed (u64)
+- Records, each starting with the varint ``tick_delta << 3 | code``, where
+  ``tick_delta`` is the tick minus the previous record's tick:
+
+  - codes 0-3: direction change to that direction
+  - code 4 (reset): u8 flag, followed by a u64 seed if the flag is set
+  - code 5 (checkpoint): u8 flags (1 = game over, 2 = won), varint score,
+    u64 state hash
+  - code 6 (end): the log was closed; a new header may follow
+
+A direction change is typically a single byte. Several logs may be
+concatenated in one file, e.g. when a session id is reused.
+
+Example:
+    ```python
+    from src.api.input_log import record_inputs
+    from src.api.snake_api import SnakeAPI
+    api = SnakeAPI("build/libsnake.so")
+    record_inputs(api, "game.snklog")
+    api.step("down")
+    api.cleanup()  # writes a final checkpoint and closes the log
+    ```
+"""
+
+import struct
+import threading
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional
+
+from src.api.snake_api import Checkpoint
+
+LOG_MAGIC = b"SNKL"
+LOG_FORMAT_VERSION = 1
+LOG_HEADER = struct.Struct("<4sBIIQ")
+_U64 = struct.Struct("<Q")
+
+# Record codes (low 3 bits of a record's first varint)
+RECORD_RESET = 4
+RECORD_CHECKPOINT = 5
+RECORD_END = 6
+
+CHECKPOINT_GAME_OVER = 1
+CHECKPOINT_WON = 2
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+class Record(NamedTuple):
+    """One logged input or checkpoint.
+
+    Attributes:
+        tick: Tick of the game when the record was written
+        code: 0-3 for a direction change, or a RECORD_* code
+        value: Seed for a seeded reset, the `Checkpoint` for a checkpoint,
+            otherwise None
+    """
+
+    tick: int
+    code: int
+    value: object = None
+
+
+class GameLog(NamedTuple):
+    """Header and records of one logged game session."""
+
+    width: int
+    height: int
+    seed: int
+    records: List[Record]
+
+
+class InputLog:
+    """Writer appending inputs of one game to a log file.
+
+    Records are buffered; `flush` pushes them to the operating system, and
+    checkpoints and `close` flush automatically. Writing is thread-safe.
+    """
+
+    def __init__(self, path: str, width: int, height: int, seed: int):
+        """Open the file for appending and write the log header.
+
+        Args:
+            path: Path of the log file. Existing contents are kept.
+            width: Number of columns on the board
+            height: Number of rows on the board
+            seed: Seed the game was created with
+        """
+        self.path = path
+        # pylint: disable=consider-using-with
+        self._file: Optional[BinaryIO] = open(path, "ab")
+        self._tick = 0
+        self._lock = threading.Lock()
+        header = LOG_HEADER.pack(LOG_MAGIC, LOG_FORMAT_VERSION, width, height, seed)
+        self._file.write(header)
+
+    @property
+    def closed(self) -> bool:
+        """Whether the log has been closed."""
+        return self._file is None
+
+    def turn(self, tick: int, direction: int) -> None:
+        """Record a direction change (0-3, as in `DIRECTION_NAMES`)."""
+        self._write(tick, direction)
+
+    def reset(self, tick: int, seed: Optional[int] = None) -> None:
+        """Record a reset, optionally with a new seed."""
+        if seed is None:
+            self._write(tick, RECORD_RESET, b"\x00")
+        else:
+            self._write(tick, RECORD_RESET, b"\x01" + _U64.pack(seed))
+
+    def checkpoint(self, checkpoint: Checkpoint) -> None:
+        """Record the state a replay must reach, and flush."""
+        flags = (CHECKPOINT_GAME_OVER if checkpoint.game_over else 0) | (
+            CHECKPOINT_WON if checkpoint.won else 0
+        )
+        payload = (
+            bytes([flags])
+            + _varint(checkpoint.score)
+            + _U64.pack(checkpoint.state_hash)
+        )
+        self._write(checkpoint.tick, RECORD_CHECKPOINT, payload)
+        self.flush()
+
+    def flush(self) -> None:
+        """Push buffered records to the operating system."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        """Write the end record and close the file."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(_varint(RECORD_END))
+            self._file.close()
+            self._file = None
+
+    def _write(self, tick: int, code: int, payload: bytes = b"") -> None:
+        with self._lock:
+            if self._file is None:
+                raise ValueError("Input log is closed")
+            if tick < self._tick:
+                raise ValueError("Ticks in an input log must not go backwards")
+            self._file.write(_varint((tick - self._tick) << 3 | code) + payload)
+            self._tick = tick
+
+
+def record_inputs(game, path: str) -> InputLog:
+    """Start logging a game's inputs to a file.
+
+    The game must not have moved yet, so that its seed determines its state.
+    The log is closed, after a final checkpoint, by `SnakeAPI.cleanup`.
+
+    Args:
+        game: A `SnakeAPI` at tick 0
+        path: Path of the log file; a new log is appended to it
+
+    Returns:
+        InputLog: The log, also set as ``game.input_log``
+
+    Raises:
+        ValueError: If the game has already moved or is already logged
+    """
+    if game.input_log is not None:
+        raise ValueError("Game inputs are already being logged")
+    if game.get_tick() != 0:
+        raise ValueError("Input logs must start when the game is created")
+    log = InputLog(path, game.width, game.height, game.get_seed())
+    game.input_log = log
+    return log
+
+
+class _TruncatedLog(ValueError):
+    """The data ends in the middle of a record."""
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def take(self, size: int) -> bytes:
+        """Read the next `size` bytes."""
+        if self.pos + size > len(self.data):
+            raise _TruncatedLog("Input log is truncated")
+        chunk = self.data[self.pos : self.pos + size]
+        self.pos += size
+        return chunk
+
+    def varint(self) -> int:
+        """Read the next variable-length integer."""
+        value = shift = 0
+        while True:
+            byte = self.take(1)[0]
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+
+def parse_log(data: bytes) -> Iterator[GameLog]:
+    """Parse the logs stored in a file's contents.
+
+    A log cut short, e.g. by a crash, is returned with the records that were
+    complete.
+
+    Args:
+        data: Contents of a log file
+
+    Yields:
+        GameLog: Each log in the file, in order
+
+    Raises:
+        ValueError: If the data is not an input log
+    """
+    reader = _Reader(data)
+    while reader.pos < len(data):
+        try:
+            header = LOG_HEADER.unpack(reader.take(LOG_HEADER.size))
+        except _TruncatedLog:
+            return
+        magic, version, width, height, seed = header
+        if magic != LOG_MAGIC or version != LOG_FORMAT_VERSION:
+            raise ValueError("Not an input log")
+        records: List[Record] = []
+        tick = 0
+        try:
+            while True:
+                first = reader.varint()
+                tick += first >> 3
+                code = first & 7
+                if code < 4:
+                    records.append(Record(tick, code))
+                elif code == RECORD_RESET:
+                    seeded = reader.take(1)[0]
+                    seed_value = _U64.unpack(reader.take(8))[0] if seeded else None
+                    records.append(Record(tick, code, seed_value))
+                elif code == RECORD_CHECKPOINT:
+                    flags = reader.take(1)[0]
+                    score = reader.varint()
+                    state_hash = _U64.unpack(reader.take(8))[0]
+                    checkpoint = Checkpoint(
+                        tick,
+                        score,
+                        bool(flags & CHECKPOINT_GAME_OVER),
+                        bool(flags & CHECKPOINT_WON),
+                        state_hash,
+                    )
+                    records.append(Record(tick, code, checkpoint))
+                elif code == RECORD_END:
+                    break
+                else:
+                    raise ValueError(f"Unknown input log record: {code}")
+        except _TruncatedLog:
+            reader.pos = len(data)
+        yield GameLog(width, height, seed, records)
+
+
+def read_log(path: str) -> List[GameLog]:
+    """Read every log stored in a file.
+
+    Args:
+        path: Path of the log file
+
+    Returns:
+        List[GameLog]: The logs in the file, in order
+    """
+    with open(path, "rb") as f:
+        return list(parse_log(f.read()))
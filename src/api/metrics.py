@@ -0,0 +1,356 @@
+"""Low-overhead metrics exported in the Prometheus text format.
+
+Counters and histograms are recorded into a table owned by the recording
+thread, so recording never takes a lock or contends with other threads;
+`Metrics.snapshot` sums the tables of every thread. Values that already live
+elsewhere, such as the number of sessions or the C library's move counters,
+are read only when a snapshot is taken.
+
+Recording is a no-op while the registry is disabled. The server enables the
+shared `METRICS` registry when ``SNAKE_METRICS=1`` and then creates its games
+with `timed_library`, so they time every call into the C library and go
+through ctypes rather than the native extension.
+
+Example:
+    ```python
+    from src.api.metrics import METRICS
+    METRICS.enabled = True
+    requests = METRICS.counter("requests_total", "Requests served")
+    METRICS.inc(requests, (("route", "state"),))
+    print(METRICS.render())
+    ```
+"""
+
+import bisect
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.api.snake_api import default_lib_path, get_engine_stats, load_library
+
+# Content type of `Metrics.render` output
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bounds, in seconds, for HTTP requests and for single C calls
+HTTP_BUCKETS = (5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+FFI_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 1e-3, 1e-2)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value) -> str:
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metrics:
+    """Registry of metrics recorded per thread.
+
+    Metrics are defined once with `counter`, `histogram`, `gauge` or `rate`,
+    then recorded with `inc` and `observe` under a tuple of label pairs.
+
+    Attributes:
+        enabled: Whether `inc` and `observe` record anything
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        # name -> (type, help, histogram bounds)
+        self._definitions: Dict[str, Tuple[str, str, Sequence[float]]] = {}
+        self._readers: List[Callable[[], Dict[str, float]]] = []
+        self._rates: Dict[str, str] = {}
+        self._last_totals: Dict[str, Tuple[float, float]] = {}
+        self._tables: List[dict] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str) -> str:
+        """Define a counter and return its name."""
+        self._definitions[name] = ("counter", help_text, ())
+        return name
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float]) -> str:
+        """Define a histogram with the given bucket upper bounds and return its name."""
+        self._definitions[name] = ("histogram", help_text, tuple(sorted(buckets)))
+        return name
+
+    def gauge(self, name: str, help_text: str) -> str:
+        """Define a gauge, whose value is provided by a reader, and return its name."""
+        self._definitions[name] = ("gauge", help_text, ())
+        return name
+
+    def rate(self, name: str, help_text: str, counter: str) -> str:
+        """Define a gauge reporting how fast a counter grew since the last render.
+
+        Args:
+            name: Name of the gauge
+            help_text: Description of the gauge
+            counter: Name of the counter, summed over all its labels
+
+        Returns:
+            str: The name of the gauge
+        """
+        self._definitions[name] = ("gauge", help_text, ())
+        self._rates[name] = counter
+        return name
+
+    def add_reader(self, reader: Callable[[], Dict[str, float]]) -> None:
+        """Register a callable returning current values of unlabelled metrics.
+
+        Readers are called by `snapshot`, e.g. to report gauges or counters
+        kept outside Python. A reader that raises is skipped.
+        """
+        with self._lock:
+            self._readers.append(reader)
+
+    def _table(self) -> dict:
+        try:
+            return self._local.table
+        except AttributeError:
+            table = self._local.table = {}
+            with self._lock:
+                self._tables.append(table)
+            return table
+
+    def inc(self, name: str, labels: Labels = (), value: float = 1) -> None:
+        """Add to a counter."""
+        if not self.enabled:
+            return
+        table = self._table()
+        key = (name, labels)
+        table[key] = table.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        """Record a value in a histogram."""
+        if not self.enabled:
+            return
+        table = self._table()
+        key = (name, labels)
+        counts = table.get(key)
+        bounds = self._definitions[name][2]
+        if counts is None:
+            # One count per bucket plus +Inf, then the sum of all values
+            counts = table[key] = [0] * (len(bounds) + 1) + [0.0]
+        counts[bisect.bisect_left(bounds, value)] += 1
+        counts[-1] += value
+
+    def observer(self, name: str, labels: Labels = ()) -> Callable[[float], None]:
+        """Return a function recording values in one histogram series.
+
+        Equivalent to calling `observe` with fixed arguments, but cheaper per
+        value, for hot paths.
+        """
+        key = (name, labels)
+        bounds = self._definitions[name][2]
+        size = len(bounds) + 1
+        local = self._local
+        find = bisect.bisect_left
+
+        def record(value: float) -> None:
+            if not self.enabled:
+                return
+            try:
+                table = local.table
+            except AttributeError:
+                table = self._table()
+            counts = table.get(key)
+            if counts is None:
+                counts = table[key] = [0] * size + [0.0]
+            counts[find(bounds, value)] += 1
+            counts[-1] += value
+
+        return record
+
+    def snapshot(self) -> dict:
+        """Sum the values recorded by every thread and read the readers.
+
+        Returns:
+            dict: Values keyed by ``(name, labels)``: a number for counters
+            and gauges, per-bucket counts followed by the sum for histograms
+        """
+        with self._lock:
+            tables = list(self._tables)
+            readers = list(self._readers)
+        totals: dict = {}
+        for table in tables:
+            # Copying is atomic under the GIL, while the owner keeps recording
+            for key, value in table.copy().items():
+                _merge_value(totals, key, value)
+        for reader in readers:
+            try:
+                values = reader()
+            except Exception:  # pylint: disable=broad-except
+                continue
+            for name, value in values.items():
+                _merge_value(totals, (name, ()), value)
+        return totals
+
+    def render(self, snapshots: Iterable[dict] = ()) -> str:
+        """Render every metric in the Prometheus text format.
+
+        Args:
+            snapshots: Snapshots from other processes to add to this one's,
+                e.g. from shard processes
+
+        Returns:
+            str: The exposition text
+        """
+        totals = self.snapshot()
+        for snapshot in snapshots:
+            for key, value in snapshot.items():
+                _merge_value(totals, key, value)
+        self._add_rates(totals)
+
+        by_name: Dict[str, list] = {}
+        for (name, labels), value in sorted(totals.items()):
+            by_name.setdefault(name, []).append((labels, value))
+        lines = []
+        for name, (kind, help_text, bounds) in self._definitions.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in by_name.get(name, ()):
+                if kind == "histogram":
+                    lines.extend(_histogram_lines(name, labels, bounds, value))
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Forget every recorded value."""
+        with self._lock:
+            for table in self._tables:
+                table.clear()
+            self._last_totals.clear()
+
+    def _add_rates(self, totals: dict) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for name, counter in self._rates.items():
+                total = sum(v for (n, _), v in totals.items() if n == counter)
+                last = self._last_totals.get(name)
+                self._last_totals[name] = (now, total)
+                if last is not None and now > last[0]:
+                    totals[(name, ())] = max(0.0, total - last[1]) / (now - last[0])
+
+
+def _merge_value(totals: dict, key, value) -> None:
+    current = totals.get(key)
+    if current is None:
+        totals[key] = list(value) if isinstance(value, list) else value
+    elif isinstance(value, list):
+        for i, count in enumerate(value):
+            current[i] += count
+    else:
+        totals[key] = current + value
+
+
+def _histogram_lines(name: str, labels: Labels, bounds: Sequence[float], counts: list):
+    cumulative = 0
+    for bound, count in zip(bounds, counts):
+        cumulative += count
+        le = f'le="{bound:g}"'
+        yield f"{name}_bucket{_format_labels(labels, le)} {cumulative}"
+    cumulative += counts[len(bounds)]
+    le = 'le="+Inf"'
+    yield f"{name}_bucket{_format_labels(labels, le)} {cumulative}"
+    yield f"{name}_sum{_format_labels(labels)} {_number(counts[-1])}"
+    yield f"{name}_count{_format_labels(labels)} {cumulative}"
+
+
+# Registry shared by the server, its games and its shard processes
+METRICS = Metrics()
+
+FFI_SECONDS = METRICS.histogram(
+    "snake_ffi_call_duration_seconds",
+    "Duration of calls into the C library by function",
+    FFI_BUCKETS,
+)
+# Read from the C library, see `engine_metrics_reader`
+MOVES_TOTAL = METRICS.counter("snake_moves_total", "Moves made by all games")
+GAMES_OVER_TOTAL = METRICS.counter("snake_games_over_total", "Games that ended")
+MOVES_PER_SECOND = METRICS.rate(
+    "snake_moves_per_second", "Moves per second since the previous scrape", MOVES_TOTAL
+)
+
+
+class TimedLibrary:
+    """Proxy for a loaded ctypes library that times every function call.
+
+    Durations are recorded in `FFI_SECONDS`, labelled with the function's
+    name. Wrap the library after setting up its function signatures; the
+    wrapper for each function is created on first use and then cached.
+    """
+
+    def __init__(self, lib, metrics: Optional[Metrics] = None):
+        self._lib = lib
+        self._metrics = metrics or METRICS
+
+    def __getattr__(self, name):
+        func = getattr(self._lib, name)
+        record = self._metrics.observer(FFI_SECONDS, (("function", name),))
+        clock = time.perf_counter
+
+        def timed(*args):
+            start = clock()
+            result = func(*args)
+            record(clock() - start)
+            return result
+
+        timed.__name__ = name
+        # Later lookups find the attribute without calling __getattr__
+        setattr(self, name, timed)
+        return timed
+
+
+_timed_libraries: Dict[str, TimedLibrary] = {}
+_timed_libraries_lock = threading.Lock()
+
+
+def timed_library(lib_path: Optional[str] = None) -> TimedLibrary:
+    """Return the process-wide `TimedLibrary` for the C library.
+
+    Pass it to `SnakeAPI` as ``library`` to time the game's calls.
+
+    Args:
+        lib_path: Path to the shared library. If None, uses default path.
+    """
+    key = os.path.abspath(lib_path or default_lib_path())
+    timed = _timed_libraries.get(key)
+    if timed is None:
+        lib = load_library(lib_path)
+        with _timed_libraries_lock:
+            timed = _timed_libraries.setdefault(key, TimedLibrary(lib))
+    return timed
+
+
+def engine_metrics_reader(
+    lib_path: Optional[str] = None,
+) -> Callable[[], Dict[str, int]]:
+    """Return a `Metrics` reader for the C library's move and game-over totals.
+
+    The totals cover every game in the current process.
+
+    Args:
+        lib_path: Path to the shared library. If None, uses default path.
+
+    Returns:
+        Callable: Reader to pass to `Metrics.add_reader`
+    """
+    load_library(lib_path)
+
+    def read() -> Dict[str, int]:
+        stats = get_engine_stats(lib_path)
+        return {MOVES_TOTAL: stats["moves"], GAMES_OVER_TOTAL: stats["games_over"]}
+
+    return read
@@ -0,0 +1,158 @@
+"""Replay input logs through the C engine and verify the recorded states.
+
+Each log is replayed from its seed without HTTP or timing: the moves
+between two recorded inputs run in a single `SnakeAPI.advance` call, so a
+replay runs as fast as the engine can move. At every checkpoint the replayed
+score and state hash must match the recording.
+
+Usage:
+    python -m src.api.replay logs/*.snklog
+    python -m src.api.replay --json game.snklog
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import List, NamedTuple, Optional
+
+from src.api.input_log import RECORD_CHECKPOINT, RECORD_RESET, GameLog, read_log
+from src.api.snake_api import DIRECTION_NAMES, SnakeAPI
+
+
+class ReplayResult(NamedTuple):
+    """Outcome of replaying one logged game session.
+
+    Attributes:
+        ticks: Ticks replayed
+        checkpoints: Checkpoints that matched
+        score: Score when the log ended
+        state_hash: State hash when the log ended
+        error: Description of the first divergence, or None if the replay
+            matched the recording
+    """
+
+    ticks: int
+    checkpoints: int
+    score: int
+    state_hash: int
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:  # pylint: disable=invalid-name
+        """Whether the replay matched every checkpoint."""
+        return self.error is None
+
+
+def _catch_up(api: SnakeAPI, tick: int) -> Optional[str]:
+    """Move until the game reaches a recorded tick."""
+    current = api.get_tick()
+    if tick > current:
+        current += api.advance(tick - current)
+    if current != tick:
+        return f"game ended at tick {current}, before the recorded tick {tick}"
+    return None
+
+
+def replay_game(log: GameLog, lib_path: Optional[str] = None) -> ReplayResult:
+    """Replay one logged game session.
+
+    Args:
+        log: The session's log, see `read_log`
+        lib_path: Path to the shared library. If None, uses default path.
+
+    Returns:
+        ReplayResult: What the replay reached and whether it matched
+    """
+    api = SnakeAPI(lib_path, seed=log.seed, width=log.width, height=log.height)
+    checkpoints = 0
+    error = None
+    try:
+        for record in log.records:
+            error = _catch_up(api, record.tick)
+            if error:
+                break
+            if record.code < 4:
+                api.change_direction(DIRECTION_NAMES[record.code])
+            elif record.code == RECORD_RESET:
+                api.reset(record.value)
+            elif record.code == RECORD_CHECKPOINT:
+                expected = record.value
+                if expected.game_over and not api.is_game_over():
+                    # The move that ended the game did not advance the tick
+                    api.move()
+                if (api.get_score(), api.get_state_hash()) != (
+                    expected.score,
+                    expected.state_hash,
+                ):
+                    error = (
+                        f"state differs at tick {record.tick}: score "
+                        f"{api.get_score()} (recorded {expected.score})"
+                    )
+                    break
+                checkpoints += 1
+        return ReplayResult(
+            api.get_tick(), checkpoints, api.get_score(), api.get_state_hash(), error
+        )
+    finally:
+        api.cleanup()
+
+
+def replay_file(path: str, lib_path: Optional[str] = None) -> List[ReplayResult]:
+    """Replay every session logged in a file.
+
+    Args:
+        path: Path of the log file
+        lib_path: Path to the shared library. If None, uses default path.
+
+    Returns:
+        List[ReplayResult]: One result per logged session
+    """
+    return [replay_game(log, lib_path) for log in read_log(path)]
+
+
+def main(argv=None) -> int:
+    """Replay the logs named on the command line and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("logs", nargs="+", help="Input log files")
+    parser.add_argument("--lib", default=None, help="Path to libsnake.so")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    start = time.perf_counter()
+    for path in args.logs:
+        for index, result in enumerate(replay_file(path, args.lib)):
+            results.append(
+                {"log": path, "game": index, **result._asdict(), "ok": result.ok}
+            )
+    elapsed = time.perf_counter() - start
+    ticks = sum(r["ticks"] for r in results)
+    failed = [r for r in results if not r["ok"]]
+
+    if args.json:
+        summary = {
+            "games": len(results),
+            "failed": len(failed),
+            "ticks": ticks,
+            "seconds": elapsed,
+            "results": results,
+        }
+        print(json.dumps(summary, indent=2))
+    else:
+        for r in results:
+            status = "ok" if r["ok"] else f"FAILED: {r['error']}"
+            print(
+                f"{r['log']}[{r['game']}]: {r['ticks']} ticks, score {r['score']}, "
+                f"{r['checkpoints']} checkpoints, {status}"
+            )
+        rate = ticks / elapsed if elapsed > 0 else 0.0
+        print(
+            f"{len(results)} games, {len(failed)} failed, {ticks} ticks in "
+            f"{elapsed:.3f}s ({rate:,.0f} ticks/s)"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
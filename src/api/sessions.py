@@ -0,0 +1,237 @@
+"""Session registry for hosting many Snake games in one API process.
+
+Each client session owns its own `SnakeAPI` instance. Sessions are kept in an
+insertion/access-ordered mapping so lookups are O(1) and idle sessions can be
+evicted from the front of the mapping without scanning every game.
+
+Example:
+    ```python
+    from src.api.sessions import SessionRegistry
+    registry = SessionRegistry("build/libsnake.so", max_sessions=5000)
+    session_id = registry.create()
+    game = registry.get(session_id)
+    game.move()
+    registry.destroy(session_id)
+    ```
+"""
+
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from src.api.input_log import record_inputs
+from src.api.snake_api import SnakeAPI
+
+DEFAULT_MAX_SESSIONS = 10000
+DEFAULT_IDLE_TTL = 600.0
+
+# Extension of per-session input log files
+INPUT_LOG_SUFFIX = ".snklog"
+_LOG_NAME = re.compile(r"[A-Za-z0-9_-]+")
+
+
+class SessionNotFoundError(KeyError):
+    """Raised when a session id does not refer to a live game."""
+
+
+class SessionLimitError(RuntimeError):
+    """Raised when the registry is full and no idle session can be evicted."""
+
+
+# pylint: disable=too-few-public-methods
+class _Session:
+    """A hosted game together with the time it was last touched."""
+
+    __slots__ = ("game", "last_seen")
+
+    def __init__(self, game: SnakeAPI, last_seen: float):
+        self.game = game
+        self.last_seen = last_seen
+
+
+class GetOrCreateMixin:
+    """`get_or_create` for registries that implement `get` and `create`."""
+
+    def get_or_create(self, session_id: str):
+        """Look up a session, creating it first if it does not exist.
+
+        Args:
+            session_id: Id of the session
+
+        Returns:
+            The game hosted by the session, as returned by `get`
+        """
+        try:
+            return self.get(session_id)
+        except SessionNotFoundError:
+            pass
+        try:
+            self.create(session_id)
+        except ValueError:
+            # Another thread created it between the two calls
+            pass
+        return self.get(session_id)
+
+
+class SessionRegistry(GetOrCreateMixin):
+    """Registry of live game sessions keyed by session id.
+
+    Sessions are ordered from least to most recently used. Every lookup moves
+    the session to the end, so expired sessions always sit at the front and
+    eviction stops at the first session that is still fresh.
+
+    Attributes:
+        max_sessions: Maximum number of concurrently hosted games
+        idle_ttl: Seconds of inactivity after which a session is evicted
+        input_log_dir: Directory receiving an input log per session, or None
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        lib_path: Optional[str] = None,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        idle_ttl: float = DEFAULT_IDLE_TTL,
+        factory: Optional[Callable[[], SnakeAPI]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        input_log_dir: Optional[str] = None,
+    ):
+        """Initialize the registry.
+
+        Args:
+            lib_path: Path to the shared library used for new games
+            max_sessions: Maximum number of concurrently hosted games
+            idle_ttl: Seconds of inactivity before a session is evicted
+            factory: Optional callable creating new games (overrides lib_path)
+            clock: Monotonic time source, injectable for tests
+            input_log_dir: Optional directory in which every session's inputs
+                are logged to ``<session_id>.snklog`` (see `src.api.input_log`)
+        """
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1")
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._factory = factory or (lambda: SnakeAPI(lib_path))
+        self._clock = clock
+        self.input_log_dir = input_log_dir
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __iter__(self):
+        """Iterate over a snapshot of the live session ids."""
+        with self._lock:
+            return iter(list(self._sessions))
+
+    def create(self, session_id: Optional[str] = None) -> str:
+        """Create a new game session.
+
+        Args:
+            session_id: Optional id to use. A random id is generated if None.
+
+        Returns:
+            str: The id of the new session
+
+        Raises:
+            ValueError: If a session with the given id already exists
+            SessionLimitError: If the registry is full
+        """
+        with self._lock:
+            now = self._clock()
+            self._evict_expired_locked(now)
+            if session_id is None:
+                session_id = uuid.uuid4().hex
+            elif session_id in self._sessions:
+                raise ValueError(f"Session already exists: {session_id}")
+            if len(self._sessions) >= self.max_sessions:
+                raise SessionLimitError("Maximum number of sessions reached")
+            game = self._factory()
+            if self.input_log_dir is not None:
+                record_inputs(game, self._log_path(session_id))
+            self._sessions[session_id] = _Session(game, now)
+            return session_id
+
+    def get(self, session_id: str) -> SnakeAPI:
+        """Look up the game for a session and mark it as recently used.
+
+        Args:
+            session_id: Id of the session
+
+        Returns:
+            SnakeAPI: The game hosted by the session
+
+        Raises:
+            SessionNotFoundError: If the session does not exist or expired
+        """
+        with self._lock:
+            now = self._clock()
+            self._evict_expired_locked(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                raise SessionNotFoundError(session_id)
+            session.last_seen = now
+            self._sessions.move_to_end(session_id)
+            return session.game
+
+    def destroy(self, session_id: str) -> bool:
+        """Destroy a session and free its native game.
+
+        Args:
+            session_id: Id of the session
+
+        Returns:
+            bool: True if a session was destroyed, False if it did not exist
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.game.cleanup()
+        return True
+
+    def evict_expired(self) -> int:
+        """Destroy every session that has been idle longer than `idle_ttl`.
+
+        Returns:
+            int: Number of evicted sessions
+        """
+        with self._lock:
+            return self._evict_expired_locked(self._clock())
+
+    def clear(self) -> None:
+        """Destroy all sessions."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.game.cleanup()
+
+    def _log_path(self, session_id: str) -> str:
+        name = (
+            session_id
+            if _LOG_NAME.fullmatch(session_id)
+            else uuid.uuid5(uuid.NAMESPACE_URL, session_id).hex
+        )
+        return os.path.join(self.input_log_dir, name + INPUT_LOG_SUFFIX)
+
+    def _evict_expired_locked(self, now: float) -> int:
+        """Evict expired sessions from the front of the LRU order."""
+        evicted = 0
+        deadline = now - self.idle_ttl
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_seen > deadline:
+                break
+            del self._sessions[session_id]
+            session.game.cleanup()
+            evicted += 1
+        return evicted
@@ -0,0 +1,607 @@
+"""Host game sessions in a pool of worker processes.
+
+A `ShardedRegistry` owns several shard processes, each running its own
+`SessionRegistry`. Sessions are routed to a shard by hashing their id onto a
+consistent-hash ring, so every game lives in exactly one process while the
+API process only forwards calls. Games on different shards step on different
+cores without sharing a GIL.
+
+The registry is a drop-in replacement for `SessionRegistry`: `get` returns a
+`RemoteGame` proxy with the same methods as `SnakeAPI`, each of which is one
+round trip to the owning shard.
+
+Shards can be added at runtime (new sessions spread onto the new shard while
+existing sessions stay pinned where they are) and drained (the shard stops
+receiving new sessions and is shut down once its sessions have ended).
+
+Example:
+    ```python
+    from src.api.sharding import ShardedRegistry
+    registry = ShardedRegistry(4, "build/libsnake.so")
+    session_id = registry.create()
+    game = registry.get(session_id)
+    game.step("up")
+    print(game.get_state()["snake"])
+    registry.close()
+    ```
+"""
+
+import bisect
+import hashlib
+import itertools
+import multiprocessing
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from src.api.metrics import METRICS, engine_metrics_reader, timed_library
+from src.api.sessions import (
+    DEFAULT_IDLE_TTL,
+    DEFAULT_MAX_SESSIONS,
+    GetOrCreateMixin,
+    SessionNotFoundError,
+    SessionRegistry,
+)
+from src.api.snake_api import (
+    GRID_HEIGHT,
+    GRID_WIDTH,
+    SnakeAPI,
+    default_lib_path,
+)
+
+# Points each shard places on the hash ring
+DEFAULT_REPLICAS = 64
+
+# SnakeAPI methods a RemoteGame forwards to its shard
+REMOTE_METHODS = frozenset(
+    {
+        "move",
+        "step",
+        "change_direction",
+        "is_game_over",
+        "is_game_won",
+        "get_score",
+        "get_snake_length",
+        "get_snake_positions",
+        "get_food_position",
+        "set_food_position",
+        "get_snake_direction",
+        "set_game_speed",
+        "get_game_speed",
+        "get_state",
+        "get_tick",
+        "get_delta",
+        "get_state_bytes",
+        "reset",
+        "get_seed",
+        "snapshot",
+        "restore",
+    }
+)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring mapping keys to nodes.
+
+    Each node is placed on the ring `replicas` times. Adding or removing a
+    node only moves the keys that hash next to its points, roughly
+    ``1 / len(nodes)`` of all keys.
+    """
+
+    def __init__(self, nodes=(), replicas: int = DEFAULT_REPLICAS):
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self) -> int:
+        return len(self._points) // self.replicas
+
+    def __contains__(self, node: str) -> bool:
+        return node in self._owners
+
+    def add(self, node: str) -> None:
+        """Place a node on the ring."""
+        if node in self:
+            raise ValueError(f"Node already on the ring: {node}")
+        for i in range(self.replicas):
+            point = _hash(f"{node}#{i}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node: str) -> None:
+        """Take a node off the ring."""
+        keep = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points = [p for p, _ in keep]
+        self._owners = [o for _, o in keep]
+
+    def node_for(self, key: str) -> str:
+        """Return the node owning a key.
+
+        Raises:
+            LookupError: If the ring is empty
+        """
+        if not self._points:
+            raise LookupError("Hash ring is empty")
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+# pylint: disable=too-many-arguments
+def _serve(
+    conn, lib_path, width, height, max_sessions, idle_ttl, input_log_dir, metrics
+):
+    """Shard process main loop: apply registry operations sent over `conn`."""
+    library = None
+    if metrics:
+        METRICS.enabled = True
+        METRICS.add_reader(engine_metrics_reader(lib_path))
+        library = timed_library(lib_path)
+    registry = SessionRegistry(
+        lib_path,
+        max_sessions=max_sessions,
+        idle_ttl=idle_ttl,
+        factory=lambda: SnakeAPI(lib_path, width=width, height=height, library=library),
+        input_log_dir=input_log_dir,
+    )
+    while True:
+        try:
+            op, session_id, args = conn.recv()
+        except (EOFError, OSError):
+            break
+        try:
+            if op == "call":
+                method, call_args = args
+                result = getattr(registry.get(session_id), method)(*call_args)
+            elif op == "touch":
+                game = registry.get(session_id)
+                result = (game.width, game.height)
+            elif op == "create":
+                result = registry.create(session_id)
+            elif op == "destroy":
+                result = registry.destroy(session_id)
+            elif op == "count":
+                result = len(registry)
+            elif op == "sessions":
+                result = list(registry)
+            elif op == "evict":
+                result = registry.evict_expired()
+            elif op == "clear":
+                result = registry.clear()
+            elif op == "metrics":
+                result = METRICS.snapshot() if METRICS.enabled else {}
+            elif op == "stop":
+                registry.clear()
+                conn.send(("ok", None))
+                break
+            else:
+                raise ValueError(f"Unknown shard operation: {op}")
+            reply = ("ok", result)
+        except Exception as e:  # pylint: disable=broad-except
+            reply = ("error", e)
+        try:
+            conn.send(reply)
+        except Exception:  # pylint: disable=broad-except
+            conn.send(("error", RuntimeError(str(reply[1]))))
+    conn.close()
+
+
+class Shard:
+    """Handle on one shard process.
+
+    Requests are sent over a pipe one at a time; concurrent callers queue on
+    the shard's lock, while different shards serve requests in parallel.
+
+    Attributes:
+        name: Name of the shard on the hash ring
+        process: The shard's worker process
+    """
+
+    def __init__(self, name: str, context, **options):
+        self.name = name
+        self._conn, child = context.Pipe()
+        self._lock = threading.Lock()
+        self.process = context.Process(
+            target=_serve,
+            args=(
+                child,
+                options["lib_path"],
+                options["width"],
+                options["height"],
+                options["max_sessions"],
+                options["idle_ttl"],
+                options["input_log_dir"],
+                options["metrics"],
+            ),
+            name=f"snake-{name}",
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+
+    def request(self, op: str, session_id: Optional[str] = None, args=()):
+        """Run an operation in the shard process and return its result.
+
+        Raises:
+            RuntimeError: If the shard process is not running
+            Exception: Whatever the operation raised in the shard
+        """
+        with self._lock:
+            try:
+                self._conn.send((op, session_id, args))
+                status, result = self._conn.recv()
+            except (EOFError, OSError) as e:
+                raise RuntimeError(f"Shard {self.name} is not running") from e
+        if status == "error":
+            raise result
+        return result
+
+    def stop(self) -> None:
+        """Destroy the shard's games and wait for its process to exit."""
+        try:
+            self.request("stop")
+        except RuntimeError:
+            pass
+        self.process.join()
+        self._conn.close()
+
+
+class RemoteGame:
+    """Proxy for a game hosted by a shard.
+
+    Calls the `SnakeAPI` methods in `REMOTE_METHODS` on the remote game.
+    A call on a session that no longer exists raises `SessionNotFoundError`.
+
+    Attributes:
+        session_id: Id of the proxied session
+        width: Number of columns on the board
+        height: Number of rows on the board
+    """
+
+    def __init__(self, shard: Shard, session_id: str, width: int, height: int):
+        self._shard = shard
+        self.session_id = session_id
+        self.width = width
+        self.height = height
+
+    def __getattr__(self, name):
+        if name not in REMOTE_METHODS:
+            raise AttributeError(name)
+
+        def call(*args):
+            return self._shard.request("call", self.session_id, (name, args))
+
+        call.__name__ = name
+        return call
+
+
+class ShardedRegistry(GetOrCreateMixin):
+    """Session registry whose games are spread over worker processes.
+
+    Offers the same interface as `SessionRegistry` (`create`, `get`,
+    `get_or_create`, `destroy`, `evict_expired`, `clear`), plus shard
+    management with `add_shard` and `drain`.
+
+    Sessions are routed by consistent hashing of their id. When the set of
+    shards changes, sessions whose hash now points elsewhere are pinned to
+    the shard that hosts them, so a game never moves or splits.
+
+    Attributes:
+        max_sessions: Maximum number of games hosted by each shard
+        idle_ttl: Seconds of inactivity after which a session is evicted
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        shards: int,
+        lib_path: Optional[str] = None,
+        width: int = GRID_WIDTH,
+        height: int = GRID_HEIGHT,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        idle_ttl: float = DEFAULT_IDLE_TTL,
+        replicas: int = DEFAULT_REPLICAS,
+        input_log_dir: Optional[str] = None,
+    ):
+        """Start the shard processes.
+
+        Args:
+            shards: Number of shard processes to start
+            lib_path: Path to the shared library. If None, uses default path.
+            width: Number of columns on each board
+            height: Number of rows on each board
+            max_sessions: Maximum number of games hosted by each shard
+            idle_ttl: Seconds of inactivity before a session is evicted
+            replicas: Points each shard places on the hash ring
+            input_log_dir: Optional directory receiving an input log per
+                session, as for `SessionRegistry`
+        """
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._options = {
+            "lib_path": lib_path or default_lib_path(),
+            "width": width,
+            "height": height,
+            "max_sessions": max_sessions,
+            "idle_ttl": idle_ttl,
+            "input_log_dir": input_log_dir,
+            # Shards record metrics if the API process does when they start
+            "metrics": METRICS.enabled,
+        }
+        # Spawn rather than fork: the API process runs threads
+        self._context = multiprocessing.get_context("spawn")
+        self._names = (f"shard-{i}" for i in itertools.count())
+        self._shards: Dict[str, Shard] = {}
+        self._ring = HashRing(replicas=replicas)
+        self._pins: Dict[str, str] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        for _ in range(shards):
+            shard = self._start_shard()
+            self._ring.add(shard.name)
+
+    @property
+    def shards(self) -> List[str]:
+        """Names of the running shards, including ones being drained."""
+        with self._lock:
+            return list(self._shards)
+
+    def __len__(self) -> int:
+        return sum(shard.request("count") for shard in self._running())
+
+    def __contains__(self, session_id: str) -> bool:
+        try:
+            self._route(session_id).request("touch", session_id)
+        except (SessionNotFoundError, RuntimeError):
+            return False
+        return True
+
+    def __iter__(self):
+        """Iterate over the ids of every live session."""
+        return iter([s for shard in self._running() for s in shard.request("sessions")])
+
+    def shard_for(self, session_id: str) -> str:
+        """Name of the shard that hosts, or would host, a session."""
+        return self._route(session_id).name
+
+    def create(self, session_id: Optional[str] = None) -> str:
+        """Create a new game session on the shard its id hashes to.
+
+        Args:
+            session_id: Optional id to use. A random id is generated if None.
+
+        Returns:
+            str: The id of the new session
+
+        Raises:
+            ValueError: If a session with the given id already exists
+            SessionLimitError: If the owning shard is full
+        """
+        if session_id is None:
+            session_id = uuid.uuid4().hex
+        with self._lock:
+            shard = self._route_locked(session_id)
+            generation = self._generation
+        shard.request("create", session_id)
+        with self._lock:
+            # The shards changed while the game was being created
+            if (
+                self._generation != generation
+                and self._route_locked(session_id) is not shard
+            ):
+                self._pins[session_id] = shard.name
+        return session_id
+
+    def get(self, session_id: str) -> RemoteGame:
+        """Look up the game for a session and mark it as recently used.
+
+        Args:
+            session_id: Id of the session
+
+        Returns:
+            RemoteGame: Proxy for the game hosted by the session
+
+        Raises:
+            SessionNotFoundError: If the session does not exist or expired
+        """
+        shard = self._route(session_id)
+        try:
+            width, height = shard.request("touch", session_id)
+        except SessionNotFoundError:
+            self._unpin(session_id)
+            raise
+        return RemoteGame(shard, session_id, width, height)
+
+    def destroy(self, session_id: str) -> bool:
+        """Destroy a session and free its native game.
+
+        Args:
+            session_id: Id of the session
+
+        Returns:
+            bool: True if a session was destroyed, False if it did not exist
+        """
+        destroyed = self._route(session_id).request("destroy", session_id)
+        self._unpin(session_id)
+        return destroyed
+
+    def evict_expired(self) -> int:
+        """Evict idle sessions on every shard.
+
+        Pins of sessions that a shard no longer hosts, whether they expired
+        now or earlier, are dropped as well.
+
+        Returns:
+            int: Number of evicted sessions
+        """
+        evicted = 0
+        for shard in self._running():
+            evicted += shard.request("evict")
+            self._prune_pins(shard)
+        return evicted
+
+    def clear(self) -> None:
+        """Destroy all sessions, keeping the shards running."""
+        for shard in self._running():
+            shard.request("clear")
+        with self._lock:
+            self._pins.clear()
+
+    def metrics_snapshots(self) -> List[dict]:
+        """Collect the metrics recorded in every shard process.
+
+        Returns:
+            List[dict]: One `Metrics.snapshot` per running shard, to pass to
+            `Metrics.render`
+        """
+        snapshots = []
+        for shard in self._running():
+            try:
+                snapshots.append(shard.request("metrics"))
+            except RuntimeError:
+                # The shard stopped since it was listed
+                continue
+        return snapshots
+
+    def add_shard(self) -> str:
+        """Start another shard and route new sessions onto it.
+
+        Existing sessions that now hash to the new shard are pinned to the
+        shard hosting them, so they keep their state.
+
+        Returns:
+            str: Name of the new shard
+        """
+        shard = self._start_shard()
+        with self._lock:
+            hosted = {
+                name: set(hosting.request("sessions"))
+                for name, hosting in self._shards.items()
+                if name in self._ring
+            }
+            self._ring.add(shard.name)
+            self._generation += 1
+            # Sessions that ended since they were pinned no longer need it
+            self._pins = {
+                session_id: name
+                for session_id, name in self._pins.items()
+                if name not in hosted or session_id in hosted[name]
+            }
+            for name, session_ids in hosted.items():
+                for session_id in session_ids:
+                    if (
+                        session_id not in self._pins
+                        and self._ring.node_for(session_id) != name
+                    ):
+                        self._pins[session_id] = name
+        return shard.name
+
+    def drain(
+        self, name: str, timeout: Optional[float] = None, poll: float = 0.1
+    ) -> int:
+        """Stop routing new sessions to a shard and shut it down.
+
+        The shard keeps serving its existing sessions until they are
+        destroyed or evicted, or until `timeout` expires.
+
+        Args:
+            name: Name of the shard
+            timeout: Seconds to wait for the shard's sessions to end. Waits
+                until they have all ended if None.
+            poll: Seconds between checks
+
+        Returns:
+            int: Number of sessions still hosted, and destroyed, when the
+            shard was shut down
+
+        Raises:
+            KeyError: If there is no such shard
+            ValueError: If it is the only shard taking new sessions
+        """
+        with self._lock:
+            shard = self._shards[name]
+            if name in self._ring:
+                if len(self._ring) == 1:
+                    raise ValueError("Cannot drain the last shard")
+                for session_id in shard.request("sessions"):
+                    self._pins.setdefault(session_id, name)
+                self._ring.remove(name)
+                self._generation += 1
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            shard.request("evict")
+            remaining = shard.request("count")
+            if not remaining or (deadline is not None and time.monotonic() >= deadline):
+                break
+            time.sleep(poll)
+
+        with self._lock:
+            del self._shards[name]
+            self._pins = {s: n for s, n in self._pins.items() if n != name}
+        shard.stop()
+        return remaining
+
+    def close(self) -> None:
+        """Destroy every session and stop every shard."""
+        with self._lock:
+            shards = list(self._shards.values())
+            self._shards.clear()
+            self._pins.clear()
+            for shard in shards:
+                self._ring.remove(shard.name)
+        for shard in shards:
+            shard.stop()
+
+    def _start_shard(self) -> Shard:
+        shard = Shard(next(self._names), self._context, **self._options)
+        with self._lock:
+            self._shards[shard.name] = shard
+        return shard
+
+    def _running(self) -> List[Shard]:
+        with self._lock:
+            return list(self._shards.values())
+
+    def _route(self, session_id: str) -> Shard:
+        with self._lock:
+            return self._route_locked(session_id)
+
+    def _route_locked(self, session_id: str) -> Shard:
+        name = self._pins.get(session_id)
+        if name is None:
+            try:
+                name = self._ring.node_for(session_id)
+            except LookupError as e:
+                raise RuntimeError("No shards are running") from e
+        return self._shards[name]
+
+    def _unpin(self, session_id: str) -> None:
+        with self._lock:
+            self._pins.pop(session_id, None)
+
+    def _prune_pins(self, shard: Shard) -> None:
+        """Unpin the sessions pinned to a shard that it no longer hosts."""
+        with self._lock:
+            pinned = [s for s, name in self._pins.items() if name == shard.name]
+        if not pinned:
+            return
+        # Only pins taken before the listing: a session pinned after it may
+        # have been created too late to be listed
+        hosted = set(shard.request("sessions"))
+        with self._lock:
+            for session_id in pinned:
+                if (
+                    session_id not in hosted
+                    and self._pins.get(session_id) == shard.name
+                ):
+                    del self._pins[session_id]
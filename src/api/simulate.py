@@ -0,0 +1,287 @@
+"""Headless simulator measuring engine throughput.
+
+Runs N games for M steps each, choosing every move with a policy, either one
+game at a time through `SnakeAPI` or all games at once through `GameBatch`
+(``--batch``). Games that end are reset and keep playing. Reports moves per
+second, calls into the C library per second, step latency percentiles and
+peak memory, optionally as JSON for tracking results over time.
+
+Policies:
+- random: a random direction every step
+- greedy: head towards the food. Through `SnakeAPI` it reads the whole state
+  each step and avoids walls and its own body when it can; in a batch it
+  only sees head and food positions.
+
+Usage:
+    python -m src.api.simulate --games 100 --steps 1000 --policy greedy
+    python -m src.api.simulate --games 4096 --steps 1000 --batch --json
+    python -m src.api.simulate --batch --output results.jsonl
+"""
+
+import argparse
+import json
+import platform
+import random
+import resource
+import sys
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence
+
+from src.api.batch import GameBatch
+from src.api.snake_api import DIRECTION_NAMES, GRID_HEIGHT, GRID_WIDTH, SnakeAPI
+
+# (dx, dy) of each direction value
+MOVES = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+# Calls into the C library made by each SnakeAPI method the simulator uses.
+# `step` with a direction calls change_direction and move_snake.
+FFI_CALLS = {"get_state": 1, "step": 2, "is_game_over": 1, "reset": 1}
+
+
+def random_policy(_state: dict, rng: random.Random) -> int:
+    """Pick any direction."""
+    return rng.randrange(4)
+
+
+def greedy_policy(state: dict, rng: random.Random) -> int:
+    """Step towards the food, preferring moves that don't die immediately."""
+    head_x, head_y = state["snake"][0]
+    food_x, food_y = state["food"]
+    # The tail moves out of the way unless the snake is about to eat
+    body = set(state["snake"][:-1])
+    reverse = (DIRECTION_NAMES.index(state["direction"]) + 2) % 4
+
+    def score(value):
+        x, y = head_x + MOVES[value][0], head_y + MOVES[value][1]
+        safe = (
+            0 <= x < state["width"] and 0 <= y < state["height"] and (x, y) not in body
+        )
+        return (safe, -(abs(food_x - x) + abs(food_y - y)), rng.random())
+
+    return max((value for value in range(4) if value != reverse), key=score)
+
+
+def random_batch_policy(heads, _food, rng: random.Random) -> List[int]:
+    """Pick any direction for every game."""
+    return [rng.randrange(4) for _ in range(len(heads) // 2)]
+
+
+def greedy_batch_policy(heads, food, _rng: random.Random) -> List[int]:
+    """Step every game towards its food, ignoring walls and bodies."""
+    directions = []
+    for i in range(0, len(heads), 2):
+        dx = food[i] - heads[i]
+        dy = food[i + 1] - heads[i + 1]
+        if abs(dx) >= abs(dy):
+            directions.append(1 if dx > 0 else 3)
+        else:
+            directions.append(2 if dy > 0 else 0)
+    return directions
+
+
+POLICIES: Dict[str, Callable] = {"random": random_policy, "greedy": greedy_policy}
+BATCH_POLICIES: Dict[str, Callable] = {
+    "random": random_batch_policy,
+    "greedy": greedy_batch_policy,
+}
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile, 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def simulate_games(
+    games: int,
+    steps: int,
+    policy: Callable = greedy_policy,
+    seed: int = 0,
+    width: int = GRID_WIDTH,
+    height: int = GRID_HEIGHT,
+    lib_path: Optional[str] = None,
+) -> dict:
+    """Play games one move at a time through `SnakeAPI`.
+
+    Every step reads the game's state, asks the policy for a direction and
+    steps the game.
+
+    Args:
+        games: Number of games
+        steps: Steps per game
+        policy: Callable ``(state, rng) -> direction value``
+        seed: Seed for the games and the policy
+        width: Number of columns on each board
+        height: Number of rows on each board
+        lib_path: Path to the shared library. If None, uses default path.
+
+    Returns:
+        dict: Measurements, see `summarize`
+    """
+    rng = random.Random(seed)
+    apis = [
+        SnakeAPI(lib_path, seed=seed + i, width=width, height=height)
+        for i in range(games)
+    ]
+    latencies = array("d")
+    resets = 0
+    per_step = FFI_CALLS["get_state"] + FFI_CALLS["step"] + FFI_CALLS["is_game_over"]
+    clock = time.perf_counter
+    try:
+        start = clock()
+        for _ in range(steps):
+            for api in apis:
+                began = clock()
+                api.step(DIRECTION_NAMES[policy(api.get_state(), rng)])
+                if api.is_game_over():
+                    api.reset()
+                    resets += 1
+                latencies.append(clock() - began)
+        elapsed = clock() - start
+        ffi_calls = games * steps * per_step + resets * FFI_CALLS["reset"]
+        scores = [api.get_score() for api in apis]
+    finally:
+        for api in apis:
+            api.cleanup()
+    return summarize(games * steps, ffi_calls, elapsed, latencies, resets, scores)
+
+
+def simulate_batch(
+    games: int,
+    steps: int,
+    policy: Callable = greedy_batch_policy,
+    seed: int = 0,
+    width: int = GRID_WIDTH,
+    height: int = GRID_HEIGHT,
+    lib_path: Optional[str] = None,
+) -> dict:
+    """Play all games together through `GameBatch`, one C call per step.
+
+    Args:
+        games: Number of games
+        steps: Steps per game
+        policy: Callable ``(heads, food, rng) -> direction values``
+        seed: Seed for the games and the policy
+        width: Number of columns on each board
+        height: Number of rows on each board
+        lib_path: Path to the shared library. If None, uses default path.
+
+    Returns:
+        dict: Measurements, see `summarize`. Latencies are per batch step.
+    """
+    rng = random.Random(seed)
+    batch = GameBatch(games, lib_path, seed=seed, width=width, height=height)
+    latencies = array("d")
+    resets = reset_calls = 0
+    clock = time.perf_counter
+    try:
+        start = clock()
+        for _ in range(steps):
+            began = clock()
+            finished = games - batch.step(policy(batch.heads, batch.food, rng))
+            if finished:
+                batch.reset_finished()
+                resets += finished
+                reset_calls += 1
+            latencies.append(clock() - began)
+        elapsed = clock() - start
+        scores = list(batch.scores)
+    finally:
+        batch.cleanup()
+    # One step_batch per step, plus a reset_batch when any game finished
+    ffi_calls = steps + reset_calls
+    return summarize(games * steps, ffi_calls, elapsed, latencies, resets, scores)
+
+
+def summarize(moves, ffi_calls, elapsed, latencies, resets, scores) -> dict:
+    """Turn raw counters into the reported measurements."""
+    return {
+        "moves": moves,
+        "seconds": elapsed,
+        "moves_per_sec": moves / elapsed if elapsed else 0.0,
+        "ffi_calls": ffi_calls,
+        "ffi_calls_per_sec": ffi_calls / elapsed if elapsed else 0.0,
+        "step_p50_us": percentile(latencies, 0.5) * 1e6,
+        "step_p99_us": percentile(latencies, 0.99) * 1e6,
+        "games_finished": resets,
+        "mean_score": sum(scores) / len(scores) if scores else 0.0,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def main(argv=None) -> int:
+    """Run the simulator with command-line options and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--steps", type=int, default=1000, help="Steps per game")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="greedy")
+    parser.add_argument(
+        "--batch", action="store_true", help="Step all games with GameBatch"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--width", type=int, default=GRID_WIDTH)
+    parser.add_argument("--height", type=int, default=GRID_HEIGHT)
+    parser.add_argument("--lib", default=None, help="Path to libsnake.so")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    parser.add_argument(
+        "--output", help="Append the results as a JSON line to this file"
+    )
+    args = parser.parse_args(argv)
+
+    config = {
+        "games": args.games,
+        "steps": args.steps,
+        "policy": args.policy,
+        "path": "batch" if args.batch else "api",
+        "seed": args.seed,
+        "width": args.width,
+        "height": args.height,
+    }
+    if args.batch:
+        run, policy = simulate_batch, BATCH_POLICIES[args.policy]
+    else:
+        run, policy = simulate_games, POLICIES[args.policy]
+    results = run(
+        args.games, args.steps, policy, args.seed, args.width, args.height, args.lib
+    )
+    report = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config": config,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report) + "\n")
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(
+            f"{config['path']} {args.policy}: {args.games} games x {args.steps} steps "
+            f"on {args.width}x{args.height}"
+        )
+        print(f"  moves/s      {results['moves_per_sec']:>14,.0f}")
+        print(f"  FFI calls/s  {results['ffi_calls_per_sec']:>14,.0f}")
+        print(f"  step p50     {results['step_p50_us']:>11.2f} us")
+        print(f"  step p99     {results['step_p99_us']:>11.2f} us")
+        print(f"  finished     {results['games_finished']:>14,}")
+        print(f"  mean score   {results['mean_score']:>14.1f}")
+        print(f"  peak RSS     {results['peak_rss_bytes'] / 2**20:>11.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
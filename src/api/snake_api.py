@@ -16,13 +16,299 @@ Example:
     ```
 """
 
+import importlib.util
+import logging
 import os
-from ctypes import CDLL, c_int, c_void_p
-from ctypes import POINTER, Structure, c_bool, c_float, byref
-from typing import Optional, List, Tuple
+import struct
+import sysconfig
+import threading
+from ctypes import CDLL, CFUNCTYPE, c_byte, c_char_p, c_int, c_uint64, c_void_p
+from ctypes import POINTER, Structure, c_bool, c_float, c_ubyte, byref, string_at
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    NamedTuple,
+    Optional,
+    List,
+    Sequence,
+    Tuple,
+)
 
 GRID_WIDTH = 20
 GRID_HEIGHT = 20
+MAX_GRID_CELLS = 1 << 24
+
+# Header layout written by get_game_snapshot (see snake.h)
+SNAPSHOT_LENGTH = 0
+SNAPSHOT_FOOD_X = 1
+SNAPSHOT_FOOD_Y = 2
+SNAPSHOT_SCORE = 3
+SNAPSHOT_DIRECTION = 4
+SNAPSHOT_GAME_OVER = 5
+SNAPSHOT_WON = 6
+SNAPSHOT_WIDTH = 7
+SNAPSHOT_HEIGHT = 8
+SNAPSHOT_HEADER_SIZE = 9
+
+# Segments the snapshot buffer holds before it first has to grow
+INITIAL_SNAPSHOT_SEGMENTS = 1024
+
+# Tick passed to get_game_delta to always get a keyframe (the whole snake)
+KEYFRAME = (1 << 64) - 1
+
+# Packed binary state written by encode_game_state (see snake.h)
+STATE_FORMAT_VERSION = 1
+STATE_HEADER = struct.Struct("<BBBBIIIIIQ")
+STATE_FLAG_GAME_OVER = 1
+STATE_FLAG_WON = 2
+STATE_FLAG_KEYFRAME = 4
+_COORD_FORMATS = {1: "B", 2: "H", 4: "I"}
+
+# Saved game written by serialize_game (see snake.h). Only the board size is
+# read in Python: two u32 fields starting at SAVE_WIDTH.
+SAVE_WIDTH = 8
+SAVE_DIMENSIONS = struct.Struct("<II")
+
+DIRECTION_NAMES = ("up", "right", "down", "left")
+DIRECTION_VALUES = {name: value for value, name in enumerate(DIRECTION_NAMES)}
+
+# Log levels understood by the C core (see snake.h)
+SNAKE_LOG_NONE = 0
+SNAKE_LOG_ERROR = 1
+SNAKE_LOG_DEBUG = 2
+
+core_logger = logging.getLogger("snake.core")
+
+LogCallback = CFUNCTYPE(None, c_int, c_char_p)
+
+
+def _forward_core_log(level: int, message: bytes) -> None:
+    """Forward a message logged by the C core to Python logging."""
+    py_level = logging.DEBUG if level >= SNAKE_LOG_DEBUG else logging.ERROR
+    core_logger.log(py_level, message.decode("utf-8", "replace"))
+
+
+# Kept at module level so the callback outlives every SnakeAPI instance
+_LOG_CALLBACK = LogCallback(_forward_core_log)
+
+
+def default_lib_path() -> str:
+    """Return the path of the shared library built by `make build-lib`."""
+    # Get the directory of the current file
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    # Go up one level to the src directory
+    src_dir = os.path.dirname(current_dir)
+    # Go up one more level to the project root
+    project_root = os.path.dirname(src_dir)
+    # Construct the path to the shared library
+    return os.path.join(project_root, "build", "libsnake.so")
+
+
+class Checkpoint(NamedTuple):
+    """Game state summary recorded in an input log (see `src.api.input_log`)."""
+
+    tick: int
+    score: int
+    game_over: bool
+    won: bool
+    state_hash: int
+
+
+class SnapshotReader:
+    """Reusable buffer for reading game state with one `get_game_delta` call.
+
+    The buffer starts out large enough for a full default board and is grown
+    whenever the snake outgrows it, so reading state normally does not
+    allocate ctypes objects.
+    """
+
+    def __init__(self, lib: CDLL, max_segments: int):
+        """Initialize the reader.
+
+        Args:
+            lib: The loaded C library instance
+            max_segments: Largest possible snake length (the board size)
+        """
+        self.lib = lib
+        self._max_segments = max_segments
+        self._tick = c_uint64()
+        self._allocate(min(max_segments, INITIAL_SNAPSHOT_SEGMENTS))
+        self._encoded = None
+
+    def _allocate(self, segments: int) -> None:
+        self._capacity = segments
+        self._buffer = (c_int * (SNAPSHOT_HEADER_SIZE + 2 * segments))()
+
+    def _read(self, game: int, since: int) -> Tuple[List[int], List[Tuple[int, int]]]:
+        needed = self.lib.get_game_delta(
+            game, since, self._buffer, self._capacity, byref(self._tick)
+        )
+        if needed > self._capacity:
+            self._allocate(min(self._max_segments, max(needed, 2 * self._capacity)))
+            needed = self.lib.get_game_delta(
+                game, since, self._buffer, self._capacity, byref(self._tick)
+            )
+        buf = self._buffer
+        coords = iter(buf[SNAPSHOT_HEADER_SIZE : SNAPSHOT_HEADER_SIZE + 2 * needed])
+        return buf[:SNAPSHOT_HEADER_SIZE], list(zip(coords, coords))
+
+    def read(self, game: int) -> Tuple[List[int], List[Tuple[int, int]]]:
+        """Snapshot a game and split the result into header and positions.
+
+        Args:
+            game: Pointer to the game in C
+
+        Returns:
+            tuple: Header values and list of (x,y) snake segment positions
+        """
+        return self._read(game, KEYFRAME)
+
+    def state(self, game: int) -> dict:
+        """Snapshot a game into the dictionary returned by `SnakeAPI.get_state`.
+
+        Args:
+            game: Pointer to the game in C
+
+        Returns:
+            dict: Dictionary containing game state
+        """
+        header, positions = self._read(game, KEYFRAME)
+        state = self._fields(header)
+        state["snake"] = positions
+        return state
+
+    def delta(self, game: int, since: int) -> dict:
+        """Read the changes since a tick, as returned by `SnakeAPI.get_delta`.
+
+        Args:
+            game: Pointer to the game in C
+            since: Last tick the client has seen
+
+        Returns:
+            dict: Dictionary containing the delta
+        """
+        header, positions = self._read(game, since)
+        delta = self._fields(header)
+        delta["keyframe"] = len(positions) == header[SNAPSHOT_LENGTH]
+        delta["snake" if delta["keyframe"] else "head"] = positions
+        return delta
+
+    def encode(self, game: int, since: int) -> bytes:
+        """Encode the state, or the delta since a tick, in the packed format.
+
+        Args:
+            game: Pointer to the game in C
+            since: Last tick the client has seen, or `KEYFRAME`
+
+        Returns:
+            bytes: The encoded state, see `decode_state`
+        """
+        if self._encoded is None:
+            segments = min(self._max_segments, INITIAL_SNAPSHOT_SEGMENTS)
+            self._encoded = (c_ubyte * (STATE_HEADER.size + 2 * segments))()
+        while True:
+            capacity = len(self._encoded)
+            size = self.lib.encode_game_state(game, since, self._encoded, capacity)
+            if size <= capacity:
+                return string_at(self._encoded, size)
+            self._encoded = (c_ubyte * max(size, 2 * capacity))()
+
+    def _fields(self, header: List[int]) -> dict:
+        return {
+            "tick": self._tick.value,
+            "length": header[SNAPSHOT_LENGTH],
+            "food": (header[SNAPSHOT_FOOD_X], header[SNAPSHOT_FOOD_Y]),
+            "score": header[SNAPSHOT_SCORE],
+            "direction": DIRECTION_NAMES[header[SNAPSHOT_DIRECTION]],
+            "game_over": bool(header[SNAPSHOT_GAME_OVER]),
+            "won": bool(header[SNAPSHOT_WON]),
+            "width": header[SNAPSHOT_WIDTH],
+            "height": header[SNAPSHOT_HEIGHT],
+        }
+
+
+def apply_delta(snake: List[Tuple[int, int]], delta: dict) -> List[Tuple[int, int]]:
+    """Bring a client-side copy of the snake up to date.
+
+    Args:
+        snake: Segments as of the tick the delta was requested for
+        delta: Result of `SnakeAPI.get_delta`
+
+    Returns:
+        List[Tuple[int, int]]: Segments as of ``delta["tick"]``
+    """
+    if delta["keyframe"]:
+        return list(delta["snake"])
+    # New heads go in front; whatever grew past the length fell off the tail
+    return (list(delta["head"]) + list(snake))[: delta["length"]]
+
+
+def decode_state(data: bytes) -> dict:
+    """Decode state packed by `SnakeAPI.get_state_bytes`.
+
+    Args:
+        data: The encoded state
+
+    Returns:
+        dict: The same fields as `SnakeAPI.get_delta`
+
+    Raises:
+        ValueError: If the data is not in a supported format
+    """
+    if len(data) < STATE_HEADER.size:
+        raise ValueError("Truncated state")
+    (
+        version,
+        flags,
+        direction,
+        coord_bytes,
+        width,
+        height,
+        score,
+        length,
+        count,
+        tick,
+    ) = STATE_HEADER.unpack_from(data)
+    if version != STATE_FORMAT_VERSION or coord_bytes not in _COORD_FORMATS:
+        raise ValueError(f"Unsupported state format: {version}")
+    coords = struct.unpack_from(
+        f"<{2 * (count + 1)}{_COORD_FORMATS[coord_bytes]}", data, STATE_HEADER.size
+    )
+    won = bool(flags & STATE_FLAG_WON)
+    keyframe = bool(flags & STATE_FLAG_KEYFRAME)
+    segments = iter(coords[2:])
+    return {
+        "tick": tick,
+        "keyframe": keyframe,
+        "length": length,
+        "food": (-1, -1) if won else (coords[0], coords[1]),
+        "score": score,
+        "direction": DIRECTION_NAMES[direction],
+        "game_over": bool(flags & STATE_FLAG_GAME_OVER),
+        "won": won,
+        "width": width,
+        "height": height,
+        "snake" if keyframe else "head": list(zip(segments, segments)),
+    }
+
+
+def _direction_value(direction: str) -> int:
+    """Map a direction name to the C `Direction` value."""
+    try:
+        return DIRECTION_VALUES[direction]
+    except (KeyError, TypeError):
+        raise ValueError("Invalid direction") from None
+
+
+def check_grid_size(width: int, height: int) -> None:
+    """Validate board dimensions for the sized C constructors.
+
+    Raises:
+        ValueError: If the board is empty or larger than the C core allows
+    """
+    if width < 1 or height < 1 or width * height > MAX_GRID_CELLS:
+        raise ValueError(f"Invalid grid size: {width}x{height}")
 
 
 # pylint: disable=too-few-public-methods
@@ -64,6 +350,365 @@ class Position(Structure):
     _fields_ = [("x", c_int), ("y", c_int)]
 
 
+def _setup_game_signatures(lib: CDLL) -> None:
+    """Set up the signatures of the functions that create and play a game."""
+    # Core game functions
+    lib.create_game.restype = c_void_p
+    lib.create_game.argtypes = []
+
+    lib.create_game_seeded.restype = c_void_p
+    lib.create_game_seeded.argtypes = [c_uint64]
+
+    lib.create_game_sized.restype = c_void_p
+    lib.create_game_sized.argtypes = [c_int, c_int]
+
+    lib.create_game_sized_seeded.restype = c_void_p
+    lib.create_game_sized_seeded.argtypes = [c_int, c_int, c_uint64]
+
+    lib.destroy_game.argtypes = [c_void_p]
+    lib.destroy_game.restype = None
+
+    lib.reset_game.argtypes = [c_void_p]
+    lib.reset_game.restype = None
+
+    lib.reset_game_seeded.argtypes = [c_void_p, c_uint64]
+    lib.reset_game_seeded.restype = None
+
+    lib.get_game_seed.argtypes = [c_void_p]
+    lib.get_game_seed.restype = c_uint64
+
+    lib.advance_game.argtypes = [c_void_p, c_int]
+    lib.advance_game.restype = c_int
+
+    lib.get_game_hash.argtypes = [c_void_p]
+    lib.get_game_hash.restype = c_uint64
+
+    lib.move_snake.argtypes = [c_void_p]
+    lib.move_snake.restype = c_bool
+
+    lib.change_direction.argtypes = [c_void_p, c_int]
+    lib.change_direction.restype = None
+
+    lib.is_game_over.argtypes = [c_void_p]
+    lib.is_game_over.restype = c_bool
+
+    lib.is_game_won.argtypes = [c_void_p]
+    lib.is_game_won.restype = c_bool
+
+    lib.get_score.argtypes = [c_void_p]
+    lib.get_score.restype = c_int
+
+    # Snake state functions
+    lib.get_snake_length.argtypes = [c_void_p]
+    lib.get_snake_length.restype = c_int
+
+    lib.get_snake_positions.argtypes = [c_void_p, POINTER(Position)]
+    lib.get_snake_positions.restype = None
+
+    lib.get_snake_direction.argtypes = [c_void_p]
+    lib.get_snake_direction.restype = c_int
+
+    # Food functions
+    lib.get_food_position.argtypes = [c_void_p, POINTER(Position)]
+    lib.get_food_position.restype = None
+
+    lib.set_food_position.argtypes = [c_void_p, c_int, c_int]
+    lib.set_food_position.restype = None
+
+    # Game settings functions
+    lib.set_game_speed.argtypes = [c_void_p, c_float]
+    lib.set_game_speed.restype = None
+
+    lib.get_game_speed.argtypes = [c_void_p]
+    lib.get_game_speed.restype = c_float
+
+
+def _setup_state_signatures(lib: CDLL) -> None:
+    """Set up the signatures of the functions that read, encode and save state."""
+    lib.get_game_state.argtypes = [
+        c_void_p,
+        POINTER(c_int),
+        POINTER(c_int),
+        POINTER(c_int),
+        POINTER(c_int),
+        POINTER(c_int),
+        POINTER(c_bool),
+    ]
+    lib.get_game_state.restype = None
+
+    lib.get_game_snapshot.argtypes = [c_void_p, POINTER(c_int), c_int]
+    lib.get_game_snapshot.restype = c_int
+
+    lib.get_game_tick.argtypes = [c_void_p]
+    lib.get_game_tick.restype = c_uint64
+
+    lib.get_game_delta.argtypes = [
+        c_void_p,
+        c_uint64,
+        POINTER(c_int),
+        c_int,
+        POINTER(c_uint64),
+    ]
+    lib.get_game_delta.restype = c_int
+
+    lib.encode_game_state.argtypes = [
+        c_void_p,
+        c_uint64,
+        POINTER(c_ubyte),
+        c_int,
+    ]
+    lib.encode_game_state.restype = c_int
+
+    lib.serialize_game.argtypes = [c_void_p, POINTER(c_ubyte), c_int]
+    lib.serialize_game.restype = c_int
+
+    lib.restore_game.argtypes = [c_void_p, c_char_p, c_int]
+    lib.restore_game.restype = c_bool
+
+
+def _setup_library_signatures(lib: CDLL) -> None:
+    """Set up the signatures of the logging, pool and engine-wide functions."""
+    lib.set_log_level.argtypes = [c_int]
+    lib.set_log_level.restype = None
+
+    lib.get_log_level.argtypes = []
+    lib.get_log_level.restype = c_int
+
+    lib.set_log_callback.argtypes = [LogCallback]
+    lib.set_log_callback.restype = None
+
+    lib.set_game_pool_limits.argtypes = [c_int, c_uint64]
+    lib.set_game_pool_limits.restype = None
+
+    lib.get_game_pool_stats.argtypes = [POINTER(c_uint64)]
+    lib.get_game_pool_stats.restype = None
+
+    lib.get_engine_stats.argtypes = [POINTER(c_uint64), POINTER(c_uint64)]
+    lib.get_engine_stats.restype = None
+
+
+def _setup_planner_signatures(lib: CDLL) -> None:
+    """Set up the signatures of the move planner, see `SnakeAPI.suggest_direction`."""
+    lib.create_planner.argtypes = []
+    lib.create_planner.restype = c_void_p
+
+    lib.destroy_planner.argtypes = [c_void_p]
+    lib.destroy_planner.restype = None
+
+    lib.plan_direction.argtypes = [c_void_p, c_void_p]
+    lib.plan_direction.restype = c_int
+
+    lib.plan_batch.argtypes = [c_void_p, c_void_p, POINTER(c_byte)]
+    lib.plan_batch.restype = c_int
+
+    lib.get_planner_stats.argtypes = [c_void_p, POINTER(c_uint64)]
+    lib.get_planner_stats.restype = None
+
+
+def _setup_function_signatures(lib: CDLL) -> None:
+    """Set up the signatures of the functions this module calls.
+
+    Modules built on other C functions set theirs up by passing their own
+    setup function to `load_library`.
+    """
+    _setup_game_signatures(lib)
+    _setup_state_signatures(lib)
+    _setup_library_signatures(lib)
+    _setup_planner_signatures(lib)
+
+
+# Counters written by get_game_pool_stats (see snake.h)
+POOL_STAT_NAMES = ("allocated", "reused", "freed", "pooled", "pooled_bytes")
+
+# Counters written by get_planner_stats (see snake.h)
+PLANNER_STAT_NAMES = ("searches", "reused", "fills", "cells")
+
+_libraries: Dict[str, CDLL] = {}
+_library_setups: Dict[str, FrozenSet[Callable[[CDLL], None]]] = {}
+_libraries_lock = threading.Lock()
+
+
+def load_library(
+    lib_path: Optional[str] = None, setups: Sequence[Callable[[CDLL], None]] = ()
+) -> CDLL:
+    """Return the process-wide handle of the C library.
+
+    The library is loaded and its function signatures are set up once per
+    path; every later call returns the same handle, so creating a game does
+    not touch the dynamic loader. Only the functions this module calls are
+    set up here; a module calling others passes the function that sets
+    their signatures up, which runs once per library.
+
+    Args:
+        lib_path: Path to the shared library. If None, uses default path.
+        setups: Functions taking the library that set up the signatures of
+            further functions
+
+    Returns:
+        CDLL: The configured ctypes library
+
+    Raises:
+        RuntimeError: If the library cannot be loaded
+    """
+    if lib_path is None:
+        lib_path = default_lib_path()
+    key = os.path.abspath(lib_path)
+    lib = _libraries.get(key)
+    if lib is not None and _library_setups[key].issuperset(setups):
+        return lib
+    with _libraries_lock:
+        lib = _libraries.get(key)
+        if lib is None:
+            try:
+                lib = CDLL(lib_path)
+            except OSError as e:
+                raise RuntimeError(f"Failed to load library: {lib_path}") from e
+            _setup_function_signatures(lib)
+            lib.set_log_callback(_LOG_CALLBACK)
+            _library_setups[key] = frozenset()
+            _libraries[key] = lib
+        done = _library_setups[key]
+        for setup in setups:
+            if setup not in done:
+                setup(lib)
+                done = done | {setup}
+        # Replaced rather than updated so the check above needs no lock
+        _library_setups[key] = done
+        return lib
+
+
+# Module built by `make build-ext` next to libsnake.so, see src/core/snake_ext.c
+NATIVE_MODULE = "_snake"
+
+# SnakeAPI methods the native extension implements. The two that change
+# direction are left to Python while the game's inputs are logged.
+_NATIVE_METHODS = (
+    "move",
+    "advance",
+    "change_direction",
+    "step",
+    "is_game_over",
+    "is_game_won",
+    "get_score",
+    "get_snake_length",
+    "get_tick",
+    "get_food_position",
+    "get_snake_positions",
+    "get_state",
+)
+_LOGGED_METHODS = ("change_direction", "step")
+
+_native_modules: Dict[str, object] = {}
+
+
+def load_native(lib_path: Optional[str] = None):
+    """Return the native extension built for the C library, if there is one.
+
+    The extension is looked up next to the library, since it links against
+    the ``libsnake.so`` in its own directory. Set ``SNAKE_NATIVE=0`` to
+    ignore it.
+
+    Args:
+        lib_path: Path to the shared library. If None, uses default path.
+
+    Returns:
+        The extension module, or None if it is not built, cannot be loaded
+        or the library is not named ``libsnake.so``
+    """
+    if os.environ.get("SNAKE_NATIVE", "1") == "0":
+        return None
+    if lib_path is None:
+        lib_path = default_lib_path()
+    lib_path = os.path.abspath(lib_path)
+    if os.path.basename(lib_path) != "libsnake.so":
+        return None
+    directory = os.path.dirname(lib_path)
+    if directory in _native_modules:
+        return _native_modules[directory]
+    # Load the library first so it is set up before the extension uses it
+    load_library(lib_path)
+    with _libraries_lock:
+        if directory not in _native_modules:
+            path = os.path.join(
+                directory, NATIVE_MODULE + sysconfig.get_config_var("EXT_SUFFIX")
+            )
+            module = None
+            if os.path.exists(path):
+                spec = importlib.util.spec_from_file_location(NATIVE_MODULE, path)
+                module = importlib.util.module_from_spec(spec)
+                try:
+                    spec.loader.exec_module(module)
+                except ImportError as e:
+                    logging.getLogger(__name__).warning(
+                        "Ignoring native extension %s: %s", path, e
+                    )
+                    module = None
+            _native_modules[directory] = module
+        return _native_modules[directory]
+
+
+def game_pool_stats(lib_path: Optional[str] = None) -> Dict[str, int]:
+    """Return the C library's game pool counters.
+
+    Args:
+        lib_path: Path to the shared library. If None, uses default path.
+
+    Returns:
+        Dict[str, int]: Games allocated from the system, reused from the pool
+        and freed since the process started, and the games and bytes the pool
+        holds now (keys as in `POOL_STAT_NAMES`)
+    """
+    stats = (c_uint64 * len(POOL_STAT_NAMES))()
+    load_library(lib_path).get_game_pool_stats(stats)
+    return dict(zip(POOL_STAT_NAMES, stats))
+
+
+def planner_stats(lib, planner: Optional[int]) -> Dict[str, int]:
+    """Return the counters of a planner created by ``lib.create_planner``.
+
+    Args:
+        lib: The loaded C library instance
+        planner: Pointer to the planner, or None for one not created yet
+
+    Returns:
+        Dict[str, int]: Distance fields computed, suggestions made from a
+        cached field, flood fills made when the food was out of reach and
+        cells visited (keys as in `PLANNER_STAT_NAMES`)
+    """
+    stats = (c_uint64 * len(PLANNER_STAT_NAMES))()
+    if planner:
+        lib.get_planner_stats(planner, stats)
+    return dict(zip(PLANNER_STAT_NAMES, stats))
+
+
+def set_game_pool_limits(
+    max_games: int, max_bytes: int, lib_path: Optional[str] = None
+) -> None:
+    """Bound the memory the C library keeps for reuse by destroyed games.
+
+    Args:
+        max_games: Most games kept, 0 to free every destroyed game
+        max_bytes: Most bytes kept
+        lib_path: Path to the shared library. If None, uses default path.
+    """
+    load_library(lib_path).set_game_pool_limits(max_games, max_bytes)
+
+
+def get_engine_stats(lib_path: Optional[str] = None) -> Dict[str, int]:
+    """Get the C library's totals over every game in the current process.
+
+    Args:
+        lib_path: Path to the shared library. If None, uses default path.
+
+    Returns:
+        Dict[str, int]: Moves made (``moves``) and games that ended, lost or
+        won (``games_over``)
+    """
+    moves, games_over = c_uint64(), c_uint64()
+    load_library(lib_path).get_engine_stats(byref(moves), byref(games_over))
+    return {"moves": moves.value, "games_over": games_over.value}
+
+
 class SnakeAPI:
     """Python wrapper for the Snake game C library.
 
@@ -72,9 +717,24 @@ class SnakeAPI:
      provides methods for game control, state management, and error
      handling.
 
+    Instances can be shared between threads. Calls on one game are
+     serialized by a per-instance lock, while different games run in
+     parallel: ctypes releases the GIL for the duration of each C call.
+
+    When the native extension is built (``make build-ext``), the most
+     frequent calls (moving, turning, reading the state and positions) go
+     through it instead of ctypes; the results are the same. It is used by
+     default unless the game is given its own `library` handle, since its
+     calls bypass that handle.
+
     Attributes:
         lib: The loaded C library instance
         game_instance: Pointer to the current game instance in C
+        native: Whether the game uses the native extension
+        width: Number of columns on the board
+        height: Number of rows on the board
+        input_log: Optional `InputLog` recording every direction change and
+            reset, see `src.api.input_log.record_inputs`
 
     Example:
         ```python
@@ -85,90 +745,90 @@ class SnakeAPI:
         ```
     """
 
-    def __init__(self, lib_path: Optional[str] = None):
+    def __init__(
+        self,
+        lib_path: Optional[str] = None,
+        seed: Optional[int] = None,
+        width: int = GRID_WIDTH,
+        height: int = GRID_HEIGHT,
+        native: Optional[bool] = None,
+        library=None,
+    ):  # pylint: disable=too-many-arguments
         """Initialize the Snake API.
 
         Args:
             lib_path: Path to the shared library. If None, uses default path.
+            seed: Seed for food placement. Games created with the same seed
+                and given the same inputs play out identically. If None, a
+                unique seed is chosen by the C library.
+            width: Number of columns on the board
+            height: Number of rows on the board
+            native: Whether to use the native extension. If None, it is used
+                when available and `library` is None.
+            library: Handle to call the C library through instead of the
+                shared one from `load_library`, such as a
+                `src.api.metrics.TimedLibrary` timing every call
+
+        Raises:
+            ValueError: If the board size is invalid
+            RuntimeError: If `native` is True and the extension is not built
         """
-        if lib_path is None:
-            # Get the directory of the current file
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            # Go up one level to the src directory
-            src_dir = os.path.dirname(current_dir)
-            # Go up one more level to the project root
-            project_root = os.path.dirname(src_dir)
-            # Construct the path to the shared library
-            lib_path = os.path.join(project_root, "build", "libsnake.so")
-
-        try:
-            self.lib = CDLL(lib_path)
-        except OSError as e:
-            raise RuntimeError(f"Failed to load library: {lib_path}") from e
-        self._setup_function_signatures()
-        self.game_instance = self.lib.create_game()
-        if not self.game_instance:
-            raise RuntimeError("Failed to create game instance")
-
-    def _setup_function_signatures(self):
-        """Set up the function signatures for the C library."""
-        # Core game functions
-        self.lib.create_game.restype = c_void_p
-        self.lib.create_game.argtypes = []
-
-        self.lib.destroy_game.argtypes = [c_void_p]
-        self.lib.destroy_game.restype = None
-
-        self.lib.reset_game.argtypes = [c_void_p]
-        self.lib.reset_game.restype = None
-
-        self.lib.move_snake.argtypes = [c_void_p]
-        self.lib.move_snake.restype = c_bool
-
-        self.lib.change_direction.argtypes = [c_void_p, c_int]
-        self.lib.change_direction.restype = None
-
-        self.lib.is_game_over.argtypes = [c_void_p]
-        self.lib.is_game_over.restype = c_bool
-
-        self.lib.get_score.argtypes = [c_void_p]
-        self.lib.get_score.restype = c_int
-
-        # Snake state functions
-        self.lib.get_snake_length.argtypes = [c_void_p]
-        self.lib.get_snake_length.restype = c_int
-
-        self.lib.get_snake_positions.argtypes = [c_void_p, POINTER(Position)]
-        self.lib.get_snake_positions.restype = None
-
-        self.lib.get_snake_direction.argtypes = [c_void_p]
-        self.lib.get_snake_direction.restype = c_int
-
-        # Food functions
-        self.lib.get_food_position.argtypes = [c_void_p, POINTER(Position)]
-        self.lib.get_food_position.restype = None
-
-        self.lib.set_food_position.argtypes = [c_void_p, c_int, c_int]
-        self.lib.set_food_position.restype = None
-
-        # Game state functions
-        self.lib.get_game_state.argtypes = [
-            c_void_p,
-            POINTER(c_int),
-            POINTER(c_int),
-            POINTER(c_int),
-            POINTER(c_int),
-            POINTER(c_int),
-            POINTER(c_bool),
-        ]
-        self.lib.get_game_state.restype = None
-
-        # Game settings functions
-        self.lib.set_game_speed.argtypes = [c_void_p, c_float]
-        self.lib.set_game_speed.restype = None
-
-        self.lib.get_game_speed.argtypes = [c_void_p]
-        self.lib.get_game_speed.restype = c_float
+        check_grid_size(width, height)
+        self.lib = load_library(lib_path) if library is None else library
+        module = None
+        if native or (native is None and library is None):
+            module = load_native(lib_path)
+        if native and module is None:
+            raise RuntimeError("Native extension not available, run `make build-ext`")
+
+        self._native = None
+        self._input_log = None
+        if module is not None:
+            self._native = module.Game(width, height, seed)
+            self.game_instance = self._native.address
+            # ctypes calls on this game share the extension's lock
+            self._lock = self._native
+            self._bind_native()
+        else:
+            if seed is None:
+                self.game_instance = self.lib.create_game_sized(width, height)
+            else:
+                self.game_instance = self.lib.create_game_sized_seeded(
+                    width, height, seed
+                )
+            if not self.game_instance:
+                raise RuntimeError("Failed to create game instance")
+            self._lock = threading.Lock()
+        self.width = width
+        self.height = height
+        self._snapshot = SnapshotReader(self.lib, width * height)
+        self._save_buffer = None
+        self._planner = None
+
+    @property
+    def native(self) -> bool:
+        """Whether the game uses the native extension."""
+        return self._native is not None
+
+    @property
+    def input_log(self):
+        """Optional `InputLog` recording direction changes and resets."""
+        return self._input_log
+
+    @input_log.setter
+    def input_log(self, log) -> None:
+        self._input_log = log
+        if self._native is not None:
+            self._bind_native()
+
+    def _bind_native(self) -> None:
+        """Route the methods the extension implements to it."""
+        for name in _NATIVE_METHODS:
+            setattr(self, name, getattr(self._native, name))
+        if self._input_log is not None:
+            # Turns must go through the Python methods to be logged
+            for name in _LOGGED_METHODS:
+                del self.__dict__[name]
 
     def move(self) -> bool:
         """Move the snake in its current direction.
@@ -176,9 +836,27 @@ class SnakeAPI:
         Returns:
             bool: True if the move was successful, False if game over
         """
-        if not self.game_instance:
-            raise RuntimeError("Game instance not initialized")
-        return self.lib.move_snake(self.game_instance)
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            return self.lib.move_snake(self.game_instance)
+
+    def advance(self, moves: int) -> int:
+        """Move the snake up to `moves` times in its current direction.
+
+        All moves happen in one call into the C library. Stops early when
+        the game ends.
+
+        Args:
+            moves: Maximum number of moves
+
+        Returns:
+            int: Number of moves made
+        """
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            return self.lib.advance_game(self.game_instance, moves)
 
     def change_direction(self, direction: str) -> None:
         """Change the snake's direction.
@@ -189,12 +867,34 @@ class SnakeAPI:
         Raises:
             ValueError: If invalid direction
         """
-        if not self.game_instance:
-            raise RuntimeError("Game instance not initialized")
-        dir_map = {"up": 0, "right": 1, "down": 2, "left": 3}
-        if direction not in dir_map:
-            raise ValueError("Invalid direction")
-        self.lib.change_direction(self.game_instance, dir_map[direction])
+        value = _direction_value(direction)
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            self._log_turn_locked(value)
+            self.lib.change_direction(self.game_instance, value)
+
+    def step(self, direction: Optional[str] = None) -> bool:
+        """Apply an optional direction change and move the snake once.
+
+        Args:
+            direction: Optional new direction ('up', 'down', 'left', 'right')
+
+        Returns:
+            bool: Result of the move, see `move`
+
+        Raises:
+            ValueError: If invalid direction
+        """
+        value = None if direction is None else _direction_value(direction)
+        # Turn and move under one lock so no other call lands in between
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            if value is not None:
+                self._log_turn_locked(value)
+                self.lib.change_direction(self.game_instance, value)
+            return self.lib.move_snake(self.game_instance)
 
     def is_game_over(self) -> bool:
         """Check if the game is over.
@@ -202,9 +902,23 @@ class SnakeAPI:
         Returns:
             bool: True if game is over, False otherwise
         """
-        if not self.game_instance:
-            raise RuntimeError("Game instance not initialized")
-        return self.lib.is_game_over(self.game_instance)
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            return self.lib.is_game_over(self.game_instance)
+
+    def is_game_won(self) -> bool:
+        """Check if the snake has filled the whole board.
+
+        A won game is also over.
+
+        Returns:
+            bool: True if the game was won, False otherwise
+        """
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            return self.lib.is_game_won(self.game_instance)
 
     def get_score(self) -> int:
         """Get the current game score.
@@ -212,9 +926,10 @@ class SnakeAPI:
         Returns:
             int: Current score
         """
-        if not self.game_instance:
-            raise RuntimeError("Game instance not initialized")
-        return self.lib.get_score(self.game_instance)
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            return self.lib.get_score(self.game_instance)
 
     def get_snake_length(self) -> int:
         """Get the current length of the snake.
@@ -222,9 +937,10 @@ class SnakeAPI:
         Returns:
             int: Current snake length
         """
-        if not self.game_instance:
-            raise RuntimeError("Game instance not initialized")
-        return self.lib.get_snake_length(self.game_instance)
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            return self.lib.get_snake_length(self.game_instance)
 
     def get_snake_positions(self) -> List[Tuple[int, int]]:
         """Get the current positions of the snake's body segments.
@@ -232,12 +948,10 @@ class SnakeAPI:
         Returns:
             List[Tuple[int, int]]: List of (x,y) coordinates for each segment
         """
-        if not self.game_instance:
-            raise RuntimeError("Game instance not initialized")
-        length = self.get_snake_length()
-        positions = (Position * length)()
-        self.lib.get_snake_positions(self.game_instance, positions)
-        return [(positions[i].x, positions[i].y) for i in range(length)]
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            return self._snapshot.read(self.game_instance)[1]
 
     def get_food_position(self) -> Tuple[int, int]:
         """Get the current position of the food.
@@ -245,11 +959,12 @@ class SnakeAPI:
         Returns:
             tuple[int, int]: (x,y) coordinates of the food
         """
-        if not self.game_instance:
-            raise RuntimeError("Game instance not initialized")
-        pos = Position()
-        self.lib.get_food_position(self.game_instance, byref(pos))
-        return (pos.x, pos.y)
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            pos = Position()
+            self.lib.get_food_position(self.game_instance, byref(pos))
+            return (pos.x, pos.y)
 
     def set_food_position(self, x: int, y: int) -> None:
         """Set the position of the food.
@@ -261,9 +976,10 @@ class SnakeAPI:
         Raises:
             RuntimeError: If game instance is not initialized
         """
-        if not self.game_instance:
-            raise RuntimeError("Game instance not initialized")
-        self.lib.set_food_position(self.game_instance, x, y)
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            self.lib.set_food_position(self.game_instance, x, y)
 
     def get_snake_direction(self) -> str:
         """Get the current direction of the snake.
@@ -271,11 +987,12 @@ class SnakeAPI:
         Returns:
             str: Current direction ('up', 'down', 'left', 'right')
         """
-        if not self.game_instance:
-            raise RuntimeError("Game instance not initialized")
-        dir_val = self.lib.get_snake_direction(self.game_instance)
-        dir_map = {0: "up", 1: "right", 2: "down", 3: "left"}
-        return dir_map.get(dir_val, "unknown")
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            dir_val = self.lib.get_snake_direction(self.game_instance)
+            dir_map = {0: "up", 1: "right", 2: "down", 3: "left"}
+            return dir_map.get(dir_val, "unknown")
 
     def set_game_speed(self, speed: float) -> None:
         """Set the game speed.
@@ -286,9 +1003,10 @@ class SnakeAPI:
         Raises:
             RuntimeError: If game instance is not initialized
         """
-        if not self.game_instance:
-            raise RuntimeError("Game instance not initialized")
-        self.lib.set_game_speed(self.game_instance, c_float(speed))
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            self.lib.set_game_speed(self.game_instance, c_float(speed))
 
     def get_game_speed(self) -> float:
         """Get the current game speed.
@@ -296,56 +1014,263 @@ class SnakeAPI:
         Returns:
             float: Current game speed
         """
-        if not self.game_instance:
-            raise RuntimeError("Game instance not initialized")
-        return self.lib.get_game_speed(self.game_instance)
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            return self.lib.get_game_speed(self.game_instance)
+
+    def set_log_level(self, level: int) -> None:
+        """Set the log level of the C core.
+
+        Messages are forwarded to the ``snake.core`` Python logger. The level
+        is process-wide and shared by every game. Debug messages are only
+        available when the library was built with ``make build-lib-debug``.
+
+        Args:
+            level: Python logging level, e.g. ``logging.DEBUG``. Levels above
+                ``logging.ERROR`` disable core logging.
+        """
+        if level <= logging.DEBUG:
+            self.lib.set_log_level(SNAKE_LOG_DEBUG)
+        elif level <= logging.ERROR:
+            self.lib.set_log_level(SNAKE_LOG_ERROR)
+        else:
+            self.lib.set_log_level(SNAKE_LOG_NONE)
 
     def get_state(self) -> dict:
         """Get the current state of the game.
 
+        The whole state is read with a single call into the C library.
+
         Returns:
             dict: Dictionary containing game state
         """
-        if not self.game_instance:
-            raise RuntimeError("Game instance not initialized")
-        max_snake = 100
-        snake_positions = (c_int * (max_snake * 2))()
-        snake_length = c_int()
-        food_position = (c_int * 2)()
-        score = c_int()
-        direction = c_int()
-        is_game_over = c_bool()
-        self.lib.get_game_state(
-            self.game_instance,
-            snake_positions,
-            byref(snake_length),
-            food_position,
-            byref(score),
-            byref(direction),
-            byref(is_game_over),
-        )
-        positions = [
-            (snake_positions[i * 2], snake_positions[i * 2 + 1])
-            for i in range(snake_length.value)
-        ]
-        dir_map = {0: "up", 1: "right", 2: "down", 3: "left"}
-        return {
-            "snake": positions,
-            "length": snake_length.value,
-            "food": (food_position[0], food_position[1]),
-            "score": score.value,
-            "direction": dir_map.get(direction.value, "unknown"),
-            "game_over": bool(is_game_over.value),
-        }
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            return self._snapshot.state(self.game_instance)
+
+    def get_tick(self) -> int:
+        """Get the game's tick.
 
-    def reset(self) -> None:
-        """Reset the game to its initial state."""
-        if not self.game_instance:
-            raise RuntimeError("Game instance not initialized")
-        self.lib.reset_game(self.game_instance)
+        The tick advances on every move and every reset and never goes
+        backwards, so it identifies a version of the snake's body.
+
+        Returns:
+            int: Current tick
+        """
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            return self.lib.get_game_tick(self.game_instance)
+
+    def get_delta(self, since: int) -> dict:
+        """Get the changes since a tick the client has already seen.
+
+        Between two ticks a move only adds heads and drops tail segments, so
+        a client holding the snake as of `since` only needs the new heads and
+        the current length (see `apply_delta`). When that is not enough,
+        e.g. the game was reset after `since`, a keyframe with the whole
+        snake is returned instead.
+
+        Args:
+            since: Last tick the client has seen (``tick`` of an earlier
+                `get_state` or `get_delta` result)
+
+        Returns:
+            dict: The fields of `get_state` except ``snake``, plus
+            ``keyframe`` and either ``snake`` (keyframe) or ``head`` (new
+            segments, newest first)
+        """
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            if since < 0:
+                raise ValueError("since must not be negative")
+            # Ticks from the future always get a keyframe
+            return self._snapshot.delta(self.game_instance, min(since, KEYFRAME))
+
+    def get_state_bytes(self, since: Optional[int] = None) -> bytes:
+        """Get the state packed into a compact binary layout.
+
+        The bytes are written by the C library, so no Python objects are
+        created per snake segment. Coordinates take one byte each on boards
+        up to 256x256. See snake.h for the layout and `decode_state` for a
+        decoder.
+
+        Args:
+            since: Optional last tick the client has seen. If given, only the
+                changes since then are encoded, as in `get_delta`.
+
+        Returns:
+            bytes: The encoded state
+        """
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            if since is None:
+                since = KEYFRAME
+            elif since < 0:
+                raise ValueError("since must not be negative")
+            return self._snapshot.encode(self.game_instance, min(since, KEYFRAME))
+
+    def snapshot(self) -> bytes:
+        """Save the whole game to bytes.
+
+        The saved game includes the snake, food, score, speed and the food
+        placement generator, so a game restored from it continues exactly
+        like this one. The body is packed at 2 bits per segment.
+
+        Returns:
+            bytes: The saved game, see `restore`
+        """
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            capacity = len(self._save_buffer) if self._save_buffer else 0
+            size = self.lib.serialize_game(
+                self.game_instance, self._save_buffer, capacity
+            )
+            if size > capacity:
+                self._save_buffer = (c_ubyte * size)()
+                self.lib.serialize_game(self.game_instance, self._save_buffer, size)
+            return string_at(self._save_buffer, size)
+
+    def restore(self, data: bytes) -> None:
+        """Replace the game with one saved by `snapshot`.
+
+        The saved game may come from another instance or process and may
+        have a different board size. Its tick is moved past both games'
+        ticks, so delta clients of either start over from a keyframe.
+
+        Args:
+            data: Bytes returned by `snapshot`
+
+        Raises:
+            ValueError: If the data is not a valid saved game, or the game's
+                inputs are being logged (a log cannot replay a restore)
+        """
+        data = bytes(data)
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            if self.input_log is not None:
+                raise ValueError("Cannot restore a game whose inputs are logged")
+            if not self.lib.restore_game(self.game_instance, data, len(data)):
+                raise ValueError("Invalid game snapshot")
+            width, height = SAVE_DIMENSIONS.unpack_from(data, SAVE_WIDTH)
+            if (width, height) != (self.width, self.height):
+                self.width = width
+                self.height = height
+                self._snapshot = SnapshotReader(self.lib, width * height)
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """Reset the game to its initial state.
+
+        Args:
+            seed: Optional new seed for food placement. If None, the game's
+                random generator continues where it left off.
+        """
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            if self.input_log is not None:
+                checkpoint = self._checkpoint_locked()
+                self.input_log.checkpoint(checkpoint)
+                self.input_log.reset(checkpoint.tick, seed)
+            if seed is None:
+                self.lib.reset_game(self.game_instance)
+            else:
+                self.lib.reset_game_seeded(self.game_instance, seed)
+
+    def get_seed(self) -> int:
+        """Get the seed the game was created or last reseeded with.
+
+        Returns:
+            int: Seed of the game's food placement generator
+        """
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            return self.lib.get_game_seed(self.game_instance)
+
+    def get_state_hash(self) -> int:
+        """Get a 64-bit hash of everything that determines how the game plays on.
+
+        Covers the board, snake, food, score, flags, tick and food placement
+        generator, but not the speed. Games in the same state have the same
+        hash.
+
+        Returns:
+            int: Hash of the game state
+        """
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            return self.lib.get_game_hash(self.game_instance)
+
+    def suggest_direction(self) -> Optional[str]:
+        """Suggest a move towards the food that does not lose.
+
+        The move starts a shortest path to the food avoiding the walls and
+        the whole body, computed in C. When the food cannot be reached, the
+        move keeping the most free cells within reach is suggested instead.
+        The game's distance field is kept between calls and reused while the
+        snake follows the suggestions, so asking every tick is cheap; the
+        path it leads along stays free but may no longer be the shortest
+        once the tail has moved.
+
+        Returns:
+            Optional[str]: The direction, or None if every move loses or the
+            game is over
+        """
+        with self._lock:
+            if not self.game_instance:
+                raise RuntimeError("Game instance not initialized")
+            if self._planner is None:
+                self._planner = self.lib.create_planner()
+                if not self._planner:
+                    raise RuntimeError("Failed to create planner")
+            value = self.lib.plan_direction(self._planner, self.game_instance)
+            return DIRECTION_NAMES[value] if value >= 0 else None
+
+    def get_planner_stats(self) -> Dict[str, int]:
+        """Get the counters of the planner behind `suggest_direction`.
+
+        Returns:
+            Dict[str, int]: Counters keyed as in `PLANNER_STAT_NAMES`
+        """
+        with self._lock:
+            return planner_stats(self.lib, self._planner)
 
     def cleanup(self) -> None:
-        """Destroy the game instance."""
-        if self.game_instance:
-            self.lib.destroy_game(self.game_instance)
-            self.game_instance = None
+        """Destroy the game instance, closing its input log if it has one."""
+        with self._lock:
+            if self.game_instance:
+                if self.input_log is not None:
+                    self.input_log.checkpoint(self._checkpoint_locked())
+                    self.input_log.close()
+                if self._native is None:
+                    self.lib.destroy_game(self.game_instance)
+                self.game_instance = None
+            if self._planner is not None:
+                self.lib.destroy_planner(self._planner)
+                self._planner = None
+        if self._native is not None:
+            self._native.close()
+
+    def _log_turn_locked(self, value: int) -> None:
+        # Turns after the game ended have no effect and would make a replay
+        # turn before it replays the move that ended the game
+        if self.input_log is not None and not self.lib.is_game_over(self.game_instance):
+            self.input_log.turn(self.lib.get_game_tick(self.game_instance), value)
+
+    def _checkpoint_locked(self) -> Checkpoint:
+        game = self.game_instance
+        return Checkpoint(
+            self.lib.get_game_tick(game),
+            self.lib.get_score(game),
+            bool(self.lib.is_game_over(game)),
+            bool(self.lib.is_game_won(game)),
+            self.lib.get_game_hash(game),
+        )
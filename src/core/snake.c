@@ -1,87 +1,366 @@
 #include "snake.h"
+#include <stdarg.h>
 #include <stdbool.h>
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
 #include <time.h>
 
-#define GRID_WIDTH 20
-#define GRID_HEIGHT 20
+static int log_level = SNAKE_LOG_ERROR;
+static LogCallback log_callback = NULL;
 
-// Debug logging
-#define DEBUG_LOG(fmt, ...) printf("[DEBUG] " fmt "\n", ##__VA_ARGS__)
+static void snake_log(int level, const char *fmt, ...) {
+  char message[256];
+  va_list args;
 
+  va_start(args, fmt);
+  vsnprintf(message, sizeof(message), fmt, args);
+  va_end(args);
+
+  if (log_callback) {
+    log_callback(level, message);
+  } else {
+    fprintf(stderr, "[%s] %s\n", level == SNAKE_LOG_ERROR ? "ERROR" : "DEBUG",
+            message);
+  }
+}
+
+// Debug logging is compiled out unless built with -DSNAKE_DEBUG, and even
+// then only emitted when the runtime log level allows it.
+#ifdef SNAKE_DEBUG
+#define DEBUG_LOG(fmt, ...)                                                    \
+  do {                                                                         \
+    if (log_level >= SNAKE_LOG_DEBUG)                                          \
+      snake_log(SNAKE_LOG_DEBUG, fmt, ##__VA_ARGS__);                          \
+  } while (0)
+#else
+#define DEBUG_LOG(fmt, ...) ((void)0)
+#endif
+
+#define ERROR_LOG(fmt, ...)                                                    \
+  do {                                                                         \
+    if (log_level >= SNAKE_LOG_ERROR)                                          \
+      snake_log(SNAKE_LOG_ERROR, fmt, ##__VA_ARGS__);                          \
+  } while (0)
+
+static inline int cell_index(const Game *game, int x, int y) {
+  return y * game->width + x;
+}
+
+static inline bool cell_occupied(const Game *game, int x, int y) {
+  int cell = cell_index(game, x, y);
+  return (game->occupied[cell >> 3] >> (cell & 7)) & 1;
+}
+
+// Occupying a cell also swap-removes it from the free-cell list
+static inline void occupy_cell(Game *game, Position pos) {
+  int cell = cell_index(game, pos.x, pos.y);
+  game->occupied[cell >> 3] |= (unsigned char)(1u << (cell & 7));
+
+  int slot = game->free_slot[cell];
+  int last = game->free_cells[--game->free_count];
+  game->free_cells[slot] = last;
+  game->free_slot[last] = slot;
+  game->free_slot[cell] = -1;
+}
+
+static inline void release_cell(Game *game, Position pos) {
+  int cell = cell_index(game, pos.x, pos.y);
+  game->occupied[cell >> 3] &= (unsigned char)~(1u << (cell & 7));
+
+  game->free_slot[cell] = game->free_count;
+  game->free_cells[game->free_count++] = cell;
+}
+
+// Segment i of the snake, counted from the head
+static inline Position *segment_at(const Game *game, int i) {
+  int index = game->head + i;
+  if (index >= game->capacity)
+    index -= game->capacity;
+  return &game->segments[index];
+}
+
+// splitmix64, used to expand seeds into well-mixed generator states
+static uint64_t mix_seed(uint64_t x) {
+  x += 0x9E3779B97F4A7C15ULL;
+  x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9ULL;
+  x = (x ^ (x >> 27)) * 0x94D049BB133111EBULL;
+  return x ^ (x >> 31);
+}
+
+static void seed_game(Game *game, uint64_t seed) {
+  game->seed = seed;
+  game->rng_state = mix_seed(seed);
+  if (game->rng_state == 0)
+    game->rng_state = 0x9E3779B97F4A7C15ULL; // xorshift must not be all-zero
+}
+
+// Seed for games created without one: unique per call and per process run
+static uint64_t next_default_seed(void) {
+  static uint64_t counter = 0;
+  uint64_t n = __atomic_fetch_add(&counter, 1, __ATOMIC_RELAXED);
+  return mix_seed((uint64_t)time(NULL) ^ (n * 0xD1B54A32D192ED03ULL));
+}
+
+// Moves made and games ended in this process (see get_engine_stats). Each
+// exported call adds its totals once, so stepping a whole batch costs one
+// atomic add rather than one per game.
+static uint64_t stats_moves = 0;
+static uint64_t stats_games_over = 0;
+
+static void count_moves(uint64_t moves, uint64_t games_over) {
+  if (moves)
+    __atomic_fetch_add(&stats_moves, moves, __ATOMIC_RELAXED);
+  if (games_over)
+    __atomic_fetch_add(&stats_games_over, games_over, __ATOMIC_RELAXED);
+}
+
+// xorshift64*
+static inline uint32_t xorshift_next(uint64_t *state) {
+  uint64_t x = *state;
+  x ^= x >> 12;
+  x ^= x << 25;
+  x ^= x >> 27;
+  *state = x;
+  return (uint32_t)((x * 0x2545F4914F6CDD1DULL) >> 32);
+}
+
+// Uniform integer in [0, bound)
+static inline int xorshift_below(uint64_t *state, int bound) {
+  return (int)(((uint64_t)xorshift_next(state) * (uint32_t)bound) >> 32);
+}
+
+static inline int rng_below(Game *game, int bound) {
+  return xorshift_below(&game->rng_state, bound);
+}
+
+// Pick a uniformly random free cell. When the snake fills the whole board
+// there is nowhere left to put food and the game ends as won.
 static void place_food(Game *game) {
-  bool valid_position;
-  do {
-    valid_position = true;
-    game->food.x = rand() % GRID_WIDTH;
-    game->food.y = rand() % GRID_HEIGHT;
-
-    // Check if food is not on snake
-    for (int i = 0; i < game->length; i++) {
-      if (game->segments[i].x == game->food.x &&
-          game->segments[i].y == game->food.y) {
-        valid_position = false;
-        break;
-      }
-    }
-  } while (!valid_position);
+  if (game->free_count == 0) {
+    game->food.x = -1;
+    game->food.y = -1;
+    game->won = true;
+    game->game_over = true;
+    DEBUG_LOG("Board full, game won with score %d", game->score);
+    return;
+  }
+
+  int cell = game->free_cells[rng_below(game, game->free_count)];
+  game->food.x = cell % game->width;
+  game->food.y = cell / game->width;
   DEBUG_LOG("Food placed at (%d, %d)", game->food.x, game->food.y);
 }
 
 static bool check_collision(const Game *game, int x, int y) {
   // Check wall collision
-  if (x < 0 || x >= GRID_WIDTH || y < 0 || y >= GRID_HEIGHT) {
+  if (x < 0 || x >= game->width || y < 0 || y >= game->height) {
     DEBUG_LOG("Wall collision at (%d, %d)", x, y);
     return true;
   }
 
   // Check self collision
-  for (int i = 0; i < game->length; i++) {
-    if (game->segments[i].x == x && game->segments[i].y == y) {
-      DEBUG_LOG("Self collision at (%d, %d)", x, y);
-      return true;
-    }
+  if (cell_occupied(game, x, y)) {
+    DEBUG_LOG("Self collision at (%d, %d)", x, y);
+    return true;
   }
 
   return false;
 }
 
-static Game *create_game_internal(void) {
+// Put a length-1 snake in the center of the board and place food
+static void init_snake(Game *game) {
+  game->head = 0;
+  game->segments[0].x = game->width / 2;
+  game->segments[0].y = game->height / 2;
+  game->length = 1;
+  game->direction = RIGHT;
+  game->score = 0;
+  game->game_over = false;
+  game->won = false;
+  occupy_cell(game, game->segments[0]);
+
+  place_food(game);
+}
+
+static bool valid_grid_size(int width, int height) {
+  return width > 0 && height > 0 &&
+         (long long)width * height <= MAX_GRID_CELLS;
+}
+
+// Game pool. Destroyed games are kept and handed out again by the
+// constructors, so creating a game normally allocates nothing. A game is the
+// Game struct plus one block holding its body, free-cell lists and occupancy
+// bitmap, all sized for the board; a pooled game is reused for any board
+// with the same number of cells. The pool is bounded by a number of games
+// and a number of bytes (see set_game_pool_limits).
+#define GAME_POOL_CAPACITY 65536
+#define GAME_POOL_SCAN 16
+
+static Game *game_pool[GAME_POOL_CAPACITY];
+static int pool_count = 0;
+static int pool_max_games = 1024;
+static uint64_t pool_bytes = 0;
+static uint64_t pool_max_bytes = 64ULL << 20;
+static uint64_t pool_stats[POOL_STAT_COUNT];
+static char pool_lock = 0;
+
+static void lock_pool(void) {
+  while (__atomic_test_and_set(&pool_lock, __ATOMIC_ACQUIRE))
+    ;
+}
+
+static void unlock_pool(void) { __atomic_clear(&pool_lock, __ATOMIC_RELEASE); }
+
+static size_t game_bytes(int cells) {
+  return sizeof(Game) + sizeof(Position) * (size_t)cells +
+         2 * sizeof(int) * (size_t)cells + (size_t)(cells + 7) / 8;
+}
+
+static void free_game_memory(Game *game) {
+  free(game->segments);
+  free(game);
+}
+
+// Take a pooled game with room for `cells` cells, or NULL
+static Game *take_pooled_game(int cells) {
+  Game *game = NULL;
+  lock_pool();
+  for (int i = pool_count - 1; i >= 0 && i >= pool_count - GAME_POOL_SCAN;
+       i--) {
+    if (game_pool[i]->capacity == cells) {
+      game = game_pool[i];
+      game_pool[i] = game_pool[--pool_count];
+      pool_bytes -= game_bytes(cells);
+      pool_stats[POOL_STAT_REUSED]++;
+      break;
+    }
+  }
+  unlock_pool();
+  return game;
+}
+
+static Game *allocate_game(int cells) {
   Game *game = (Game *)malloc(sizeof(Game));
   if (!game)
     return NULL;
-
-  game->capacity = 10;
-  game->segments = (Position *)malloc(sizeof(Position) * game->capacity);
-  if (!game->segments) {
+  // The body can never outgrow the board, so allocate it once. The body
+  // comes first in the block so that freeing it frees the whole block.
+  size_t positions = sizeof(Position) * (size_t)cells;
+  size_t ints = sizeof(int) * (size_t)cells;
+  char *block = (char *)malloc(positions + 2 * ints + (size_t)(cells + 7) / 8);
+  if (!block) {
     free(game);
     return NULL;
   }
+  game->capacity = cells;
+  game->segments = (Position *)block;
+  game->free_cells = (int *)(block + positions);
+  game->free_slot = (int *)(block + positions + ints);
+  game->occupied = (unsigned char *)(block + positions + 2 * ints);
+  lock_pool();
+  pool_stats[POOL_STAT_ALLOCATED]++;
+  unlock_pool();
+  return game;
+}
+
+// Destroy a game, keeping its memory in the pool if there is room
+static void release_game(Game *game) {
+  size_t bytes = game_bytes(game->capacity);
+  lock_pool();
+  if (pool_count < pool_max_games && pool_bytes + bytes <= pool_max_bytes) {
+    game_pool[pool_count++] = game;
+    pool_bytes += bytes;
+    game = NULL;
+  } else {
+    pool_stats[POOL_STAT_FREED]++;
+  }
+  unlock_pool();
+  if (game)
+    free_game_memory(game);
+}
+
+static void set_game_pool_limits_internal(int max_games, uint64_t max_bytes) {
+  if (max_games < 0)
+    max_games = 0;
+  if (max_games > GAME_POOL_CAPACITY)
+    max_games = GAME_POOL_CAPACITY;
+  Game *evicted[GAME_POOL_SCAN];
+  do {
+    // Free what no longer fits a few games at a time, outside the lock
+    int count = 0;
+    lock_pool();
+    pool_max_games = max_games;
+    pool_max_bytes = max_bytes;
+    while (count < GAME_POOL_SCAN && pool_count > 0 &&
+           (pool_count > pool_max_games || pool_bytes > pool_max_bytes)) {
+      Game *game = game_pool[--pool_count];
+      pool_bytes -= game_bytes(game->capacity);
+      pool_stats[POOL_STAT_FREED]++;
+      evicted[count++] = game;
+    }
+    unlock_pool();
+    for (int i = 0; i < count; i++)
+      free_game_memory(evicted[i]);
+    if (count < GAME_POOL_SCAN)
+      break;
+  } while (true);
+}
+
+static void get_game_pool_stats_internal(uint64_t *stats) {
+  lock_pool();
+  for (int i = 0; i < POOL_STAT_COUNT; i++)
+    stats[i] = pool_stats[i];
+  stats[POOL_STAT_POOLED] = (uint64_t)pool_count;
+  stats[POOL_STAT_POOLED_BYTES] = pool_bytes;
+  unlock_pool();
+}
+
+// Mark every cell free, in the same order as on a new board
+static void clear_board(Game *game) {
+  int cells = game->capacity;
+  memset(game->occupied, 0, (size_t)(cells + 7) / 8);
+  for (int cell = 0; cell < cells; cell++) {
+    game->free_cells[cell] = cell;
+    game->free_slot[cell] = cell;
+  }
+  game->free_count = cells;
+}
+
+static Game *create_game_internal(int width, int height, uint64_t seed) {
+  if (!valid_grid_size(width, height)) {
+    ERROR_LOG("Invalid grid size %dx%d", width, height);
+    return NULL;
+  }
+
+  int cells = width * height;
+  Game *game = take_pooled_game(cells);
+  if (!game)
+    game = allocate_game(cells);
+  if (!game) {
+    ERROR_LOG("Failed to allocate game");
+    return NULL;
+  }
+
+  game->width = width;
+  game->height = height;
+  clear_board(game);
 
-  // Initialize snake in center
-  game->segments[0].x = GRID_WIDTH / 2;
-  game->segments[0].y = GRID_HEIGHT / 2;
-  game->length = 1;
-  game->direction = RIGHT;
-  game->score = 0;
-  game->game_over = false;
   game->speed = 1.0f; // Default speed
+  game->tick = 0;
+  game->reset_tick = 0;
+  seed_game(game, seed);
+  init_snake(game);
 
   DEBUG_LOG("Game initialized. Snake at (%d, %d), direction: %d",
             game->segments[0].x, game->segments[0].y, game->direction);
 
-  // Place initial food
-  place_food(game);
-
   return game;
 }
 
 static void free_game_internal(Game *game) {
-  if (game) {
-    free(game->segments);
-    free(game);
-  }
+  if (game)
+    release_game(game);
 }
 
 static bool move_snake_internal(Game *game) {
@@ -89,7 +368,8 @@ static bool move_snake_internal(Game *game) {
     return false;
 
   // Calculate new head position
-  Position new_head = game->segments[0];
+  Position head = *segment_at(game, 0);
+  Position new_head = head;
   switch (game->direction) {
   case UP:
     new_head.y--;
@@ -107,8 +387,7 @@ static bool move_snake_internal(Game *game) {
 
   DEBUG_LOG(
       "Moving snake. Current head: (%d, %d), New head: (%d, %d), Direction: %d",
-      game->segments[0].x, game->segments[0].y, new_head.x, new_head.y,
-      game->direction);
+      head.x, head.y, new_head.x, new_head.y, game->direction);
 
   // Check for collisions
   if (check_collision(game, new_head.x, new_head.y)) {
@@ -122,41 +401,24 @@ static bool move_snake_internal(Game *game) {
     DEBUG_LOG("Food eaten at (%d, %d)", new_head.x, new_head.y);
   }
 
-  // Move snake
+  // Move snake: drop the tail unless growing, then prepend the new head
   if (food_eaten) {
-    // Grow snake
-    if (game->length >= game->capacity) {
-      game->capacity *= 2;
-      Position *new_segments =
-          realloc(game->segments, sizeof(Position) * game->capacity);
-      if (!new_segments) {
-        game->game_over = true;
-        return false;
-      }
-      game->segments = new_segments;
-    }
-
-    // Shift segments
-    for (int i = game->length; i > 0; i--) {
-      game->segments[i] = game->segments[i - 1];
-    }
     game->length++;
-
-    // Update score
     game->score += 10;
+  } else {
+    release_cell(game, *segment_at(game, game->length - 1));
+  }
 
+  game->head = game->head == 0 ? game->capacity - 1 : game->head - 1;
+  game->segments[game->head] = new_head;
+  occupy_cell(game, new_head);
+  game->tick++;
+
+  if (food_eaten) {
     // Place new food
     place_food(game);
-  } else {
-    // Shift segments
-    for (int i = game->length - 1; i > 0; i--) {
-      game->segments[i] = game->segments[i - 1];
-    }
   }
 
-  // Update head
-  game->segments[0] = new_head;
-
   return food_eaten;
 }
 
@@ -178,10 +440,26 @@ static void change_direction_internal(Game *game, Direction new_direction) {
   DEBUG_LOG("Direction changed to %d", new_direction);
 }
 
+static void reset_game_internal(Game *game) {
+  if (!game)
+    return;
+
+  // Release the old body, then reset snake to initial position and length
+  for (int i = 0; i < game->length; i++) {
+    release_cell(game, *segment_at(game, i));
+  }
+  init_snake(game);
+  game->reset_tick = ++game->tick;
+}
+
 static bool is_game_over_internal(Game *game) {
   return game ? game->game_over : true;
 }
 
+static bool is_game_won_internal(Game *game) {
+  return game ? game->won : false;
+}
+
 static int get_score_internal(Game *game) { return game ? game->score : 0; }
 
 static int get_snake_length_internal(Game *game) {
@@ -193,7 +471,7 @@ static void get_snake_positions_internal(Game *game, Position *positions) {
     return;
 
   for (int i = 0; i < game->length; i++) {
-    positions[i] = game->segments[i];
+    positions[i] = *segment_at(game, i);
   }
 }
 
@@ -219,8 +497,9 @@ static void get_game_state_internal(Game *game, int *snake_positions,
 
   // Copy snake positions
   for (int i = 0; i < game->length; i++) {
-    snake_positions[i * 2] = game->segments[i].x;
-    snake_positions[i * 2 + 1] = game->segments[i].y;
+    const Position *segment = segment_at(game, i);
+    snake_positions[i * 2] = segment->x;
+    snake_positions[i * 2 + 1] = segment->y;
   }
 
   // Copy other state
@@ -232,14 +511,417 @@ static void get_game_state_internal(Game *game, int *snake_positions,
   *is_game_over = game->game_over;
 }
 
+// Write the snapshot header followed by the `count` newest segments
+static void write_snapshot(Game *game, int *buffer, int count) {
+  buffer[SNAPSHOT_LENGTH] = game->length;
+  buffer[SNAPSHOT_FOOD_X] = game->food.x;
+  buffer[SNAPSHOT_FOOD_Y] = game->food.y;
+  buffer[SNAPSHOT_SCORE] = game->score;
+  buffer[SNAPSHOT_DIRECTION] = game->direction;
+  buffer[SNAPSHOT_GAME_OVER] = game->game_over;
+  buffer[SNAPSHOT_WON] = game->won;
+  buffer[SNAPSHOT_WIDTH] = game->width;
+  buffer[SNAPSHOT_HEIGHT] = game->height;
+
+  int *positions = buffer + SNAPSHOT_HEADER_SIZE;
+  for (int i = 0; i < count; i++) {
+    const Position *segment = segment_at(game, i);
+    positions[i * 2] = segment->x;
+    positions[i * 2 + 1] = segment->y;
+  }
+}
+
+static int get_game_snapshot_internal(Game *game, int *buffer,
+                                      int max_segments) {
+  if (!game || !buffer || max_segments < 0)
+    return -1;
+
+  int count = game->length < max_segments ? game->length : max_segments;
+  write_snapshot(game, buffer, count);
+  return count;
+}
+
+// Segments a client that last saw tick `since` is missing: the new heads
+// added since then, or the whole snake when it must start from a keyframe.
+static int delta_segments(Game *game, uint64_t since) {
+  if (since < game->reset_tick || since > game->tick)
+    return game->length;
+  uint64_t moves = game->tick - since;
+  return moves < (uint64_t)game->length ? (int)moves : game->length;
+}
+
+static int get_game_delta_internal(Game *game, uint64_t since, int *buffer,
+                                   int max_segments, uint64_t *tick) {
+  if (!game || !buffer || max_segments < 0)
+    return -1;
+
+  int needed = delta_segments(game, since);
+  write_snapshot(game, buffer, needed < max_segments ? needed : max_segments);
+  if (tick)
+    *tick = game->tick;
+  return needed;
+}
+
+static int coord_bytes(Game *game) {
+  int side = game->width > game->height ? game->width : game->height;
+  return side <= 256 ? 1 : side <= 65536 ? 2 : 4;
+}
+
+static unsigned char *put_le(unsigned char *out, uint64_t value, int bytes) {
+  for (int i = 0; i < bytes; i++) {
+    out[i] = (unsigned char)(value >> (8 * i));
+  }
+  return out + bytes;
+}
+
+static int encode_game_state_internal(Game *game, uint64_t since,
+                                      unsigned char *buffer, int capacity) {
+  if (!game || !buffer)
+    return -1;
+
+  int count = delta_segments(game, since);
+  int coord = coord_bytes(game);
+  int size = STATE_HEADER_SIZE + (count + 1) * 2 * coord;
+  if (size > capacity)
+    return size;
+
+  unsigned char flags = 0;
+  if (game->game_over)
+    flags |= STATE_FLAG_GAME_OVER;
+  if (game->won)
+    flags |= STATE_FLAG_WON;
+  if (count == game->length)
+    flags |= STATE_FLAG_KEYFRAME;
+
+  buffer[STATE_VERSION] = STATE_FORMAT_VERSION;
+  buffer[STATE_FLAGS] = flags;
+  buffer[STATE_DIRECTION] = (unsigned char)game->direction;
+  buffer[STATE_COORD_BYTES] = (unsigned char)coord;
+  put_le(buffer + STATE_WIDTH, (uint32_t)game->width, 4);
+  put_le(buffer + STATE_HEIGHT, (uint32_t)game->height, 4);
+  put_le(buffer + STATE_SCORE, (uint32_t)game->score, 4);
+  put_le(buffer + STATE_LENGTH, (uint32_t)game->length, 4);
+  put_le(buffer + STATE_COUNT, (uint32_t)count, 4);
+  put_le(buffer + STATE_TICK, game->tick, 8);
+
+  unsigned char *out = buffer + STATE_HEADER_SIZE;
+  out = put_le(out, game->won ? 0 : (uint32_t)game->food.x, coord);
+  out = put_le(out, game->won ? 0 : (uint32_t)game->food.y, coord);
+  for (int i = 0; i < count; i++) {
+    const Position *segment = segment_at(game, i);
+    out = put_le(out, (uint32_t)segment->x, coord);
+    out = put_le(out, (uint32_t)segment->y, coord);
+  }
+  return size;
+}
+
+static uint64_t get_le(const unsigned char *in, int bytes) {
+  uint64_t value = 0;
+  for (int i = 0; i < bytes; i++) {
+    value |= (uint64_t)in[i] << (8 * i);
+  }
+  return value;
+}
+
+static int cell_bytes(int cells) {
+  return cells <= 256 ? 1 : cells <= 65536 ? 2 : 3;
+}
+
+// Size of a saved game with the given board and snake length
+static long long save_size(int cells, int length) {
+  return SAVE_HEADER_SIZE + (length - 1 + 3) / 4 +
+         (long long)(cells - length) * cell_bytes(cells);
+}
+
+// Direction of the step from one segment to the next
+static Direction step_direction(Position from, Position to) {
+  if (to.y < from.y)
+    return UP;
+  if (to.x > from.x)
+    return RIGHT;
+  if (to.y > from.y)
+    return DOWN;
+  return LEFT;
+}
+
+static int serialize_game_internal(Game *game, unsigned char *buffer,
+                                   int capacity) {
+  if (!game)
+    return -1;
+
+  int cells = game->width * game->height;
+  int size = (int)save_size(cells, game->length);
+  if (!buffer || size > capacity)
+    return size;
+
+  unsigned char flags = 0;
+  if (game->game_over)
+    flags |= STATE_FLAG_GAME_OVER;
+  if (game->won)
+    flags |= STATE_FLAG_WON;
+  bool has_food = game->food.x >= 0 && game->food.x < game->width &&
+                  game->food.y >= 0 && game->food.y < game->height;
+  uint32_t speed;
+  memcpy(&speed, &game->speed, sizeof(speed));
+
+  memset(buffer, 0, SAVE_HEADER_SIZE);
+  put_le(buffer + SAVE_MAGIC, SAVE_MAGIC_VALUE, 4);
+  buffer[SAVE_VERSION] = SAVE_FORMAT_VERSION;
+  buffer[SAVE_FLAGS] = flags;
+  buffer[SAVE_DIRECTION] = (unsigned char)game->direction;
+  put_le(buffer + SAVE_WIDTH, (uint32_t)game->width, 4);
+  put_le(buffer + SAVE_HEIGHT, (uint32_t)game->height, 4);
+  put_le(buffer + SAVE_SCORE, (uint32_t)game->score, 4);
+  put_le(buffer + SAVE_LENGTH, (uint32_t)game->length, 4);
+  put_le(buffer + SAVE_SPEED, speed, 4);
+  put_le(buffer + SAVE_FOOD,
+         has_food ? (uint32_t)cell_index(game, game->food.x, game->food.y)
+                  : SAVE_NO_FOOD,
+         4);
+  put_le(buffer + SAVE_SEED, game->seed, 8);
+  put_le(buffer + SAVE_RNG_STATE, game->rng_state, 8);
+  put_le(buffer + SAVE_TICK, game->tick, 8);
+  put_le(buffer + SAVE_RESET_TICK, game->reset_tick, 8);
+  const Position *head = segment_at(game, 0);
+  put_le(buffer + SAVE_HEAD, (uint32_t)cell_index(game, head->x, head->y), 4);
+
+  unsigned char *out = buffer + SAVE_HEADER_SIZE;
+  int body_bytes = (game->length - 1 + 3) / 4;
+  memset(out, 0, body_bytes);
+  for (int i = 1; i < game->length; i++) {
+    Direction step =
+        step_direction(*segment_at(game, i - 1), *segment_at(game, i));
+    out[(i - 1) >> 2] |= (unsigned char)(step << (2 * ((i - 1) & 3)));
+  }
+  out += body_bytes;
+
+  int width = cell_bytes(cells);
+  for (int i = 0; i < game->free_count; i++) {
+    out = put_le(out, (uint32_t)game->free_cells[i], width);
+  }
+  return size;
+}
+
+static Game *deserialize_game_internal(const unsigned char *data, int size) {
+  if (!data || size < SAVE_HEADER_SIZE ||
+      get_le(data + SAVE_MAGIC, 4) != SAVE_MAGIC_VALUE ||
+      data[SAVE_VERSION] != SAVE_FORMAT_VERSION) {
+    ERROR_LOG("Not a saved game");
+    return NULL;
+  }
+
+  uint64_t width = get_le(data + SAVE_WIDTH, 4);
+  uint64_t height = get_le(data + SAVE_HEIGHT, 4);
+  uint64_t length = get_le(data + SAVE_LENGTH, 4);
+  uint64_t head = get_le(data + SAVE_HEAD, 4);
+  uint64_t food = get_le(data + SAVE_FOOD, 4);
+  if (width > MAX_GRID_CELLS || height > MAX_GRID_CELLS ||
+      !valid_grid_size((int)width, (int)height)) {
+    ERROR_LOG("Saved game has an invalid grid size");
+    return NULL;
+  }
+  int cells = (int)(width * height);
+  if (length < 1 || length > (uint64_t)cells || head >= (uint64_t)cells ||
+      (food != SAVE_NO_FOOD && food >= (uint64_t)cells) ||
+      data[SAVE_DIRECTION] > LEFT ||
+      size != save_size(cells, (int)length)) {
+    ERROR_LOG("Saved game is corrupt");
+    return NULL;
+  }
+
+  Game *game = create_game_internal((int)width, (int)height,
+                                    get_le(data + SAVE_SEED, 8));
+  if (!game)
+    return NULL;
+
+  // Start from an empty board; occupied cells are in no free-cell slot
+  memset(game->occupied, 0, (cells + 7) / 8);
+  for (int cell = 0; cell < cells; cell++) {
+    game->free_slot[cell] = -1;
+  }
+
+  const unsigned char *in = data + SAVE_HEADER_SIZE;
+  Position pos = {(int)(head % width), (int)(head / width)};
+  for (int i = 0; i < (int)length; i++) {
+    if (i > 0) {
+      int shift = 2 * ((i - 1) & 3);
+      Direction step = (Direction)((in[(i - 1) >> 2] >> shift) & 3);
+      pos.x += step == RIGHT ? 1 : step == LEFT ? -1 : 0;
+      pos.y += step == DOWN ? 1 : step == UP ? -1 : 0;
+    }
+    if (pos.x < 0 || pos.x >= game->width || pos.y < 0 ||
+        pos.y >= game->height || cell_occupied(game, pos.x, pos.y)) {
+      ERROR_LOG("Saved snake body is invalid");
+      free_game_internal(game);
+      return NULL;
+    }
+    int cell = cell_index(game, pos.x, pos.y);
+    game->occupied[cell >> 3] |= (unsigned char)(1u << (cell & 7));
+    game->segments[i] = pos;
+  }
+  in += (length - 1 + 3) / 4;
+
+  int free_count = cells - (int)length;
+  int width_bytes = cell_bytes(cells);
+  for (int i = 0; i < free_count; i++, in += width_bytes) {
+    int cell = (int)get_le(in, width_bytes);
+    if (cell >= cells || game->free_slot[cell] != -1 ||
+        ((game->occupied[cell >> 3] >> (cell & 7)) & 1)) {
+      ERROR_LOG("Saved free-cell list is invalid");
+      free_game_internal(game);
+      return NULL;
+    }
+    game->free_cells[i] = cell;
+    game->free_slot[cell] = i;
+  }
+  game->free_count = free_count;
+
+  uint32_t speed = (uint32_t)get_le(data + SAVE_SPEED, 4);
+  memcpy(&game->speed, &speed, sizeof(speed));
+  game->head = 0;
+  game->length = (int)length;
+  game->direction = (Direction)data[SAVE_DIRECTION];
+  game->score = (int)get_le(data + SAVE_SCORE, 4);
+  game->game_over = (data[SAVE_FLAGS] & STATE_FLAG_GAME_OVER) != 0;
+  game->won = (data[SAVE_FLAGS] & STATE_FLAG_WON) != 0;
+  game->food.x = food == SAVE_NO_FOOD ? -1 : (int)(food % width);
+  game->food.y = food == SAVE_NO_FOOD ? -1 : (int)(food / width);
+  game->rng_state = get_le(data + SAVE_RNG_STATE, 8);
+  if (game->rng_state == 0)
+    game->rng_state = 0x9E3779B97F4A7C15ULL;
+  game->tick = get_le(data + SAVE_TICK, 8);
+  game->reset_tick = get_le(data + SAVE_RESET_TICK, 8);
+  if (game->reset_tick > game->tick)
+    game->reset_tick = game->tick;
+  return game;
+}
+
+static bool restore_game_internal(Game *game, const unsigned char *data,
+                                  int size) {
+  if (!game)
+    return false;
+  Game *loaded = deserialize_game_internal(data, size);
+  if (!loaded)
+    return false;
+
+  // Clients of either game must start over from a keyframe
+  uint64_t tick = game->tick > loaded->tick ? game->tick : loaded->tick;
+  // Swap contents so the old board is released along with `loaded`
+  Game old = *game;
+  *game = *loaded;
+  *loaded = old;
+  release_game(loaded);
+  game->tick = tick + 1;
+  game->reset_tick = game->tick;
+  return true;
+}
+
+static int advance_game_internal(Game *game, int moves) {
+  int made = 0;
+  while (made < moves && !game->game_over) {
+    uint64_t tick = game->tick;
+    move_snake_internal(game);
+    if (game->tick == tick)
+      break;
+    made++;
+  }
+  return made;
+}
+
+// FNV-1a over the little-endian bytes of a value
+static uint64_t hash_value(uint64_t hash, uint64_t value, int bytes) {
+  for (int i = 0; i < bytes; i++) {
+    hash ^= (value >> (8 * i)) & 0xFF;
+    hash *= 0x100000001B3ULL;
+  }
+  return hash;
+}
+
+static uint64_t get_game_hash_internal(Game *game) {
+  uint64_t hash = 0xCBF29CE484222325ULL;
+  hash = hash_value(hash, (uint32_t)game->width, 4);
+  hash = hash_value(hash, (uint32_t)game->height, 4);
+  hash = hash_value(hash, game->tick, 8);
+  hash = hash_value(hash, game->reset_tick, 8);
+  hash = hash_value(hash, (uint32_t)game->score, 4);
+  hash = hash_value(hash, (uint32_t)game->direction, 1);
+  hash = hash_value(hash, (uint32_t)game->game_over | (game->won << 1), 1);
+  hash = hash_value(hash, (uint32_t)game->food.x, 4);
+  hash = hash_value(hash, (uint32_t)game->food.y, 4);
+  hash = hash_value(hash, game->rng_state, 8);
+  hash = hash_value(hash, (uint32_t)game->length, 4);
+  for (int i = 0; i < game->length; i++) {
+    const Position *segment = segment_at(game, i);
+    hash = hash_value(hash, (uint32_t)segment->x, 4);
+    hash = hash_value(hash, (uint32_t)segment->y, 4);
+  }
+  return hash;
+}
+
 // Externally visible wrapper functions
-void *create_game(void) { return (void *)create_game_internal(); }
+void *create_game(void) {
+  return (void *)create_game_internal(GRID_WIDTH, GRID_HEIGHT,
+                                      next_default_seed());
+}
+
+__attribute__((visibility("default"))) void *create_game_seeded(uint64_t seed) {
+  return (void *)create_game_internal(GRID_WIDTH, GRID_HEIGHT, seed);
+}
+
+__attribute__((visibility("default"))) void *create_game_sized(int width,
+                                                               int height) {
+  return (void *)create_game_internal(width, height, next_default_seed());
+}
+
+__attribute__((visibility("default"))) void *
+create_game_sized_seeded(int width, int height, uint64_t seed) {
+  return (void *)create_game_internal(width, height, seed);
+}
 
 __attribute__((visibility("default"))) void destroy_game(void *game) {
   free_game_internal((Game *)game);
 }
 
-bool move_snake(void *game) { return move_snake_internal((Game *)game); }
+__attribute__((visibility("default"))) void
+set_game_pool_limits(int max_games, uint64_t max_bytes) {
+  set_game_pool_limits_internal(max_games, max_bytes);
+}
+
+__attribute__((visibility("default"))) void
+get_game_pool_stats(uint64_t *stats) {
+  if (stats)
+    get_game_pool_stats_internal(stats);
+}
+
+bool move_snake(void *game) {
+  Game *g = (Game *)game;
+  if (!g)
+    return false;
+  uint64_t tick = g->tick;
+  bool was_over = g->game_over;
+  bool eaten = move_snake_internal(g);
+  count_moves(g->tick - tick, !was_over && g->game_over);
+  return eaten;
+}
+
+__attribute__((visibility("default"))) int advance_game(void *game,
+                                                       int moves) {
+  Game *g = (Game *)game;
+  if (!g)
+    return 0;
+  bool was_over = g->game_over;
+  int made = advance_game_internal(g, moves);
+  count_moves(made, !was_over && g->game_over);
+  return made;
+}
+
+__attribute__((visibility("default"))) void
+get_engine_stats(uint64_t *moves, uint64_t *games_over) {
+  if (moves)
+    *moves = __atomic_load_n(&stats_moves, __ATOMIC_RELAXED);
+  if (games_over)
+    *games_over = __atomic_load_n(&stats_games_over, __ATOMIC_RELAXED);
+}
 
 void change_direction(void *game, Direction new_direction) {
   change_direction_internal((Game *)game, new_direction);
@@ -247,6 +929,10 @@ void change_direction(void *game, Direction new_direction) {
 
 bool is_game_over(void *game) { return is_game_over_internal((Game *)game); }
 
+__attribute__((visibility("default"))) bool is_game_won(void *game) {
+  return is_game_won_internal((Game *)game);
+}
+
 int get_score(void *game) { return get_score_internal((Game *)game); }
 
 int get_snake_length(void *game) {
@@ -268,20 +954,22 @@ void set_food_position(void *game, int x, int y) {
 }
 
 __attribute__((visibility("default"))) void reset_game(void *game_ptr) {
+  reset_game_internal((Game *)game_ptr);
+}
+
+__attribute__((visibility("default"))) void reset_game_seeded(void *game_ptr,
+                                                              uint64_t seed) {
   Game *game = (Game *)game_ptr;
   if (!game)
     return;
 
-  // Reset snake to initial position and length
-  game->length = 1;
-  game->segments[0].x = GRID_WIDTH / 2;
-  game->segments[0].y = GRID_HEIGHT / 2;
-  game->direction = RIGHT;
-  game->score = 0;
-  game->game_over = false;
+  seed_game(game, seed);
+  reset_game_internal(game);
+}
 
-  // Place new food
-  place_food(game);
+__attribute__((visibility("default"))) uint64_t get_game_seed(void *game_ptr) {
+  Game *game = (Game *)game_ptr;
+  return game ? game->seed : 0;
 }
 
 Direction get_snake_direction(void *game) {
@@ -296,6 +984,49 @@ get_game_state(void *game_ptr, int *snake_positions, int *snake_length,
                           food_position, score, direction, is_game_over);
 }
 
+__attribute__((visibility("default"))) int
+get_game_snapshot(void *game_ptr, int *buffer, int max_segments) {
+  return get_game_snapshot_internal((Game *)game_ptr, buffer, max_segments);
+}
+
+__attribute__((visibility("default"))) uint64_t get_game_tick(void *game_ptr) {
+  Game *game = (Game *)game_ptr;
+  return game ? game->tick : 0;
+}
+
+__attribute__((visibility("default"))) int
+get_game_delta(void *game_ptr, uint64_t since, int *buffer, int max_segments,
+               uint64_t *tick) {
+  return get_game_delta_internal((Game *)game_ptr, since, buffer, max_segments,
+                                 tick);
+}
+
+__attribute__((visibility("default"))) int
+encode_game_state(void *game_ptr, uint64_t since, unsigned char *buffer,
+                  int capacity) {
+  return encode_game_state_internal((Game *)game_ptr, since, buffer, capacity);
+}
+
+__attribute__((visibility("default"))) uint64_t get_game_hash(void *game_ptr) {
+  Game *game = (Game *)game_ptr;
+  return game ? get_game_hash_internal(game) : 0;
+}
+
+__attribute__((visibility("default"))) int
+serialize_game(void *game_ptr, unsigned char *buffer, int capacity) {
+  return serialize_game_internal((Game *)game_ptr, buffer, capacity);
+}
+
+__attribute__((visibility("default"))) void *
+deserialize_game(const unsigned char *data, int size) {
+  return (void *)deserialize_game_internal(data, size);
+}
+
+__attribute__((visibility("default"))) bool
+restore_game(void *game_ptr, const unsigned char *data, int size) {
+  return restore_game_internal((Game *)game_ptr, data, size);
+}
+
 __attribute__((visibility("default"))) void set_game_speed(void *game_ptr,
                                                            float speed) {
   Game *game = (Game *)game_ptr;
@@ -310,4 +1041,931 @@ __attribute__((visibility("default"))) float get_game_speed(void *game_ptr) {
     return game->speed;
   }
   return 1.0f;
-}
\ No newline at end of file
+}
+
+__attribute__((visibility("default"))) void set_log_level(int level) {
+  log_level = level;
+}
+
+__attribute__((visibility("default"))) int get_log_level(void) {
+  return log_level;
+}
+
+__attribute__((visibility("default"))) void
+set_log_callback(LogCallback callback) {
+  log_callback = callback;
+}
+
+// Batched stepping. A batch owns many independent games and advances all of
+// them with one call, writing results into caller-supplied arrays.
+
+static GameBatch *create_batch_internal(int count, int width, int height,
+                                        uint64_t seed) {
+  if (count <= 0 || !valid_grid_size(width, height))
+    return NULL;
+
+  GameBatch *batch = (GameBatch *)malloc(sizeof(GameBatch));
+  if (!batch) {
+    ERROR_LOG("Failed to allocate game batch");
+    return NULL;
+  }
+  batch->games = (Game **)calloc(count, sizeof(Game *));
+  batch->count = count;
+  if (!batch->games) {
+    ERROR_LOG("Failed to allocate game batch");
+    free(batch);
+    return NULL;
+  }
+
+  for (int i = 0; i < count; i++) {
+    // Consecutive seeds are decorrelated by mix_seed
+    batch->games[i] = create_game_internal(width, height, seed + (uint64_t)i);
+    if (!batch->games[i]) {
+      for (int j = 0; j < i; j++) {
+        free_game_internal(batch->games[j]);
+      }
+      free(batch->games);
+      free(batch);
+      return NULL;
+    }
+  }
+
+  return batch;
+}
+
+static void free_batch_internal(GameBatch *batch) {
+  if (batch) {
+    for (int i = 0; i < batch->count; i++) {
+      free_game_internal(batch->games[i]);
+    }
+    free(batch->games);
+    free(batch);
+  }
+}
+
+static void read_batch_results(const GameBatch *batch, int *scores,
+                               unsigned char *game_over, int *heads,
+                               int *food) {
+  for (int i = 0; i < batch->count; i++) {
+    const Game *game = batch->games[i];
+    if (scores)
+      scores[i] = game->score;
+    if (game_over)
+      game_over[i] = game->game_over;
+    if (heads) {
+      const Position *head = segment_at(game, 0);
+      heads[i * 2] = head->x;
+      heads[i * 2 + 1] = head->y;
+    }
+    if (food) {
+      food[i * 2] = game->food.x;
+      food[i * 2 + 1] = game->food.y;
+    }
+  }
+}
+
+static int step_batch_internal(GameBatch *batch, const signed char *directions,
+                               int *scores, unsigned char *game_over,
+                               int *heads, int *food) {
+  if (!batch)
+    return 0;
+
+  int alive = 0;
+  uint64_t moves = 0, ended = 0;
+  for (int i = 0; i < batch->count; i++) {
+    Game *game = batch->games[i];
+    if (game->game_over)
+      continue;
+    if (directions && directions[i] >= UP && directions[i] <= LEFT)
+      change_direction_internal(game, (Direction)directions[i]);
+    uint64_t tick = game->tick;
+    move_snake_internal(game);
+    moves += game->tick - tick;
+    ended += game->game_over;
+    alive += !game->game_over;
+  }
+  count_moves(moves, ended);
+
+  read_batch_results(batch, scores, game_over, heads, food);
+  return alive;
+}
+
+static void reset_batch_internal(GameBatch *batch, const unsigned char *mask,
+                                 int *scores, unsigned char *game_over,
+                                 int *heads, int *food) {
+  if (!batch)
+    return;
+
+  for (int i = 0; i < batch->count; i++) {
+    if (!mask || mask[i])
+      reset_game_internal(batch->games[i]);
+  }
+
+  read_batch_results(batch, scores, game_over, heads, food);
+}
+
+__attribute__((visibility("default"))) void *create_batch(int count) {
+  return (void *)create_batch_internal(count, GRID_WIDTH, GRID_HEIGHT,
+                                       next_default_seed());
+}
+
+__attribute__((visibility("default"))) void *
+create_batch_seeded(int count, uint64_t seed) {
+  return (void *)create_batch_internal(count, GRID_WIDTH, GRID_HEIGHT, seed);
+}
+
+__attribute__((visibility("default"))) void *
+create_batch_sized(int count, int width, int height) {
+  return (void *)create_batch_internal(count, width, height,
+                                       next_default_seed());
+}
+
+__attribute__((visibility("default"))) void *
+create_batch_sized_seeded(int count, int width, int height, uint64_t seed) {
+  return (void *)create_batch_internal(count, width, height, seed);
+}
+
+__attribute__((visibility("default"))) void destroy_batch(void *batch) {
+  free_batch_internal((GameBatch *)batch);
+}
+
+__attribute__((visibility("default"))) int batch_size(void *batch) {
+  return batch ? ((GameBatch *)batch)->count : 0;
+}
+
+__attribute__((visibility("default"))) void *batch_game(void *batch,
+                                                        int index) {
+  GameBatch *b = (GameBatch *)batch;
+  if (!b || index < 0 || index >= b->count)
+    return NULL;
+  return (void *)b->games[index];
+}
+
+__attribute__((visibility("default"))) int
+step_batch(void *batch, const signed char *directions, int *scores,
+           unsigned char *game_over, int *heads, int *food) {
+  return step_batch_internal((GameBatch *)batch, directions, scores, game_over,
+                             heads, food);
+}
+
+__attribute__((visibility("default"))) void
+reset_batch(void *batch, const unsigned char *mask, int *scores,
+            unsigned char *game_over, int *heads, int *food) {
+  reset_batch_internal((GameBatch *)batch, mask, scores, game_over, heads,
+                       food);
+}
+// Arenas. Many snakes share one board and move simultaneously. The owner
+// grid says for every cell which snake covers it, so a head is checked
+// against all snakes with one lookup. Heads aiming at the same cell are
+// detected through the claim grid, which is only non-zero during a step.
+#define ARENA_INITIAL_BODY 16
+
+static inline int arena_food_index(int owner) { return ARENA_FOOD - owner; }
+
+static void arena_take_free(Arena *arena, int cell) {
+  int slot = arena->free_slot[cell];
+  int last = arena->free_cells[--arena->free_count];
+  arena->free_cells[slot] = last;
+  arena->free_slot[last] = slot;
+  arena->free_slot[cell] = -1;
+}
+
+static void arena_release(Arena *arena, int cell) {
+  arena->owner[cell] = ARENA_EMPTY;
+  arena->free_slot[cell] = arena->free_count;
+  arena->free_cells[arena->free_count++] = cell;
+}
+
+static inline int arena_cell(const Arena *arena, Position pos) {
+  return pos.y * arena->width + pos.x;
+}
+
+static inline Position *arena_segment(const ArenaSnake *snake, int i) {
+  int index = snake->head + i;
+  if (index >= snake->capacity)
+    index -= snake->capacity;
+  return &snake->segments[index];
+}
+
+// Put food on random empty cells until there are food_target pieces
+static void arena_place_food(Arena *arena) {
+  while (arena->food_count < arena->food_target && arena->free_count > 0) {
+    int cell = arena->free_cells[xorshift_below(&arena->rng_state,
+                                                arena->free_count)];
+    arena_take_free(arena, cell);
+    arena->owner[cell] = ARENA_FOOD - arena->food_count;
+    arena->food[arena->food_count++] = cell;
+  }
+}
+
+static void arena_remove_food(Arena *arena, int cell) {
+  int index = arena_food_index(arena->owner[cell]);
+  int last = arena->food[--arena->food_count];
+  arena->food[index] = last;
+  arena->owner[last] = ARENA_FOOD - index;
+}
+
+static void arena_clear_snake(Arena *arena, ArenaSnake *snake) {
+  for (int i = 0; i < snake->length; i++)
+    arena_release(arena, arena_cell(arena, *arena_segment(snake, i)));
+  snake->length = 0;
+  snake->alive = false;
+}
+
+// Make room for one more segment, unwrapping the ring buffer
+static bool arena_grow_body(ArenaSnake *snake) {
+  if (snake->length < snake->capacity)
+    return true;
+  int capacity = snake->capacity * 2;
+  Position *segments = (Position *)malloc(sizeof(Position) * capacity);
+  if (!segments) {
+    ERROR_LOG("Failed to grow arena snake");
+    return false;
+  }
+  for (int i = 0; i < snake->length; i++)
+    segments[i] = *arena_segment(snake, i);
+  free(snake->segments);
+  snake->segments = segments;
+  snake->capacity = capacity;
+  snake->head = 0;
+  return true;
+}
+
+// Put a length-1 snake on an empty cell, replacing the snake if it is alive
+static bool arena_spawn_at(Arena *arena, int index, int cell,
+                           Direction direction) {
+  ArenaSnake *snake = &arena->snakes[index];
+  if (snake->alive)
+    arena_clear_snake(arena, snake);
+  if (arena->owner[cell] != ARENA_EMPTY)
+    return false;
+  arena_take_free(arena, cell);
+  arena->owner[cell] = index;
+  snake->head = 0;
+  snake->segments[0].x = cell % arena->width;
+  snake->segments[0].y = cell / arena->width;
+  snake->length = 1;
+  snake->direction = direction;
+  snake->score = 0;
+  snake->alive = true;
+  return true;
+}
+
+static bool arena_spawn_internal(Arena *arena, int index) {
+  if (!arena || index < 0 || index >= arena->snake_count)
+    return false;
+  if (arena->snakes[index].alive)
+    arena_clear_snake(arena, &arena->snakes[index]);
+  if (arena->free_count == 0)
+    return false;
+  int cell = arena->free_cells[xorshift_below(&arena->rng_state,
+                                              arena->free_count)];
+  Direction direction = (Direction)xorshift_below(&arena->rng_state, 4);
+  return arena_spawn_at(arena, index, cell, direction);
+}
+
+static void free_arena_internal(Arena *arena) {
+  if (!arena)
+    return;
+  if (arena->snakes) {
+    for (int i = 0; i < arena->snake_count; i++)
+      free(arena->snakes[i].segments);
+  }
+  free(arena->snakes);
+  free(arena->targets);
+  free(arena->owner);
+  free(arena->claims);
+  free(arena->free_cells);
+  free(arena->free_slot);
+  free(arena->food);
+  free(arena);
+}
+
+static Arena *create_arena_internal(int width, int height, int snakes,
+                                    int food, uint64_t seed) {
+  if (!valid_grid_size(width, height) || snakes < 1 || food < 0 ||
+      snakes > width * height) {
+    ERROR_LOG("Invalid arena: %dx%d, %d snakes, %d food", width, height,
+              snakes, food);
+    return NULL;
+  }
+  Arena *arena = (Arena *)calloc(1, sizeof(Arena));
+  if (!arena) {
+    ERROR_LOG("Failed to allocate arena");
+    return NULL;
+  }
+  int cells = width * height;
+  arena->width = width;
+  arena->height = height;
+  arena->snake_count = snakes;
+  arena->food_target = food < cells ? food : cells;
+  arena->snakes = (ArenaSnake *)calloc(snakes, sizeof(ArenaSnake));
+  arena->targets = (int *)malloc(sizeof(int) * snakes);
+  arena->owner = (int *)malloc(sizeof(int) * cells);
+  arena->claims = (int *)calloc(cells, sizeof(int));
+  arena->free_cells = (int *)malloc(sizeof(int) * cells);
+  arena->free_slot = (int *)malloc(sizeof(int) * cells);
+  arena->food = (int *)malloc(sizeof(int) * (arena->food_target + 1));
+  bool ok = arena->snakes && arena->targets && arena->owner &&
+            arena->claims && arena->free_cells && arena->free_slot &&
+            arena->food;
+  for (int i = 0; ok && i < snakes; i++) {
+    arena->snakes[i].capacity = ARENA_INITIAL_BODY;
+    arena->snakes[i].segments =
+        (Position *)malloc(sizeof(Position) * ARENA_INITIAL_BODY);
+    ok = arena->snakes[i].segments != NULL;
+  }
+  if (!ok) {
+    ERROR_LOG("Failed to allocate arena");
+    free_arena_internal(arena);
+    return NULL;
+  }
+
+  for (int cell = 0; cell < cells; cell++) {
+    arena->owner[cell] = ARENA_EMPTY;
+    arena->free_cells[cell] = cell;
+    arena->free_slot[cell] = cell;
+  }
+  arena->free_count = cells;
+  arena->seed = seed;
+  arena->rng_state = mix_seed(seed);
+  if (arena->rng_state == 0)
+    arena->rng_state = 0x9E3779B97F4A7C15ULL;
+  for (int i = 0; i < snakes; i++)
+    arena_spawn_internal(arena, i);
+  arena_place_food(arena);
+  return arena;
+}
+
+static void read_arena_results(const Arena *arena, int *scores,
+                               unsigned char *alive, int *heads,
+                               int *lengths) {
+  for (int i = 0; i < arena->snake_count; i++) {
+    const ArenaSnake *snake = &arena->snakes[i];
+    if (scores)
+      scores[i] = snake->score;
+    if (alive)
+      alive[i] = snake->alive;
+    if (heads) {
+      Position head = snake->alive ? *arena_segment(snake, 0)
+                                   : (Position){-1, -1};
+      heads[i * 2] = head.x;
+      heads[i * 2 + 1] = head.y;
+    }
+    if (lengths)
+      lengths[i] = snake->length;
+  }
+}
+
+static int step_arena_internal(Arena *arena, const signed char *directions,
+                               int *scores, unsigned char *alive, int *heads,
+                               int *lengths) {
+  if (!arena)
+    return 0;
+
+  // Turn, then find where every head goes. A head hitting a wall or any
+  // body, including a tail about to move, dies as in a single game.
+  int *targets = arena->targets;
+  for (int i = 0; i < arena->snake_count; i++) {
+    ArenaSnake *snake = &arena->snakes[i];
+    targets[i] = -1;
+    if (!snake->alive)
+      continue;
+    // Ignore invalid directions and 180-degree turns
+    int turn = directions ? directions[i] : -1;
+    if (turn >= UP && turn <= LEFT && turn != (int)((snake->direction + 2) & 3))
+      snake->direction = (Direction)turn;
+    Position head = *arena_segment(snake, 0);
+    switch (snake->direction) {
+    case UP:
+      head.y--;
+      break;
+    case RIGHT:
+      head.x++;
+      break;
+    case DOWN:
+      head.y++;
+      break;
+    case LEFT:
+      head.x--;
+      break;
+    }
+    if (head.x < 0 || head.x >= arena->width || head.y < 0 ||
+        head.y >= arena->height)
+      continue;
+    int cell = arena_cell(arena, head);
+    if (arena->owner[cell] >= 0)
+      continue;
+    targets[i] = cell;
+  }
+
+  // Heads meeting on one cell all die
+  for (int i = 0; i < arena->snake_count; i++) {
+    int cell = targets[i];
+    if (cell < 0)
+      continue;
+    int other = arena->claims[cell] - 1;
+    if (other >= 0) {
+      targets[other] = -2 - cell;
+      targets[i] = -2 - cell;
+    } else {
+      arena->claims[cell] = i + 1;
+    }
+  }
+  for (int i = 0; i < arena->snake_count; i++) {
+    int cell = targets[i] >= 0 ? targets[i] : -2 - targets[i];
+    if (arena->snakes[i].alive && cell >= 0)
+      arena->claims[cell] = 0;
+  }
+
+  // Remove the dead before anyone moves, then move the survivors
+  int survivors = 0;
+  uint64_t moves = 0, ended = 0;
+  for (int i = 0; i < arena->snake_count; i++) {
+    ArenaSnake *snake = &arena->snakes[i];
+    if (snake->alive && targets[i] < 0) {
+      arena_clear_snake(arena, snake);
+      ended++;
+    }
+  }
+  for (int i = 0; i < arena->snake_count; i++) {
+    ArenaSnake *snake = &arena->snakes[i];
+    int cell = targets[i];
+    if (!snake->alive)
+      continue;
+    bool eats = arena->owner[cell] <= ARENA_FOOD;
+    if (eats) {
+      arena_remove_food(arena, cell);
+      if (arena_grow_body(snake)) {
+        snake->length++;
+        snake->score += 10;
+      } else {
+        eats = false;
+      }
+    } else {
+      arena_take_free(arena, cell);
+    }
+    if (!eats) {
+      Position tail = *arena_segment(snake, snake->length - 1);
+      arena_release(arena, arena_cell(arena, tail));
+    }
+    snake->head = snake->head == 0 ? snake->capacity - 1 : snake->head - 1;
+    snake->segments[snake->head].x = cell % arena->width;
+    snake->segments[snake->head].y = cell / arena->width;
+    arena->owner[cell] = i;
+    moves++;
+    survivors++;
+  }
+  arena_place_food(arena);
+  arena->tick++;
+  count_moves(moves, ended);
+
+  read_arena_results(arena, scores, alive, heads, lengths);
+  return survivors;
+}
+
+__attribute__((visibility("default"))) void *
+create_arena(int width, int height, int snakes, int food) {
+  return (void *)create_arena_internal(width, height, snakes, food,
+                                       next_default_seed());
+}
+
+__attribute__((visibility("default"))) void *
+create_arena_seeded(int width, int height, int snakes, int food,
+                    uint64_t seed) {
+  return (void *)create_arena_internal(width, height, snakes, food, seed);
+}
+
+__attribute__((visibility("default"))) void destroy_arena(void *arena) {
+  free_arena_internal((Arena *)arena);
+}
+
+__attribute__((visibility("default"))) int
+step_arena(void *arena, const signed char *directions, int *scores,
+           unsigned char *alive, int *heads, int *lengths) {
+  return step_arena_internal((Arena *)arena, directions, scores, alive, heads,
+                             lengths);
+}
+
+__attribute__((visibility("default"))) void
+read_arena(void *arena, int *scores, unsigned char *alive, int *heads,
+           int *lengths) {
+  if (arena)
+    read_arena_results((Arena *)arena, scores, alive, heads, lengths);
+}
+
+__attribute__((visibility("default"))) bool spawn_arena_snake(void *arena,
+                                                             int index) {
+  return arena_spawn_internal((Arena *)arena, index);
+}
+
+__attribute__((visibility("default"))) bool
+spawn_arena_snake_at(void *arena_ptr, int index, int x, int y,
+                     Direction direction) {
+  Arena *arena = (Arena *)arena_ptr;
+  if (!arena || index < 0 || index >= arena->snake_count || x < 0 ||
+      x >= arena->width || y < 0 || y >= arena->height || direction < UP ||
+      direction > LEFT)
+    return false;
+  return arena_spawn_at(arena, index, y * arena->width + x, direction);
+}
+
+__attribute__((visibility("default"))) void set_arena_food(void *arena_ptr,
+                                                          int food) {
+  Arena *arena = (Arena *)arena_ptr;
+  if (!arena || food < 0)
+    return;
+  int cells = arena->width * arena->height;
+  if (food > cells)
+    food = cells;
+  if (food > arena->food_target) {
+    int *grown = (int *)realloc(arena->food, sizeof(int) * (food + 1));
+    if (!grown) {
+      ERROR_LOG("Failed to grow arena food");
+      return;
+    }
+    arena->food = grown;
+  }
+  arena->food_target = food;
+  arena_place_food(arena);
+}
+
+__attribute__((visibility("default"))) int
+get_arena_snake(void *arena_ptr, int index, int *buffer, int max_segments) {
+  Arena *arena = (Arena *)arena_ptr;
+  if (!arena || index < 0 || index >= arena->snake_count)
+    return 0;
+  const ArenaSnake *snake = &arena->snakes[index];
+  if (buffer) {
+    int count = snake->length < max_segments ? snake->length : max_segments;
+    for (int i = 0; i < count; i++) {
+      const Position *pos = arena_segment(snake, i);
+      buffer[i * 2] = pos->x;
+      buffer[i * 2 + 1] = pos->y;
+    }
+  }
+  return snake->length;
+}
+
+__attribute__((visibility("default"))) int
+get_arena_snake_direction(void *arena_ptr, int index) {
+  Arena *arena = (Arena *)arena_ptr;
+  if (!arena || index < 0 || index >= arena->snake_count)
+    return -1;
+  return arena->snakes[index].direction;
+}
+
+__attribute__((visibility("default"))) int
+get_arena_food(void *arena_ptr, int *buffer, int max_food) {
+  Arena *arena = (Arena *)arena_ptr;
+  if (!arena)
+    return 0;
+  if (buffer) {
+    int count = arena->food_count < max_food ? arena->food_count : max_food;
+    for (int i = 0; i < count; i++) {
+      buffer[i * 2] = arena->food[i] % arena->width;
+      buffer[i * 2 + 1] = arena->food[i] / arena->width;
+    }
+  }
+  return arena->food_count;
+}
+
+__attribute__((visibility("default"))) int get_arena_cell(void *arena_ptr,
+                                                          int x, int y) {
+  Arena *arena = (Arena *)arena_ptr;
+  if (!arena || x < 0 || x >= arena->width || y < 0 || y >= arena->height)
+    return ARENA_WALL;
+  int owner = arena->owner[y * arena->width + x];
+  return owner <= ARENA_FOOD ? ARENA_FOOD : owner;
+}
+
+__attribute__((visibility("default"))) uint64_t get_arena_tick(void *arena) {
+  return arena ? ((Arena *)arena)->tick : 0;
+}
+
+// Planners. A suggestion comes from a breadth-first search outwards from the
+// food over the free cells, which gives every cell its distance to the food;
+// the head steps to its closest free neighbor. The path stays free while the
+// snake follows it: the cells the snake has occupied since the search are
+// the ones its head walked through, all further from the food than the head.
+// So the field of the previous tick is reused when the head is where the
+// last suggestion led, one move later, with the same food and no reset.
+// Tail cells freed meanwhile may open a shorter path, found by the next
+// search once the food is eaten.
+
+static const int move_dx[4] = {0, 1, 0, -1};
+static const int move_dy[4] = {-1, 0, 1, 0};
+
+// Turns tried from the current direction: straight, right, left
+static const int planner_turns[3] = {0, 1, 3};
+
+static bool planner_reserve(Planner *planner, int caches, int cells) {
+  if (caches > planner->cache_count) {
+    PlannerCache *grown = (PlannerCache *)realloc(
+        planner->caches, sizeof(PlannerCache) * (size_t)caches);
+    if (!grown)
+      return false;
+    for (int i = planner->cache_count; i < caches; i++) {
+      memset(&grown[i], 0, sizeof(PlannerCache));
+      grown[i].next = -1;
+    }
+    planner->caches = grown;
+    planner->cache_count = caches;
+  }
+  if (cells > planner->queue_size) {
+    int *queue = (int *)realloc(planner->queue, sizeof(int) * (size_t)cells);
+    if (!queue)
+      return false;
+    planner->queue = queue;
+    planner->queue_size = cells;
+  }
+  return true;
+}
+
+// Cell the head reaches by moving in `direction`, or -1 if the move loses
+static int free_neighbor(const Game *game, Position head, int direction) {
+  int x = head.x + move_dx[direction];
+  int y = head.y + move_dy[direction];
+  if (x < 0 || x >= game->width || y < 0 || y >= game->height ||
+      cell_occupied(game, x, y))
+    return -1;
+  return cell_index(game, x, y);
+}
+
+// Direction of the free neighbor of the head closest to the food, or -1 if
+// none has a distance. Sets cache->next to that neighbor.
+static int descend(const Game *game, PlannerCache *cache) {
+  Position head = *segment_at(game, 0);
+  int best = -1;
+  cache->next = -1;
+  for (int i = 0; i < 3; i++) {
+    int direction = (game->direction + planner_turns[i]) & 3;
+    int cell = free_neighbor(game, head, direction);
+    if (cell < 0 || cache->dist[cell] < 0)
+      continue;
+    if (best < 0 || cache->dist[cell] < cache->dist[cache->next]) {
+      best = direction;
+      cache->next = cell;
+    }
+  }
+  return best;
+}
+
+// Fill cache->dist from the food, stopping once a neighbor the head may move
+// to is reached: every cell closer to the food than that neighbor has its
+// distance by then, which is all that following the field ever reads.
+static void search_food(Planner *planner, const Game *game,
+                        PlannerCache *cache) {
+  int *dist = cache->dist;
+  int *queue = planner->queue;
+  for (int cell = 0; cell < cache->cells; cell++)
+    dist[cell] = -1;
+
+  Position food = game->food;
+  if (food.x < 0 || food.x >= game->width || food.y < 0 ||
+      food.y >= game->height || cell_occupied(game, food.x, food.y))
+    return;
+  const Position *head = segment_at(game, 0);
+  int target = cell_index(game, head->x, head->y);
+  int read = 0, write = 0;
+  dist[cache->food] = 0;
+  queue[write++] = cache->food;
+  while (read < write) {
+    int cell = queue[read++];
+    int x = cell % game->width;
+    int y = cell / game->width;
+    for (int direction = 0; direction < 4; direction++) {
+      int nx = x + move_dx[direction];
+      int ny = y + move_dy[direction];
+      if (nx < 0 || nx >= game->width || ny < 0 || ny >= game->height)
+        continue;
+      int next = cell_index(game, nx, ny);
+      // Reaching the head from the cell behind it is a 180-degree turn
+      if (next == target && direction != (int)game->direction) {
+        planner->stats[PLANNER_STAT_CELLS] += (uint64_t)read;
+        return;
+      }
+      if (dist[next] >= 0 || cell_occupied(game, nx, ny))
+        continue;
+      dist[next] = dist[cell] + 1;
+      queue[write++] = next;
+    }
+  }
+  planner->stats[PLANNER_STAT_CELLS] += (uint64_t)read;
+}
+
+// Free cells reachable from `start`, marking them with `mark` in marks
+static int flood_fill(Planner *planner, const Game *game, int *marks,
+                      int start, int mark) {
+  int *queue = planner->queue;
+  int read = 0, write = 0;
+  marks[start] = mark;
+  queue[write++] = start;
+  while (read < write) {
+    int cell = queue[read++];
+    int x = cell % game->width;
+    int y = cell / game->width;
+    for (int direction = 0; direction < 4; direction++) {
+      int nx = x + move_dx[direction];
+      int ny = y + move_dy[direction];
+      if (nx < 0 || nx >= game->width || ny < 0 || ny >= game->height)
+        continue;
+      int next = cell_index(game, nx, ny);
+      if (marks[next] >= 0 || cell_occupied(game, nx, ny))
+        continue;
+      marks[next] = mark;
+      queue[write++] = next;
+    }
+  }
+  planner->stats[PLANNER_STAT_CELLS] += (uint64_t)read;
+  return read;
+}
+
+// With no path to the food, head into the largest free region. The
+// distance field is used as scratch space and no longer reusable.
+static int fill_direction(Planner *planner, const Game *game,
+                          PlannerCache *cache) {
+  int *marks = cache->dist;
+  for (int cell = 0; cell < cache->cells; cell++)
+    marks[cell] = -1;
+  Position head = *segment_at(game, 0);
+  int sizes[4];
+  int best = -1, best_size = 0;
+  for (int i = 0; i < 3; i++) {
+    int direction = (game->direction + planner_turns[i]) & 3;
+    int cell = free_neighbor(game, head, direction);
+    if (cell < 0)
+      continue;
+    // Neighbors in one region share its size
+    sizes[direction] = marks[cell] >= 0
+                           ? sizes[marks[cell]]
+                           : flood_fill(planner, game, marks, cell, direction);
+    if (sizes[direction] > best_size) {
+      best = direction;
+      best_size = sizes[direction];
+    }
+  }
+  cache->next = -1;
+  return best;
+}
+
+static int plan_game(Planner *planner, PlannerCache *cache, const Game *game) {
+  if (!game || game->game_over)
+    return -1;
+  int cells = game->width * game->height;
+  if (!planner_reserve(planner, 0, cells)) {
+    ERROR_LOG("Failed to allocate planner queue");
+    return -1;
+  }
+  if (cache->cells != cells) {
+    free(cache->dist);
+    cache->dist = (int *)malloc(sizeof(int) * (size_t)cells);
+    cache->cells = cache->dist ? cells : 0;
+    cache->game = NULL;
+    if (!cache->dist) {
+      ERROR_LOG("Failed to allocate distance field");
+      return -1;
+    }
+  }
+
+  const Position *head = segment_at(game, 0);
+  int food = game->food.x < 0 ? -1
+                              : cell_index(game, game->food.x, game->food.y);
+  int direction = -1;
+  if (cache->game == game && cache->food == food &&
+      cache->reset_tick == game->reset_tick && cache->tick + 1 == game->tick &&
+      cache->next == cell_index(game, head->x, head->y)) {
+    direction = descend(game, cache);
+    if (direction >= 0)
+      planner->stats[PLANNER_STAT_REUSED]++;
+  }
+  if (direction < 0) {
+    planner->stats[PLANNER_STAT_SEARCHES]++;
+    cache->game = game;
+    cache->food = food;
+    search_food(planner, game, cache);
+    direction = descend(game, cache);
+    if (direction < 0) {
+      planner->stats[PLANNER_STAT_FILLS]++;
+      direction = fill_direction(planner, game, cache);
+    }
+  }
+  cache->tick = game->tick;
+  cache->reset_tick = game->reset_tick;
+  return direction;
+}
+
+static void free_planner_internal(Planner *planner) {
+  if (planner) {
+    for (int i = 0; i < planner->cache_count; i++)
+      free(planner->caches[i].dist);
+    free(planner->caches);
+    free(planner->queue);
+    free(planner);
+  }
+}
+
+static int plan_batch_internal(Planner *planner, GameBatch *batch,
+                               signed char *directions) {
+  if (!planner || !batch || !directions)
+    return 0;
+  if (!planner_reserve(planner, batch->count, 0)) {
+    ERROR_LOG("Failed to allocate planner caches");
+    return 0;
+  }
+  int planned = 0;
+  for (int i = 0; i < batch->count; i++) {
+    int direction = plan_game(planner, &planner->caches[i], batch->games[i]);
+    directions[i] = (signed char)direction;
+    planned += direction >= 0;
+  }
+  return planned;
+}
+
+__attribute__((visibility("default"))) void *create_planner(void) {
+  Planner *planner = (Planner *)calloc(1, sizeof(Planner));
+  if (!planner || !planner_reserve(planner, 1, 0)) {
+    ERROR_LOG("Failed to allocate planner");
+    free(planner);
+    return NULL;
+  }
+  return (void *)planner;
+}
+
+__attribute__((visibility("default"))) void destroy_planner(void *planner) {
+  free_planner_internal((Planner *)planner);
+}
+
+__attribute__((visibility("default"))) int plan_direction(void *planner_ptr,
+                                                          void *game) {
+  Planner *planner = (Planner *)planner_ptr;
+  if (!planner)
+    return -1;
+  return plan_game(planner, &planner->caches[0], (const Game *)game);
+}
+
+__attribute__((visibility("default"))) int
+plan_batch(void *planner, void *batch, signed char *directions) {
+  return plan_batch_internal((Planner *)planner, (GameBatch *)batch,
+                             directions);
+}
+
+__attribute__((visibility("default"))) void
+get_planner_stats(void *planner_ptr, uint64_t *stats) {
+  Planner *planner = (Planner *)planner_ptr;
+  for (int i = 0; i < PLANNER_STAT_COUNT; i++)
+    stats[i] = planner ? planner->stats[i] : 0;
+}
+
+// Observations. A frame is written whole: clearing it and drawing the snake
+// costs about as much as finding what changed since the previous frame.
+
+static void write_planes(const Game *game, unsigned char *frame) {
+  int cells = game->width * game->height;
+  unsigned char *body = frame + (size_t)OBS_BODY * cells;
+  memset(frame, 0, (size_t)OBS_PLANES * cells);
+  for (int i = 0; i < game->length; i++) {
+    const Position *pos = segment_at(game, i);
+    body[cell_index(game, pos->x, pos->y)] = 1;
+  }
+  const Position *head = segment_at(game, 0);
+  frame[(size_t)OBS_HEAD * cells + cell_index(game, head->x, head->y)] = 1;
+  if (game->food.x >= 0 && game->food.x < game->width && game->food.y >= 0 &&
+      game->food.y < game->height)
+    frame[(size_t)OBS_FOOD * cells +
+          cell_index(game, game->food.x, game->food.y)] = 1;
+}
+
+static void observe_game_internal(const Game *game, unsigned char *frames,
+                                  int stack, bool fresh) {
+  size_t frame = (size_t)OBS_PLANES * game->width * game->height;
+  unsigned char *last = frames + (size_t)(stack - 1) * frame;
+  if (!fresh && stack > 1)
+    memmove(frames, frames + frame, (size_t)(stack - 1) * frame);
+  write_planes(game, last);
+  if (fresh) {
+    for (int i = 0; i < stack - 1; i++)
+      memcpy(frames + (size_t)i * frame, last, frame);
+  }
+}
+
+__attribute__((visibility("default"))) void
+observe_game(void *game, unsigned char *frames, int stack, bool fresh) {
+  if (!game || !frames || stack < 1)
+    return;
+  observe_game_internal((const Game *)game, frames, stack, fresh);
+}
+
+__attribute__((visibility("default"))) void
+observe_batch(void *batch_ptr, unsigned char *frames, int stack,
+              const unsigned char *fresh) {
+  GameBatch *batch = (GameBatch *)batch_ptr;
+  if (!batch || !frames || stack < 1)
+    return;
+  for (int i = 0; i < batch->count; i++) {
+    const Game *game = batch->games[i];
+    size_t size = (size_t)stack * OBS_PLANES * game->width * game->height;
+    observe_game_internal(game, frames + (size_t)i * size, stack,
+                          fresh && fresh[i]);
+  }
+}
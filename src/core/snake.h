@@ -2,11 +2,15 @@
 #define SNAKE_H
 
 #include <stdbool.h>
+#include <stdint.h>
 
-// Grid dimensions
+// Default grid dimensions, used by create_game and create_batch
 #define GRID_WIDTH 20
 #define GRID_HEIGHT 20
 
+// Largest board accepted by the sized constructors
+#define MAX_GRID_CELLS (1 << 24)
+
 // Struct definitions for use in tests and other files
 
 typedef struct {
@@ -16,31 +20,364 @@ typedef struct {
 
 typedef enum { UP, RIGHT, DOWN, LEFT } Direction;
 
+// Each game draws food positions from its own xorshift64* generator, so games
+// are reproducible from their seed and share no hidden state.
+//
+// The snake body is a circular buffer: segment i (0 = head) lives at
+// segments[(head + i) % capacity]. Moving writes one new head slot and drops
+// the tail slot, so a move never shifts the body. The occupancy bitmap has
+// one bit per grid cell and makes collision checks O(1). Cells not covered by
+// the snake are also kept in free_cells (free_slot maps a cell back to its
+// index there), so food is placed in O(1) at any fill level.
+//
+// tick counts body changes: it advances on every move and on every reset,
+// and is never rewound. reset_tick is the tick of the last reset. A client
+// that saw the body at tick t, with reset_tick <= t, can catch up from the
+// tick - t newest segments alone (see get_game_delta).
 typedef struct {
+  int width;
+  int height;
   Position *segments;
+  int head;
   int length;
   int capacity;
   Direction direction;
   Position food;
   int score;
   bool game_over;
+  bool won;
   float speed;
+  unsigned char *occupied;
+  int *free_cells;
+  int *free_slot;
+  int free_count;
+  uint64_t seed;
+  uint64_t rng_state;
+  uint64_t tick;
+  uint64_t reset_tick;
 } Game;
 
+// Counters written by get_game_pool_stats
+enum {
+  POOL_STAT_ALLOCATED,    // games allocated from the system
+  POOL_STAT_REUSED,       // games taken from the pool instead
+  POOL_STAT_FREED,        // games returned to the system
+  POOL_STAT_POOLED,       // games in the pool now
+  POOL_STAT_POOLED_BYTES, // bytes held by the pool now
+  POOL_STAT_COUNT
+};
+
+// A set of independent games stepped together by step_batch
+typedef struct {
+  Game **games;
+  int count;
+} GameBatch;
+
+// One snake of an arena. The body is a ring buffer like Game's, but sized for
+// the snake rather than the board and doubled as it grows.
+typedef struct {
+  Position *segments;
+  int head;
+  int length;
+  int capacity;
+  Direction direction;
+  int score;
+  bool alive;
+} ArenaSnake;
+
+// Values of get_arena_cell other than a snake index
+#define ARENA_EMPTY (-1)
+#define ARENA_FOOD (-2)
+#define ARENA_WALL (-3) // outside the board
+
+// Many snakes on one board, moved together by step_arena. owner holds for
+// every cell the index of the snake covering it, ARENA_EMPTY, or for food
+// ARENA_FOOD minus its index in `food`. Empty cells are also listed in
+// free_cells (free_slot maps a cell back to its index there) for O(1)
+// spawning and food placement. claims and targets are scratch space for
+// step_arena.
+typedef struct {
+  int width;
+  int height;
+  int snake_count;
+  ArenaSnake *snakes;
+  int *targets;
+  int *owner;
+  int *claims;
+  int *free_cells;
+  int *free_slot;
+  int free_count;
+  int *food;
+  int food_count;
+  int food_target;
+  uint64_t seed;
+  uint64_t rng_state;
+  uint64_t tick;
+} Arena;
+
+// Counters written by get_planner_stats
+enum {
+  PLANNER_STAT_SEARCHES, // distance fields computed
+  PLANNER_STAT_REUSED,   // suggestions made from a cached distance field
+  PLANNER_STAT_FILLS,    // suggestions made by flood fill, with no path to food
+  PLANNER_STAT_CELLS,    // cells visited by searches and flood fills
+  PLANNER_STAT_COUNT
+};
+
+// Distance field of one game, kept by a planner between ticks
+typedef struct {
+  int *dist;           // steps from each cell to the food, -1 if not reached
+  int cells;           // cells covered by dist
+  const Game *game;    // game the field was computed for
+  int food;            // food cell, where dist is 0
+  int next;            // cell the last suggestion leads to, -1 if none
+  uint64_t tick;       // game tick of the last suggestion
+  uint64_t reset_tick; // reset_tick of the game at that time
+} PlannerCache;
+
+// Suggests moves for games (see plan_direction). caches holds one distance
+// field per game planned by plan_batch, the first one serving
+// plan_direction; queue is scratch space shared by the searches.
+typedef struct {
+  PlannerCache *caches;
+  int cache_count;
+  int *queue;
+  int queue_size;
+  uint64_t stats[PLANNER_STAT_COUNT];
+} Planner;
+
+// Log levels for messages emitted by the core. DEBUG messages are only
+// compiled in when building with -DSNAKE_DEBUG.
+typedef enum { SNAKE_LOG_NONE, SNAKE_LOG_ERROR, SNAKE_LOG_DEBUG } LogLevel;
+
+// Receives formatted log messages instead of them being printed
+typedef void (*LogCallback)(int level, const char *message);
+
+// Layout of the header written by get_game_snapshot. Snake segments follow
+// the header as interleaved x, y pairs, head first.
+enum {
+  SNAPSHOT_LENGTH,
+  SNAPSHOT_FOOD_X,
+  SNAPSHOT_FOOD_Y,
+  SNAPSHOT_SCORE,
+  SNAPSHOT_DIRECTION,
+  SNAPSHOT_GAME_OVER,
+  SNAPSHOT_WON,
+  SNAPSHOT_WIDTH,
+  SNAPSHOT_HEIGHT,
+  SNAPSHOT_HEADER_SIZE
+};
+
+// Packed binary state written by encode_game_state. All integers are little
+// endian. The fixed header is followed by the food position and then `count`
+// snake segments (head first), each coordinate STATE_COORD_BYTES wide:
+// 1 byte when both board sides are at most 256 cells, 2 up to 65536, else 4.
+// When the game is won there is no food and its coordinates are 0.
+#define STATE_FORMAT_VERSION 1
+enum {
+  STATE_VERSION = 0,     // u8
+  STATE_FLAGS = 1,       // u8, STATE_FLAG_* bits
+  STATE_DIRECTION = 2,   // u8
+  STATE_COORD_BYTES = 3, // u8
+  STATE_WIDTH = 4,       // u32
+  STATE_HEIGHT = 8,      // u32
+  STATE_SCORE = 12,      // u32
+  STATE_LENGTH = 16,     // u32
+  STATE_COUNT = 20,      // u32, segments that follow the food position
+  STATE_TICK = 24,       // u64
+  STATE_HEADER_SIZE = 32
+};
+enum {
+  STATE_FLAG_GAME_OVER = 1,
+  STATE_FLAG_WON = 2,
+  STATE_FLAG_KEYFRAME = 4 // segments are the whole snake, not a delta
+};
+
+// Saved game written by serialize_game. All integers are little endian.
+// The header is followed by the body, stored as the direction from each
+// segment to the next one towards the tail (2 bits each, four per byte,
+// lowest bits first), and then the free-cell list in its exact order, each
+// cell index SAVE_CELL_BYTES wide: 1 byte when the board has at most 256
+// cells, 2 up to 65536, else 3. Keeping the free-cell order makes a restored
+// game place food exactly where the original would have.
+#define SAVE_MAGIC_VALUE 0x474B4E53 // "SNKG"
+#define SAVE_FORMAT_VERSION 1
+#define SAVE_NO_FOOD 0xFFFFFFFFu
+enum {
+  SAVE_MAGIC = 0,       // u32
+  SAVE_VERSION = 4,     // u8
+  SAVE_FLAGS = 5,       // u8, STATE_FLAG_GAME_OVER and STATE_FLAG_WON
+  SAVE_DIRECTION = 6,   // u8
+  SAVE_WIDTH = 8,       // u32
+  SAVE_HEIGHT = 12,     // u32
+  SAVE_SCORE = 16,      // u32
+  SAVE_LENGTH = 20,     // u32
+  SAVE_SPEED = 24,      // f32
+  SAVE_FOOD = 28,       // u32 cell index, SAVE_NO_FOOD when there is none
+  SAVE_SEED = 32,       // u64
+  SAVE_RNG_STATE = 40,  // u64
+  SAVE_TICK = 48,       // u64
+  SAVE_RESET_TICK = 56, // u64
+  SAVE_HEAD = 64,       // u32 cell index of the head
+  SAVE_HEADER_SIZE = 68
+};
+
 // Core game functions
 void *create_game(void);
+void *create_game_seeded(uint64_t seed);
+void *create_game_sized(int width, int height);
+void *create_game_sized_seeded(int width, int height, uint64_t seed);
+void reset_game(void *game);
+void reset_game_seeded(void *game, uint64_t seed);
+uint64_t get_game_seed(void *game);
 void destroy_game(void *game);
 bool move_snake(void *game);
+// Move up to `moves` times, stopping early if the game ends. Returns the
+// number of moves made (the tick advances by the same amount).
+int advance_game(void *game, int moves);
 void change_direction(void *game, Direction new_direction);
 bool is_game_over(void *game);
+bool is_game_won(void *game);
 int get_score(void *game);
 int get_snake_length(void *game);
+Direction get_snake_direction(void *game);
 void get_snake_positions(void *game, Position *positions);
 void get_food_position(void *game, Position *position);
 void set_food_position(void *game, int x, int y); // Only for testing
+int get_game_snapshot(void *game, int *buffer, int max_segments);
+uint64_t get_game_tick(void *game);
+// Like get_game_snapshot, but only writes the segments a client that last saw
+// tick `since` is missing (head first), or the whole snake when the client
+// needs a keyframe. Returns the number of segments needed, which may exceed
+// max_segments, and stores the current tick in *tick.
+int get_game_delta(void *game, uint64_t since, int *buffer, int max_segments,
+                   uint64_t *tick);
+// Encode the state, or the delta since tick `since` (see get_game_delta), in
+// the packed format above. Returns the encoded size in bytes; nothing is
+// written if that exceeds capacity.
+int encode_game_state(void *game, uint64_t since, unsigned char *buffer,
+                      int capacity);
+// Write a saved copy of the game to `buffer` and return its size in bytes.
+// Nothing is written if the size exceeds `capacity`.
+int serialize_game(void *game, unsigned char *buffer, int capacity);
+// Create a game from serialize_game output, or return NULL if it is invalid.
+// The game continues exactly like the original, including its tick.
+void *deserialize_game(const unsigned char *data, int size);
+// Replace a game's state with a saved game. Counts as a reset for delta
+// clients: the tick moves past both games' ticks. Returns false, leaving the
+// game unchanged, if the data is invalid.
+bool restore_game(void *game, const unsigned char *data, int size);
+// 64-bit hash of everything that determines how the game plays on: board,
+// snake, food, score, flags, tick and generator state (not speed). Equal
+// games have equal hashes, so replays can be checked against recordings.
+uint64_t get_game_hash(void *game);
+// Destroyed games are pooled and reused by the constructors. The pool keeps
+// at most max_games games (0 disables it, up to 65536) and max_bytes bytes;
+// lowering the limits frees what no longer fits. Defaults: 1024 games, 64 MiB.
+void set_game_pool_limits(int max_games, uint64_t max_bytes);
+// Writes POOL_STAT_COUNT counters, indexed by the POOL_STAT_* values above.
+void get_game_pool_stats(uint64_t *stats);
+// Totals over every game in this process: moves made and games that ended
+// (lost or won). Either pointer may be NULL.
+void get_engine_stats(uint64_t *moves, uint64_t *games_over);
 void set_game_speed(void *game, float speed);
 float get_game_speed(void *game);
 
+// Batched stepping. Directions are one signed byte per game (-1 keeps the
+// current direction). Any output array may be NULL; heads and food hold
+// interleaved x, y pairs.
+void *create_batch(int count);
+void *create_batch_seeded(int count, uint64_t seed);
+void *create_batch_sized(int count, int width, int height);
+void *create_batch_sized_seeded(int count, int width, int height,
+                                uint64_t seed);
+void destroy_batch(void *batch);
+int batch_size(void *batch);
+void *batch_game(void *batch, int index);
+int step_batch(void *batch, const signed char *directions, int *scores,
+               unsigned char *game_over, int *heads, int *food);
+void reset_batch(void *batch, const unsigned char *mask, int *scores,
+                 unsigned char *game_over, int *heads, int *food);
+
+// Arenas: `snakes` snakes on one board with `food` pieces of food, all
+// spawned at random empty cells with random directions. Each step_arena call
+// moves every live snake once, simultaneously: a head that would leave the
+// board or enter any body (tails included) dies, as do heads entering the
+// same cell, and dead snakes are removed from the board. Eating scores 10
+// and grows the snake; eaten food is replaced. Directions and outputs work
+// like step_batch; heads of dead snakes are (-1, -1). Returns the number of
+// live snakes. Deaths count as games over in get_engine_stats.
+void *create_arena(int width, int height, int snakes, int food);
+void *create_arena_seeded(int width, int height, int snakes, int food,
+                          uint64_t seed);
+void destroy_arena(void *arena);
+int step_arena(void *arena, const signed char *directions, int *scores,
+               unsigned char *alive, int *heads, int *lengths);
+// Fill the step_arena outputs without moving
+void read_arena(void *arena, int *scores, unsigned char *alive, int *heads,
+                int *lengths);
+// (Re)spawn a snake with length 1, replacing it if it is alive. Returns false
+// if the board has no empty cell.
+bool spawn_arena_snake(void *arena, int index);
+// Like spawn_arena_snake, at a given cell and direction. Returns false, with
+// the snake removed, if the cell is not empty.
+bool spawn_arena_snake_at(void *arena, int index, int x, int y,
+                          Direction direction);
+// Change the amount of food kept on the board. Extra food is placed right
+// away; with less, existing food stays until eaten.
+void set_arena_food(void *arena, int food);
+// Write up to max_segments segments (x, y pairs, head first) and return the
+// snake's length (0 when dead)
+int get_arena_snake(void *arena, int index, int *buffer, int max_segments);
+int get_arena_snake_direction(void *arena, int index);
+// Write up to max_food food positions (x, y pairs) and return the food count
+int get_arena_food(void *arena, int *buffer, int max_food);
+// Index of the snake covering a cell, or ARENA_EMPTY, ARENA_FOOD, ARENA_WALL
+int get_arena_cell(void *arena, int x, int y);
+uint64_t get_arena_tick(void *arena);
+
+// Planners suggest a safe move for a game: the first step of a shortest path
+// to the food that avoids the walls and the whole body, preferring to keep
+// going straight. When the food cannot be reached, the move leading to the
+// most free cells is suggested instead. Returns the direction, or -1 when
+// every move loses or the game is over. The distance field is cached and
+// reused on the next tick while the snake follows the suggestions; its path
+// stays free, but is only shortest as of the search that found it. A
+// planner must not be used from two threads at once.
+void *create_planner(void);
+void destroy_planner(void *planner);
+int plan_direction(void *planner, void *game);
+// Write a suggestion (or -1) for every game of a batch into `directions`,
+// ready for step_batch, keeping one distance field per game. Returns the
+// number of games given a direction.
+int plan_batch(void *planner, void *batch, signed char *directions);
+// Writes PLANNER_STAT_COUNT counters, indexed by the PLANNER_STAT_* values
+void get_planner_stats(void *planner, uint64_t *stats);
+
+// Observation planes written by observe_game, one byte per cell each
+enum {
+  OBS_BODY, // every segment, head included
+  OBS_HEAD,
+  OBS_FOOD,
+  OBS_PLANES
+};
+
+// Write the game as OBS_PLANES planes (1 where the plane's object is, else 0)
+// into the last of `stack` frames at `frames`, each frame OBS_PLANES *
+// width * height bytes, after moving the older frames one frame back. With
+// `fresh`, as at the start of an episode, every frame gets the current
+// planes instead.
+void observe_game(void *game, unsigned char *frames, int stack, bool fresh);
+// observe_game for every game of a batch, the frames of game i starting at
+// frames + i * stack * OBS_PLANES * width * height. fresh may be NULL.
+void observe_batch(void *batch, unsigned char *frames, int stack,
+                   const unsigned char *fresh);
+
+// Logging (process-wide)
+void set_log_level(int level);
+int get_log_level(void);
+void set_log_callback(LogCallback callback);
+
 // Wrapper functions for Python API
 void *create_game_wrapper(void);
 void free_game_wrapper(void *game);
@@ -0,0 +1,369 @@
+// Optional CPython extension: a native fast path for SnakeAPI.
+//
+// The module wraps one game of libsnake.so per `Game` object and builds the
+// Python results (tuples, lists and the state dict) directly from the game
+// struct, without ctypes marshalling or intermediate buffers. It links
+// against libsnake.so instead of compiling the engine in, so games, the game
+// pool, engine counters and logging are shared with the ctypes binding and
+// `address` can be passed to any libsnake function.
+//
+// Every method holds the game's lock, which is also exposed as a context
+// manager so that SnakeAPI serializes its ctypes calls on the same game with
+// it. Short calls run with the GIL held; the GIL is only released to wait for
+// the lock and for long runs of moves.
+//
+// Build with `make build-ext`; SnakeAPI loads it from the directory of the
+// library it uses.
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <pythread.h>
+
+#include "snake.h"
+
+// advance() releases the GIL from this many moves on
+#define ADVANCE_RELEASE_GIL_MOVES 256
+
+typedef struct {
+  PyObject_HEAD Game *game;
+  PyThread_type_lock lock;
+} GameObject;
+
+static PyObject *direction_names[4];
+static PyObject *key_tick, *key_length, *key_food, *key_score, *key_direction,
+    *key_game_over, *key_won, *key_width, *key_height, *key_snake;
+
+static void lock_game(GameObject *self) {
+  if (!PyThread_acquire_lock(self->lock, NOWAIT_LOCK)) {
+    Py_BEGIN_ALLOW_THREADS PyThread_acquire_lock(self->lock, WAIT_LOCK);
+    Py_END_ALLOW_THREADS
+  }
+}
+
+static void unlock_game(GameObject *self) { PyThread_release_lock(self->lock); }
+
+// Lock the game, or raise RuntimeError if it was closed
+static Game *locked_game(GameObject *self) {
+  lock_game(self);
+  if (!self->game) {
+    unlock_game(self);
+    PyErr_SetString(PyExc_RuntimeError, "Game instance not initialized");
+    return NULL;
+  }
+  return self->game;
+}
+
+static int direction_value(PyObject *name) {
+  if (PyUnicode_Check(name)) {
+    for (int i = 0; i < 4; i++) {
+      if (PyUnicode_Compare(name, direction_names[i]) == 0)
+        return i;
+    }
+  }
+  PyErr_Clear();
+  PyErr_SetString(PyExc_ValueError, "Invalid direction");
+  return -1;
+}
+
+static PyObject *position_tuple(Position pos) {
+  PyObject *tuple = PyTuple_New(2);
+  if (!tuple)
+    return NULL;
+  PyObject *x = PyLong_FromLong(pos.x), *y = PyLong_FromLong(pos.y);
+  if (!x || !y) {
+    Py_XDECREF(x);
+    Py_XDECREF(y);
+    Py_DECREF(tuple);
+    return NULL;
+  }
+  PyTuple_SET_ITEM(tuple, 0, x);
+  PyTuple_SET_ITEM(tuple, 1, y);
+  return tuple;
+}
+
+static PyObject *snake_list(const Game *game) {
+  PyObject *list = PyList_New(game->length);
+  if (!list)
+    return NULL;
+  int index = game->head;
+  for (int i = 0; i < game->length; i++) {
+    PyObject *pos = position_tuple(game->segments[index]);
+    if (!pos) {
+      Py_DECREF(list);
+      return NULL;
+    }
+    PyList_SET_ITEM(list, i, pos);
+    if (++index == game->capacity)
+      index = 0;
+  }
+  return list;
+}
+
+static int set_item(PyObject *dict, PyObject *key, PyObject *value) {
+  if (!value)
+    return -1;
+  int result = PyDict_SetItem(dict, key, value);
+  Py_DECREF(value);
+  return result;
+}
+
+static PyObject *state_dict(const Game *game) {
+  PyObject *state = PyDict_New();
+  if (!state)
+    return NULL;
+  // Same keys, in the same order, as SnapshotReader.state
+  if (set_item(state, key_tick, PyLong_FromUnsignedLongLong(game->tick)) ||
+      set_item(state, key_length, PyLong_FromLong(game->length)) ||
+      set_item(state, key_food, position_tuple(game->food)) ||
+      set_item(state, key_score, PyLong_FromLong(game->score)) ||
+      PyDict_SetItem(state, key_direction,
+                     direction_names[game->direction & 3]) ||
+      PyDict_SetItem(state, key_game_over,
+                     game->game_over ? Py_True : Py_False) ||
+      PyDict_SetItem(state, key_won, game->won ? Py_True : Py_False) ||
+      set_item(state, key_width, PyLong_FromLong(game->width)) ||
+      set_item(state, key_height, PyLong_FromLong(game->height)) ||
+      set_item(state, key_snake, snake_list(game))) {
+    Py_DECREF(state);
+    return NULL;
+  }
+  return state;
+}
+
+static int Game_init(GameObject *self, PyObject *args, PyObject *kwds) {
+  static char *kwlist[] = {"width", "height", "seed", NULL};
+  int width = GRID_WIDTH, height = GRID_HEIGHT;
+  PyObject *seed = Py_None;
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "|iiO", kwlist, &width, &height,
+                                   &seed))
+    return -1;
+  if (self->game) {
+    PyErr_SetString(PyExc_RuntimeError, "Game already initialized");
+    return -1;
+  }
+  if (seed == Py_None) {
+    self->game = create_game_sized(width, height);
+  } else {
+    unsigned long long value = PyLong_AsUnsignedLongLongMask(seed);
+    if (value == (unsigned long long)-1 && PyErr_Occurred())
+      return -1;
+    self->game = create_game_sized_seeded(width, height, value);
+  }
+  if (!self->game) {
+    PyErr_SetString(PyExc_RuntimeError, "Failed to create game instance");
+    return -1;
+  }
+  return 0;
+}
+
+static PyObject *Game_new(PyTypeObject *type, PyObject *args, PyObject *kwds) {
+  (void)args;
+  (void)kwds;
+  GameObject *self = (GameObject *)type->tp_alloc(type, 0);
+  if (!self)
+    return NULL;
+  self->game = NULL;
+  self->lock = PyThread_allocate_lock();
+  if (!self->lock) {
+    Py_DECREF(self);
+    return PyErr_NoMemory();
+  }
+  return (PyObject *)self;
+}
+
+static void Game_dealloc(GameObject *self) {
+  if (self->game)
+    destroy_game(self->game);
+  if (self->lock)
+    PyThread_free_lock(self->lock);
+  Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+static PyObject *Game_close(GameObject *self, PyObject *unused) {
+  (void)unused;
+  lock_game(self);
+  if (self->game) {
+    destroy_game(self->game);
+    self->game = NULL;
+  }
+  unlock_game(self);
+  Py_RETURN_NONE;
+}
+
+static PyObject *Game_enter(GameObject *self, PyObject *unused) {
+  (void)unused;
+  lock_game(self);
+  Py_RETURN_NONE;
+}
+
+static PyObject *Game_exit(GameObject *self, PyObject *args) {
+  (void)args;
+  unlock_game(self);
+  Py_RETURN_FALSE;
+}
+
+static PyObject *Game_move(GameObject *self, PyObject *unused) {
+  (void)unused;
+  Game *game = locked_game(self);
+  if (!game)
+    return NULL;
+  bool result = move_snake(game);
+  unlock_game(self);
+  return PyBool_FromLong(result);
+}
+
+static PyObject *Game_advance(GameObject *self, PyObject *arg) {
+  int moves = PyLong_AsLong(arg);
+  if (moves == -1 && PyErr_Occurred())
+    return NULL;
+  Game *game = locked_game(self);
+  if (!game)
+    return NULL;
+  int made;
+  if (moves >= ADVANCE_RELEASE_GIL_MOVES) {
+    Py_BEGIN_ALLOW_THREADS made = advance_game(game, moves);
+    Py_END_ALLOW_THREADS
+  } else {
+    made = advance_game(game, moves);
+  }
+  unlock_game(self);
+  return PyLong_FromLong(made);
+}
+
+static PyObject *Game_change_direction(GameObject *self, PyObject *arg) {
+  int value = direction_value(arg);
+  if (value < 0)
+    return NULL;
+  Game *game = locked_game(self);
+  if (!game)
+    return NULL;
+  change_direction(game, (Direction)value);
+  unlock_game(self);
+  Py_RETURN_NONE;
+}
+
+static PyObject *Game_step(GameObject *self, PyObject *args) {
+  PyObject *direction = Py_None;
+  if (!PyArg_UnpackTuple(args, "step", 0, 1, &direction))
+    return NULL;
+  int value = direction == Py_None ? -1 : direction_value(direction);
+  if (value < 0 && direction != Py_None)
+    return NULL;
+  Game *game = locked_game(self);
+  if (!game)
+    return NULL;
+  if (value >= 0)
+    change_direction(game, (Direction)value);
+  bool result = move_snake(game);
+  unlock_game(self);
+  return PyBool_FromLong(result);
+}
+
+// Getters read the struct directly under the game's lock
+#define GAME_GETTER(name, expr)                                                \
+  static PyObject *Game_##name(GameObject *self, PyObject *unused) {           \
+    (void)unused;                                                              \
+    Game *game = locked_game(self);                                            \
+    if (!game)                                                                 \
+      return NULL;                                                             \
+    PyObject *result = (expr);                                                 \
+    unlock_game(self);                                                         \
+    return result;                                                             \
+  }
+
+GAME_GETTER(is_game_over, PyBool_FromLong(game->game_over))
+GAME_GETTER(is_game_won, PyBool_FromLong(game->won))
+GAME_GETTER(get_score, PyLong_FromLong(game->score))
+GAME_GETTER(get_snake_length, PyLong_FromLong(game->length))
+GAME_GETTER(get_tick, PyLong_FromUnsignedLongLong(game->tick))
+GAME_GETTER(get_food_position, position_tuple(game->food))
+GAME_GETTER(get_snake_positions, snake_list(game))
+GAME_GETTER(get_state, state_dict(game))
+
+static PyObject *Game_get_address(GameObject *self, void *closure) {
+  (void)closure;
+  if (!self->game)
+    Py_RETURN_NONE;
+  return PyLong_FromVoidPtr(self->game);
+}
+
+static PyMethodDef Game_methods[] = {
+    {"close", (PyCFunction)Game_close, METH_NOARGS,
+     "Destroy the game. Later calls raise RuntimeError."},
+    {"__enter__", (PyCFunction)Game_enter, METH_NOARGS, "Acquire the lock."},
+    {"__exit__", (PyCFunction)Game_exit, METH_VARARGS, "Release the lock."},
+    {"move", (PyCFunction)Game_move, METH_NOARGS, "SnakeAPI.move"},
+    {"advance", (PyCFunction)Game_advance, METH_O, "SnakeAPI.advance"},
+    {"change_direction", (PyCFunction)Game_change_direction, METH_O,
+     "SnakeAPI.change_direction"},
+    {"step", (PyCFunction)Game_step, METH_VARARGS, "SnakeAPI.step"},
+    {"is_game_over", (PyCFunction)Game_is_game_over, METH_NOARGS,
+     "SnakeAPI.is_game_over"},
+    {"is_game_won", (PyCFunction)Game_is_game_won, METH_NOARGS,
+     "SnakeAPI.is_game_won"},
+    {"get_score", (PyCFunction)Game_get_score, METH_NOARGS,
+     "SnakeAPI.get_score"},
+    {"get_snake_length", (PyCFunction)Game_get_snake_length, METH_NOARGS,
+     "SnakeAPI.get_snake_length"},
+    {"get_tick", (PyCFunction)Game_get_tick, METH_NOARGS, "SnakeAPI.get_tick"},
+    {"get_food_position", (PyCFunction)Game_get_food_position, METH_NOARGS,
+     "SnakeAPI.get_food_position"},
+    {"get_snake_positions", (PyCFunction)Game_get_snake_positions, METH_NOARGS,
+     "SnakeAPI.get_snake_positions"},
+    {"get_state", (PyCFunction)Game_get_state, METH_NOARGS,
+     "SnakeAPI.get_state"},
+    {NULL, NULL, 0, NULL}};
+
+static PyGetSetDef Game_getset[] = {
+    {"address", (getter)Game_get_address, NULL,
+     "Pointer to the game in libsnake, or None once closed", NULL},
+    {NULL, NULL, NULL, NULL, NULL}};
+
+static PyTypeObject GameType = {
+    PyVarObject_HEAD_INIT(NULL, 0).tp_name = "_snake.Game",
+    .tp_doc = "Game(width=20, height=20, seed=None): one libsnake game",
+    .tp_basicsize = sizeof(GameObject),
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_new = Game_new,
+    .tp_init = (initproc)Game_init,
+    .tp_dealloc = (destructor)Game_dealloc,
+    .tp_methods = Game_methods,
+    .tp_getset = Game_getset,
+};
+
+static struct PyModuleDef snake_module = {
+    PyModuleDef_HEAD_INIT, .m_name = "_snake",
+    .m_doc = "Native fast path for SnakeAPI, see src/core/snake_ext.c",
+    .m_size = -1};
+
+PyMODINIT_FUNC PyInit__snake(void) {
+  static const char *names[] = {"up", "right", "down", "left"};
+  for (int i = 0; i < 4; i++) {
+    if (!(direction_names[i] = PyUnicode_InternFromString(names[i])))
+      return NULL;
+  }
+  if (!(key_tick = PyUnicode_InternFromString("tick")) ||
+      !(key_length = PyUnicode_InternFromString("length")) ||
+      !(key_food = PyUnicode_InternFromString("food")) ||
+      !(key_score = PyUnicode_InternFromString("score")) ||
+      !(key_direction = PyUnicode_InternFromString("direction")) ||
+      !(key_game_over = PyUnicode_InternFromString("game_over")) ||
+      !(key_won = PyUnicode_InternFromString("won")) ||
+      !(key_width = PyUnicode_InternFromString("width")) ||
+      !(key_height = PyUnicode_InternFromString("height")) ||
+      !(key_snake = PyUnicode_InternFromString("snake")))
+    return NULL;
+
+  if (PyType_Ready(&GameType) < 0)
+    return NULL;
+  PyObject *module = PyModule_Create(&snake_module);
+  if (!module)
+    return NULL;
+  Py_INCREF(&GameType);
+  if (PyModule_AddObject(module, "Game", (PyObject *)&GameType) < 0) {
+    Py_DECREF(&GameType);
+    Py_DECREF(module);
+    return NULL;
+  }
+  return module;
+}
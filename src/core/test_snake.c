@@ -1,4 +1,6 @@
 #include "snake.h"
+#include <stdlib.h>
+#include <string.h>
 #include <CUnit/Basic.h>
 #include <CUnit/CUnit.h>
 
@@ -106,6 +108,311 @@ static void test_boundaries(void) {
   CU_ASSERT_TRUE(is_game_over(game)); // Optionally assert that the game ends
 }
 
+static void test_body_wraps_ring_buffer(void) {
+  Game *g = create_game();
+  const Direction loop[] = {RIGHT, DOWN, LEFT, UP};
+
+  // Grow to three segments, then circle a 2x2 square long enough for the
+  // head index to wrap around the segment buffer several times
+  for (int i = 0; i < 2; i++) {
+    Position body[4];
+    get_snake_positions(g, body);
+    set_food_position(g, body[0].x + 1, body[0].y);
+    move_snake(g);
+  }
+  for (int i = 0; i < 4 * GRID_WIDTH * GRID_HEIGHT; i++) {
+    change_direction(g, loop[i % 4]);
+    move_snake(g);
+  }
+
+  CU_ASSERT_FALSE(is_game_over(g));
+  CU_ASSERT_EQUAL(get_snake_length(g), 3);
+
+  Position positions[3];
+  get_snake_positions(g, positions);
+  for (int i = 1; i < 3; i++) {
+    int dx = abs(positions[i].x - positions[i - 1].x);
+    int dy = abs(positions[i].y - positions[i - 1].y);
+    CU_ASSERT_EQUAL(dx + dy, 1);
+  }
+
+  destroy_game(g);
+}
+
+static void test_tail_collision(void) {
+  Game *g = create_game();
+  const Direction loop[] = {DOWN, LEFT, UP};
+
+  // A four-segment snake turning back onto itself hits its own tail
+  for (int i = 0; i < 3; i++) {
+    Position body[4];
+    get_snake_positions(g, body);
+    set_food_position(g, body[0].x + 1, body[0].y);
+    move_snake(g);
+  }
+  for (int i = 0; i < 3; i++) {
+    change_direction(g, loop[i]);
+    move_snake(g);
+  }
+
+  CU_ASSERT_TRUE(is_game_over(g));
+  destroy_game(g);
+}
+
+static void test_game_delta(void) {
+  Game *g = create_game();
+  int buffer[SNAPSHOT_HEADER_SIZE + 2 * 4];
+  uint64_t tick;
+
+  // Grow to three segments, then move once more
+  for (int i = 0; i < 2; i++) {
+    Position body[3];
+    get_snake_positions(g, body);
+    set_food_position(g, body[0].x + 1, body[0].y);
+    move_snake(g);
+  }
+  move_snake(g);
+  CU_ASSERT_EQUAL(get_game_tick(g), 3);
+
+  // A client at tick 2 only needs the newest head
+  CU_ASSERT_EQUAL(get_game_delta(g, 2, buffer, 4, &tick), 1);
+  CU_ASSERT_EQUAL(tick, 3);
+  CU_ASSERT_EQUAL(buffer[SNAPSHOT_LENGTH], 3);
+  CU_ASSERT_EQUAL(buffer[SNAPSHOT_HEADER_SIZE], GRID_WIDTH / 2 + 3);
+
+  // Too old or from the future: the whole snake
+  CU_ASSERT_EQUAL(get_game_delta(g, 0, buffer, 4, &tick), 3);
+  CU_ASSERT_EQUAL(get_game_delta(g, 4, buffer, 4, &tick), 3);
+
+  // Ticks before a reset need a keyframe
+  reset_game(g);
+  CU_ASSERT_EQUAL(get_game_tick(g), 4);
+  CU_ASSERT_EQUAL(get_game_delta(g, 3, buffer, 4, &tick), 1);
+  CU_ASSERT_EQUAL(get_game_delta(g, 4, buffer, 4, &tick), 0);
+  destroy_game(g);
+}
+
+// Put the food on the cell in front of the head
+static void feed(Game *g) {
+  Position head = g->segments[g->head];
+  Direction d = get_snake_direction(g);
+  set_food_position(g, head.x + (d == RIGHT) - (d == LEFT),
+                    head.y + (d == DOWN) - (d == UP));
+}
+
+static void test_serialize_game(void) {
+  // Grow the snake around a corner
+  Game *g = create_game_sized_seeded(8, 6, 42);
+  static const Direction path[] = {RIGHT, RIGHT, DOWN, DOWN, LEFT};
+  for (int i = 0; i < 5; i++) {
+    change_direction(g, path[i]);
+    if (i < 3)
+      feed(g);
+    move_snake(g);
+  }
+  CU_ASSERT_FALSE(is_game_over(g));
+
+  int size = serialize_game(g, NULL, 0);
+  CU_ASSERT_EQUAL(size, SAVE_HEADER_SIZE + (g->length + 2) / 4 +
+                            (48 - g->length));
+  unsigned char *data = malloc(size);
+  CU_ASSERT_EQUAL(serialize_game(g, data, size), size);
+
+  // The copy plays on exactly like the original, food included
+  Game *copy = deserialize_game(data, size);
+  CU_ASSERT_PTR_NOT_NULL_FATAL(copy);
+  CU_ASSERT_EQUAL(copy->tick, g->tick);
+  for (int i = 0; i < 3; i++) {
+    Position a[48], b[48];
+    feed(g);
+    feed(copy);
+    CU_ASSERT_TRUE(move_snake(g));
+    CU_ASSERT_TRUE(move_snake(copy));
+    get_snake_positions(g, a);
+    get_snake_positions(copy, b);
+    CU_ASSERT_EQUAL(get_snake_length(copy), get_snake_length(g));
+    CU_ASSERT_EQUAL(memcmp(a, b, sizeof(Position) * g->length), 0);
+    CU_ASSERT_EQUAL(copy->food.x, g->food.x);
+    CU_ASSERT_EQUAL(copy->food.y, g->food.y);
+    CU_ASSERT_EQUAL(copy->rng_state, g->rng_state);
+  }
+
+  // Corrupt or truncated data is rejected
+  CU_ASSERT_PTR_NULL(deserialize_game(data, size - 1));
+  data[SAVE_MAGIC] ^= 1;
+  CU_ASSERT_PTR_NULL(deserialize_game(data, size));
+  CU_ASSERT_FALSE(restore_game(copy, data, size));
+  data[SAVE_MAGIC] ^= 1;
+
+  // Restoring moves the tick past both games
+  uint64_t tick = copy->tick;
+  CU_ASSERT_TRUE(restore_game(copy, data, size));
+  CU_ASSERT_EQUAL(copy->tick, tick + 1);
+  CU_ASSERT_EQUAL(copy->reset_tick, copy->tick);
+
+  free(data);
+  destroy_game(copy);
+  destroy_game(g);
+}
+
+static void test_engine_stats(void) {
+  uint64_t moves, games_over;
+  get_engine_stats(&moves, &games_over);
+
+  Game *g = create_game_sized(5, 5);
+  CU_ASSERT_PTR_NOT_NULL_FATAL(g);
+  change_direction(g, UP);
+  move_snake(g);
+  int made = advance_game(g, 100);
+  CU_ASSERT_TRUE(is_game_over(g));
+  // Moving a finished game neither moves nor ends it again
+  move_snake(g);
+  advance_game(g, 5);
+
+  uint64_t moves_after, games_over_after;
+  get_engine_stats(&moves_after, &games_over_after);
+  CU_ASSERT_EQUAL(moves_after - moves, 1 + (uint64_t)made);
+  CU_ASSERT_EQUAL(games_over_after - games_over, 1);
+  destroy_game(g);
+}
+
+static void test_game_pool(void) {
+  uint64_t before[POOL_STAT_COUNT], after[POOL_STAT_COUNT];
+  Game *g = create_game_sized_seeded(7, 9, 42);
+  CU_ASSERT_PTR_NOT_NULL_FATAL(g);
+  advance_game(g, 3);
+  Game *fresh = create_game_sized_seeded(7, 9, 42);
+  uint64_t hash = get_game_hash(fresh);
+  destroy_game(fresh);
+  destroy_game(g);
+
+  // A game with the same number of cells reuses the memory, and plays
+  // exactly like a newly allocated one
+  get_game_pool_stats(before);
+  Game *reused = create_game_sized_seeded(9, 7, 42);
+  destroy_game(reused);
+  reused = create_game_sized_seeded(7, 9, 42);
+  get_game_pool_stats(after);
+  CU_ASSERT_EQUAL(after[POOL_STAT_ALLOCATED], before[POOL_STAT_ALLOCATED]);
+  CU_ASSERT_EQUAL(after[POOL_STAT_REUSED] - before[POOL_STAT_REUSED], 2);
+  CU_ASSERT_EQUAL(get_game_hash(reused), hash);
+
+  // Without a pool, destroyed games are freed
+  set_game_pool_limits(0, 0);
+  get_game_pool_stats(after);
+  CU_ASSERT_EQUAL(after[POOL_STAT_POOLED], 0);
+  CU_ASSERT_EQUAL(after[POOL_STAT_POOLED_BYTES], 0);
+  destroy_game(reused);
+  get_game_pool_stats(before);
+  CU_ASSERT_EQUAL(before[POOL_STAT_FREED] - after[POOL_STAT_FREED], 1);
+  set_game_pool_limits(1024, 64ULL << 20);
+}
+
+static void test_arena(void) {
+  // Two heads meeting on one cell both die, as does a head hitting a wall
+  Arena *arena = create_arena_seeded(5, 5, 3, 0, 7);
+  CU_ASSERT_PTR_NOT_NULL_FATAL(arena);
+  int xs[] = {0, 2, 4}, ys[] = {2, 2, 0};
+  Direction dirs[] = {RIGHT, LEFT, UP};
+  for (int pass = 0; pass < 2; pass++) {
+    for (int i = 0; i < 3; i++)
+      spawn_arena_snake_at(arena, i, xs[i], ys[i], dirs[i]);
+  }
+  CU_ASSERT_EQUAL(get_arena_cell(arena, 2, 2), 1);
+  unsigned char alive[3];
+  int heads[6];
+  CU_ASSERT_EQUAL(step_arena(arena, NULL, NULL, alive, heads, NULL), 0);
+  CU_ASSERT_FALSE(alive[0] || alive[1] || alive[2]);
+  CU_ASSERT_EQUAL(heads[0], -1);
+  CU_ASSERT_EQUAL(arena->free_count, 25);
+  CU_ASSERT_EQUAL(get_arena_cell(arena, 1, 2), ARENA_EMPTY);
+  destroy_arena(arena);
+
+  // A snake eating along a full row grows past its initial body buffer
+  arena = create_arena_seeded(64, 1, 1, 0, 1);
+  CU_ASSERT_PTR_NOT_NULL_FATAL(arena);
+  CU_ASSERT_TRUE(spawn_arena_snake_at(arena, 0, 0, 0, RIGHT));
+  set_arena_food(arena, 100);
+  CU_ASSERT_EQUAL(get_arena_food(arena, NULL, 0), 63);
+  int score, length;
+  for (int i = 0; i < 63; i++)
+    CU_ASSERT_EQUAL(step_arena(arena, NULL, &score, NULL, NULL, &length), 1);
+  CU_ASSERT_EQUAL(length, 64);
+  CU_ASSERT_EQUAL(score, 630);
+  CU_ASSERT_EQUAL(get_arena_food(arena, NULL, 0), 0);
+  int body[2 * 64];
+  CU_ASSERT_EQUAL(get_arena_snake(arena, 0, body, 64), 64);
+  CU_ASSERT_EQUAL(body[0], 63);
+  CU_ASSERT_EQUAL(body[2 * 63], 0);
+  CU_ASSERT_EQUAL(step_arena(arena, NULL, NULL, NULL, NULL, NULL), 0);
+  destroy_arena(arena);
+}
+
+static void test_planner(void) {
+  // Following the suggestions eats food, mostly from cached fields
+  Planner *planner = create_planner();
+  CU_ASSERT_PTR_NOT_NULL_FATAL(planner);
+  Game *g = create_game_sized_seeded(10, 10, 5);
+  for (int i = 0; i < 2000 && !is_game_over(g); i++) {
+    int direction = plan_direction(planner, g);
+    if (direction < 0)
+      break;
+    change_direction(g, (Direction)direction);
+    move_snake(g);
+  }
+  CU_ASSERT_TRUE(get_score(g) >= 100);
+  uint64_t stats[PLANNER_STAT_COUNT];
+  get_planner_stats(planner, stats);
+  CU_ASSERT_TRUE(stats[PLANNER_STAT_REUSED] > stats[PLANNER_STAT_SEARCHES]);
+  destroy_game(g);
+
+  // Food only reachable by turning back: head into the free cell, then give
+  // up when every move loses
+  uint64_t fills = stats[PLANNER_STAT_FILLS];
+  g = create_game_sized_seeded(3, 1, 1);
+  set_food_position(g, 0, 0);
+  CU_ASSERT_EQUAL(plan_direction(planner, g), RIGHT);
+  get_planner_stats(planner, stats);
+  CU_ASSERT_EQUAL(stats[PLANNER_STAT_FILLS], fills + 1);
+  move_snake(g);
+  CU_ASSERT_EQUAL(plan_direction(planner, g), -1);
+  destroy_game(g);
+
+  // Batches keep a distance field per game
+  GameBatch *batch = create_batch_sized_seeded(3, 8, 8, 2);
+  signed char directions[3];
+  CU_ASSERT_EQUAL(plan_batch(planner, batch, directions), 3);
+  CU_ASSERT_EQUAL(step_batch(batch, directions, NULL, NULL, NULL, NULL), 3);
+  CU_ASSERT_EQUAL(planner->cache_count, 3);
+  destroy_batch(batch);
+  destroy_planner(planner);
+}
+
+static void test_observe(void) {
+  // Frames shift back one at a time; fresh fills them all
+  Game *g = create_game_sized_seeded(4, 3, 1);
+  set_food_position(g, 0, 0);
+  unsigned char frames[2 * OBS_PLANES * 12];
+  observe_game(g, frames, 2, true);
+  CU_ASSERT_EQUAL(memcmp(frames, frames + OBS_PLANES * 12, OBS_PLANES * 12),
+                  0);
+  CU_ASSERT_EQUAL(frames[OBS_BODY * 12 + 1 * 4 + 2], 1);
+  CU_ASSERT_EQUAL(frames[OBS_HEAD * 12 + 1 * 4 + 2], 1);
+  CU_ASSERT_EQUAL(frames[OBS_FOOD * 12 + 0], 1);
+
+  move_snake(g);
+  observe_game(g, frames, 2, false);
+  unsigned char *newest = frames + OBS_PLANES * 12;
+  CU_ASSERT_EQUAL(frames[OBS_HEAD * 12 + 1 * 4 + 2], 1);
+  CU_ASSERT_EQUAL(newest[OBS_HEAD * 12 + 1 * 4 + 2], 0);
+  CU_ASSERT_EQUAL(newest[OBS_HEAD * 12 + 1 * 4 + 3], 1);
+  int drawn = 0;
+  for (int i = 0; i < OBS_PLANES * 12; i++)
+    drawn += newest[i];
+  CU_ASSERT_EQUAL(drawn, 3);
+  destroy_game(g);
+}
+
 // Test registry
 int main(void) {
   CU_pSuite pSuite = NULL;
@@ -129,7 +436,19 @@ int main(void) {
       (NULL ==
        CU_add_test(pSuite, "test food collision", test_food_collision)) ||
       (NULL == CU_add_test(pSuite, "test game over", test_game_over)) ||
-      (NULL == CU_add_test(pSuite, "test boundaries", test_boundaries))) {
+      (NULL == CU_add_test(pSuite, "test boundaries", test_boundaries)) ||
+      (NULL == CU_add_test(pSuite, "test body wraps ring buffer",
+                           test_body_wraps_ring_buffer)) ||
+      (NULL ==
+       CU_add_test(pSuite, "test tail collision", test_tail_collision)) ||
+      (NULL == CU_add_test(pSuite, "test game delta", test_game_delta)) ||
+      (NULL ==
+       CU_add_test(pSuite, "test serialize game", test_serialize_game)) ||
+      (NULL == CU_add_test(pSuite, "test engine stats", test_engine_stats)) ||
+      (NULL == CU_add_test(pSuite, "test game pool", test_game_pool)) ||
+      (NULL == CU_add_test(pSuite, "test arena", test_arena)) ||
+      (NULL == CU_add_test(pSuite, "test planner", test_planner)) ||
+      (NULL == CU_add_test(pSuite, "test observe", test_observe))) {
     CU_cleanup_registry();
     return CU_get_error();
   }
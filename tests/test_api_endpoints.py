@@ -86,3 +86,139 @@ def test_sequence_of_moves(test_client):
     # Assert game is not over after reset and snake exists
     assert not game_over
     assert len(data["snake"]) > 0
+
+
+def test_session_lifecycle(test_client):
+    """Test creating, playing and destroying a session."""
+    response = test_client.post("/api/game/session")
+    assert response.status_code == 201
+    session_id = json.loads(response.data)["session_id"]
+
+    response = test_client.post(f"/api/game/{session_id}/move")
+    assert response.status_code == 200
+    response = test_client.get(f"/api/game/{session_id}/state")
+    assert response.status_code == 200
+    assert not json.loads(response.data)["game_over"]
+
+    response = test_client.delete(f"/api/game/{session_id}")
+    assert response.status_code == 200
+    response = test_client.get(f"/api/game/{session_id}/state")
+    assert response.status_code == 404
+
+
+def test_game_setup_error(test_client, monkeypatch):
+    """Test that a game that cannot be created gives a JSON error."""
+    from examples.web import app as server
+    from src.api.sessions import SessionRegistry
+
+    def broken_factory():
+        raise RuntimeError("Library not found")
+
+    monkeypatch.setattr(server, "registry", SessionRegistry(factory=broken_factory))
+    for response in (
+        test_client.get("/api/game/state"),
+        test_client.post("/api/game/move"),
+        test_client.post("/api/game/session"),
+    ):
+        assert response.status_code == 400
+        assert json.loads(response.data) == {"error": "Library not found"}
+    assert test_client.get("/api/game/missing/state").status_code == 404
+
+
+def test_step(test_client):
+    """Test moving and fetching state in a single request."""
+    test_client.post("/api/game/reset")
+    initial = json.loads(test_client.get("/api/game/state").data)
+
+    response = test_client.post("/api/game/step?direction=up")
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    head_x, head_y = initial["snake"][0]
+    assert data["snake"][0] == [head_x, head_y - 1]
+    assert not data["game_over"]
+
+    response = test_client.post("/api/game/step", json={"direction": "sideways"})
+    assert response.status_code == 400
+
+
+def test_speed(test_client):
+    """Test setting the server-side tick speed."""
+    response = test_client.post("/api/game/speed", json={"speed": 2})
+    assert response.status_code == 200
+    assert json.loads(response.data)["speed"] == 2.0
+
+    assert test_client.post("/api/game/speed?speed=0").status_code == 400
+    assert test_client.post("/api/game/speed?speed=fast").status_code == 400
+    test_client.post("/api/game/speed?speed=1")
+
+
+def test_stream(test_client):
+    """Test that the event stream pushes frames as the server ticks the game."""
+    session_id = json.loads(test_client.post("/api/game/session").data)["session_id"]
+    test_client.post(f"/api/game/{session_id}/speed?speed=10")
+
+    response = test_client.get(f"/api/game/{session_id}/stream", buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    events = iter(response.response)
+    first = json.loads(next(events).decode()[len("data: "):])
+    second = json.loads(next(events).decode()[len("data: "):])
+    assert second["snake"][0] == [first["snake"][0][0] + 1, first["snake"][0][1]]
+    response.close()
+
+    test_client.delete(f"/api/game/{session_id}")
+    assert test_client.get("/api/game/missing/stream").status_code == 404
+
+
+def test_state_delta(test_client):
+    """Test fetching only the changes since a tick."""
+    from examples.web.app import init_game
+
+    test_client.post("/api/game/reset")
+    initial = json.loads(test_client.get("/api/game/state").data)
+    # Grow the snake so one move doesn't replace the whole body
+    x, y = initial["snake"][0]
+    init_game().set_food_position(x + 1, y)
+    state = json.loads(test_client.post("/api/game/step").data)
+
+    step = json.loads(test_client.post(f"/api/game/step?since={state['tick']}").data)
+    assert not step["keyframe"]
+    assert step["tick"] == state["tick"] + 1
+    assert step["head"] == [[state["snake"][0][0] + 1, state["snake"][0][1]]]
+    assert "snake" not in step
+
+    delta = json.loads(test_client.get(f"/api/game/state?since={step['tick']}").data)
+    assert delta["head"] == []
+
+    test_client.post("/api/game/reset")
+    delta = json.loads(test_client.get(f"/api/game/state?since={step['tick']}").data)
+    assert delta["keyframe"]
+    assert delta["snake"] == initial["snake"]
+
+    assert test_client.get("/api/game/state?since=-1").status_code == 400
+    response = test_client.post("/api/game/step?direction=up&since=x")
+    assert response.status_code == 400
+    assert json.loads(response.data)["error"] == "since must be a non-negative integer"
+
+
+def test_state_binary(test_client):
+    """Test requesting packed binary state through the Accept header."""
+    from src.api.snake_api import decode_state
+
+    test_client.post("/api/game/reset")
+    state = json.loads(test_client.get("/api/game/state").data)
+
+    headers = {"Accept": "application/octet-stream"}
+    response = test_client.get("/api/game/state", headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == "application/octet-stream"
+    decoded = decode_state(response.data)
+    assert decoded["snake"] == [tuple(segment) for segment in state["snake"]]
+    assert decoded["tick"] == state["tick"]
+
+    response = test_client.post(f"/api/game/step?since={state['tick']}", headers=headers)
+    assert decode_state(response.data)["tick"] == state["tick"] + 1
+
+    # Browsers accepting anything still get JSON
+    response = test_client.get("/api/game/state", headers={"Accept": "*/*"})
+    assert response.mimetype == "application/json"
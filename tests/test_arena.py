@@ -0,0 +1,113 @@
+"""Test suite for arenas of snakes sharing one board."""
+
+import random
+
+import pytest
+from src.api.arena import ARENA_EMPTY, ARENA_FOOD, ARENA_WALL, SnakeArena
+
+LIB_PATH = "build/libsnake.so"
+
+
+def place(arena, snakes):
+    """Move snakes to chosen cells, clearing every target first."""
+    for _ in range(2):
+        for index, (position, direction) in snakes.items():
+            arena.spawn(index, position, direction)
+
+
+def test_collisions():
+    """Test that heads meeting, walls and bodies all kill."""
+    arena = SnakeArena(4, LIB_PATH, seed=1, width=6, height=6, food=0)
+    place(
+        arena,
+        {
+            0: ((0, 2), "right"),
+            1: ((2, 2), "left"),
+            2: ((5, 0), "up"),
+            3: ((4, 4), "right"),
+        },
+    )
+    assert arena.get_cell(2, 2) == 1
+    assert arena.get_cell(-1, 0) == ARENA_WALL
+    assert arena.step() == 1
+    assert list(arena.alive) == [0, 0, 0, 1]
+    assert arena.heads[0:2].tolist() == [-1, -1]
+    assert arena.get_cell(1, 2) == ARENA_EMPTY
+    assert arena.get_snake(3) == [(5, 4)]
+
+    # A body blocks a head, even the tail of a snake that is moving on
+    assert arena.spawn(0, (5, 3), "down")
+    arena.change_direction(3, "down")
+    assert arena.step() == 1
+    assert list(arena.alive) == [0, 0, 0, 1]
+    assert arena.get_tick() == 2
+    assert arena.respawn_dead() == 3
+    assert all(arena.alive) and arena.dead() == []
+    arena.cleanup()
+
+
+def test_eating_grows_snake():
+    """Test that eating scores, grows the snake and replaces the food."""
+    arena = SnakeArena(1, LIB_PATH, seed=2, width=40, height=1, food=0)
+    place(arena, {0: ((0, 0), "right")})
+    arena.set_food(1000)
+    assert len(arena.get_food()) == 39
+    assert arena.get_cell(1, 0) == ARENA_FOOD
+    for _ in range(39):
+        arena.step()
+    assert arena.lengths[0] == 40 and arena.scores[0] == 390
+    assert arena.get_snake(0)[0] == (39, 0)
+    assert arena.get_food() == []
+    assert arena.step() == 0
+    assert arena.get_snake(0) == []
+    arena.cleanup()
+
+
+def test_board_stays_consistent():
+    """Test the occupancy grid against every snake over a random game."""
+    rng = random.Random(0)
+    arena = SnakeArena(30, LIB_PATH, seed=3, width=15, height=12, food=20)
+    other = SnakeArena(30, LIB_PATH, seed=3, width=15, height=12, food=20)
+    for _ in range(300):
+        directions = [rng.randrange(-1, 4) for _ in range(arena.count)]
+        assert arena.step(directions) == other.step(directions)
+        for index in arena.dead()[:3]:
+            arena.spawn(index)
+            other.spawn(index)
+
+        state = arena.get_state()
+        owners = {}
+        for index, snake in enumerate(state["snakes"]):
+            assert snake["alive"] == bool(snake["snake"])
+            assert len(snake["snake"]) == arena.lengths[index]
+            for cell in snake["snake"]:
+                assert cell not in owners
+                owners[cell] = index
+        for cell in state["food"]:
+            assert cell not in owners
+            owners[cell] = ARENA_FOOD
+        for x in range(arena.width):
+            for y in range(arena.height):
+                assert arena.get_cell(x, y) == owners.get((x, y), ARENA_EMPTY)
+        assert len(state["food"]) == 20
+    assert other.get_state() == state
+    arena.cleanup()
+    other.cleanup()
+
+
+def test_invalid_arguments():
+    """Test argument checks."""
+    with pytest.raises(ValueError):
+        SnakeArena(10, LIB_PATH, width=3, height=3)
+    arena = SnakeArena(2, LIB_PATH, width=5, height=5)
+    with pytest.raises(IndexError):
+        arena.spawn(2)
+    with pytest.raises(ValueError):
+        arena.change_direction(0, "sideways")
+    # Spawning on an occupied cell fails and leaves the snake dead
+    x, y = arena.get_snake(1)[0]
+    assert not arena.spawn(0, (x, y))
+    assert arena.alive[0] == 0
+    arena.cleanup()
+    with pytest.raises(RuntimeError):
+        arena.step()
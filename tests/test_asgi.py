@@ -0,0 +1,141 @@
+"""Test suite for the ASGI entry point."""
+
+import asyncio
+import json
+
+import asgi
+from src.api.snake_api import decode_state
+
+
+async def _request(method, path, body=b"", headers=()):
+    """Send one request through the ASGI app and collect the response."""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi.app(scope, receive, send)
+    status = sent[0]["status"]
+    headers = dict(sent[0]["headers"])
+    data = b"".join(m.get("body", b"") for m in sent[1:])
+    return status, headers, data
+
+
+def request(method, path, body=None, headers=()):
+    if body is not None:
+        body = json.dumps(body).encode()
+    return asyncio.run(_request(method, path, body or b"", headers))
+
+
+def request_json(method, path, body=None):
+    status, _, data = request(method, path, body)
+    return status, json.loads(data)
+
+
+def test_state_and_move():
+    """Test the legacy routes on the default session."""
+    assert request_json("POST", "/api/game/reset") == (200, {"success": True})
+    status, state = request_json("GET", "/api/game/state")
+    assert status == 200
+    assert request_json("POST", "/api/game/move")[0] == 200
+    status, moved = request_json("GET", "/api/game/state")
+    assert moved["snake"][0] == [state["snake"][0][0] + 1, state["snake"][0][1]]
+
+
+def test_sessions_and_step():
+    """Test session routes, step with a direction and delta state."""
+    status, created = request_json("POST", "/api/game/session")
+    assert status == 201
+    session = f"/api/game/{created['session_id']}"
+    status, state = request_json("GET", f"{session}/state")
+
+    status, stepped = request_json("POST", f"{session}/step", {"direction": "down"})
+    assert status == 200
+    assert stepped["snake"][0] == [state["snake"][0][0], state["snake"][0][1] + 1]
+    assert request_json("POST", f"{session}/direction/left")[0] == 200
+    assert request_json("POST", f"{session}/direction/sideways")[0] == 400
+
+    status, delta = request_json("GET", f"{session}/state?since={stepped['tick']}")
+    assert delta["head"] == [] and not delta["keyframe"]
+    assert request_json("GET", f"{session}/state?since=x")[0] == 400
+
+    assert request_json("POST", f"{session}/speed?speed=2") == (
+        200,
+        {"success": True, "speed": 2.0},
+    )
+    assert request_json("POST", f"{session}/speed", {"speed": -1})[0] == 400
+
+    assert request_json("DELETE", session) == (200, {"success": True})
+    assert request_json("GET", f"{session}/state")[0] == 404
+    assert request_json("DELETE", session)[0] == 404
+
+
+def test_binary_state():
+    """Test content negotiation for packed binary state."""
+    status, headers, data = request(
+        "GET", "/api/game/state", headers=[("Accept", "application/octet-stream")]
+    )
+    assert status == 200
+    assert headers[b"content-type"] == b"application/octet-stream"
+    assert decode_state(data)["keyframe"]
+
+    _, headers, _ = request("GET", "/api/game/state", headers=[("Accept", "*/*")])
+    assert headers[b"content-type"] == b"application/json"
+
+
+def test_unknown_routes():
+    """Test 404 and 405 responses."""
+    assert request_json("GET", "/api/nothing")[0] == 404
+    assert request_json("GET", "/api/game/move")[0] == 405
+
+
+def test_stream():
+    """Test that the event stream pushes frames until the client disconnects."""
+    _, created = request_json("POST", "/api/game/session")
+    session_id = created["session_id"]
+    request_json("POST", f"/api/game/{session_id}/speed?speed=10")
+
+    async def run():
+        sent = []
+        got_frames = asyncio.Event()
+        disconnect = asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+            if len(sent) == 3:
+                got_frames.set()
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": f"/api/game/{session_id}/stream",
+            "query_string": b"",
+            "headers": [],
+        }
+        task = asyncio.ensure_future(asgi.app(scope, receive, send))
+        await asyncio.wait_for(got_frames.wait(), 2)
+        disconnect.set()
+        await asyncio.wait_for(task, 2)
+        return sent
+
+    sent = asyncio.run(run())
+    assert sent[0]["status"] == 200
+    frames = [json.loads(m["body"].decode()[len("data: "):]) for m in sent[1:3]]
+    assert frames[1]["snake"][0] == [frames[0]["snake"][0][0] + 1, frames[0]["snake"][0][1]]
+    request("DELETE", f"/api/game/{session_id}")
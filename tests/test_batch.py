@@ -0,0 +1,64 @@
+"""Test suite for batched game stepping."""
+
+import pytest
+from src.api.batch import GameBatch, KEEP_DIRECTION
+from src.api.snake_api import SnakeAPI
+
+
+@pytest.fixture
+def batch():
+    games = GameBatch(8, "build/libsnake.so")
+    yield games
+    games.cleanup()
+
+
+def test_step_matches_single_games(batch):
+    """Test that batched moves match moving games one by one."""
+    single = SnakeAPI("build/libsnake.so")
+    directions = [0, 1, 2, 3, KEEP_DIRECTION, 0, 2, 1]
+    try:
+        assert batch.step(directions) == 8
+        single.step("up")
+        assert tuple(batch.heads[0:2]) == single.get_snake_positions()[0]
+        assert batch.get_state(0)["snake"] == single.get_snake_positions()
+    finally:
+        single.cleanup()
+    assert batch.heads.tolist() == [
+        10, 9, 11, 10, 10, 11, 11, 10, 11, 10, 10, 9, 10, 11, 11, 10
+    ]
+
+
+def test_game_over_and_reset(batch):
+    """Test game-over flags and resetting only finished games."""
+    for _ in range(11):
+        batch.step([KEEP_DIRECTION] * 7 + [0])
+    assert list(batch.game_over) == [1] * 8
+    assert batch.step() == 0
+
+    batch.reset([1, 0, 0, 0, 0, 0, 0, 0])
+    assert list(batch.game_over) == [0] + [1] * 7
+    batch.reset_finished()
+    assert not any(batch.game_over)
+    assert batch.heads.tolist() == [10, 10] * 8
+
+
+def test_numpy_views_share_memory(batch):
+    """Test that NumPy arrays are zero-copy views of the batch buffers."""
+    np = pytest.importorskip("numpy")
+    arrays = batch.as_numpy()
+    arrays["directions"][:] = 2
+    batch.step()
+    assert np.array_equal(arrays["heads"], np.tile([10, 11], (8, 1)))
+    assert arrays["scores"].sum() == 0
+
+
+def test_seeded_batch_matches_seeded_games():
+    """Test that batch game i plays like a single game seeded with seed + i."""
+    games = GameBatch(3, "build/libsnake.so", seed=100)
+    try:
+        for i in range(3):
+            single = SnakeAPI("build/libsnake.so", seed=100 + i)
+            assert games.get_state(i)["food"] == single.get_food_position()
+            single.cleanup()
+    finally:
+        games.cleanup()
@@ -0,0 +1,126 @@
+"""Test suite for the reinforcement-learning environments."""
+
+import pytest
+from src.api.snake_api import DIRECTION_NAMES, SnakeAPI
+
+np = pytest.importorskip("numpy")
+from src.api.env import SnakeEnv, SnakeVecEnv  # noqa: E402 pylint: disable=wrong-import-position
+
+LIB_PATH = "build/libsnake.so"
+
+
+def planes(state):
+    """The body, head and food planes of a `SnakeAPI` state."""
+    frame = np.zeros((3, state["height"], state["width"]), dtype=np.uint8)
+    for x, y in state["snake"]:
+        frame[0, y, x] = 1
+    head_x, head_y = state["snake"][0]
+    frame[1, head_y, head_x] = 1
+    food_x, food_y = state["food"]
+    frame[2, food_y, food_x] = 1
+    return frame
+
+
+def test_observations_match_game_state():
+    """Test that C draws the state, with older frames shifting back."""
+    env = SnakeVecEnv(3, LIB_PATH, seed=10, width=9, height=8, stack=3)
+    games = [SnakeAPI(LIB_PATH, seed=10 + i, width=9, height=8) for i in range(3)]
+    obs, _ = env.reset()
+    assert obs.shape == (3, 9, 8, 9) and obs.dtype == np.uint8
+    for i, api in enumerate(games):
+        api.reset()
+        for frame in range(3):
+            assert (obs[i, 3 * frame : 3 * frame + 3] == planes(api.get_state())).all()
+
+    actions = [1, 2, 0]
+    for _ in range(4):
+        previous = obs.copy()
+        obs, _, terminated, _, _ = env.step(actions)
+        assert not terminated.any()
+        assert (obs[:, :6] == previous[:, 3:]).all()
+        for i, api in enumerate(games):
+            api.step(DIRECTION_NAMES[actions[i]])
+            assert (obs[i, 6:] == planes(api.get_state())).all()
+        actions = [2, 3, 1]
+    env.cleanup()
+    for api in games:
+        api.cleanup()
+
+
+def test_observations_are_not_copied():
+    """Test that reset and step return views of one buffer written by C."""
+    env = SnakeVecEnv(2, LIB_PATH, seed=1, stack=2)
+    obs, _ = env.reset()
+    stepped = env.step([0, 0])[0]
+    assert stepped is obs is env.observations
+    assert obs.base is not None and not obs.flags.owndata
+    single = SnakeEnv(LIB_PATH, seed=1)
+    first, _ = single.reset()
+    assert np.shares_memory(first, single.step(1)[0])
+    env.cleanup()
+    single.cleanup()
+
+
+def test_rewards_and_autoreset():
+    """Test rewards against scores and games restarting after they end."""
+    env = SnakeVecEnv(8, LIB_PATH, seed=3, width=8, height=8)
+    env.reset()
+    rng = np.random.default_rng(0)
+    returns = np.zeros(8)
+    episodes = 0
+    for _ in range(400):
+        obs, rewards, terminated, truncated, info = env.step(rng.integers(0, 4, 8))
+        assert not truncated.any()
+        returns += rewards
+        for i in np.flatnonzero(terminated):
+            # Food eaten, then -1 for losing
+            assert returns[i] == info["score"][i] // 10 - 1
+            returns[i] = 0
+            episodes += 1
+            assert obs[i, 0].sum() == 1 and (obs[i, 0] == obs[i, 1]).all()
+    assert episodes > 8
+    env.cleanup()
+
+
+def test_truncation_and_single_env():
+    """Test max_steps and a single env that waits for reset."""
+    env = SnakeVecEnv(2, LIB_PATH, seed=0, width=30, height=30, max_steps=5)
+    env.reset()
+    for step in range(1, 6):
+        _, _, terminated, truncated, info = env.step([0, 2])
+        assert not terminated.any()
+        assert truncated.all() == (step == 5)
+    assert info["steps"].tolist() == [5, 5]
+    env.step([1, 1])
+    env.cleanup()
+
+    single = SnakeEnv(LIB_PATH, seed=2, width=5, height=5, stack=2)
+    obs, _ = single.reset()
+    assert obs.shape == (6, 5, 5)
+    terminated = False
+    steps = 0
+    while not terminated:
+        _, reward, terminated, truncated, info = single.step(0)
+        steps += 1
+        assert not truncated
+    assert reward == -1.0 and info["steps"] == steps
+    assert single.step(0)[1:3] == (0.0, True)
+    single.reset()
+    assert not single.step(1)[2]
+    single.cleanup()
+
+
+def test_seeded_reset_is_reproducible():
+    """Test that resetting with a seed replays the same episodes."""
+    env = SnakeVecEnv(4, LIB_PATH, width=10, height=10)
+    runs = []
+    for _ in range(2):
+        obs, _ = env.reset(seed=42)
+        frames = [obs.copy()]
+        for t in range(50):
+            frames.append(env.step([(t // 3) % 4] * 4)[0].copy())
+        runs.append(np.stack(frames))
+    assert (runs[0] == runs[1]).all()
+    env.cleanup()
+    with pytest.raises(ValueError):
+        SnakeVecEnv(2, LIB_PATH, stack=0)
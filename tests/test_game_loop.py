@@ -0,0 +1,153 @@
+"""Test suite for the server-side game loop."""
+
+import pytest
+from src.api.game_loop import GameLoop
+from src.api.sessions import SessionNotFoundError, SessionRegistry
+from src.api.snake_api import SnakeAPI
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def registry():
+    reg = SessionRegistry(factory=lambda: SnakeAPI("build/libsnake.so", seed=0))
+    yield reg
+    reg.clear()
+
+
+@pytest.fixture
+def loop(registry, clock):
+    game_loop = GameLoop(registry, base_interval=0.1, clock=clock)
+    yield game_loop
+    game_loop.stop()
+
+
+def head(frame):
+    return list(frame["snake"][0])
+
+
+def test_subscribe_publishes_current_state(registry, loop):
+    """Test that a new subscriber receives the current state immediately."""
+    session_id = registry.create()
+    subscription = loop.subscribe(session_id)
+    assert subscription.get(timeout=0) == registry.get(session_id).get_state()
+
+
+def test_ticks_at_game_speed(registry, loop):
+    """Test that sessions are stepped at their own speed."""
+    session_id = registry.create()
+    subscription = loop.subscribe(session_id)
+    start = head(subscription.get(timeout=0))
+
+    assert loop.tick(0.05) == 0
+    assert loop.tick(0.1) == 1
+    assert head(subscription.get(timeout=0)) == [start[0] + 1, start[1]]
+
+    registry.get(session_id).set_game_speed(2.0)
+    assert loop.tick(0.2) == 1
+    assert loop.tick(0.25) == 1
+    assert loop.tick(0.25) == 0
+    assert head(subscription.get(timeout=0)) == [start[0] + 2, start[1]]
+    assert head(subscription.get(timeout=0)) == [start[0] + 3, start[1]]
+    assert subscription.get(timeout=0) is None
+
+
+def test_stall_does_not_burst(registry, loop):
+    """Test that a late tick steps once instead of catching up."""
+    session_id = registry.create()
+    loop.subscribe(session_id)
+    assert loop.tick(1.0) == 1
+    assert loop.tick(1.05) == 0
+    assert loop.tick(1.1) == 1
+
+
+def test_shared_frames(registry, loop):
+    """Test that every subscriber of a session gets each frame once."""
+    session_id = registry.create()
+    first = loop.subscribe(session_id)
+    second = loop.subscribe(session_id)
+    first.get(timeout=0)
+    second.get(timeout=0)
+    assert loop.tick(0.1) == 1
+    assert first.get(timeout=0) == second.get(timeout=0)
+
+
+def test_unsubscribe_stops_ticking(registry, loop):
+    """Test that a session without subscribers is not advanced."""
+    session_id = registry.create()
+    subscription = loop.subscribe(session_id)
+    state = registry.get(session_id).get_state()
+    loop.unsubscribe(subscription)
+    assert subscription.closed
+    assert loop.tick(1.0) == 0
+    assert registry.get(session_id).get_state() == state
+
+
+def test_resubscribe_keeps_one_tick_per_interval(registry, loop):
+    """Test that reconnecting subscribers don't make a session tick faster."""
+    session_id = registry.create()
+    for _ in range(5):
+        loop.unsubscribe(loop.subscribe(session_id))
+    subscription = loop.subscribe(session_id)
+    start = head(subscription.get(timeout=0))
+    for step in range(1, 4):
+        assert loop.tick(0.1 * step) == 1
+    assert head(registry.get(session_id).get_state()) == [start[0] + 3, start[1]]
+
+
+def test_game_over_pauses_until_reset(registry, loop):
+    """Test that finished games publish nothing until they are reset."""
+    session_id = registry.create()
+    game = registry.get(session_id)
+    game.change_direction("up")
+    subscription = loop.subscribe(session_id)
+    now = 0.0
+    while not game.is_game_over():
+        now += 0.1
+        loop.tick(now)
+    assert loop.tick(now + 0.15) == 0
+
+    game.reset()
+    assert loop.tick(now + 0.25) == 1
+    while subscription.get(timeout=0) is not None:
+        pass
+
+
+def test_destroyed_session_closes_subscription(registry, loop):
+    """Test that subscribers are closed when their session goes away."""
+    session_id = registry.create()
+    subscription = loop.subscribe(session_id)
+    subscription.get(timeout=0)
+    registry.destroy(session_id)
+    loop.tick(0.1)
+    assert subscription.closed
+    assert subscription.get(timeout=0) is None
+
+    with pytest.raises(SessionNotFoundError):
+        loop.subscribe(session_id)
+
+
+def test_background_thread(registry):
+    """Test that a started loop pushes frames on its own."""
+    game_loop = GameLoop(registry, base_interval=0.01)
+    game_loop.start()
+    try:
+        subscription = game_loop.subscribe(registry.create())
+        start = head(subscription.get(timeout=1))
+        assert head(subscription.get(timeout=1)) == [start[0] + 1, start[1]]
+    finally:
+        game_loop.stop()
+    assert subscription.closed
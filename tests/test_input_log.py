@@ -0,0 +1,134 @@
+"""Test suite for input logs and replay."""
+
+import json
+import os
+import random
+
+import pytest
+from src.api.input_log import (
+    LOG_HEADER,
+    RECORD_CHECKPOINT,
+    RECORD_RESET,
+    parse_log,
+    read_log,
+    record_inputs,
+)
+from src.api.replay import main, replay_file
+from src.api.sessions import SessionRegistry
+from src.api.snake_api import DIRECTION_NAMES, SnakeAPI
+
+LIB_PATH = "build/libsnake.so"
+
+
+def play_recorded(path, seed=None, moves=400):
+    """Play a game with random turns and resets while logging its inputs."""
+    rng = random.Random(seed)
+    api = SnakeAPI(LIB_PATH, seed=seed, width=10, height=10)
+    record_inputs(api, path)
+    for _ in range(moves):
+        if api.is_game_over():
+            # Turns after the game ended are not logged
+            api.change_direction(rng.choice(DIRECTION_NAMES))
+            api.reset(rng.choice([None, rng.randrange(1000)]))
+        if rng.random() < 0.3:
+            api.step(rng.choice(DIRECTION_NAMES))
+        else:
+            api.move()
+    final = (api.get_tick(), api.get_score(), api.get_state_hash())
+    api.cleanup()
+    return final
+
+
+def test_replay_matches_recording(tmp_path):
+    """Test that replaying a log reaches every recorded state."""
+    path = str(tmp_path / "game.snklog")
+    tick, score, state_hash = play_recorded(path, seed=3)
+
+    (log,) = read_log(path)
+    assert (log.width, log.height, log.seed) == (10, 10, 3)
+    resets = [r for r in log.records if r.code == RECORD_RESET]
+    checkpoints = [r for r in log.records if r.code == RECORD_CHECKPOINT]
+    assert resets and len(checkpoints) == len(resets) + 1
+
+    (result,) = replay_file(path, LIB_PATH)
+    assert result.ok, result.error
+    assert result.checkpoints == len(checkpoints)
+    assert (result.ticks, result.score, result.state_hash) == (tick, score, state_hash)
+
+
+def test_replay_detects_tampering(tmp_path):
+    """Test that a changed input makes the replay diverge."""
+    path = str(tmp_path / "game.snklog")
+    play_recorded(path, seed=5)
+    data = bytearray(open(path, "rb").read())
+    (log,) = parse_log(bytes(data))
+    turns = [r for r in log.records if r.code < 4]
+    assert turns
+
+    # Records start right after the header; flip the first turn's direction
+    offset = LOG_HEADER.size
+    while data[offset] & 7 >= 4 or data[offset] & 0x80:
+        offset += 1
+    data[offset] ^= 1
+    tampered = tmp_path / "tampered.snklog"
+    tampered.write_bytes(bytes(data))
+    (result,) = replay_file(str(tampered), LIB_PATH)
+    assert not result.ok
+
+
+def test_log_is_compact_and_append_only(tmp_path):
+    """Test record sizes, concatenated logs and truncated files."""
+    path = str(tmp_path / "game.snklog")
+    api = SnakeAPI(LIB_PATH, seed=1)
+    record_inputs(api, path)
+    with pytest.raises(ValueError):
+        record_inputs(api, path)
+    api.step("down")
+    api.input_log.flush()
+    # One byte for the header-relative turn record
+    assert os.path.getsize(path) == LOG_HEADER.size + 1
+    with pytest.raises(ValueError):
+        api.restore(api.snapshot())
+    api.cleanup()
+
+    play_recorded(path, seed=2, moves=50)
+    logs = read_log(path)
+    assert [log.seed for log in logs] == [1, 2]
+
+    data = open(path, "rb").read()
+    partial = list(parse_log(data[:-3]))
+    assert len(partial) == 2 and partial[1].records == logs[1].records[:-1]
+    with pytest.raises(ValueError):
+        list(parse_log(b"XXXX" + data[4:]))
+
+    moved = SnakeAPI(LIB_PATH)
+    moved.move()
+    with pytest.raises(ValueError):
+        record_inputs(moved, str(tmp_path / "late.snklog"))
+    moved.cleanup()
+
+
+def test_registry_logs_sessions(tmp_path):
+    """Test that a registry writes a replayable log per session."""
+    registry = SessionRegistry(LIB_PATH, input_log_dir=str(tmp_path))
+    session_id = registry.create()
+    game = registry.get(session_id)
+    for direction in ("down", None, "left", None, "up"):
+        game.step(direction)
+    registry.destroy(session_id)
+    registry.create("not/a/file name")
+    registry.clear()
+
+    paths = sorted(os.listdir(tmp_path))
+    assert f"{session_id}.snklog" in paths and len(paths) == 2
+    assert main([str(tmp_path / p) for p in paths] + ["--lib", LIB_PATH]) == 0
+
+
+def test_replay_cli_json(tmp_path, capsys):
+    """Test the JSON output of the replay tool."""
+    path = str(tmp_path / "game.snklog")
+    play_recorded(path, seed=9, moves=100)
+    assert main([path, "--lib", LIB_PATH, "--json"]) == 0
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["games"] == 1 and summary["failed"] == 0
+    assert summary["results"][0]["ok"]
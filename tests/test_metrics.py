@@ -0,0 +1,142 @@
+"""Test suite for metrics collection and the /metrics endpoint."""
+
+import threading
+
+import pytest
+from src.api.metrics import (
+    FFI_SECONDS,
+    GAMES_OVER_TOTAL,
+    METRICS,
+    MOVES_TOTAL,
+    Metrics,
+    engine_metrics_reader,
+    timed_library,
+)
+from src.api.sharding import ShardedRegistry
+from src.api.snake_api import SnakeAPI, load_library
+
+LIB_PATH = "build/libsnake.so"
+
+
+@pytest.fixture
+def metrics_enabled():
+    """Enable the shared registry for one test."""
+    enabled = METRICS.enabled
+    METRICS.enabled = True
+    METRICS.reset()
+    yield METRICS
+    METRICS.enabled = enabled
+
+
+def test_threads_record_without_sharing():
+    """Test that values recorded by many threads are summed in a snapshot."""
+    metrics = Metrics(enabled=True)
+    hits = metrics.counter("hits_total", "Hits")
+    latency = metrics.histogram("latency_seconds", "Latency", (0.1, 1.0))
+
+    def record():
+        for i in range(1000):
+            metrics.inc(hits, (("route", "a"),))
+            metrics.observe(latency, 0.05 if i % 2 else 0.5)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    snapshot = metrics.snapshot()
+    assert snapshot[(hits, (("route", "a"),))] == 4000
+    assert snapshot[(latency, ())][:3] == [2000, 2000, 0]
+
+    text = metrics.render()
+    assert 'hits_total{route="a"} 4000' in text
+    assert 'latency_seconds_bucket{le="0.1"} 2000' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4000' in text
+    assert "latency_seconds_count 4000" in text
+    assert "# TYPE latency_seconds histogram" in text
+
+    # Snapshots from other processes are added to this one's
+    assert 'hits_total{route="a"} 4001' in metrics.render([{(hits, (("route", "a"),)): 1}])
+
+
+def test_disabled_records_nothing():
+    """Test that recording is a no-op while disabled, and rates and readers."""
+    metrics = Metrics()
+    hits = metrics.counter("hits_total", "Hits")
+    metrics.inc(hits)
+    assert metrics.snapshot() == {}
+
+    total = metrics.counter("moves_total", "Moves")
+    rate = metrics.rate("moves_per_second", "Moves per second", total)
+    values = iter([10, 30])
+    metrics.add_reader(lambda: {total: next(values)})
+    metrics.add_reader(lambda: 1 / 0)
+    assert "moves_total 10" in metrics.render()
+    text = metrics.render()
+    assert "moves_total 30" in text and f"{rate} " in text
+
+
+def test_games_record_ffi_calls_and_moves(metrics_enabled):
+    """Test that games time C calls and the engine counts moves and games over."""
+    read_engine = engine_metrics_reader(LIB_PATH)
+    before = read_engine()
+    api = SnakeAPI(LIB_PATH, width=5, height=5, library=timed_library(LIB_PATH))
+    assert not api.native
+    assert timed_library(LIB_PATH) is api.lib
+    assert api.lib._lib is load_library(LIB_PATH)  # pylint: disable=protected-access
+    api.change_direction("up")
+    moves = api.advance(100)
+    assert api.is_game_over()
+    api.move()
+    after = read_engine()
+    api.cleanup()
+
+    assert after[MOVES_TOTAL] - before[MOVES_TOTAL] == moves
+    assert after[GAMES_OVER_TOTAL] - before[GAMES_OVER_TOTAL] == 1
+    snapshot = metrics_enabled.snapshot()
+    counts = snapshot[(FFI_SECONDS, (("function", "advance_game"),))]
+    assert sum(counts[:-1]) >= 1 and counts[-1] > 0
+
+
+def test_metrics_endpoint(metrics_enabled, monkeypatch):
+    """Test per-route request metrics served by the Flask app."""
+    monkeypatch.setenv("SNAKE_METRICS", "1")
+    import app as server  # pylint: disable=import-outside-toplevel
+
+    server.app.config["TESTING"] = True
+    with server.app.test_client() as client:
+        session_id = client.post("/api/game/session").get_json()["session_id"]
+        client.post(f"/api/game/{session_id}/move")
+        client.post("/api/game/move")
+        client.get("/api/game/missing/state")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain")
+        text = response.get_data(as_text=True)
+
+        assert 'snake_http_requests_total{route="move",method="POST",status="200"} 2' in text
+        assert 'route="get_state",method="GET",status="404"' in text
+        assert 'snake_http_request_duration_seconds_count{route="move",method="POST"} 2' in text
+        assert 'snake_ffi_call_duration_seconds_count{function="move_snake"}' in text
+        assert "snake_active_sessions" in text and "snake_moves_total" in text
+
+        metrics_enabled.enabled = False
+        assert client.get("/metrics").status_code == 404
+        client.delete(f"/api/game/{session_id}")
+
+
+def test_sharded_metrics(metrics_enabled):
+    """Test that shard processes report their games' metrics."""
+    registry = ShardedRegistry(1, LIB_PATH)
+    try:
+        session_id = registry.create()
+        game = registry.get(session_id)
+        for _ in range(3):
+            game.move()
+        (snapshot,) = registry.metrics_snapshots()
+        assert snapshot[(MOVES_TOTAL, ())] == 3
+        assert (FFI_SECONDS, (("function", "move_snake"),)) in snapshot
+        assert 'function="move_snake"' in metrics_enabled.render([snapshot])
+    finally:
+        registry.close()
@@ -0,0 +1,114 @@
+"""Test suite for the native extension fast path of SnakeAPI."""
+
+import os
+import random
+import subprocess
+import sysconfig
+import threading
+
+import pytest
+from src.api.input_log import read_log, record_inputs
+from src.api.snake_api import NATIVE_MODULE, SnakeAPI
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORE = os.path.join(ROOT, "src", "core")
+
+
+@pytest.fixture(scope="module")
+def lib_path(tmp_path_factory):
+    """Build the library and the extension next to it, like `make build-ext`."""
+    build = tmp_path_factory.mktemp("native")
+    lib = str(build / "libsnake.so")
+    ext = str(build / (NATIVE_MODULE + sysconfig.get_config_var("EXT_SUFFIX")))
+    include = sysconfig.get_paths()["include"]
+    if not os.path.exists(os.path.join(include, "Python.h")):
+        pytest.skip("Python headers are not installed")
+    subprocess.run(
+        ["gcc", "-shared", "-O2", "-fPIC", "-o", lib, os.path.join(CORE, "snake.c")],
+        check=True,
+    )
+    subprocess.run(
+        ["gcc", "-shared", "-O2", "-fPIC", f"-I{include}", f"-I{CORE}", "-o", ext,
+         os.path.join(CORE, "snake_ext.c"), f"-L{build}", "-lsnake",
+         "-Wl,-rpath,$ORIGIN"],
+        check=True,
+    )
+    return lib
+
+
+def test_native_plays_like_ctypes(lib_path):
+    """Test that both bindings return the same results for the same inputs."""
+    native = SnakeAPI(lib_path, seed=7, width=8, height=6, native=True)
+    plain = SnakeAPI(lib_path, seed=7, width=8, height=6, native=False)
+    assert native.native and not plain.native
+    rng = random.Random(0)
+    for _ in range(500):
+        if native.is_game_over():
+            native.reset()
+            plain.reset()
+        direction = rng.choice(["up", "down", "left", "right"])
+        assert native.step(direction) == plain.step(direction)
+        assert native.get_state() == plain.get_state()
+        assert native.get_snake_positions() == plain.get_snake_positions()
+        assert native.get_food_position() == plain.get_food_position()
+        assert native.get_tick() == plain.get_tick()
+    assert native.advance(50) == plain.advance(50)
+    assert native.get_state_hash() == plain.get_state_hash()
+    with pytest.raises(ValueError):
+        native.change_direction("sideways")
+
+    native.cleanup()
+    plain.cleanup()
+    with pytest.raises(RuntimeError):
+        native.move()
+    with pytest.raises(RuntimeError):
+        native.get_state()
+
+
+def test_native_shares_lock_with_ctypes_calls(lib_path):
+    """Test that native and ctypes calls on one game do not interleave."""
+    api = SnakeAPI(lib_path, seed=1, width=30, height=30, native=True)
+    data = api.snapshot()
+    errors = []
+
+    def restore():
+        for _ in range(200):
+            api.restore(data)
+
+    def read():
+        for _ in range(2000):
+            state = api.get_state()
+            if len(state["snake"]) != state["length"]:
+                errors.append(state)
+            api.step("up")
+
+    threads = [threading.Thread(target=restore), threading.Thread(target=read)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    api.cleanup()
+    assert not errors
+
+
+def test_logged_turns_use_python(lib_path, tmp_path):
+    """Test that direction changes are still logged on native games."""
+    api = SnakeAPI(lib_path, seed=3, native=True)
+    path = str(tmp_path / "game.log")
+    record_inputs(api, path)
+    assert api.change_direction.__self__ is api
+    api.step("down")
+    api.cleanup()
+    (game_log,) = read_log(path)
+    assert game_log.records[0].code == 2  # down
+
+
+def test_native_required(tmp_path):
+    """Test that asking for the extension where it is not built fails."""
+    lib = os.path.join(ROOT, "build", "libsnake.so")
+    os.symlink(lib, tmp_path / "libsnake.so")
+    with pytest.raises(RuntimeError):
+        SnakeAPI(str(tmp_path / "libsnake.so"), native=True)
+    api = SnakeAPI(str(tmp_path / "libsnake.so"))
+    assert not api.native
+    api.cleanup()
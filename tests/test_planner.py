@@ -0,0 +1,139 @@
+"""Test suite for move suggestions computed in C."""
+
+import random
+from collections import deque
+
+from src.api.batch import GameBatch
+from src.api.snake_api import DIRECTION_NAMES, SnakeAPI
+
+LIB_PATH = "build/libsnake.so"
+MOVES = {"up": (0, -1), "right": (1, 0), "down": (0, 1), "left": (-1, 0)}
+
+
+def food_distances(state):
+    """Steps from every free cell to the food, by breadth-first search."""
+    body = set(state["snake"])
+    dist = {state["food"]: 0}
+    queue = deque([state["food"]])
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in MOVES.values():
+            cell = (x + dx, y + dy)
+            if (
+                0 <= cell[0] < state["width"]
+                and 0 <= cell[1] < state["height"]
+                and cell not in body
+                and cell not in dist
+            ):
+                dist[cell] = dist[x, y] + 1
+                queue.append(cell)
+    return dist
+
+
+def safe_moves(state):
+    """Moves that don't lose, each with the cell it leads to."""
+    back = DIRECTION_NAMES[(DIRECTION_NAMES.index(state["direction"]) + 2) % 4]
+    x, y = state["snake"][0]
+    moves = {}
+    for name, (dx, dy) in MOVES.items():
+        cell = (x + dx, y + dy)
+        if (
+            name != back
+            and 0 <= cell[0] < state["width"]
+            and 0 <= cell[1] < state["height"]
+            and cell not in state["snake"]
+        ):
+            moves[name] = cell
+    return moves
+
+
+def check_suggestion(state, direction, searched):
+    """Assert that a suggestion is safe and leads to the food if it can.
+
+    A fresh search must give a shortest path; a cached field may not, since
+    tail cells freed since the search can open shorter ones.
+    """
+    moves = safe_moves(state)
+    if not moves:
+        assert direction is None
+        return
+    assert direction in moves
+    dist = food_distances(state)
+    reachable = [dist[cell] for cell in moves.values() if cell in dist]
+    if reachable:
+        assert moves[direction] in dist
+        if searched:
+            assert dist[moves[direction]] == min(reachable)
+
+
+def test_suggestions_are_safe_and_reach_food():
+    """Test suggestions against a Python search, followed or not."""
+    api = SnakeAPI(LIB_PATH, seed=4, width=12, height=9)
+    rng = random.Random(1)
+    for _ in range(3000):
+        if api.is_game_over():
+            api.reset()
+        state = api.get_state()
+        searches = api.get_planner_stats()["searches"]
+        direction = api.suggest_direction()
+        check_suggestion(state, direction, api.get_planner_stats()["searches"] > searches)
+        # Mostly follow, sometimes stray from the cached field
+        if rng.random() < 0.1 or direction is None:
+            direction = rng.choice(list(MOVES))
+        api.step(direction)
+    stats = api.get_planner_stats()
+    assert stats["reused"] > stats["searches"] > 0
+    api.cleanup()
+
+
+def test_following_suggestions_scores():
+    """Test that a game played by the planner eats most of the board."""
+    api = SnakeAPI(LIB_PATH, seed=9, width=10, height=10)
+    while not api.is_game_over():
+        direction = api.suggest_direction()
+        if direction is None:
+            break
+        api.step(direction)
+    assert api.get_score() >= 200
+    api.cleanup()
+
+
+def test_batch_suggestions_match_single_games():
+    """Test that a batch suggests what each game's SnakeAPI suggests."""
+    batch = GameBatch(6, LIB_PATH, seed=20, width=8, height=8)
+    games = [SnakeAPI(LIB_PATH, seed=20 + i, width=8, height=8) for i in range(6)]
+    for _ in range(200):
+        planned = batch.suggest_directions()
+        suggestions = [api.suggest_direction() for api in games]
+        assert planned == sum(s is not None for s in suggestions)
+        assert list(batch.directions) == [
+            -1 if s is None else DIRECTION_NAMES.index(s) for s in suggestions
+        ]
+        batch.step()
+        for api, direction in zip(games, suggestions):
+            if direction is not None:
+                api.step(direction)
+            elif not api.is_game_over():
+                api.move()
+        assert [api.is_game_over() for api in games] == [bool(x) for x in batch.game_over]
+        batch.reset_finished()
+        for api in games:
+            if api.is_game_over():
+                api.reset()
+    assert batch.get_planner_stats()["reused"] > 0
+    batch.cleanup()
+    for api in games:
+        api.cleanup()
+
+
+def test_no_safe_move():
+    """Test the suggestion when the snake faces a wall in a corridor."""
+    api = SnakeAPI(LIB_PATH, seed=1, width=3, height=1)
+    api.set_food_position(0, 0)
+    assert api.suggest_direction() == "right"
+    assert api.get_planner_stats()["fills"] == 1
+    api.move()
+    assert api.suggest_direction() is None
+    api.move()
+    assert api.suggest_direction() is None
+    api.cleanup()
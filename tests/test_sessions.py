@@ -0,0 +1,77 @@
+"""Test suite for the game session registry."""
+
+import pytest
+from src.api.sessions import SessionLimitError, SessionNotFoundError, SessionRegistry
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def registry(clock):
+    reg = SessionRegistry("build/libsnake.so", max_sessions=3, idle_ttl=10, clock=clock)
+    yield reg
+    reg.clear()
+
+
+def test_create_and_get(registry):
+    """Test that sessions own independent games."""
+    first = registry.create()
+    second = registry.create()
+    assert first != second
+    registry.get(first).move()
+    assert registry.get(first).get_snake_positions() != registry.get(
+        second
+    ).get_snake_positions()
+
+
+def test_destroy(registry):
+    """Test that destroyed sessions can no longer be looked up."""
+    session_id = registry.create()
+    game = registry.get(session_id)
+    assert registry.destroy(session_id)
+    assert game.game_instance is None
+    assert not registry.destroy(session_id)
+    with pytest.raises(SessionNotFoundError):
+        registry.get(session_id)
+
+
+def test_idle_eviction(registry, clock):
+    """Test that idle sessions are evicted while active ones survive."""
+    idle = registry.create()
+    active = registry.create()
+    clock.now = 8
+    registry.get(active)
+    clock.now = 12
+    assert registry.evict_expired() == 1
+    assert idle not in registry
+    assert active in registry
+
+
+def test_max_sessions(registry, clock):
+    """Test the session cap and that expired sessions free up slots."""
+    for _ in range(3):
+        registry.create()
+    with pytest.raises(SessionLimitError):
+        registry.create()
+    clock.now = 20
+    registry.create()
+    assert len(registry) == 1
+
+
+def test_get_or_create(registry):
+    """Test that named sessions are created on demand."""
+    game = registry.get_or_create("player")
+    assert registry.get_or_create("player") is game
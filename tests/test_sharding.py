@@ -0,0 +1,148 @@
+"""Test suite for process-sharded session hosting."""
+
+import threading
+import time
+
+import pytest
+from src.api.sessions import SessionNotFoundError
+from src.api.sharding import HashRing, ShardedRegistry
+from src.api.snake_api import SnakeAPI
+
+LIB_PATH = "build/libsnake.so"
+
+
+@pytest.fixture
+def registry():
+    reg = ShardedRegistry(2, LIB_PATH, width=10, height=10)
+    yield reg
+    reg.close()
+
+
+def test_hash_ring_moves_few_keys():
+    """Test that adding a node only moves keys onto that node."""
+    ring = HashRing(["a", "b", "c"])
+    keys = [f"session-{i}" for i in range(3000)]
+    before = {key: ring.node_for(key) for key in keys}
+    assert set(before.values()) == {"a", "b", "c"}
+
+    ring.add("d")
+    moved = [key for key in keys if ring.node_for(key) != before[key]]
+    assert all(ring.node_for(key) == "d" for key in moved)
+    assert 0.1 < len(moved) / len(keys) < 0.4
+
+    ring.remove("d")
+    assert {key: ring.node_for(key) for key in keys} == before
+    with pytest.raises(ValueError):
+        ring.add("a")
+
+
+def test_remote_game_matches_local(registry):
+    """Test that a sharded game plays exactly like a local one."""
+    session_id = registry.create()
+    game = registry.get(session_id)
+    local = SnakeAPI(LIB_PATH, width=10, height=10)
+    game.reset(5)
+    local.reset(5)
+    for direction in ("down", "down", "left", "up", None, "right"):
+        game.step(direction)
+        local.step(direction)
+    assert game.get_state() == local.get_state()
+    assert game.get_state_bytes() == local.get_state_bytes()
+    assert (game.width, game.height) == (10, 10)
+    local.cleanup()
+
+
+def test_sessions_spread_over_shards(registry):
+    """Test routing by session id and the registry interface."""
+    ids = [registry.create() for _ in range(40)]
+    assert len(registry) == 40
+    assert sorted(registry) == sorted(ids)
+    assert {registry.shard_for(session_id) for session_id in ids} == set(registry.shards)
+
+    registry.get(ids[0]).move()
+    assert registry.destroy(ids[0])
+    assert not registry.destroy(ids[0])
+    assert ids[0] not in registry
+    with pytest.raises(SessionNotFoundError):
+        registry.get(ids[0])
+    with pytest.raises(SessionNotFoundError):
+        registry.get("missing").move()
+    with pytest.raises(ValueError):
+        registry.create(ids[1])
+    with pytest.raises(ValueError):
+        registry.get(ids[1]).change_direction("sideways")
+
+    assert registry.get_or_create("default").get_tick() == 0
+    registry.clear()
+    assert len(registry) == 0
+
+
+def test_add_shard_keeps_sessions(registry):
+    """Test that existing games stay where they are when a shard is added."""
+    ids = [registry.create() for _ in range(40)]
+    for session_id in ids:
+        registry.get(session_id).move()
+    owners = {session_id: registry.shard_for(session_id) for session_id in ids}
+
+    name = registry.add_shard()
+    assert name in registry.shards
+    for session_id in ids:
+        assert registry.shard_for(session_id) == owners[session_id]
+        assert registry.get(session_id).get_tick() == 1
+
+    new_ids = [registry.create() for _ in range(40)]
+    assert name in {registry.shard_for(session_id) for session_id in new_ids}
+
+
+def test_expired_sessions_are_unpinned():
+    """Test that pins of sessions the shards evicted are dropped."""
+    registry = ShardedRegistry(2, LIB_PATH, width=10, height=10, idle_ttl=0.3)
+    try:
+        ids = [registry.create() for _ in range(40)]
+        owners = {session_id: registry.shard_for(session_id) for session_id in ids}
+        registry.add_shard()
+        pinned = [s for s in ids if s in registry._pins]  # pylint: disable=protected-access
+        assert pinned
+        kept = pinned[0]
+        time.sleep(0.2)
+        registry.get(kept).move()
+        time.sleep(0.2)
+        assert registry.evict_expired() == len(ids) - 1
+        assert registry._pins == {kept: owners[kept]}  # pylint: disable=protected-access
+        assert registry.get(kept).get_tick() == 1
+    finally:
+        registry.close()
+
+
+def test_drain(registry):
+    """Test that a drained shard takes no new sessions and stops when empty."""
+    first, second = registry.shards
+    ids = [registry.create() for _ in range(20)]
+    on_first = [s for s in ids if registry.shard_for(s) == first]
+    assert on_first
+
+    # Sessions still alive when the timeout expires are destroyed
+    assert registry.drain(first, timeout=0) == len(on_first)
+    assert registry.shards == [second]
+    for session_id in on_first:
+        assert session_id not in registry
+    assert all(registry.shard_for(registry.create()) == second for _ in range(10))
+    with pytest.raises(ValueError):
+        registry.drain(second)
+
+
+def test_drain_waits_for_sessions(registry):
+    """Test that draining serves existing sessions until they end."""
+    first, _ = registry.shards
+    session_id = next(s for s in iter(registry.create, None) if registry.shard_for(s) == first)
+    registry.add_shard()
+
+    result = []
+    drainer = threading.Thread(target=lambda: result.append(registry.drain(first, poll=0.01)))
+    drainer.start()
+    registry.get(session_id).move()
+    assert registry.get(session_id).get_tick() == 1
+    registry.destroy(session_id)
+    drainer.join(5)
+    assert result == [0]
+    assert first not in registry.shards
@@ -0,0 +1,70 @@
+"""Test suite for the headless simulator."""
+
+import json
+import random
+
+from src.api.simulate import (
+    BATCH_POLICIES,
+    POLICIES,
+    greedy_policy,
+    main,
+    simulate_batch,
+    simulate_games,
+)
+from src.api.snake_api import DIRECTION_NAMES
+
+LIB_PATH = "build/libsnake.so"
+
+
+def test_greedy_policy_avoids_walls_and_body():
+    """Test that the greedy policy heads for food without dying."""
+    state = {
+        "width": 10,
+        "height": 10,
+        "snake": [(0, 5), (1, 5), (2, 5)],
+        "food": (0, 0),
+        "direction": "left",
+    }
+    # Up leads to the food, left into the wall
+    assert DIRECTION_NAMES[greedy_policy(state, random.Random(0))] == "up"
+    state["snake"] = [(5, 5), (5, 4), (6, 4), (6, 5), (6, 6)]
+    state["direction"] = "down"
+    state["food"] = (9, 5)
+    # Right is closest to the food but hits the body
+    assert DIRECTION_NAMES[greedy_policy(state, random.Random(0))] in ("down", "left")
+
+
+def test_simulations_report_measurements():
+    """Test both simulation paths with every policy."""
+    for name, policy in POLICIES.items():
+        results = simulate_games(4, 50, policy, seed=1, lib_path=LIB_PATH)
+        assert results["moves"] == 200
+        assert results["ffi_calls"] >= 4 * 200
+        assert 0 < results["step_p50_us"] <= results["step_p99_us"], name
+        assert results["peak_rss_bytes"] > 0
+    for name, policy in BATCH_POLICIES.items():
+        results = simulate_batch(16, 50, policy, seed=1, lib_path=LIB_PATH)
+        assert results["moves"] == 800 and 50 <= results["ffi_calls"] <= 100, name
+
+    # Seeded greedy runs are deterministic
+    first = simulate_games(2, 100, seed=7, lib_path=LIB_PATH)
+    second = simulate_games(2, 100, seed=7, lib_path=LIB_PATH)
+    assert (first["mean_score"], first["games_finished"]) == (
+        second["mean_score"],
+        second["games_finished"],
+    )
+
+
+def test_cli_json_output(tmp_path, capsys):
+    """Test JSON results printed and appended to a file."""
+    output = tmp_path / "results.jsonl"
+    args = ["--games", "3", "--steps", "20", "--lib", LIB_PATH, "--output", str(output)]
+    assert main(args + ["--json"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["config"]["path"] == "api"
+    assert report["results"]["moves"] == 60
+
+    assert main(args + ["--batch", "--policy", "random"]) == 0
+    assert "moves/s" in capsys.readouterr().out
+    lines = output.read_text().splitlines()
+    assert [json.loads(line)["config"]["path"] for line in lines] == ["api", "batch"]
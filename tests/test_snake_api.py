@@ -1,8 +1,16 @@
 """Test suite for the Snake game API."""
 
+import logging
 import os
 import pytest
-from src.api.snake_api import SnakeAPI
+from src.api.snake_api import (
+    SnakeAPI,
+    apply_delta,
+    decode_state,
+    game_pool_stats,
+    load_library,
+    set_game_pool_limits,
+)
 
 # Path to the compiled C library
 LIB_PATH = os.path.join(
@@ -130,3 +138,377 @@ def test_cleanup(api_instance):
     """Test cleanup of resources."""
     api_instance.cleanup()
     assert api_instance.game_instance is None
+
+
+def test_step(api_instance):
+    """Test changing direction and moving in one call."""
+    head_x, head_y = api_instance.get_snake_positions()[0]
+    api_instance.step("down")
+    assert api_instance.get_snake_positions()[0] == (head_x, head_y + 1)
+    api_instance.step()
+    assert api_instance.get_snake_positions()[0] == (head_x, head_y + 2)
+
+
+def test_get_state_long_snake(api_instance):
+    """Test that the state snapshot is not truncated for long snakes."""
+    # Serpentine through the lower half of the board, feeding every step
+    for _ in range(150):
+        x, y = api_instance.get_snake_positions()[0]
+        direction = api_instance.get_snake_direction()
+        if direction == "down":
+            direction = "left" if x == 19 else "right"
+        elif (direction == "right" and x == 19) or (direction == "left" and x == 0):
+            direction = "down"
+        api_instance.change_direction(direction)
+        step = {"up": (0, -1), "right": (1, 0), "down": (0, 1), "left": (-1, 0)}
+        dx, dy = step[direction]
+        api_instance.set_food_position(x + dx, y + dy)
+        api_instance.move()
+
+    state = api_instance.get_state()
+    assert not state["game_over"]
+    assert state["length"] == 151
+    assert len(state["snake"]) == 151
+    assert state["snake"] == api_instance.get_snake_positions()
+    assert state["score"] == api_instance.get_score()
+
+
+def test_core_logging(tmp_path, caplog):
+    """Test that debug builds forward core logs to Python logging."""
+    lib_path = str(tmp_path / "libsnake_debug.so")
+    os.system(f"gcc -shared -DSNAKE_DEBUG -o {lib_path} -fPIC src/core/snake.c")
+    api = SnakeAPI(lib_path)
+    try:
+        with caplog.at_level(logging.DEBUG, logger="snake.core"):
+            api.move()
+            assert not caplog.records
+            api.set_log_level(logging.DEBUG)
+            api.move()
+        assert any("Moving snake" in record.message for record in caplog.records)
+    finally:
+        api.set_log_level(logging.ERROR)
+        api.cleanup()
+
+
+def _play(api, moves):
+    """Play a fixed eating pattern and record food positions."""
+    foods = []
+    for _ in range(moves):
+        x, y = api.get_snake_positions()[0]
+        api.set_food_position(x + 1, y)
+        api.move()
+        foods.append(api.get_food_position())
+    return foods
+
+
+def test_seeded_games_are_reproducible():
+    """Test that equal seeds give equal food sequences."""
+    first, second, other = (SnakeAPI(LIB_PATH, seed=s) for s in (42, 42, 7))
+    try:
+        assert first.get_seed() == 42
+        assert first.get_food_position() == second.get_food_position()
+        sequence = _play(first, 5)
+        assert sequence == _play(second, 5)
+        assert sequence != _play(other, 5)
+
+        first.reset(seed=99)
+        second.reset(seed=99)
+        assert first.get_seed() == 99
+        assert _play(first, 3) == _play(second, 3)
+    finally:
+        for api in (first, second, other):
+            api.cleanup()
+
+
+def _hamiltonian_cycle(width, height):
+    """Return a cycle visiting every cell of an even-height board once."""
+    cycle = [(x, 0) for x in range(width)]
+    for y in range(1, height):
+        columns = range(width - 1, 0, -1) if y % 2 else range(1, width)
+        cycle.extend((x, y) for x in columns)
+    cycle.extend((0, y) for y in range(height - 1, 0, -1))
+    return cycle
+
+
+def test_full_board_wins(api_instance):
+    """Test that filling the board ends the game as won instead of hanging."""
+    cycle = _hamiltonian_cycle(20, 20)
+    names = {(0, -1): "up", (1, 0): "right", (0, 1): "down", (-1, 0): "left"}
+    index = cycle.index(api_instance.get_snake_positions()[0])
+
+    for _ in range(len(cycle) - 1):
+        x, y = cycle[index]
+        index = (index + 1) % len(cycle)
+        next_x, next_y = cycle[index]
+        api_instance.change_direction(names[(next_x - x, next_y - y)])
+        api_instance.set_food_position(next_x, next_y)
+        api_instance.move()
+
+    state = api_instance.get_state()
+    assert state["length"] == 400
+    assert state["won"] and state["game_over"]
+    assert api_instance.is_game_won()
+    assert state["food"] == (-1, -1)
+    assert decode_state(api_instance.get_state_bytes())["food"] == (-1, -1)
+
+    api_instance.reset()
+    assert not api_instance.is_game_won()
+    assert api_instance.get_snake_length() == 1
+
+
+def test_custom_grid_size():
+    """Test games on boards other than the default 20x20."""
+    api = SnakeAPI(LIB_PATH, width=7, height=3)
+    try:
+        state = api.get_state()
+        assert (state["width"], state["height"]) == (7, 3)
+        assert state["snake"] == [(3, 1)]
+        food_x, food_y = state["food"]
+        assert 0 <= food_x < 7 and 0 <= food_y < 3
+
+        for _ in range(3):
+            api.move()
+        assert not api.is_game_over()
+        api.move()
+        assert api.is_game_over()
+    finally:
+        api.cleanup()
+
+
+def test_large_grid_long_snake():
+    """Test that snapshots grow past their initial buffer on large boards."""
+    api = SnakeAPI(LIB_PATH, seed=0, width=2400, height=4)
+    try:
+        api.step("up")
+        api.change_direction("left")
+        for _ in range(1150):
+            x, y = api.get_snake_positions()[0]
+            api.set_food_position(x - 1, y)
+            api.move()
+        state = api.get_state()
+        assert not state["game_over"]
+        assert state["length"] == len(state["snake"]) == 1151
+        assert state["snake"][0] == (50, 1)
+        assert state["snake"][-1] == (1200, 1)
+    finally:
+        api.cleanup()
+
+
+def test_invalid_grid_size():
+    """Test that empty boards are rejected."""
+    with pytest.raises(ValueError):
+        SnakeAPI(LIB_PATH, width=0, height=10)
+
+
+def test_delta_tracks_state():
+    """Test that applying deltas reproduces the snake tick after tick."""
+    api = SnakeAPI(LIB_PATH, seed=3, width=10, height=10)
+    try:
+        state = api.get_state()
+        snake, tick = state["snake"], state["tick"]
+        turns = ["down", "left", "up", "right"]
+        for i in range(40):
+            if i % 3 == 0:
+                # Feed the snake so deltas also cover growth
+                x, y = api.get_snake_positions()[0]
+                api.set_food_position(x + 1, y)
+            api.step(turns[(i // 2) % 4] if i % 2 else None)
+            delta = api.get_delta(tick)
+            if not delta["keyframe"]:
+                assert len(delta["head"]) == delta["tick"] - tick
+            snake, tick = apply_delta(snake, delta), delta["tick"]
+            assert snake == api.get_snake_positions()
+            assert delta["score"] == api.get_score()
+            if api.is_game_over():
+                api.reset()
+    finally:
+        api.cleanup()
+
+
+def test_delta_keyframes(api_instance):
+    """Test when a delta falls back to the whole snake."""
+    x, y = api_instance.get_snake_positions()[0]
+    api_instance.set_food_position(x + 1, y)
+    api_instance.move()
+    start = api_instance.get_tick()
+    api_instance.move()
+    delta = api_instance.get_delta(start)
+    assert not delta["keyframe"]
+    assert delta["head"] == api_instance.get_snake_positions()[:1]
+    assert api_instance.get_delta(delta["tick"])["head"] == []
+
+    # Older than the snake's length, from the future, or from before a reset
+    api_instance.move()
+    assert api_instance.get_delta(start)["keyframe"]
+    assert api_instance.get_delta(api_instance.get_tick() + 1)["keyframe"]
+    assert api_instance.get_delta(1 << 70)["keyframe"]
+    before_reset = api_instance.get_tick()
+    api_instance.reset()
+    assert api_instance.get_tick() > before_reset
+    assert api_instance.get_delta(before_reset)["keyframe"]
+    assert not api_instance.get_delta(api_instance.get_tick())["keyframe"]
+
+    with pytest.raises(ValueError):
+        api_instance.get_delta(-1)
+
+
+@pytest.mark.parametrize(
+    "width,height,size",
+    [(20, 20, 32 + 2 * 3), (256, 2, 32 + 2 * 3), (257, 2, 32 + 4 * 3), (70000, 1, 32 + 8 * 3)],
+)
+def test_state_bytes(width, height, size):
+    """Test that the binary state decodes to get_state, with coordinates sized to the board."""
+    api = SnakeAPI(LIB_PATH, seed=5, width=width, height=height)
+    try:
+        x, y = api.get_snake_positions()[0]
+        api.set_food_position(x + 1, y)
+        api.move()
+        data = api.get_state_bytes()
+        assert len(data) == size
+        decoded = decode_state(data)
+        assert decoded.pop("keyframe")
+        assert decoded == api.get_state()
+
+        api.move()
+        delta = decode_state(api.get_state_bytes(since=api.get_tick() - 1))
+        assert delta == api.get_delta(api.get_tick() - 1)
+    finally:
+        api.cleanup()
+
+
+def test_state_bytes_long_snake():
+    """Test that the encode buffer grows with the snake."""
+    api = SnakeAPI(LIB_PATH, seed=0, width=2400, height=4)
+    try:
+        api.step("up")
+        for _ in range(1100):
+            x, y = api.get_snake_positions()[0]
+            api.set_food_position(x - 1, y)
+            api.step("left")
+        decoded = decode_state(api.get_state_bytes())
+        assert decoded["snake"] == api.get_snake_positions()
+        assert len(decoded["snake"]) == 1101
+    finally:
+        api.cleanup()
+
+
+def test_decode_state_rejects_bad_data(api_instance):
+    """Test that truncated or unknown data is rejected."""
+    data = api_instance.get_state_bytes()
+    with pytest.raises(ValueError):
+        decode_state(data[:10])
+    with pytest.raises(ValueError):
+        decode_state(b"\x09" + data[1:])
+
+
+def test_snapshot_restore_continues_game():
+    """Test that a restored game plays on exactly like the original."""
+    original = SnakeAPI(LIB_PATH, seed=11, width=20, height=10)
+    copy = SnakeAPI(LIB_PATH, width=5, height=5)
+    try:
+        original.set_game_speed(2.5)
+        _play(original, 4)
+        data = original.snapshot()
+        copy.restore(data)
+        assert (copy.width, copy.height) == (20, 10)
+        assert copy.get_game_speed() == 2.5
+        assert copy.get_seed() == 11
+        assert copy.get_state()["snake"] == original.get_state()["snake"]
+        assert _play(copy, 4) == _play(original, 4)
+        assert not copy.is_game_over()
+        assert copy.get_score() == original.get_score() == 80
+    finally:
+        original.cleanup()
+        copy.cleanup()
+
+
+def test_restore_forces_keyframe(api_instance):
+    """Test that delta clients of a restored game get the whole snake."""
+    data = api_instance.snapshot()
+    for _ in range(3):
+        api_instance.move()
+    tick = api_instance.get_tick()
+    api_instance.restore(data)
+    assert api_instance.get_tick() == tick + 1
+    assert api_instance.get_delta(tick)["keyframe"]
+    assert api_instance.get_snake_positions() == [(10, 10)]
+
+
+def test_snapshot_full_board(api_instance):
+    """Test a snapshot at the maximum snake length."""
+    cycle = _hamiltonian_cycle(20, 20)
+    names = {(0, -1): "up", (1, 0): "right", (0, 1): "down", (-1, 0): "left"}
+    index = cycle.index(api_instance.get_snake_positions()[0])
+    for _ in range(len(cycle) - 1):
+        x, y = cycle[index]
+        index = (index + 1) % len(cycle)
+        api_instance.set_food_position(*cycle[index])
+        api_instance.step(names[(cycle[index][0] - x, cycle[index][1] - y)])
+
+    data = api_instance.snapshot()
+    # Header, 2 bits per segment after the head, no free cells
+    assert len(data) == 68 + 100
+    copy = SnakeAPI(LIB_PATH)
+    try:
+        copy.restore(data)
+        state = copy.get_state()
+        assert state["won"] and state["food"] == (-1, -1)
+        assert state["snake"] == api_instance.get_snake_positions()
+    finally:
+        copy.cleanup()
+
+
+def test_restore_rejects_bad_data(api_instance):
+    """Test that truncated or corrupt snapshots leave the game unchanged."""
+    api_instance.move()
+    data = api_instance.snapshot()
+    state = api_instance.get_state()
+    for bad in (b"", data[:-1], data + b"\x00", b"XXXX" + data[4:]):
+        with pytest.raises(ValueError):
+            api_instance.restore(bad)
+    assert api_instance.get_state() == state
+
+
+def test_games_share_library():
+    """Test that games share one configured library handle."""
+    first = SnakeAPI(LIB_PATH)
+    second = SnakeAPI(os.path.relpath(LIB_PATH))
+    assert first.lib is second.lib
+    first.cleanup()
+    second.cleanup()
+
+
+def test_library_setups_run_once():
+    """Test that a feature's signature setup runs once per library."""
+    calls = []
+
+    def setup(lib):
+        calls.append(lib)
+
+    lib = load_library(LIB_PATH, (setup,))
+    assert load_library(LIB_PATH, (setup,)) is lib
+    assert load_library(LIB_PATH) is lib
+    assert calls == [lib]
+
+
+def test_destroyed_games_are_reused():
+    """Test that new games reuse pooled memory and play like new ones."""
+    fresh = SnakeAPI(LIB_PATH, seed=5, width=6, height=6)
+    expected = fresh.get_state_hash()
+    fresh.cleanup()
+    try:
+        before = game_pool_stats(LIB_PATH)
+        for _ in range(10):
+            api = SnakeAPI(LIB_PATH, seed=5, width=6, height=6)
+            assert api.get_state_hash() == expected
+            api.advance(3)
+            api.cleanup()
+        after = game_pool_stats(LIB_PATH)
+        assert after["allocated"] == before["allocated"]
+        assert after["reused"] - before["reused"] == 10
+
+        set_game_pool_limits(0, 0, LIB_PATH)
+        stats = game_pool_stats(LIB_PATH)
+        assert stats["pooled"] == 0 and stats["pooled_bytes"] == 0
+    finally:
+        set_game_pool_limits(1024, 64 << 20, LIB_PATH)
@@ -0,0 +1,124 @@
+"""Stress tests for sharing games between threads."""
+
+import random
+import threading
+
+from src.api.batch import GameBatch
+from src.api.snake_api import SnakeAPI
+
+LIB_PATH = "build/libsnake.so"
+DIRECTIONS = ("up", "right", "down", "left")
+
+
+def play(api, moves, seed):
+    """Play a game with pseudo-random turns and return its final state."""
+    rng = random.Random(seed)
+    for _ in range(moves):
+        if api.is_game_over():
+            api.reset()
+        api.step(rng.choice(DIRECTIONS))
+    return api.get_state()
+
+
+def run_threads(target, count):
+    errors = []
+
+    def guarded(index):
+        try:
+            target(index)
+        except Exception as e:  # pylint: disable=broad-except
+            errors.append(e)
+
+    threads = [threading.Thread(target=guarded, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_independent_games_match_serial_run():
+    """Test that games stepped on separate threads play as if run alone."""
+    count, moves = 8, 2000
+    expected = []
+    for i in range(count):
+        api = SnakeAPI(LIB_PATH, seed=i)
+        expected.append(play(api, moves, i))
+        api.cleanup()
+
+    results = [None] * count
+
+    def worker(index):
+        api = SnakeAPI(LIB_PATH, seed=index)
+        results[index] = play(api, moves, index)
+        api.cleanup()
+
+    run_threads(worker, count)
+    assert results == expected
+
+
+def test_shared_game_stays_consistent():
+    """Test that concurrent calls on one game never see a torn snake."""
+    api = SnakeAPI(LIB_PATH, seed=7, width=12, height=12)
+
+    def worker(index):
+        rng = random.Random(index)
+        for _ in range(2000):
+            action = rng.random()
+            if action < 0.4:
+                api.step(rng.choice(DIRECTIONS))
+            elif action < 0.6:
+                api.change_direction(rng.choice(DIRECTIONS))
+            elif action < 0.65:
+                api.reset()
+            elif action < 0.8:
+                api.get_delta(max(0, api.get_tick() - 3))
+            else:
+                state = api.get_state()
+                snake = state["snake"]
+                assert len(snake) == state["score"] // 10 + 1
+                for (x1, y1), (x2, y2) in zip(snake, snake[1:]):
+                    assert abs(x1 - x2) + abs(y1 - y2) == 1
+            if api.is_game_over():
+                api.reset()
+
+    run_threads(worker, 8)
+    api.cleanup()
+
+
+def test_cleanup_while_in_use():
+    """Test that calls racing with cleanup fail cleanly instead of crashing."""
+    api = SnakeAPI(LIB_PATH)
+    failures = []
+
+    def worker(index):
+        if index == 0:
+            api.cleanup()
+            return
+        for _ in range(1000):
+            try:
+                api.step()
+                api.get_state()
+            except RuntimeError:
+                failures.append(index)
+                return
+
+    run_threads(worker, 4)
+    assert api.game_instance is None
+    assert sorted(failures) == [1, 2, 3]
+
+
+def test_shared_batch():
+    """Test that a batch can be stepped and read from several threads."""
+    batch = GameBatch(64, LIB_PATH, seed=0)
+
+    def worker(index):
+        rng = random.Random(index)
+        for _ in range(500):
+            batch.step([rng.randrange(4) for _ in range(64)])
+            batch.reset_finished()
+            state = batch.get_state(rng.randrange(64))
+            assert len(state["snake"]) >= 1
+
+    run_threads(worker, 4)
+    batch.cleanup()